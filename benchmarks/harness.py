@@ -0,0 +1,208 @@
+"""Offline workflow benchmarks on top of the test suite's fake services.
+
+Installs the fakes from tests/conftest.py (install_fake_db, install_fake_openai,
+install_fake_gmail), wraps every fake call with a counter and an optional
+synthetic latency, seeds N users or emails, and runs one workflow. Nothing
+touches Supabase, OpenAI or Gmail.
+
+Call counts are deterministic for a given tree, so they are what the
+baseline gates on: an N+1 query shows up as db calls growing faster than N.
+Wall time depends on the synthetic latency and the machine and is reported
+for comparison only.
+"""
+
+import logging
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from tests.conftest import (
+    install_fake_db, install_fake_gmail, install_fake_openai, make_conversation, make_email, make_user,
+)
+
+# Captured before anything patches time.sleep
+_sleep = time.sleep
+
+CATEGORIES = ("db", "llm", "imap", "smtp")
+
+# Synthetic latency per fake call, in milliseconds
+DEFAULT_LATENCY_MS = {"db": 1, "llm": 10, "imap": 5, "smtp": 5}
+
+IMAP_FUNCTIONS = {"inbox_status", "fetch_unread_emails", "fetch_old_unread_emails", "mark_as_read", "mark_multiple_as_read"}
+
+ALL_DAYS = "mon,tue,wed,thu,fri,sat,sun"
+
+
+def _days_ago(days: int) -> str:
+    return (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+
+
+# ── Scenarios ──────────────────────────────────────────────────
+# Each seeds the fakes for n items and returns the workflow call.
+
+def _process_emails(storage, gmail, n):
+    from workflows import process_emails
+    emails = []
+    for i in range(n):
+        user = make_user(email=f"user{i}@example.com", first_name=f"User{i}")
+        storage["users"].append(user)
+        emails.append(make_email(from_email=user["email"], imap_id=str(i + 1),
+                                 body=f"Update {i}: talked to three customers about pricing."))
+    gmail["fetch_unread_emails"].return_value = emails
+    return process_emails.run
+
+
+def _send_approved(storage, gmail, n):
+    from workflows import send_approved
+    types = ("Check-in", "Follow-up", "Onboarding")
+    for i in range(n):
+        user = make_user(email=f"user{i}@example.com", first_name=f"User{i}")
+        storage["users"].append(user)
+        conv_type = types[i % len(types)]
+        if conv_type == "Check-in":
+            # As check_in drafts them: no inbound message, subject pregenerated
+            fields = {"email_subject": "Checking in on your launch", "user_message_raw": None,
+                      "user_message_parsed": None}
+        else:
+            fields = {"email_subject": "Re: Coaching"}
+        storage["conversations"].append(make_conversation(
+            user_id=user["id"], type=conv_type, status="Approved", approved_at=_days_ago(0), **fields,
+        ))
+    return lambda: send_approved.run(immediate=True)
+
+
+def _check_in(storage, gmail, n):
+    from workflows import check_in
+    for i in range(n):
+        storage["users"].append(make_user(
+            email=f"user{i}@example.com", first_name=f"User{i}",
+            checkin_days=ALL_DAYS, last_response_date=_days_ago(5),
+        ))
+    return check_in.run
+
+
+def _re_engagement(storage, gmail, n):
+    from workflows import re_engagement
+    for i in range(n):
+        storage["users"].append(make_user(
+            email=f"user{i}@example.com", first_name=f"User{i}", last_response_date=_days_ago(20),
+        ))
+    return re_engagement.run
+
+
+SCENARIOS = {
+    "process_emails": _process_emails,
+    "send_approved": _send_approved,
+    "check_in": _check_in,
+    "re_engagement": _re_engagement,
+}
+
+
+# ── Instrumentation ────────────────────────────────────────────
+
+def _instrument(monkeypatch, module, name, category, counts, latency_ms):
+    fn = getattr(module, name)
+    delay = latency_ms.get(category, 0) / 1000
+
+    def wrapper(*args, **kwargs):
+        counts[category] += 1
+        counts[f"{category}.{name}"] += 1
+        if delay:
+            _sleep(delay)
+        return fn(*args, **kwargs)
+
+    monkeypatch.setattr(module, name, wrapper)
+
+
+def _install(monkeypatch, latency_ms, counts):
+    """Install the fakes and wrap each one; returns (storage, gmail mocks)."""
+    import db.supabase_client as db_mod
+    import services.embedding_service as embedding
+    import services.gmail_service as gmail_mod
+    import services.openai_service as oai
+
+    storage = install_fake_db(monkeypatch)
+    openai_mocks = install_fake_openai(monkeypatch)
+    gmail_mocks = install_fake_gmail(monkeypatch)
+    # RAG embeds the query; keep it offline like the other LLM calls
+    monkeypatch.setattr(embedding, "embed_text", lambda text: [0.0] * 1536)
+
+    for name, fn in list(vars(db_mod).items()):
+        if getattr(fn, "__qualname__", "").startswith("install_fake_db."):
+            _instrument(monkeypatch, db_mod, name, "db", counts, latency_ms)
+    for name in openai_mocks:
+        _instrument(monkeypatch, oai, name, "llm", counts, latency_ms)
+    _instrument(monkeypatch, embedding, "embed_text", "llm", counts, latency_ms)
+    for name in gmail_mocks:
+        category = "imap" if name in IMAP_FUNCTIONS else "smtp"
+        _instrument(monkeypatch, gmail_mod, name, category, counts, latency_ms)
+
+    return storage, gmail_mocks
+
+
+def run_scenario(workflow: str, size: int, latency_ms: dict = None) -> dict:
+    """Run one workflow against size seeded items; returns its measurements."""
+    latency_ms = DEFAULT_LATENCY_MS if latency_ms is None else latency_ms
+    counts = Counter()
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        storage, gmail = _install(monkeypatch, latency_ms, counts)
+        run = SCENARIOS[workflow](storage, gmail, size)
+        counts.clear()  # Seeding doesn't count
+
+        previous_level = logging.root.manager.disable
+        logging.disable(logging.INFO)
+        tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            run()
+        finally:
+            wall = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            logging.disable(previous_level)
+
+    return {
+        "workflow": workflow,
+        "size": size,
+        "wall_seconds": round(wall, 3),
+        "peak_memory_kb": round(peak / 1024, 1),
+        "calls": {category: counts[category] for category in CATEGORIES},
+        "calls_by_function": {
+            key: value for key, value in sorted(counts.items()) if "." in key
+        },
+    }
+
+
+def result_key(result: dict) -> str:
+    return f"{result['workflow']}@{result['size']}"
+
+
+def compare(results: list[dict], baseline: dict, max_slowdown: float = None) -> list[str]:
+    """Return a regression message for every result worse than its baseline.
+
+    Any call count above the baseline is a regression. Wall time only counts
+    when max_slowdown is given (e.g. 1.5 = 50% slower than baseline).
+    """
+    regressions = []
+    for result in results:
+        key = result_key(result)
+        base = baseline.get(key)
+        if not base:
+            continue
+        for category in CATEGORIES:
+            now, before = result["calls"][category], base["calls"].get(category, 0)
+            if now > before:
+                grew = sorted(
+                    name for name, count in result["calls_by_function"].items()
+                    if name.startswith(f"{category}.") and count > base["calls_by_function"].get(name, 0)
+                )
+                regressions.append(f"{key}: {now} {category} calls (baseline {before}; grew: {', '.join(grew)})")
+        if max_slowdown and result["wall_seconds"] > base["wall_seconds"] * max_slowdown:
+            regressions.append(
+                f"{key}: {result['wall_seconds']}s wall time (baseline {base['wall_seconds']}s)"
+            )
+    return regressions
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Benchmark the workflows offline and compare against the saved baseline.
+
+Each workflow runs against the fake services from tests/conftest.py at each
+size (users or emails), with synthetic latency per fake call. Reports wall
+time, peak memory and DB/LLM/IMAP/SMTP call counts. Exits non-zero if any
+call count exceeds benchmarks/baseline.json.
+
+Usage:
+    python -m benchmarks.run                              # All workflows at 10, 100, 1000
+    python -m benchmarks.run --sizes 10,100 --workflows process_emails,check_in
+    python -m benchmarks.run --latency db=5,llm=800       # Closer to production latency
+    python -m benchmarks.run --max-slowdown 1.5           # Also gate on wall time
+    python -m benchmarks.run --update-baseline            # Accept the current numbers
+"""
+
+import argparse
+import json
+import os
+import sys
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import DEFAULT_LATENCY_MS, SCENARIOS, compare, result_key, run_scenario
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_SIZES = (10, 100, 1000)
+
+
+def load_baseline(path: str = BASELINE_PATH) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _parse_latency(value: str) -> dict:
+    latency = dict(DEFAULT_LATENCY_MS)
+    for part in filter(None, value.split(",")):
+        category, _, ms = part.partition("=")
+        if category not in latency:
+            raise argparse.ArgumentTypeError(f"unknown category '{category}' (use {', '.join(latency)})")
+        latency[category] = float(ms)
+    return latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline workflow benchmarks")
+    parser.add_argument("--workflows", default=",".join(SCENARIOS), help="Comma-separated workflow names")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="Comma-separated item counts")
+    parser.add_argument("--latency", type=_parse_latency, default=dict(DEFAULT_LATENCY_MS),
+                        help="Synthetic ms per fake call, e.g. db=1,llm=10,imap=5,smtp=5")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON path")
+    parser.add_argument("--output", help="Also write this run's results to a JSON file")
+    parser.add_argument("--max-slowdown", type=float, help="Fail if wall time exceeds baseline by this factor")
+    parser.add_argument("--update-baseline", action="store_true", help="Write results into the baseline")
+    args = parser.parse_args()
+
+    workflows = [w.strip() for w in args.workflows.split(",") if w.strip()]
+    unknown = [w for w in workflows if w not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown workflow(s): {', '.join(unknown)}")
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    baseline = load_baseline(args.baseline)
+    results = []
+    print(f"{'benchmark':<22} {'wall':>8} {'peak KB':>9} {'db':>6} {'llm':>6} {'imap':>5} {'smtp':>5}")
+    for workflow in workflows:
+        for size in sizes:
+            result = run_scenario(workflow, size, args.latency)
+            results.append(result)
+            calls = result["calls"]
+            print(f"{result_key(result):<22} {result['wall_seconds']:>7.2f}s {result['peak_memory_kb']:>9.0f} "
+                  f"{calls['db']:>6} {calls['llm']:>6} {calls['imap']:>5} {calls['smtp']:>5}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"latency_ms": args.latency, "results": results}, f, indent=2)
+
+    if args.update_baseline:
+        baseline.update({result_key(r): r for r in results})
+        with open(args.baseline, "w") as f:
+            json.dump(dict(sorted(baseline.items())), f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline updated: {args.baseline}")
+        return
+
+    regressions = compare(results, baseline, args.max_slowdown)
+    if regressions:
+        print("\nRegressions against baseline:")
+        for message in regressions:
+            print(f"  {message}")
+        sys.exit(1)
+    print("\nNo regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
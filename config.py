@@ -1,18 +1,69 @@
+"""Configuration, resolved lazily per subsystem.
+
+Settings are read as module attributes (config.SUPABASE_URL). Nothing is
+read until a setting is first used; then its whole subsystem is loaded from
+the environment and validated, so importing config is free and cron runs
+never import streamlit. Call validate() to check every subsystem up front.
+"""
+
 import os
 import sys
-from dotenv import load_dotenv
+from functools import lru_cache
+
+REQUIRED = object()
+
+# Settings by subsystem, with their defaults
+SUBSYSTEMS = {
+    "supabase": {
+        "SUPABASE_URL": REQUIRED,
+        "SUPABASE_KEY": REQUIRED,
+    },
+    "openai": {
+        "OPENAI_API_KEY": REQUIRED,
+        "VECTOR_STORE_ID": "vs_6985fa853f84819196e012018b0defca",
+    },
+    "gmail": {
+        "GMAIL_ADDRESS": REQUIRED,
+        "GMAIL_APP_PASSWORD": REQUIRED,
+        "GMAIL_IMAP_HOST": "imap.gmail.com",
+        "GMAIL_SMTP_HOST": "smtp.gmail.com",
+        "GMAIL_SMTP_PORT": "587",
+    },
+    # Optional — only needed when Anthropic is selected as AI provider
+    "anthropic": {
+        "ANTHROPIC_API_KEY": "",
+    },
+    "app": {
+        "COACH_TIMEZONE": "America/New_York",
+    },
+}
+
+_SUBSYSTEM_OF = {name: subsystem for subsystem, names in SUBSYSTEMS.items() for name in names}
+
+_environment_loaded = False
+
+
+def _load_environment():
+    """Load .env, and Streamlit secrets when running inside the dashboard."""
+    global _environment_loaded
+    if _environment_loaded:
+        return
+    _environment_loaded = True
 
-load_dotenv()
+    from dotenv import load_dotenv
+    load_dotenv()
 
-# Streamlit Community Cloud stores secrets in st.secrets, not os.environ.
-# Copy them into os.environ so the rest of the code works unchanged.
-try:
-    import streamlit as st
-    for key, value in st.secrets.items():
-        if isinstance(value, str):
-            os.environ.setdefault(key, value)
-except Exception:
-    pass
+    # Streamlit Community Cloud stores secrets in st.secrets, not os.environ.
+    # Copy them into os.environ so the rest of the code works unchanged. Only
+    # the dashboard has streamlit loaded; workflows skip the import entirely.
+    if "streamlit" in sys.modules:
+        try:
+            st = sys.modules["streamlit"]
+            for key, value in st.secrets.items():
+                if isinstance(value, str):
+                    os.environ.setdefault(key, value)
+        except Exception:
+            pass
 
 
 def _require(var_name: str) -> str:
@@ -25,27 +76,31 @@ def _require(var_name: str) -> str:
     return value.strip()
 
 
-# Supabase
-SUPABASE_URL = _require("SUPABASE_URL")
-SUPABASE_KEY = _require("SUPABASE_KEY")
+@lru_cache(maxsize=None)
+def load(subsystem: str) -> dict:
+    """Read and validate one subsystem's settings (cached)."""
+    _load_environment()
+    values = {
+        name: _require(name) if default is REQUIRED else os.environ.get(name, default)
+        for name, default in SUBSYSTEMS[subsystem].items()
+    }
+    if subsystem == "gmail":
+        try:
+            values["GMAIL_SMTP_PORT"] = int(values["GMAIL_SMTP_PORT"])
+        except ValueError:
+            print(f"ERROR: GMAIL_SMTP_PORT must be a number, got '{values['GMAIL_SMTP_PORT']}'", file=sys.stderr)
+            sys.exit(1)
+    return values
 
-# OpenAI
-OPENAI_API_KEY = _require("OPENAI_API_KEY")
-VECTOR_STORE_ID = os.environ.get("VECTOR_STORE_ID", "vs_6985fa853f84819196e012018b0defca")
 
-# Gmail
-GMAIL_ADDRESS = _require("GMAIL_ADDRESS")
-GMAIL_APP_PASSWORD = _require("GMAIL_APP_PASSWORD")
-GMAIL_IMAP_HOST = os.environ.get("GMAIL_IMAP_HOST", "imap.gmail.com")
-GMAIL_SMTP_HOST = os.environ.get("GMAIL_SMTP_HOST", "smtp.gmail.com")
-try:
-    GMAIL_SMTP_PORT = int(os.environ.get("GMAIL_SMTP_PORT", "587"))
-except ValueError:
-    print(f"ERROR: GMAIL_SMTP_PORT must be a number, got '{os.environ.get('GMAIL_SMTP_PORT')}'", file=sys.stderr)
-    sys.exit(1)
+def validate():
+    """Load every subsystem, exiting on the first missing required setting."""
+    for subsystem in SUBSYSTEMS:
+        load(subsystem)
 
-# Anthropic (optional — only needed when Anthropic is selected as AI provider)
-ANTHROPIC_API_KEY = os.environ.get("ANTHROPIC_API_KEY", "")
 
-# Timezone
-COACH_TIMEZONE = os.environ.get("COACH_TIMEZONE", "America/New_York")
+def __getattr__(name: str):
+    subsystem = _SUBSYSTEM_OF.get(name)
+    if subsystem is None:
+        raise AttributeError(f"module 'config' has no attribute '{name}'")
+    return load(subsystem)[name]
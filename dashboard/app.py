@@ -50,34 +50,34 @@ Use the sidebar to navigate between pages:
 - **Conversations** — Browse all conversation history
 - **Users** — Manage coaching program members
 - **Corrections** — View and add corrected responses for AI learning
+- **Performance** — Pipeline latency, throughput, and LLM token spend
 - **Settings** — Configure auto-approve thresholds, schedules, and system status
 """)
 
 # Quick stats
 try:
-    from db import supabase_client as db
+    from dashboard import data
 
     col1, col2, col3, col4 = st.columns(4)
 
-    pending = db.get_conversations_by_status("Pending Review")
-    flagged = db.get_conversations_by_status("Flagged")
-    users = db.get_all_users()
-    active_users = [u for u in users if u.get("status") == "Active"]
+    counts = data.status_counts()
+    user_counts = counts["users"]
 
-    col1.metric("Pending Review", len(pending))
-    col2.metric("Flagged", len(flagged))
-    col3.metric("Active Users", len(active_users))
-    col4.metric("Total Users", len(users))
+    col1.metric("Pending Review", data.conversation_count("Pending Review"))
+    col2.metric("Flagged", data.conversation_count("Flagged"))
+    col3.metric("Active Users", user_counts.get("Active", 0))
+    col4.metric("Total Users", sum(user_counts.values()))
 
     # Error banner: failed workflows and send failures
     try:
-        send_failed = db.get_conversations_by_status("Send Failed")
-        recent_runs = db.get_recent_workflow_runs(hours=24, limit=50)
+        send_failed_count = data.conversation_count("Send Failed")
+        send_failed = data.conversations_page("Send Failed", limit=10) if send_failed_count else []
+        recent_runs = data.recent_workflow_runs(hours=24, limit=50)
         failed_runs = [r for r in recent_runs if r.get("status") in ("failed", "completed_with_errors")]
 
         alerts = []
-        if send_failed:
-            alerts.append(f"{len(send_failed)} conversation(s) failed to send")
+        if send_failed_count:
+            alerts.append(f"{send_failed_count} conversation(s) failed to send")
         if failed_runs:
             alerts.append(f"{len(failed_runs)} workflow(s) had errors in the last 24h")
 
@@ -99,7 +99,7 @@ try:
 
     # Recent workflow runs
     st.subheader("Recent Workflow Runs")
-    runs = db.get_recent_workflow_runs(hours=24, limit=10)
+    runs = data.recent_workflow_runs(hours=24, limit=50)[:10]
     if runs:
         for run in runs:
             status_icon = {"completed": "\u2705", "failed": "\u274c", "running": "\u23f3"}.get(
@@ -0,0 +1,92 @@
+"""Cached data access for the dashboard pages.
+
+Streamlit reruns the whole page on every widget interaction, so pages read
+through these wrappers instead of calling db directly. Results are cached for
+a short TTL keyed by the query arguments, and pages call the invalidate_*
+helpers after a mutation so the next rerun sees their own writes immediately.
+"""
+
+import streamlit as st
+
+from db import supabase_client as db
+
+# Short enough that workflow runs outside the dashboard show up quickly
+CACHE_TTL_SECONDS = 30
+
+# Conversations per keyset page on the review pages
+PAGE_SIZE = 25
+
+
+# ── Conversations ──────────────────────────────────────────────
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def conversations_page(status: str, limit: int = PAGE_SIZE, after: tuple = None) -> list[dict]:
+    """One keyset page of conversations with a status, oldest first."""
+    return db.get_conversations_by_status(status, limit=limit, after=after)
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def status_counts() -> dict:
+    """Conversation and user counts per status, from one grouped query."""
+    return db.get_status_counts()
+
+
+def conversation_count(status: str) -> int:
+    return status_counts()["conversations"].get(status, 0)
+
+
+def conversations_by_status(status: str, pages: int = 1, page_size: int = PAGE_SIZE) -> tuple[list[dict], bool]:
+    """Load the first `pages` pages for a status.
+
+    Returns (rows, has_more). Each page is cached separately, so "Load more"
+    only fetches the new page.
+    """
+    rows, after = [], None
+    for _ in range(pages):
+        page = conversations_page(status, page_size, after)
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows, False
+        after = (page[-1]["created_at"], page[-1]["id"])
+    return rows, True
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def recent_history(user_ids: tuple, limit: int = 3) -> dict:
+    """Latest Sent exchanges for each user, fetched for a whole page at once."""
+    return db.get_recent_conversations_for_users(list(user_ids), limit=limit)
+
+
+def invalidate_conversations():
+    """Call after approving, rejecting, archiving, flagging or deleting conversations."""
+    conversations_page.clear()
+    status_counts.clear()
+    recent_history.clear()
+
+
+# ── Users ──────────────────────────────────────────────────────
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def all_users(projection: str = "light") -> list[dict]:
+    """All users; pass projection="full" where profile fields are edited."""
+    return db.get_all_users(projection=projection)
+
+
+def invalidate_users():
+    """Call after creating, updating or deleting users."""
+    all_users.clear()
+    status_counts.clear()
+
+
+# ── Workflow Runs ──────────────────────────────────────────────
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def recent_workflow_runs(hours: int = 24, limit: int = 50) -> list[dict]:
+    return db.get_recent_workflow_runs(hours=hours, limit=limit)
+
+
+def invalidate_all():
+    """Call after running a workflow, which can touch anything."""
+    invalidate_conversations()
+    invalidate_users()
+    recent_workflow_runs.clear()
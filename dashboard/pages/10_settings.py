@@ -70,6 +70,94 @@ with col_model:
         db.set_setting("ai_model", new_model)
         st.success(f"Model updated to {new_model}")
 
+st.markdown("**Failover** — if the provider above keeps failing or timing out, its circuit breaker "
+            "opens and responses are drafted with this provider instead until it recovers.")
+fallback_options = [""] + [p for p in provider_options if p != new_provider]
+current_fallback = settings.get("ai_fallback_provider", "")
+if current_fallback not in fallback_options:
+    current_fallback = ""
+
+col_fb_prov, col_fb_model = st.columns(2)
+with col_fb_prov:
+    new_fallback = st.selectbox(
+        "Fallback provider",
+        options=fallback_options,
+        index=fallback_options.index(current_fallback),
+        format_func=lambda x: x.capitalize() if x else "None",
+    )
+    if new_fallback != settings.get("ai_fallback_provider", ""):
+        db.set_setting("ai_fallback_provider", new_fallback)
+        db.set_setting("ai_fallback_model", PROVIDERS[new_fallback][0] if new_fallback else "")
+        st.rerun()
+
+with col_fb_model:
+    if new_fallback:
+        fallback_models = PROVIDERS[new_fallback]
+        current_fallback_model = settings.get("ai_fallback_model", fallback_models[0])
+        if current_fallback_model not in fallback_models:
+            current_fallback_model = fallback_models[0]
+        new_fallback_model = st.selectbox(
+            "Fallback model",
+            options=fallback_models,
+            index=fallback_models.index(current_fallback_model),
+        )
+        if new_fallback_model != settings.get("ai_fallback_model"):
+            db.set_setting("ai_fallback_model", new_fallback_model)
+            st.success(f"Fallback model updated to {new_fallback_model}")
+
+st.markdown("**Model routing** — send simple messages (short status updates) to a faster, cheaper model "
+            "and keep the model above for complex ones. A message uses the fast model only if every rule "
+            "below calls it simple.")
+all_models = [m for models in PROVIDERS.values() for m in models]
+fast_options = [""] + all_models
+current_fast = settings.get("ai_fast_model", "")
+if current_fast not in fast_options:
+    current_fast = ""
+new_fast = st.selectbox(
+    "Fast model",
+    options=fast_options,
+    index=fast_options.index(current_fast),
+    format_func=lambda x: x or "None (always use the model above)",
+)
+if new_fast != settings.get("ai_fast_model", ""):
+    db.set_setting("ai_fast_model", new_fast)
+    st.rerun()
+
+if new_fast:
+    col_words, col_conf = st.columns(2)
+    with col_words:
+        current_words = int(settings.get("routing_max_words", "80"))
+        new_words = st.number_input("Max words for a simple message", min_value=10, max_value=500,
+                                    value=current_words, step=10)
+        if new_words != current_words:
+            db.set_setting("routing_max_words", str(new_words))
+            st.success("Routing word limit updated")
+    with col_conf:
+        current_conf = int(settings.get("routing_min_prior_confidence", "7"))
+        new_conf = st.slider("Min confidence of the last response", min_value=1, max_value=10, value=current_conf,
+                             help="If the last AI-generated response to this user scored lower, use the model above. "
+                                  "Check-ins and canned replies don't count.")
+        if new_conf != current_conf:
+            db.set_setting("routing_min_prior_confidence", str(new_conf))
+            st.success("Routing confidence updated")
+
+    stage_options = ["Ideation", "Early Validation", "Late Validation", "Growth"]
+    stages_str = settings.get("routing_premium_stages", "Growth")
+    current_stages = [s.strip() for s in stages_str.split(",") if s.strip() in stage_options]
+    selected_stages = st.multiselect("Always use the model above for these stages", options=stage_options,
+                                     default=current_stages)
+    if ",".join(selected_stages) != stages_str:
+        db.set_setting("routing_premium_stages", ",".join(selected_stages))
+        st.success("Routing stages updated")
+
+    classifier_on = settings.get("routing_classifier", "off") == "on"
+    new_classifier = st.checkbox("Double-check simple messages with a GPT-4o-mini classifier", value=classifier_on,
+                                 help="Adds one small, cheap call per simple message; anything it calls complex "
+                                      "uses the model above.")
+    if new_classifier != classifier_on:
+        db.set_setting("routing_classifier", "on" if new_classifier else "off")
+        st.success("Routing classifier updated")
+
 # ── Check-in Schedule ─────────────────────────────────────
 st.subheader("Check-in Schedule")
 
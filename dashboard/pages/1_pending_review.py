@@ -7,6 +7,7 @@ import streamlit as st
 from datetime import datetime, timezone
 
 from db import supabase_client as db
+from dashboard import data
 
 st.set_page_config(page_title="Pending Review", layout="wide")
 st.title("Pending Review")
@@ -29,12 +30,16 @@ div[class*="st-key-unarchive_"] button:hover {
 </style>
 """, unsafe_allow_html=True)
 
-conversations = db.get_conversations_by_status("Pending Review")
+# Keyset pages loaded so far; "Load more" at the bottom adds one
+pending_pages = st.session_state.setdefault("pending_pages", 1)
+conversations, has_more = data.conversations_by_status("Pending Review", pages=pending_pages)
 
 if not conversations:
     st.success("No pending responses to review!")
 else:
-    st.info(f"{len(conversations)} response(s) awaiting review")
+    pending_total = data.conversation_count("Pending Review")
+    st.info(f"{pending_total} response(s) awaiting review"
+            + (f" — showing the oldest {len(conversations)}" if has_more else ""))
 
     # ── Bulk approve section ───────────────────────────────────────
     eligible = [c for c in conversations if (c.get("confidence") or 0) >= 7]
@@ -59,17 +64,25 @@ else:
         with bulk_col3:
             if selected_ids:
                 if st.button(f"Bulk Approve {len(selected_ids)} Selected", type="primary", key="bulk_approve"):
-                    for cid in selected_ids:
-                        db.update_conversation(cid, {
+                    for c in eligible:
+                        if c["id"] not in selected_ids:
+                            continue
+                        approved_at = datetime.now(timezone.utc).isoformat()
+                        db.update_conversation(c["id"], {
                             "status": "Approved",
-                            "approved_at": datetime.now(timezone.utc).isoformat(),
+                            "approved_at": approved_at,
                             "approved_by": "manual_bulk",
+                            **db.compute_review_metrics(c, approved_at),
                         })
+                    data.invalidate_conversations()
                     st.success(f"Bulk approved {len(selected_ids)} conversation(s)")
                     st.rerun()
 
         st.markdown("---")
 
+    # Recent history for every user on this page, in one query
+    history = data.recent_history(tuple(sorted({c["user_id"] for c in conversations if c.get("user_id")})))
+
     # ── Individual conversation cards ──────────────────────────────
     for conv in conversations:
         user = conv.get("users") or {}
@@ -137,7 +150,7 @@ else:
                 st.write(f"**Business Idea:** {user.get('business_idea', 'Not specified')}")
                 st.write(f"**Summary:** {user.get('summary', 'No summary yet')}")
 
-                recent = db.get_recent_conversations(user.get("id", ""), limit=3)
+                recent = history.get(conv.get("user_id"), [])
                 if recent:
                     st.markdown("**Recent exchanges:**")
                     for r in recent:
@@ -152,10 +165,14 @@ else:
                     original = conv.get("ai_response", "")
                     was_edited = edited_response.strip() != original.strip()
 
+                    approved_at = datetime.now(timezone.utc).isoformat()
                     updates = {
                         "status": "Approved",
-                        "approved_at": datetime.now(timezone.utc).isoformat(),
+                        "approved_at": approved_at,
                         "approved_by": "manual",
+                        **db.compute_review_metrics(
+                            conv, approved_at, sent_response=edited_response if was_edited else None,
+                        ),
                     }
 
                     if was_edited:
@@ -169,20 +186,22 @@ else:
                             "correction_notes": "Edited during review",
                             "correction_type": "Content",
                         })
-                        # Auto-regenerate coaching playbook with new correction
+                        # Queue a coaching playbook rebuild with the new correction
                         try:
-                            from services.coaching_service import regenerate_playbook
-                            regenerate_playbook()
+                            from services.coaching_service import queue_playbook_regeneration
+                            queue_playbook_regeneration()
                         except Exception:
                             pass  # Non-critical — playbook will catch up next time
 
                     db.update_conversation(conv["id"], updates)
+                    data.invalidate_conversations()
                     st.success("Approved!" + (" (correction saved)" if was_edited else ""))
                     st.rerun()
 
             with btn_col2:
                 if st.button("Archive", key=f"archive_{conv['id']}", type="secondary"):
                     db.update_conversation(conv["id"], {"status": "Archived"})
+                    data.invalidate_conversations()
                     st.rerun()
 
             with btn_col3:
@@ -203,6 +222,7 @@ else:
                                 "status": "Flagged",
                                 "flag_reason": "Manually flagged during review",
                             })
+                            data.invalidate_conversations()
                             st.session_state[flag_confirm_key] = False
                             st.rerun()
                     with no_col:
@@ -210,12 +230,19 @@ else:
                             st.session_state[flag_confirm_key] = False
                             st.rerun()
 
+    if has_more:
+        if st.button("Load more", key="pending_load_more"):
+            st.session_state["pending_pages"] = pending_pages + 1
+            st.rerun()
+
 # ── Archived conversations ────────────────────────────────────
-archived = db.get_conversations_by_status("Archived")
+archived_total = data.conversation_count("Archived")
 
-if archived:
+if archived_total:
     st.markdown("---")
-    with st.expander(f"Archived ({len(archived)})", expanded=False):
+    with st.expander(f"Archived ({archived_total})", expanded=False):
+        archived_pages = st.session_state.setdefault("archived_pages", 1)
+        archived, archived_has_more = data.conversations_by_status("Archived", pages=archived_pages)
         for conv in archived:
             user = conv.get("users") or {}
             user_name = user.get("first_name") or user.get("email", "Unknown")
@@ -227,4 +254,10 @@ if archived:
                 with col2:
                     if st.button("Unarchive", key=f"unarchive_{conv['id']}"):
                         db.update_conversation(conv["id"], {"status": "Pending Review"})
+                        data.invalidate_conversations()
                         st.rerun()
+
+        if archived_has_more:
+            if st.button("Load more", key="archived_load_more"):
+                st.session_state["archived_pages"] = archived_pages + 1
+                st.rerun()
@@ -7,17 +7,21 @@ import streamlit as st
 from datetime import datetime, timezone
 
 from db import supabase_client as db
+from dashboard import data
 
 st.set_page_config(page_title="Flagged", layout="wide")
 st.title("Flagged Responses")
 
-conversations = db.get_conversations_by_status("Flagged")
+flagged_pages = st.session_state.setdefault("flagged_pages", 1)
+conversations, has_more = data.conversations_by_status("Flagged", pages=flagged_pages)
 
 if not conversations:
     st.success("No flagged responses!")
     st.stop()
 
-st.warning(f"{len(conversations)} flagged response(s) need attention")
+flagged_total = data.conversation_count("Flagged")
+st.warning(f"{flagged_total} flagged response(s) need attention"
+           + (f" — showing the oldest {len(conversations)}" if has_more else ""))
 
 for conv in conversations:
     user = conv.get("users") or {}
@@ -85,9 +89,10 @@ for conv in conversations:
                 if not response_to_save:
                     st.error("Please write a response before approving.")
                 else:
+                    approved_at = datetime.now(timezone.utc).isoformat()
                     updates = {
                         "status": "Approved",
-                        "approved_at": datetime.now(timezone.utc).isoformat(),
+                        "approved_at": approved_at,
                         "approved_by": "manual",
                     }
                     if response_to_save != ai_resp.strip():
@@ -101,19 +106,24 @@ for conv in conversations:
                                 "correction_notes": "Corrected from flagged review",
                                 "correction_type": "Content",
                             })
-                            # Auto-regenerate coaching playbook with new correction
+                            # Queue a coaching playbook rebuild with the new correction
                             try:
-                                from services.coaching_service import regenerate_playbook
-                                regenerate_playbook()
+                                from services.coaching_service import queue_playbook_regeneration
+                                queue_playbook_regeneration()
                             except Exception:
                                 pass  # Non-critical — playbook will catch up next time
+                    updates.update(db.compute_review_metrics(
+                        conv, approved_at, sent_response=updates.get("sent_response"),
+                    ))
                     db.update_conversation(conv["id"], updates)
+                    data.invalidate_conversations()
                     st.success("Approved!")
                     st.rerun()
 
         with btn_col2:
             if st.button("Reject", key=f"flagged_reject_{conv['id']}"):
                 db.update_conversation(conv["id"], {"status": "Rejected"})
+                data.invalidate_conversations()
                 st.info("Rejected")
                 st.rerun()
 
@@ -123,6 +133,7 @@ for conv in conversations:
                     "status": "Pending Review",
                     "flag_reason": None,
                 })
+                data.invalidate_conversations()
                 st.info("Moved to Pending Review")
                 st.rerun()
 
@@ -141,6 +152,7 @@ for conv in conversations:
                 with yes_col:
                     if st.button("Yes", key=f"flagged_delete_yes_{conv['id']}", type="primary"):
                         db.get_client().table("conversations").delete().eq("id", conv["id"]).execute()
+                        data.invalidate_conversations()
                         st.session_state[confirm_key] = False
                         st.success("Deleted")
                         st.rerun()
@@ -148,3 +160,8 @@ for conv in conversations:
                     if st.button("Cancel", key=f"flagged_delete_cancel_{conv['id']}"):
                         st.session_state[confirm_key] = False
                         st.rerun()
+
+if has_more:
+    if st.button("Load more", key="flagged_load_more"):
+        st.session_state["flagged_pages"] = flagged_pages + 1
+        st.rerun()
@@ -6,6 +6,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspa
 import streamlit as st
 
 from db import supabase_client as db
+from dashboard import data
 
 st.set_page_config(page_title="Conversations", layout="wide")
 st.title("Conversations")
@@ -14,7 +15,7 @@ st.title("Conversations")
 col1, col2 = st.columns(2)
 
 with col1:
-    users = db.get_all_users()
+    users = data.all_users()
     user_options = {"All Users": None}
     for u in users:
         label = f"{u.get('first_name', '')} ({u['email']})"
@@ -30,7 +31,7 @@ with col2:
 
 # Fetch conversations
 if selected_user_id:
-    conversations = db.get_conversations_for_user(selected_user_id)
+    conversations = db.get_conversations_for_user(selected_user_id, projection="review")
 else:
     conversations = db.get_all_conversations(limit=200)
 
@@ -101,6 +102,7 @@ for conv in conversations:
             with yes_col:
                 if st.button("Yes, delete", key=f"conv_delete_yes_{conv['id']}", type="primary"):
                     db.get_client().table("conversations").delete().eq("id", conv["id"]).execute()
+                    data.invalidate_conversations()
                     st.session_state[confirm_key] = False
                     st.success("Deleted")
                     st.rerun()
@@ -6,6 +6,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspa
 import streamlit as st
 
 from db import supabase_client as db
+from dashboard import data
 from services import gmail_service
 
 st.set_page_config(page_title="Users", layout="wide")
@@ -39,7 +40,7 @@ form_version = st.session_state["add_user_form_version"]
 # Filter
 status_filter = st.selectbox("Filter by status", ["All", "Active", "Paused", "Silent", "Onboarding"])
 
-users = db.get_all_users()
+users = data.all_users(projection="full")
 if status_filter != "All":
     users = [u for u in users if u.get("status") == status_filter]
 
@@ -99,6 +100,8 @@ with st.container(border=True):
                         "ai_response": onboarding_body,
                         "confidence": 9,
                     })
+                data.invalidate_users()
+                data.invalidate_conversations()
                 st.session_state["user_added"] = f"User {new_email} added! Onboarding email is in Pending Review."
                 st.session_state["add_user_form_version"] += 1
                 st.rerun()
@@ -163,6 +166,7 @@ for user in users:
                     "notes": edit_notes or None,
                     "checkin_days": checkin_days_value,
                 })
+                data.invalidate_users()
                 st.success("User updated!")
                 st.rerun()
 
@@ -195,6 +199,9 @@ for user in users:
                 st.markdown('<div class="red-btn"></div>', unsafe_allow_html=True)
                 if st.button("Yes, delete", key=f"delete_user_yes_{user['id']}"):
                     db.get_client().table("users").delete().eq("id", user["id"]).execute()
+                    # Cascade removes their conversations too
+                    data.invalidate_users()
+                    data.invalidate_conversations()
                     st.session_state[delete_confirm_key] = False
                     st.success("User deleted")
                     st.rerun()
@@ -31,11 +31,11 @@ with st.expander("Add manual correction"):
                 "correction_notes": notes,
                 "correction_type": correction_type,
             })
-            # Auto-regenerate coaching playbook with new correction
+            # Queue a coaching playbook rebuild with the new correction
             try:
-                from services.coaching_service import regenerate_playbook
-                regenerate_playbook()
-                st.success("Correction saved! Coaching playbook updated.")
+                from services.coaching_service import queue_playbook_regeneration
+                queue_playbook_regeneration()
+                st.success("Correction saved! Coaching playbook update queued.")
             except Exception:
                 st.success("Correction saved!")
             st.rerun()
@@ -0,0 +1,240 @@
+"""Performance dashboard: pipeline latency, throughput and LLM token spend."""
+
+import os, sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import streamlit as st
+import pandas as pd
+from datetime import datetime, timedelta, timezone
+
+from db import supabase_client as db
+from services.ai_service import estimate_cost
+
+st.set_page_config(page_title="Performance", layout="wide")
+st.title("Performance")
+st.caption(
+    "Stage timings and token usage are recorded by every workflow run "
+    "(db/migration_v14.sql). Runs from before that migration have no data here."
+)
+
+# ── Date Range ────────────────────────────────────────────────
+
+RANGE_OPTIONS = {
+    "Last 24 hours": 1,
+    "Last 7 days": 7,
+    "Last 30 days": 30,
+    "All time": None,
+    "Custom": "custom",
+}
+
+range_choice = st.selectbox("Date range", list(RANGE_OPTIONS.keys()), index=1)
+start_date = end_date = None
+if range_choice == "Custom":
+    today = datetime.now(timezone.utc).date()
+    col_start, col_end = st.columns(2)
+    custom_start = col_start.date_input("From", value=today - timedelta(days=30))
+    custom_end = col_end.date_input("To", value=today)
+    start_date = datetime.combine(custom_start, datetime.min.time(), tzinfo=timezone.utc)
+    # Inclusive of the whole "To" day
+    end_date = datetime.combine(custom_end + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc)
+elif RANGE_OPTIONS[range_choice]:
+    start_date = datetime.now(timezone.utc) - timedelta(days=RANGE_OPTIONS[range_choice])
+
+# ── 1. Stage Latency ──────────────────────────────────────────
+
+st.subheader("Pipeline Stage Latency")
+st.caption("One sample per processed email. Stages nest (generate includes rag), so they don't sum to total.")
+
+stage_rows = db.get_stage_latency(start_date, end_date)
+
+if stage_rows:
+    df_stage = pd.DataFrame(stage_rows)
+    total = df_stage[df_stage["stage"] == "total"]
+    if not total.empty:
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Emails Measured", int(total["samples"].iloc[0]))
+        col2.metric("p50 per Email", f"{total['p50_ms'].iloc[0] / 1000:.1f}s")
+        col3.metric("p95 per Email", f"{total['p95_ms'].iloc[0] / 1000:.1f}s")
+
+    stages = df_stage[df_stage["stage"] != "total"]
+    try:
+        st.bar_chart(
+            stages.set_index("stage")[["p50_ms", "p95_ms"]],
+            x_label="Stage", y_label="Latency (ms)", stack=False,
+        )
+    except Exception:
+        st.caption("Could not render stage latency chart.")
+
+    st.dataframe(
+        df_stage.round(1).rename(columns={
+            "stage": "Stage", "samples": "Samples",
+            "p50_ms": "p50 (ms)", "p95_ms": "p95 (ms)", "max_ms": "Max (ms)",
+        }),
+        use_container_width=True,
+        hide_index=True,
+    )
+else:
+    st.info("No stage timings recorded for this period.")
+
+st.divider()
+
+# ── 2. Throughput ─────────────────────────────────────────────
+
+st.subheader("Throughput per Run")
+
+runs = db.get_run_throughput(start_date, end_date)
+
+if runs:
+    df_runs = pd.DataFrame(runs)
+    workflow_names = sorted(df_runs["workflow_name"].unique())
+    default_index = workflow_names.index("process_emails") if "process_emails" in workflow_names else 0
+    workflow = st.selectbox("Workflow", workflow_names, index=default_index)
+
+    df_wf = df_runs[(df_runs["workflow_name"] == workflow) & (df_runs["items_processed"] > 0)].copy()
+    if not df_wf.empty:
+        df_wf["started_at"] = pd.to_datetime(df_wf["started_at"])
+        minutes = (df_wf["duration_seconds"] / 60).clip(lower=1 / 60)
+        df_wf["items_per_minute"] = (df_wf["items_processed"] / minutes).round(2)
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Runs with Items", len(df_wf))
+        col2.metric("Median Items / min", f"{df_wf['items_per_minute'].median():.1f}")
+        col3.metric("Median Run Duration", f"{df_wf['duration_seconds'].median():.0f}s")
+
+        try:
+            st.line_chart(
+                df_wf.set_index("started_at")[["items_per_minute"]],
+                x_label="Run Started", y_label="Items / min",
+            )
+        except Exception:
+            st.caption("Could not render throughput chart.")
+    else:
+        st.info(f"No {workflow} runs processed any items in this period.")
+else:
+    st.info("No finished workflow runs in this period.")
+
+st.divider()
+
+# ── 3. Token Spend ────────────────────────────────────────────
+
+st.subheader("LLM Tokens and Estimated Cost")
+
+usage = db.get_llm_usage(start_date, end_date)
+
+if usage:
+    df_usage = pd.DataFrame(usage)
+    df_usage["cost"] = [
+        estimate_cost(r["model"], r["prompt_tokens"], r["completion_tokens"], r["cached_tokens"])
+        for r in usage
+    ]
+    df_usage["cache_hit_%"] = (
+        df_usage["cached_tokens"] / df_usage["prompt_tokens"].where(df_usage["prompt_tokens"] > 0) * 100
+    ).round(1)
+
+    total_prompt = int(df_usage["prompt_tokens"].sum())
+    total_cached = int(df_usage["cached_tokens"].sum())
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("LLM Calls", int(df_usage["calls"].sum()))
+    col2.metric("Prompt Tokens", f"{total_prompt:,}")
+    col3.metric("Completion Tokens", f"{int(df_usage['completion_tokens'].sum()):,}")
+    col4.metric("Estimated Cost", f"${df_usage['cost'].sum():.2f}")
+    if total_prompt:
+        st.caption(f"Prompt cache hit rate: {total_cached / total_prompt * 100:.1f}% of prompt tokens")
+    if df_usage["cost"].isna().any():
+        st.caption("Models without pricing in services/ai_service.py MODEL_PRICING are excluded from the cost total.")
+
+    st.dataframe(
+        df_usage.rename(columns={
+            "provider": "Provider", "model": "Model", "calls": "Calls",
+            "prompt_tokens": "Prompt", "completion_tokens": "Completion",
+            "cached_tokens": "Cached", "cache_hit_%": "Cache Hit %", "cost": "Est. Cost ($)",
+        }).round({"Est. Cost ($)": 4}),
+        use_container_width=True,
+        hide_index=True,
+    )
+else:
+    st.info("No token usage recorded for this period.")
+
+st.divider()
+
+# ── 4. Provider Comparison ────────────────────────────────────
+
+st.subheader("Generation Latency by Provider and Model")
+st.caption("Compare before and after switching the AI provider or model in Settings. "
+           "With model routing on, the fast and premium models show as separate rows.")
+
+by_model = db.get_generate_latency(start_date, end_date)
+
+if by_model:
+    st.dataframe(
+        pd.DataFrame(by_model).drop(columns=["day"]).round(1).rename(columns={
+            "provider": "Provider", "model": "Model", "conversations": "Emails",
+            "p50_ms": "p50 (ms)", "p95_ms": "p95 (ms)", "avg_completion_tokens": "Avg Completion Tokens",
+        }),
+        use_container_width=True,
+        hide_index=True,
+    )
+
+    try:
+        df_daily = pd.DataFrame(db.get_generate_latency(start_date, end_date, by_day=True))
+        df_daily["day"] = pd.to_datetime(df_daily["day"])
+        chart_df = df_daily.pivot_table(index="day", columns="model", values="p50_ms")
+        st.line_chart(chart_df, x_label="Date", y_label="p50 generate (ms)")
+    except Exception:
+        st.caption("Could not render daily latency chart.")
+else:
+    st.info("No generation timings recorded for this period.")
+
+st.divider()
+
+# ── 5. Slowest Emails ─────────────────────────────────────────
+
+st.subheader("Slowest Emails")
+
+slowest = db.get_slowest_conversations(start_date, end_date, limit=20)
+
+if slowest:
+    df_slow = pd.DataFrame(slowest)
+    df_slow["seconds"] = (df_slow["total_ms"] / 1000).round(1)
+    df_slow["created_at"] = df_slow["created_at"].str[:19].str.replace("T", " ")
+    st.dataframe(
+        df_slow[["created_at", "email", "type", "status", "seconds"]].rename(columns={
+            "created_at": "Received", "email": "User", "type": "Type", "status": "Status", "seconds": "Total (s)",
+        }),
+        use_container_width=True,
+        hide_index=True,
+    )
+
+    labels = {
+        f"{row['created_at']} — {row['email'] or 'unknown'} ({row['seconds']}s)": i
+        for i, row in df_slow.iterrows()
+    }
+    choice = st.selectbox("Drill down", list(labels.keys()))
+    detail = slowest[labels[choice]]
+    metrics = detail["pipeline_metrics"] or {}
+
+    st.caption(f"Conversation {detail['id']}")
+    stage_detail = pd.DataFrame([
+        {"Stage": stage, "Calls": agg["count"], "Total (ms)": agg["total_ms"],
+         "Max (ms)": agg["max_ms"], "Errors": agg.get("errors", 0)}
+        for stage, agg in (metrics.get("stages") or {}).items()
+    ])
+    if not stage_detail.empty:
+        stage_detail = stage_detail.sort_values("Total (ms)", ascending=False)
+        try:
+            st.bar_chart(stage_detail.set_index("Stage")[["Total (ms)"]], x_label="Stage", y_label="ms")
+        except Exception:
+            st.caption("Could not render stage breakdown.")
+        st.dataframe(stage_detail, use_container_width=True, hide_index=True)
+
+    if metrics.get("llm"):
+        st.dataframe(
+            pd.DataFrame(metrics["llm"]).rename(columns={
+                "stage": "Stage", "provider": "Provider", "model": "Model", "calls": "Calls",
+                "prompt_tokens": "Prompt", "completion_tokens": "Completion", "cached_tokens": "Cached",
+            }),
+            use_container_width=True,
+            hide_index=True,
+        )
+else:
+    st.info("No processed emails with timings in this period.")
@@ -7,6 +7,7 @@ import streamlit as st
 from datetime import datetime, timezone
 
 from db import supabase_client as db
+from dashboard import data
 
 st.set_page_config(page_title="Run Workflows", layout="wide")
 st.title("Run Workflows")
@@ -46,6 +47,24 @@ with status_cols[3]:
     except Exception:
         st.write("❌ **Migration v2** — Not applied")
 
+# AI provider circuit breakers (services/circuit_breaker.py), as saved by
+# the last workflow run that changed one
+try:
+    import json
+    breakers = json.loads(db.get_setting("circuit_breakers") or "{}")
+except Exception:
+    breakers = {}
+if breakers:
+    breaker_cols = st.columns(4)
+    for col, (provider, state) in zip(breaker_cols, sorted(breakers.items())):
+        since = datetime.fromtimestamp(state.get("changed_at") or 0, timezone.utc).strftime("%Y-%m-%d %H:%M")
+        label = {"closed": "✅ **{}** — Healthy", "open": "❌ **{}** — Circuit open, failing over",
+                 "half_open": "⚠️ **{}** — Probing"}.get(state.get("state"), "❓ **{}**")
+        with col:
+            st.write(label.format(provider.capitalize()))
+            st.caption(f"Since {since} UTC — {state.get('error_rate', 0):.0%} errors "
+                       f"over last {state.get('calls', 0)} call(s)")
+
 # ── Automated Schedule ───────────────────────────────────────
 st.divider()
 st.subheader("Automated Schedule (GitHub Actions)")
@@ -87,7 +106,8 @@ with col1:
         with st.spinner("Processing emails..."):
             try:
                 from workflows import process_emails
-                process_emails.run()
+                process_emails.run(force=True)
+                data.invalidate_all()
                 st.success("Emails processed!")
                 st.rerun()
             except Exception as e:
@@ -101,6 +121,7 @@ with col2:
                 from workflows import send_approved
                 importlib.reload(send_approved)
                 send_approved.run(immediate=True)
+                data.invalidate_all()
                 st.success("Approved responses sent!")
                 st.rerun()
             except Exception as e:
@@ -112,6 +133,7 @@ with col3:
             try:
                 from workflows import check_in
                 check_in.run()
+                data.invalidate_all()
                 st.success("Check-ins sent!")
                 st.rerun()
             except Exception as e:
@@ -125,6 +147,7 @@ with col4:
             try:
                 from workflows import re_engagement
                 re_engagement.run()
+                data.invalidate_all()
                 st.success("Re-engagement complete!")
                 st.rerun()
             except Exception as e:
@@ -136,6 +159,7 @@ with col5:
             try:
                 from workflows import cleanup
                 cleanup.run()
+                data.invalidate_all()
                 st.success("Cleanup complete!")
                 st.rerun()
             except Exception as e:
@@ -278,12 +302,57 @@ if st.button("🧠 Export Fine-Tuning Data", use_container_width=True, help="Gen
             except Exception as e:
                 st.error(f"Export failed: {e}")
 
+# ── Job Queue ────────────────────────────────────────────────
+st.divider()
+st.subheader("Job Queue")
+st.caption(
+    "Workflows queue their work as jobs and drain them in the same run; "
+    "`python run_workflow.py worker` drains them from extra workers. Failed jobs retry with backoff."
+)
+
+try:
+    job_counts = db.get_job_counts()
+    dead_jobs = db.get_dead_jobs(limit=20)
+except Exception:
+    job_counts, dead_jobs = [], []
+    st.warning("Job queue unavailable — has migration v16 been applied?")
+
+if job_counts:
+    st.table([
+        {"Job Type": row["job_type"], "Status": row["status"], "Jobs": row["jobs"],
+         "Oldest": (row.get("oldest") or "")[:19].replace("T", " ")}
+        for row in job_counts
+    ])
+else:
+    st.write("No queued, running or dead jobs.")
+
+if dead_jobs:
+    with st.expander(f"☠️ {len(dead_jobs)} dead job(s) — gave up after retries"):
+        for job in dead_jobs:
+            finished = (job.get("completed_at") or "")[:19].replace("T", " ")
+            st.write(f"**{job['job_type']}** — {finished} — {job.get('attempts', 0)} attempt(s)")
+            if job.get("last_error"):
+                st.error(job["last_error"])
+
 # ── Workflow Run History ─────────────────────────────────────
 st.divider()
 st.subheader("Workflow Run History")
 
+# process_emails ticks that find no new mail skip the run history (see
+# workflows/process_emails.py) and only update this counter
+try:
+    import json
+    inbox_state = json.loads(db.get_setting("inbox_state") or "{}")
+except Exception:
+    inbox_state = {}
+if inbox_state.get("checked_at"):
+    st.caption(
+        f"📨 Inbox last checked {inbox_state['checked_at'][:19].replace('T', ' ')} UTC — "
+        f"{inbox_state.get('idle_ticks', 0)} check(s) with no new mail since the last Process Emails run."
+    )
+
 history_hours = st.selectbox("Show runs from last", [24, 48, 72, 168], format_func=lambda x: f"{x} hours" if x < 168 else "7 days")
-runs = db.get_recent_workflow_runs(hours=history_hours)
+runs = data.recent_workflow_runs(hours=history_hours)
 
 if runs:
     # Summary stats
@@ -315,6 +384,12 @@ if runs:
                     f"{run_icon} {started} — "
                     f"{run.get('items_processed', 0)} items processed"
                 )
+                # Trivial replies handled without the LLM (services/triage.py)
+                triaged = (run.get("metrics") or {}).get("triage") or {}
+                if triaged.get("llm_calls_avoided"):
+                    routes = ", ".join(f"{n} {route.replace('_', ' ')}" for route, n in triaged["routes"].items())
+                    st.caption(f"Triaged without AI: {routes} — "
+                               f"{triaged['llm_calls_avoided_share']:.0%} of LLM calls avoided")
                 if run.get("error_message"):
                     st.error(run["error_message"])
 else:
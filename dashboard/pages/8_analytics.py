@@ -5,17 +5,45 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspa
 
 import streamlit as st
 import pandas as pd
+from datetime import datetime, timedelta, timezone
 
 from db import supabase_client as db
+from dashboard import data
 
 st.set_page_config(page_title="Analytics", layout="wide")
 st.title("Analytics")
 
+# ── Date Range ────────────────────────────────────────────────
+# Applies to the calibration, response time, correction and satisfaction
+# sections. Aggregation happens in Postgres (db/migration_v8.sql), so
+# "All time" is as cheap as the last week.
+
+RANGE_OPTIONS = {
+    "Last 7 days": 7,
+    "Last 30 days": 30,
+    "Last 90 days": 90,
+    "All time": None,
+    "Custom": "custom",
+}
+
+range_choice = st.selectbox("Date range", list(RANGE_OPTIONS.keys()), index=3)
+start_date = end_date = None
+if range_choice == "Custom":
+    today = datetime.now(timezone.utc).date()
+    col_start, col_end = st.columns(2)
+    custom_start = col_start.date_input("From", value=today - timedelta(days=30))
+    custom_end = col_end.date_input("To", value=today)
+    start_date = datetime.combine(custom_start, datetime.min.time(), tzinfo=timezone.utc)
+    # Inclusive of the whole "To" day
+    end_date = datetime.combine(custom_end + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc)
+elif RANGE_OPTIONS[range_choice]:
+    start_date = datetime.now(timezone.utc) - timedelta(days=RANGE_OPTIONS[range_choice])
+
 # ── 1. User Overview Metrics ──────────────────────────────────
 
 st.subheader("User Overview")
 
-users = db.get_all_users()
+users = data.all_users()
 
 if users:
     total_users = len(users)
@@ -39,54 +67,43 @@ st.divider()
 
 st.subheader("Confidence Calibration")
 
-calibration_data = db.get_confidence_calibration_data()
+calibration_data = db.get_edit_rate_by_confidence(start_date, end_date)
 
 if calibration_data:
     df_cal = pd.DataFrame(calibration_data)
 
-    # Filter to rows with a confidence score
-    df_cal = df_cal[df_cal["confidence"].notna()].copy()
-
-    if not df_cal.empty:
-        # Overall edit rate
-        total_responses = len(df_cal)
-        total_edited = df_cal["was_edited"].sum()
-        overall_edit_rate = (total_edited / total_responses * 100) if total_responses > 0 else 0
-
-        col1, col2, col3 = st.columns(3)
-        col1.metric("Total Reviewed Responses", total_responses)
-        col2.metric("Responses Edited", int(total_edited))
-        col3.metric("Overall Edit Rate", f"{overall_edit_rate:.1f}%")
-
-        # Group by confidence score
-        df_cal["confidence"] = df_cal["confidence"].astype(int)
-        grouped = df_cal.groupby("confidence").agg(
-            count=("was_edited", "size"),
-            edited=("was_edited", "sum"),
-            avg_response_time=("response_time_hours", "mean"),
-        ).reset_index()
-        grouped["edit_rate_%"] = (grouped["edited"] / grouped["count"] * 100).round(1)
-        grouped["avg_response_time"] = grouped["avg_response_time"].round(2)
-        grouped = grouped.rename(columns={
-            "confidence": "Confidence",
-            "count": "Responses",
-            "edited": "Edited",
-            "avg_response_time": "Avg Response Time (hrs)",
-        })
-
-        st.dataframe(grouped, use_container_width=True, hide_index=True)
-
-        # Bar chart of edit rate by confidence
-        try:
-            chart_df = grouped.set_index("Confidence")[["edit_rate_%"]]
-            chart_df = chart_df.reindex(range(1, 11), fill_value=0)
-            st.bar_chart(chart_df, y="edit_rate_%", y_label="Edit Rate (%)", x_label="Confidence Score")
-        except Exception:
-            st.caption("Could not render confidence chart.")
-    else:
-        st.info("No responses with confidence scores yet.")
+    # Overall edit rate
+    total_responses = int(df_cal["responses"].sum())
+    total_edited = int(df_cal["edited"].sum())
+    overall_edit_rate = (total_edited / total_responses * 100) if total_responses > 0 else 0
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Total Reviewed Responses", total_responses)
+    col2.metric("Responses Edited", total_edited)
+    col3.metric("Overall Edit Rate", f"{overall_edit_rate:.1f}%")
+
+    grouped = df_cal.copy()
+    grouped["confidence"] = grouped["confidence"].astype(int)
+    grouped["edit_rate_%"] = (grouped["edited"] / grouped["responses"] * 100).round(1)
+    grouped["avg_response_time_hours"] = pd.to_numeric(grouped["avg_response_time_hours"]).round(2)
+    grouped = grouped.rename(columns={
+        "confidence": "Confidence",
+        "responses": "Responses",
+        "edited": "Edited",
+        "avg_response_time_hours": "Avg Response Time (hrs)",
+    })
+
+    st.dataframe(grouped, use_container_width=True, hide_index=True)
+
+    # Bar chart of edit rate by confidence
+    try:
+        chart_df = grouped.set_index("Confidence")[["edit_rate_%"]]
+        chart_df = chart_df.reindex(range(1, 11), fill_value=0)
+        st.bar_chart(chart_df, y="edit_rate_%", y_label="Edit Rate (%)", x_label="Confidence Score")
+    except Exception:
+        st.caption("Could not render confidence chart.")
 else:
-    st.info("No calibration data yet.")
+    st.info("No calibration data for this period.")
 
 st.divider()
 
@@ -94,37 +111,32 @@ st.divider()
 
 st.subheader("Response Time Tracking")
 
-if calibration_data:
-    df_rt = pd.DataFrame(calibration_data)
-    df_rt = df_rt[df_rt["response_time_hours"].notna()].copy()
-
-    if not df_rt.empty:
-        avg_time = df_rt["response_time_hours"].mean()
-        median_time = df_rt["response_time_hours"].median()
-        min_time = df_rt["response_time_hours"].min()
-        max_time = df_rt["response_time_hours"].max()
-
-        col1, col2, col3, col4 = st.columns(4)
-        col1.metric("Avg Response Time", f"{avg_time:.1f} hrs")
-        col2.metric("Median Response Time", f"{median_time:.1f} hrs")
-        col3.metric("Fastest", f"{min_time:.1f} hrs")
-        col4.metric("Slowest", f"{max_time:.1f} hrs")
-
-        # Distribution as histogram-like bar chart
-        try:
-            bins = [0, 1, 2, 4, 8, 12, 24, 48, float("inf")]
-            labels = ["<1h", "1-2h", "2-4h", "4-8h", "8-12h", "12-24h", "24-48h", "48h+"]
-            df_rt["bucket"] = pd.cut(df_rt["response_time_hours"], bins=bins, labels=labels, right=False)
-            bucket_counts = df_rt["bucket"].value_counts().reindex(labels, fill_value=0)
-            chart_df = pd.DataFrame({"Responses": bucket_counts.values}, index=bucket_counts.index)
-            chart_df.index.name = "Response Time"
-            st.bar_chart(chart_df, y="Responses", x_label="Response Time", y_label="Count")
-        except Exception:
-            st.caption("Could not render response time distribution.")
-    else:
-        st.info("No response time data yet.")
+rt_summary = db.get_response_time_summary(start_date, end_date)
+
+if rt_summary["responses"]:
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Avg Response Time", f"{rt_summary['avg_hours']:.1f} hrs")
+    col2.metric("Median Response Time", f"{rt_summary['median_hours']:.1f} hrs")
+    col3.metric("Fastest", f"{rt_summary['min_hours']:.1f} hrs")
+    col4.metric("Slowest", f"{rt_summary['max_hours']:.1f} hrs")
+
+    # Distribution as histogram-like bar chart
+    try:
+        histogram = db.get_response_time_histogram(start_date, end_date)
+        chart_df = pd.DataFrame(
+            {"Responses": [row["responses"] for row in histogram]},
+            index=pd.CategoricalIndex(
+                [row["bucket"] for row in histogram],
+                categories=[row["bucket"] for row in histogram],
+                ordered=True,
+                name="Response Time",
+            ),
+        )
+        st.bar_chart(chart_df, y="Responses", x_label="Response Time", y_label="Count")
+    except Exception:
+        st.caption("Could not render response time distribution.")
 else:
-    st.info("No data available for response time tracking.")
+    st.info("No response time data for this period.")
 
 st.divider()
 
@@ -132,29 +144,29 @@ st.divider()
 
 st.subheader("Correction Analytics")
 
-correction_stats = db.get_correction_stats()
+correction_stats = db.get_correction_stats(start_date, end_date)
 
 if correction_stats:
     total_corrections = sum(correction_stats.values())
     st.metric("Total Corrections", total_corrections)
 
-    try:
-        df_corr = pd.DataFrame(
-            list(correction_stats.items()),
-            columns=["Correction Type", "Count"],
-        ).sort_values("Count", ascending=False)
+    df_corr = pd.DataFrame(
+        list(correction_stats.items()),
+        columns=["Correction Type", "Count"],
+    ).sort_values("Count", ascending=False)
 
+    try:
         st.bar_chart(df_corr.set_index("Correction Type"), y="Count", x_label="Correction Type", y_label="Count")
     except Exception:
         st.caption("Could not render correction chart.")
 
     st.dataframe(
-        pd.DataFrame(list(correction_stats.items()), columns=["Type", "Count"]).sort_values("Count", ascending=False),
+        df_corr.rename(columns={"Correction Type": "Type"}),
         use_container_width=True,
         hide_index=True,
     )
 else:
-    st.info("No corrections recorded yet.")
+    st.info("No corrections recorded for this period.")
 
 st.divider()
 
@@ -162,29 +174,22 @@ st.divider()
 
 st.subheader("Satisfaction Trends")
 
-satisfaction_data = db.get_satisfaction_trend()
-
-if satisfaction_data:
-    df_sat = pd.DataFrame(satisfaction_data)
-    df_sat = df_sat[df_sat["satisfaction_score"].notna()].copy()
-
-    if not df_sat.empty:
-        avg_satisfaction = df_sat["satisfaction_score"].mean()
-        col1, col2, col3 = st.columns(3)
-        col1.metric("Avg Satisfaction", f"{avg_satisfaction:.1f} / 10")
-        col2.metric("Responses with Scores", len(df_sat))
-        col3.metric("Unique Users", df_sat["user_id"].nunique())
-
-        # Line chart over time
-        try:
-            df_sat["created_at"] = pd.to_datetime(df_sat["created_at"])
-            df_sat = df_sat.sort_values("created_at")
-            chart_df = df_sat.set_index("created_at")[["satisfaction_score"]]
-            chart_df = chart_df.rename(columns={"satisfaction_score": "Satisfaction Score"})
-            st.line_chart(chart_df, y="Satisfaction Score", x_label="Date", y_label="Score")
-        except Exception:
-            st.caption("Could not render satisfaction trend chart.")
-    else:
-        st.info("No satisfaction scores recorded yet.")
+sat_summary = db.get_satisfaction_summary(start_date, end_date)
+
+if sat_summary["responses"]:
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Avg Satisfaction", f"{sat_summary['avg_score']:.1f} / 10")
+    col2.metric("Responses with Scores", sat_summary["responses"])
+    col3.metric("Unique Users", sat_summary["unique_users"])
+
+    # Daily average over time
+    try:
+        df_sat = pd.DataFrame(db.get_satisfaction_daily(start_date, end_date))
+        df_sat["day"] = pd.to_datetime(df_sat["day"])
+        chart_df = df_sat.set_index("day")[["avg_score"]]
+        chart_df = chart_df.rename(columns={"avg_score": "Satisfaction Score"})
+        st.line_chart(chart_df, y="Satisfaction Score", x_label="Date", y_label="Avg Score")
+    except Exception:
+        st.caption("Could not render satisfaction trend chart.")
 else:
-    st.info("No satisfaction data yet.")
+    st.info("No satisfaction scores recorded for this period.")
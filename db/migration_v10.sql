@@ -0,0 +1,23 @@
+-- Migration v10: Status counts for the dashboard landing page
+-- Run this in the Supabase SQL Editor.
+-- One round trip returns conversation and user counts per status, instead of
+-- downloading the Pending Review / Flagged / Send Failed lists and the whole
+-- users table just to len() them.
+
+create or replace function get_status_counts()
+returns table (
+    kind text,
+    status text,
+    total bigint
+)
+language sql
+stable
+as $$
+    select 'conversations', coalesce(c.status, 'Unknown'), count(*)
+    from conversations c
+    group by c.status
+    union all
+    select 'users', coalesce(u.status, 'Unknown'), count(*)
+    from users u
+    group by u.status;
+$$;
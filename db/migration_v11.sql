@@ -0,0 +1,33 @@
+-- Migration v11: Batched recent-history lookup for the review pages
+-- Run this in the Supabase SQL Editor.
+-- Pending Review showed each card's last few exchanges by querying once per
+-- card. This returns the latest Sent conversations for many users in one
+-- windowed query, with only the columns the cards display.
+
+create or replace function get_recent_conversations_for_users(
+    user_ids uuid[],
+    per_user integer default 3
+)
+returns table (
+    id uuid,
+    user_id uuid,
+    created_at timestamptz,
+    user_message_parsed text,
+    ai_response text,
+    sent_response text
+)
+language sql
+stable
+as $$
+    select r.id, r.user_id, r.created_at, r.user_message_parsed, r.ai_response, r.sent_response
+    from (
+        select
+            c.id, c.user_id, c.created_at, c.user_message_parsed, c.ai_response, c.sent_response,
+            row_number() over (partition by c.user_id order by c.created_at desc) as rn
+        from conversations c
+        where c.user_id = any(user_ids)
+          and c.status = 'Sent'
+    ) r
+    where r.rn <= per_user
+    order by r.user_id, r.created_at desc;
+$$;
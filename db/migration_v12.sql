@@ -0,0 +1,46 @@
+-- Migration v12: Indexes for the hot conversation and user lookups
+-- Run this in the Supabase SQL Editor.
+-- Check the plans afterwards against a local copy of the schema with
+--   python scripts/check_query_plans.py
+--
+-- Every per-email lookup should be an index scan, so its cost grows with
+-- log(history) rather than with the number of conversations stored.
+
+-- ── Users: exact-match email lookups ─────────────────────────
+-- get_user_by_email used ilike, which can't use a btree (and treats _ and %
+-- in addresses as wildcards). Emails are now stored lowercase and looked up
+-- with =, which uses the unique index on users.email.
+-- If this UPDATE fails on the unique constraint, two users differ only by
+-- case: merge or delete one of them, then re-run.
+update users set email = lower(btrim(email)) where email <> lower(btrim(email));
+
+alter table users drop constraint if exists users_email_lowercase_check;
+alter table users add constraint users_email_lowercase_check
+    check (email = lower(btrim(email)));
+
+-- ── Conversations ────────────────────────────────────────────
+-- get_recent_conversations, has_pending_outreach, has_recent_reengagement,
+-- get_recent_conversations_for_users
+create index if not exists idx_conversations_user_status_created
+    on conversations (user_id, status, created_at desc);
+
+-- count_thread_replies: latest Sent check-in, then Sent follow-ups after it
+create index if not exists idx_conversations_user_type_status_created
+    on conversations (user_id, type, status, created_at desc);
+
+-- get_approved_unsent: status = 'Approved' and sent_at is null
+create index if not exists idx_conversations_status_sent_at
+    on conversations (status, sent_at);
+
+-- Keyset pagination on the review pages: status = ? order by created_at, id.
+-- Replaces the v8 (status, created_at desc) index, which this one covers.
+create index if not exists idx_conversations_status_created_id
+    on conversations (status, created_at, id);
+drop index if exists idx_conversations_status_created;
+
+-- user_id alone is a prefix of the composite indexes above
+drop index if exists idx_conversations_user_id;
+
+-- gmail_message_id already has a unique index (conversations_gmail_message_id_key);
+-- the separate non-unique copy from setup.sql only slows inserts.
+drop index if exists idx_conversations_gmail_message_id;
@@ -0,0 +1,25 @@
+-- Migration v13: Single-query thread reply count
+-- Run this in the Supabase SQL Editor.
+-- count_thread_replies used two round trips and downloaded the id of every
+-- follow-up since the last check-in (or ever) just to count them. This counts
+-- in one indexed query on (user_id, type, status, created_at) from v12.
+
+create or replace function count_thread_replies(p_user_id uuid)
+returns integer
+language sql
+stable
+as $$
+    select count(*)::integer
+    from conversations c
+    where c.user_id = p_user_id
+      and c.type = 'Follow-up'
+      and c.status = 'Sent'
+      and c.created_at > coalesce(
+          (select max(ci.created_at)
+           from conversations ci
+           where ci.user_id = p_user_id
+             and ci.type = 'Check-in'
+             and ci.status = 'Sent'),
+          '-infinity'::timestamptz
+      );
+$$;
@@ -0,0 +1,9 @@
+-- Migration v14: Pipeline stage timings and LLM token usage
+-- Run this in the Supabase SQL Editor.
+-- Both columns hold the services/telemetry.py summary:
+--   {"total_ms", "stages": {stage: {"count", "total_ms", "max_ms", "errors"}},
+--    "llm": [{"stage", "provider", "model", "calls", "prompt_tokens", "completion_tokens", "cached_tokens"}]}
+-- conversations.pipeline_metrics covers one email, workflow_runs.metrics a whole run.
+
+alter table conversations add column if not exists pipeline_metrics jsonb;
+alter table workflow_runs add column if not exists metrics jsonb;
@@ -0,0 +1,189 @@
+-- Migration v15: Performance dashboard aggregation
+-- Run this in the Supabase SQL Editor.
+-- Aggregates the telemetry summaries stored by v14 for the Performance page:
+-- stage latency percentiles and the slowest emails come from
+-- conversations.pipeline_metrics, throughput and token spend from
+-- workflow_runs.metrics (which also covers check-ins and subjects).
+--
+-- Every function takes an optional [start_date, end_date) range (created_at
+-- for conversations, started_at for runs); pass null for an open end.
+
+create index if not exists idx_conversations_metrics_created on conversations (created_at)
+    where pipeline_metrics is not null;
+
+-- p50/p95/max per pipeline stage, one sample per conversation. The "total"
+-- row is the whole process_email call.
+create or replace function perf_stage_latency(
+    start_date timestamptz default null,
+    end_date timestamptz default null
+)
+returns table (
+    stage text,
+    samples bigint,
+    p50_ms double precision,
+    p95_ms double precision,
+    max_ms double precision
+)
+language sql
+stable
+as $$
+    with samples as (
+        select s.key as stage, (s.value->>'total_ms')::double precision as ms
+        from conversations c
+        cross join lateral jsonb_each(c.pipeline_metrics->'stages') s
+        where c.pipeline_metrics is not null
+          and (start_date is null or c.created_at >= start_date)
+          and (end_date is null or c.created_at < end_date)
+        union all
+        select 'total', (c.pipeline_metrics->>'total_ms')::double precision
+        from conversations c
+        where c.pipeline_metrics is not null
+          and (start_date is null or c.created_at >= start_date)
+          and (end_date is null or c.created_at < end_date)
+    )
+    select
+        stage,
+        count(*) as samples,
+        percentile_cont(0.5) within group (order by ms) as p50_ms,
+        percentile_cont(0.95) within group (order by ms) as p95_ms,
+        max(ms) as max_ms
+    from samples
+    where ms is not null
+    group by stage
+    order by p50_ms desc;
+$$;
+
+-- Generate-stage latency per provider/model, optionally per day, so a
+-- provider switch in Settings can be compared before and after.
+create or replace function perf_generate_latency(
+    start_date timestamptz default null,
+    end_date timestamptz default null,
+    by_day boolean default false
+)
+returns table (
+    day date,
+    provider text,
+    model text,
+    conversations bigint,
+    p50_ms double precision,
+    p95_ms double precision,
+    avg_completion_tokens double precision
+)
+language sql
+stable
+as $$
+    select
+        case when by_day then c.created_at::date end as day,
+        l->>'provider' as provider,
+        l->>'model' as model,
+        count(*) as conversations,
+        percentile_cont(0.5) within group (order by (c.pipeline_metrics->'stages'->'generate'->>'total_ms')::double precision) as p50_ms,
+        percentile_cont(0.95) within group (order by (c.pipeline_metrics->'stages'->'generate'->>'total_ms')::double precision) as p95_ms,
+        avg((l->>'completion_tokens')::double precision) as avg_completion_tokens
+    from conversations c
+    cross join lateral jsonb_array_elements(c.pipeline_metrics->'llm') l
+    where c.pipeline_metrics ? 'stages'
+      and c.pipeline_metrics->'stages' ? 'generate'
+      and l->>'stage' = 'generate'
+      and (start_date is null or c.created_at >= start_date)
+      and (end_date is null or c.created_at < end_date)
+    group by 1, 2, 3
+    order by 1 nulls first, 2, 3;
+$$;
+
+-- Token totals per provider/model across all workflow runs
+create or replace function perf_llm_usage(
+    start_date timestamptz default null,
+    end_date timestamptz default null
+)
+returns table (
+    provider text,
+    model text,
+    calls bigint,
+    prompt_tokens bigint,
+    completion_tokens bigint,
+    cached_tokens bigint
+)
+language sql
+stable
+as $$
+    select
+        l->>'provider' as provider,
+        l->>'model' as model,
+        sum((l->>'calls')::bigint) as calls,
+        sum((l->>'prompt_tokens')::bigint) as prompt_tokens,
+        sum((l->>'completion_tokens')::bigint) as completion_tokens,
+        sum((l->>'cached_tokens')::bigint) as cached_tokens
+    from workflow_runs r
+    cross join lateral jsonb_array_elements(r.metrics->'llm') l
+    where r.metrics is not null
+      and (start_date is null or r.started_at >= start_date)
+      and (end_date is null or r.started_at < end_date)
+    group by 1, 2
+    order by 1, 2;
+$$;
+
+-- Finished runs with their duration, for items-per-minute throughput
+create or replace function perf_run_throughput(
+    start_date timestamptz default null,
+    end_date timestamptz default null
+)
+returns table (
+    id uuid,
+    workflow_name text,
+    started_at timestamptz,
+    status text,
+    items_processed integer,
+    duration_seconds double precision
+)
+language sql
+stable
+as $$
+    select
+        r.id,
+        r.workflow_name,
+        r.started_at,
+        r.status,
+        r.items_processed,
+        extract(epoch from (r.completed_at - r.started_at)) as duration_seconds
+    from workflow_runs r
+    where r.completed_at is not null
+      and (start_date is null or r.started_at >= start_date)
+      and (end_date is null or r.started_at < end_date)
+    order by r.started_at;
+$$;
+
+-- Slowest processed emails, with their full summary for drill-down
+create or replace function perf_slowest_conversations(
+    start_date timestamptz default null,
+    end_date timestamptz default null,
+    max_rows integer default 20
+)
+returns table (
+    id uuid,
+    created_at timestamptz,
+    type text,
+    status text,
+    email text,
+    total_ms double precision,
+    pipeline_metrics jsonb
+)
+language sql
+stable
+as $$
+    select
+        c.id,
+        c.created_at,
+        c.type,
+        c.status,
+        u.email,
+        (c.pipeline_metrics->>'total_ms')::double precision as total_ms,
+        c.pipeline_metrics
+    from conversations c
+    left join users u on u.id = c.user_id
+    where c.pipeline_metrics is not null
+      and (start_date is null or c.created_at >= start_date)
+      and (end_date is null or c.created_at < end_date)
+    order by total_ms desc nulls last
+    limit max_rows;
+$$;
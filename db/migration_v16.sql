@@ -0,0 +1,109 @@
+-- Migration v16: Durable job queue
+-- Run this in the Supabase SQL Editor.
+-- Cron workflows enqueue typed jobs here and workers drain them
+-- (services/job_queue.py). claim_jobs hands each job to exactly one worker
+-- with FOR UPDATE SKIP LOCKED and a lease; a worker that dies mid-job lets
+-- the lease expire and the job is claimed again. Failed jobs go back to
+-- 'queued' with run_after pushed out (exponential backoff) until
+-- max_attempts, then stay 'dead' with last_error for review.
+
+create table if not exists jobs (
+    id uuid primary key default gen_random_uuid(),
+    job_type text not null check (job_type in (
+        'process_email', 'generate_checkin', 'send', 'update_summary', 'regenerate_playbook'
+    )),
+    payload jsonb not null default '{}'::jsonb,
+    status text not null default 'queued' check (status in ('queued', 'running', 'done', 'dead')),
+    dedupe_key text,
+    priority integer not null default 100,
+    attempts integer not null default 0,
+    max_attempts integer not null default 5,
+    run_after timestamptz not null default now(),
+    locked_by text,
+    locked_until timestamptz,
+    last_error text,
+    created_at timestamptz not null default now(),
+    completed_at timestamptz
+);
+
+-- At most one live job per dedupe_key (e.g. one process_email per Message-ID)
+create unique index if not exists idx_jobs_dedupe_live on jobs (dedupe_key)
+    where dedupe_key is not null and status in ('queued', 'running');
+
+-- claim_jobs: due queued jobs of a type, and running jobs with an expired lease
+create index if not exists idx_jobs_claim on jobs (job_type, priority, run_after)
+    where status = 'queued';
+create index if not exists idx_jobs_lease on jobs (job_type, locked_until)
+    where status = 'running';
+
+-- delete_finished_jobs (cleanup workflow) and the dead-job list
+create index if not exists idx_jobs_status_completed on jobs (status, completed_at);
+
+-- Insert many jobs in one round trip. Rows whose dedupe_key already has a
+-- live job are skipped. Returns the number inserted.
+create or replace function enqueue_jobs(p_jobs jsonb)
+returns integer
+language plpgsql
+as $$
+declare
+    inserted integer;
+begin
+    insert into jobs (job_type, payload, dedupe_key, priority, run_after, max_attempts)
+    select j.job_type,
+           coalesce(j.payload, '{}'::jsonb),
+           j.dedupe_key,
+           coalesce(j.priority, 100),
+           coalesce(j.run_after, now()),
+           coalesce(j.max_attempts, 5)
+    from jsonb_to_recordset(p_jobs) as j(
+        job_type text, payload jsonb, dedupe_key text, priority integer,
+        run_after timestamptz, max_attempts integer
+    )
+    on conflict (dedupe_key) where dedupe_key is not null and status in ('queued', 'running')
+    do nothing;
+    get diagnostics inserted = row_count;
+    return inserted;
+end;
+$$;
+
+-- Lease up to max_jobs due jobs of one type to worker_id. Concurrent callers
+-- skip each other's locked rows, so no job is handed out twice.
+create or replace function claim_jobs(
+    worker_id text,
+    p_job_type text,
+    max_jobs integer default 10,
+    lease_seconds integer default 300
+)
+returns setof jobs
+language sql
+as $$
+    update jobs j
+    set status = 'running',
+        locked_by = worker_id,
+        locked_until = now() + make_interval(secs => lease_seconds),
+        attempts = j.attempts + 1
+    where j.id in (
+        select q.id
+        from jobs q
+        where q.job_type = p_job_type
+          and ((q.status = 'queued' and q.run_after <= now())
+               or (q.status = 'running' and q.locked_until < now()))
+        order by q.priority, q.run_after
+        limit max_jobs
+        for update skip locked
+    )
+    returning j.*;
+$$;
+
+-- Queue depth for the Run Workflows page
+create or replace function get_job_counts()
+returns table (job_type text, status text, jobs bigint, oldest timestamptz)
+language sql
+stable
+as $$
+    select job_type, status, count(*), min(created_at)
+    from jobs
+    where status <> 'done'
+    group by job_type, status
+    order by job_type, status;
+$$;
@@ -0,0 +1,26 @@
+-- Migration v17: Release leased jobs without spending an attempt
+-- Run this in the Supabase SQL Editor.
+-- When a run nears its deadline (services/deadline.py), jobs it claimed but
+-- did not start go back to the queue for the next run. claim_jobs counted
+-- an attempt for them, so it is given back here.
+
+create or replace function release_jobs(p_job_ids uuid[], worker_id text)
+returns integer
+language plpgsql
+as $$
+declare
+    released integer;
+begin
+    update jobs
+    set status = 'queued',
+        attempts = greatest(attempts - 1, 0),
+        run_after = now(),
+        locked_by = null,
+        locked_until = null
+    where id = any(p_job_ids)
+      and locked_by = worker_id
+      and status = 'running';
+    get diagnostics released = row_count;
+    return released;
+end;
+$$;
@@ -0,0 +1,56 @@
+-- Migration v18: One generate latency sample per conversation
+-- Run this in the Supabase SQL Editor.
+-- pipeline_metrics.llm has an entry per (stage, provider, model), so a
+-- generate stage that failed over to the fallback provider has two. v15's
+-- perf_generate_latency joined every entry, counting that conversation
+-- twice: once under each provider, both with the stage's full latency.
+-- Each conversation is now one sample, attributed to the provider that
+-- answered (the last generate entry), with the stage's completion tokens
+-- summed across providers.
+
+create or replace function perf_generate_latency(
+    start_date timestamptz default null,
+    end_date timestamptz default null,
+    by_day boolean default false
+)
+returns table (
+    day date,
+    provider text,
+    model text,
+    conversations bigint,
+    p50_ms double precision,
+    p95_ms double precision,
+    avg_completion_tokens double precision
+)
+language sql
+stable
+as $$
+    with generate as (
+        select
+            c.id,
+            c.created_at,
+            (c.pipeline_metrics->'stages'->'generate'->>'total_ms')::double precision as ms,
+            (array_agg(l->>'provider' order by n desc))[1] as provider,
+            (array_agg(l->>'model' order by n desc))[1] as model,
+            sum((l->>'completion_tokens')::double precision) as completion_tokens
+        from conversations c
+        cross join lateral jsonb_array_elements(c.pipeline_metrics->'llm') with ordinality as e(l, n)
+        where c.pipeline_metrics ? 'stages'
+          and c.pipeline_metrics->'stages' ? 'generate'
+          and l->>'stage' = 'generate'
+          and (start_date is null or c.created_at >= start_date)
+          and (end_date is null or c.created_at < end_date)
+        group by c.id
+    )
+    select
+        case when by_day then g.created_at::date end as day,
+        g.provider,
+        g.model,
+        count(*) as conversations,
+        percentile_cont(0.5) within group (order by g.ms) as p50_ms,
+        percentile_cont(0.95) within group (order by g.ms) as p95_ms,
+        avg(g.completion_tokens) as avg_completion_tokens
+    from generate g
+    group by 1, 2, 3
+    order by 1 nulls first, 2, 3;
+$$;
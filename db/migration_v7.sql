@@ -0,0 +1,45 @@
+-- Migration v7: Server-side knowledge base aggregation
+-- Run this in the Supabase SQL Editor.
+-- The Knowledge Base page used to download every chunk's source/word_count and
+-- group in Python; these functions return only the aggregated rows.
+
+-- Browsing, counting and deleting chunks all filter or group on source_name
+create index if not exists idx_knowledge_chunks_source on knowledge_chunks (source_name);
+
+-- Per-source chunk counts and word totals
+create or replace function get_knowledge_sources()
+returns table (
+    source_name text,
+    source_type text,
+    chunk_count bigint,
+    total_words bigint
+)
+language sql
+stable
+as $$
+    select
+        kc.source_name,
+        min(kc.source_type) as source_type,
+        count(*) as chunk_count,
+        coalesce(sum(kc.word_count), 0) as total_words
+    from knowledge_chunks kc
+    group by kc.source_name
+    order by kc.source_name;
+$$;
+
+-- Totals across the whole knowledge base (always exactly one row)
+create or replace function get_knowledge_stats()
+returns table (
+    source_count bigint,
+    chunk_count bigint,
+    total_words bigint
+)
+language sql
+stable
+as $$
+    select
+        count(distinct kc.source_name) as source_count,
+        count(*) as chunk_count,
+        coalesce(sum(kc.word_count), 0) as total_words
+    from knowledge_chunks kc;
+$$;
@@ -0,0 +1,183 @@
+-- Migration v8: Server-side analytics aggregation
+-- Run this in the Supabase SQL Editor.
+-- The Analytics page used to pull the latest 500 reviewed conversations (with
+-- full ai_response/sent_response bodies) and every correction row, then
+-- aggregate in Python. These functions return only the aggregates.
+--
+-- Every function takes an optional [start_date, end_date) range on created_at;
+-- pass null for an open end.
+
+-- Date-ranged scans over reviewed conversations and corrections
+create index if not exists idx_conversations_status_created on conversations (status, created_at desc);
+create index if not exists idx_conversations_satisfaction_created on conversations (created_at)
+    where satisfaction_score is not null;
+
+-- Edit rate and average approval latency per confidence score
+create or replace function analytics_edit_rate_by_confidence(
+    start_date timestamptz default null,
+    end_date timestamptz default null
+)
+returns table (
+    confidence integer,
+    responses bigint,
+    edited bigint,
+    avg_response_time_hours double precision
+)
+language sql
+stable
+as $$
+    select
+        c.confidence,
+        count(*) as responses,
+        count(*) filter (
+            where c.sent_response is not null
+              and btrim(c.sent_response) <> btrim(coalesce(c.ai_response, ''))
+        ) as edited,
+        avg(extract(epoch from (c.approved_at - c.created_at)) / 3600.0) as avg_response_time_hours
+    from conversations c
+    where c.status in ('Sent', 'Approved')
+      and c.confidence is not null
+      and (start_date is null or c.created_at >= start_date)
+      and (end_date is null or c.created_at < end_date)
+    group by c.confidence
+    order by c.confidence;
+$$;
+
+-- Approval latency summary (one row)
+create or replace function analytics_response_time_summary(
+    start_date timestamptz default null,
+    end_date timestamptz default null
+)
+returns table (
+    responses bigint,
+    avg_hours double precision,
+    median_hours double precision,
+    min_hours double precision,
+    max_hours double precision
+)
+language sql
+stable
+as $$
+    with t as (
+        select extract(epoch from (c.approved_at - c.created_at)) / 3600.0 as hours
+        from conversations c
+        where c.status in ('Sent', 'Approved')
+          and c.approved_at is not null
+          and (start_date is null or c.created_at >= start_date)
+          and (end_date is null or c.created_at < end_date)
+    )
+    select
+        count(*),
+        avg(hours),
+        percentile_cont(0.5) within group (order by hours),
+        min(hours),
+        max(hours)
+    from t;
+$$;
+
+-- Approval latency histogram in the buckets the dashboard charts
+create or replace function analytics_response_time_histogram(
+    start_date timestamptz default null,
+    end_date timestamptz default null
+)
+returns table (
+    bucket text,
+    bucket_order integer,
+    responses bigint
+)
+language sql
+stable
+as $$
+    with buckets(bucket, bucket_order, lower_hours, upper_hours) as (
+        values
+            ('<1h', 1, 0.0, 1.0),
+            ('1-2h', 2, 1.0, 2.0),
+            ('2-4h', 3, 2.0, 4.0),
+            ('4-8h', 4, 4.0, 8.0),
+            ('8-12h', 5, 8.0, 12.0),
+            ('12-24h', 6, 12.0, 24.0),
+            ('24-48h', 7, 24.0, 48.0),
+            ('48h+', 8, 48.0, 'infinity'::float)
+    ),
+    t as (
+        select extract(epoch from (c.approved_at - c.created_at)) / 3600.0 as hours
+        from conversations c
+        where c.status in ('Sent', 'Approved')
+          and c.approved_at is not null
+          and (start_date is null or c.created_at >= start_date)
+          and (end_date is null or c.created_at < end_date)
+    )
+    select b.bucket, b.bucket_order, count(t.hours) as responses
+    from buckets b
+    left join t on t.hours >= b.lower_hours and t.hours < b.upper_hours
+    group by b.bucket, b.bucket_order
+    order by b.bucket_order;
+$$;
+
+-- Corrections per type
+create or replace function analytics_correction_counts(
+    start_date timestamptz default null,
+    end_date timestamptz default null
+)
+returns table (
+    correction_type text,
+    corrections bigint
+)
+language sql
+stable
+as $$
+    select coalesce(cr.correction_type, 'Unknown'), count(*)
+    from corrected_responses cr
+    where (start_date is null or cr.created_at >= start_date)
+      and (end_date is null or cr.created_at < end_date)
+    group by 1
+    order by 2 desc;
+$$;
+
+-- Daily satisfaction averages for the trend chart
+create or replace function analytics_satisfaction_daily(
+    start_date timestamptz default null,
+    end_date timestamptz default null
+)
+returns table (
+    day date,
+    avg_score double precision,
+    responses bigint
+)
+language sql
+stable
+as $$
+    select
+        (c.created_at at time zone 'utc')::date as day,
+        avg(c.satisfaction_score)::double precision,
+        count(*)
+    from conversations c
+    where c.satisfaction_score is not null
+      and (start_date is null or c.created_at >= start_date)
+      and (end_date is null or c.created_at < end_date)
+    group by 1
+    order by 1;
+$$;
+
+-- Satisfaction headline numbers (one row)
+create or replace function analytics_satisfaction_summary(
+    start_date timestamptz default null,
+    end_date timestamptz default null
+)
+returns table (
+    avg_score double precision,
+    responses bigint,
+    unique_users bigint
+)
+language sql
+stable
+as $$
+    select
+        avg(c.satisfaction_score)::double precision,
+        count(*),
+        count(distinct c.user_id)
+    from conversations c
+    where c.satisfaction_score is not null
+      and (start_date is null or c.created_at >= start_date)
+      and (end_date is null or c.created_at < end_date);
+$$;
@@ -0,0 +1,144 @@
+-- Migration v9: Precomputed review metrics on conversations
+-- Run this in the Supabase SQL Editor, then run
+--   python scripts/backfill_review_metrics.py
+-- to fill the new columns on existing rows.
+--
+-- was_edited and response_time_seconds are written by the app when a
+-- conversation moves to Approved or Sent (see db.compute_review_metrics),
+-- so analytics no longer compare response bodies or subtract timestamps.
+
+alter table conversations add column if not exists was_edited boolean default null;
+alter table conversations add column if not exists response_time_seconds integer default null;
+
+-- Covering partial index: the analytics functions below are index-only scans
+create index if not exists idx_conversations_review_metrics
+    on conversations (created_at, confidence, was_edited, response_time_seconds)
+    where status in ('Sent', 'Approved');
+
+-- Backfill one batch of reviewed rows that predate the columns.
+-- Returns the number of rows updated; call until it returns 0.
+create or replace function backfill_review_metrics(batch_size integer default 500)
+returns integer
+language plpgsql
+as $$
+declare
+    updated integer;
+begin
+    with batch as (
+        select id
+        from conversations
+        where status in ('Sent', 'Approved')
+          and was_edited is null
+        order by created_at
+        limit batch_size
+        for update skip locked
+    )
+    update conversations c
+    set was_edited = (c.sent_response is not null
+                      and btrim(c.sent_response) <> btrim(coalesce(c.ai_response, ''))),
+        response_time_seconds = extract(epoch from (c.approved_at - c.created_at))::integer
+    from batch
+    where c.id = batch.id;
+
+    get diagnostics updated = row_count;
+    return updated;
+end;
+$$;
+
+-- Redefine the v8 analytics functions on the precomputed columns
+
+create or replace function analytics_edit_rate_by_confidence(
+    start_date timestamptz default null,
+    end_date timestamptz default null
+)
+returns table (
+    confidence integer,
+    responses bigint,
+    edited bigint,
+    avg_response_time_hours double precision
+)
+language sql
+stable
+as $$
+    select
+        c.confidence,
+        count(*) as responses,
+        count(*) filter (where c.was_edited) as edited,
+        avg(c.response_time_seconds) / 3600.0 as avg_response_time_hours
+    from conversations c
+    where c.status in ('Sent', 'Approved')
+      and c.confidence is not null
+      and (start_date is null or c.created_at >= start_date)
+      and (end_date is null or c.created_at < end_date)
+    group by c.confidence
+    order by c.confidence;
+$$;
+
+create or replace function analytics_response_time_summary(
+    start_date timestamptz default null,
+    end_date timestamptz default null
+)
+returns table (
+    responses bigint,
+    avg_hours double precision,
+    median_hours double precision,
+    min_hours double precision,
+    max_hours double precision
+)
+language sql
+stable
+as $$
+    with t as (
+        select c.response_time_seconds / 3600.0 as hours
+        from conversations c
+        where c.status in ('Sent', 'Approved')
+          and c.response_time_seconds is not null
+          and (start_date is null or c.created_at >= start_date)
+          and (end_date is null or c.created_at < end_date)
+    )
+    select
+        count(*),
+        avg(hours)::double precision,
+        percentile_cont(0.5) within group (order by hours),
+        min(hours)::double precision,
+        max(hours)::double precision
+    from t;
+$$;
+
+create or replace function analytics_response_time_histogram(
+    start_date timestamptz default null,
+    end_date timestamptz default null
+)
+returns table (
+    bucket text,
+    bucket_order integer,
+    responses bigint
+)
+language sql
+stable
+as $$
+    with buckets(bucket, bucket_order, lower_seconds, upper_seconds) as (
+        values
+            ('<1h', 1, 0, 3600),
+            ('1-2h', 2, 3600, 7200),
+            ('2-4h', 3, 7200, 14400),
+            ('4-8h', 4, 14400, 28800),
+            ('8-12h', 5, 28800, 43200),
+            ('12-24h', 6, 43200, 86400),
+            ('24-48h', 7, 86400, 172800),
+            ('48h+', 8, 172800, 2147483647)
+    ),
+    t as (
+        select c.response_time_seconds as seconds
+        from conversations c
+        where c.status in ('Sent', 'Approved')
+          and c.response_time_seconds is not null
+          and (start_date is null or c.created_at >= start_date)
+          and (end_date is null or c.created_at < end_date)
+    )
+    select b.bucket, b.bucket_order, count(t.seconds) as responses
+    from buckets b
+    left join t on t.seconds >= b.lower_seconds and t.seconds < b.upper_seconds
+    group by b.bucket, b.bucket_order
+    order by b.bucket_order;
+$$;
@@ -1,6 +1,6 @@
-from datetime import datetime, timezone
-from supabase import create_client
+from datetime import datetime, timedelta, timezone
 import config
+from services import telemetry
 
 _client = None
 
@@ -8,25 +8,84 @@ _client = None
 def get_client():
     global _client
     if _client is None:
+        from supabase import create_client
         _client = create_client(config.SUPABASE_URL, config.SUPABASE_KEY)
     return _client
 
 
+# ── Projections ────────────────────────────────────────────────
+# Named column sets for reads. Hot paths use the narrowest profile their
+# callers need so large columns (summary, user_message_raw, evaluation_details)
+# only move when something reads them. "full" is for the dashboard edit views.
+
+USER_PROJECTIONS = {
+    "light": "id, email, first_name, status, stage, last_response_date, checkin_days, onboarding_step, created_at",
+    "context": ("id, email, first_name, status, stage, last_response_date, checkin_days, onboarding_step, created_at, "
+                "business_idea, current_challenge, summary, gmail_thread_id, gmail_message_id, "
+                "auto_approve_threshold, satisfaction_score, bounce_count"),
+    "full": "*",
+}
+
+CONVERSATION_PROJECTIONS = {
+    "light": "id, user_id, type, status, confidence, flag_reason, created_at, approved_at, sent_at, send_attempts",
+    # Prompt history: what the user said and what the coach replied
+    "context": "id, user_id, type, status, created_at, user_message_parsed, ai_response, sent_response",
+    # Sending: response text, threading and review-metric inputs
+    "send": ("id, user_id, type, status, created_at, approved_at, user_message_parsed, user_message_raw, "
+             "ai_response, sent_response, email_subject, gmail_message_id, send_attempts"),
+    # Dashboard cards: everything shown or edited during review
+    "review": ("id, user_id, type, status, confidence, flag_reason, created_at, approved_at, approved_by, sent_at, "
+               "user_message_parsed, user_message_raw, ai_response, sent_response, email_subject, "
+               "evaluation_details, resource_referenced, stage_detected, send_attempts"),
+    "full": "*",
+}
+
+
+# PostgREST puts in_ filters in the URL; 200 UUIDs stay well under its limits
+IN_FILTER_CHUNK = 200
+
+# Conversations that count as outreach already waiting to go out
+PENDING_OUTREACH_STATUSES = ["Pending Review", "Approved"]
+
+# Check-in schedule settings and their defaults
+CHECKIN_SETTINGS = {"default_checkin_days": "tue,fri", "checkin_min_days_since_response": "3"}
+
+
+def _chunked(items, size: int = IN_FILTER_CHUNK):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
 # ── Users ──────────────────────────────────────────────────────
 
-def get_user_by_email(email: str):
-    resp = get_client().table("users").select("*").ilike("email", email).limit(1).execute()
+def get_user_by_email(email: str, projection: str = "context"):
+    # Emails are stored lowercase (migration v12), so = hits the unique index
+    resp = (get_client().table("users")
+            .select(USER_PROJECTIONS[projection])
+            .eq("email", email.strip().lower())
+            .limit(1)
+            .execute())
     return resp.data[0] if resp.data else None
 
 
-def get_user_by_id(user_id: str):
-    resp = get_client().table("users").select("*").eq("id", user_id).limit(1).execute()
+def get_user_by_id(user_id: str, projection: str = "context"):
+    resp = get_client().table("users").select(USER_PROJECTIONS[projection]).eq("id", user_id).limit(1).execute()
     return resp.data[0] if resp.data else None
 
 
+def get_users_by_ids(user_ids: list[str], projection: str = "context") -> list[dict]:
+    """Batch version of get_user_by_id, one query per IN_FILTER_CHUNK ids."""
+    users = []
+    for chunk in _chunked(user_ids):
+        resp = get_client().table("users").select(USER_PROJECTIONS[projection]).in_("id", chunk).execute()
+        users.extend(resp.data)
+    return users
+
+
 def get_active_users_needing_checkin(days_since: int = 3):
     """Active users whose last response was >= days_since days ago, or who have never been contacted."""
-    resp = get_client().table("users").select("*").eq("status", "Active").execute()
+    resp = get_client().table("users").select(USER_PROJECTIONS["context"]).eq("status", "Active").execute()
     users = []
     for u in resp.data:
         last = u.get("last_response_date")
@@ -40,20 +99,22 @@ def get_active_users_needing_checkin(days_since: int = 3):
     return users
 
 
-def get_active_users_for_checkin_today(day_of_week: str):
+def get_active_users_for_checkin_today(day_of_week: str, settings: dict = None):
     """Get active users who should receive a check-in today based on their personalized schedule.
 
     Args:
         day_of_week: Three-letter lowercase day, e.g. 'mon', 'tue', 'wed'
+        settings: default_checkin_days and checkin_min_days_since_response,
+            if the caller has already read them
 
     Returns users whose checkin_days includes today, or who use the system default
     and today is in the system default.
     """
-    default_days_str = get_setting("default_checkin_days", "tue,fri")
-    default_days = [d.strip().lower() for d in default_days_str.split(",")]
-    min_days = int(get_setting("checkin_min_days_since_response", "3"))
+    settings = settings or get_settings(CHECKIN_SETTINGS)
+    default_days = [d.strip().lower() for d in settings["default_checkin_days"].split(",")]
+    min_days = int(settings["checkin_min_days_since_response"])
 
-    resp = get_client().table("users").select("*").eq("status", "Active").execute()
+    resp = get_client().table("users").select(USER_PROJECTIONS["context"]).eq("status", "Active").execute()
     users = []
     for u in resp.data:
         user_days_str = u.get("checkin_days")
@@ -77,12 +138,12 @@ def get_active_users_for_checkin_today(day_of_week: str):
 
 def get_onboarding_users() -> list:
     """Get users with status 'Onboarding'."""
-    resp = get_client().table("users").select("*").eq("status", "Onboarding").execute()
+    resp = get_client().table("users").select(USER_PROJECTIONS["light"]).eq("status", "Onboarding").execute()
     return resp.data
 
 
 def get_silent_users(days: int = 10):
-    resp = get_client().table("users").select("*").eq("status", "Active").execute()
+    resp = get_client().table("users").select(USER_PROJECTIONS["light"]).eq("status", "Active").execute()
     users = []
     for u in resp.data:
         last = u.get("last_response_date")
@@ -96,7 +157,7 @@ def get_silent_users(days: int = 10):
 
 
 def create_user(email: str, first_name: str = None):
-    data = {"email": email.lower(), "status": "Onboarding"}
+    data = {"email": email.strip().lower(), "status": "Onboarding"}
     if first_name:
         data["first_name"] = first_name
     resp = get_client().table("users").insert(data).execute()
@@ -104,58 +165,149 @@ def create_user(email: str, first_name: str = None):
 
 
 def update_user(user_id: str, updates: dict):
-    resp = get_client().table("users").update(updates).eq("id", user_id).execute()
+    with telemetry.span("db_write", table="users"):
+        resp = get_client().table("users").update(updates).eq("id", user_id).execute()
     return resp.data[0] if resp.data else None
 
 
+def update_users(user_ids: list[str], updates: dict) -> int:
+    """Apply the same updates to many users, one query per IN_FILTER_CHUNK ids."""
+    updated = 0
+    for chunk in _chunked(user_ids):
+        with telemetry.span("db_write", table="users"):
+            resp = get_client().table("users").update(updates).in_("id", chunk).execute()
+        updated += len(resp.data or [])
+    return updated
+
+
 def delete_user(user_id: str):
     """Delete a user by ID. ON DELETE CASCADE removes their conversations automatically."""
     get_client().table("users").delete().eq("id", user_id).execute()
 
 
-def get_all_users():
-    resp = get_client().table("users").select("*").order("created_at", desc=True).execute()
+def get_all_users(projection: str = "light"):
+    resp = get_client().table("users").select(USER_PROJECTIONS[projection]).order("created_at", desc=True).execute()
     return resp.data
 
 
 # ── Conversations ──────────────────────────────────────────────
 
 def create_conversation(data: dict):
-    resp = get_client().table("conversations").insert(data).execute()
+    with telemetry.span("db_write", table="conversations"):
+        resp = get_client().table("conversations").insert(data).execute()
     return resp.data[0] if resp.data else None
 
 
+def create_conversations(rows: list[dict], chunk_size: int = 500) -> list[dict]:
+    """Insert many conversations with one query per chunk_size rows."""
+    created = []
+    for chunk in _chunked(rows, chunk_size):
+        with telemetry.span("db_write", table="conversations"):
+            resp = get_client().table("conversations").insert(chunk).execute()
+        created.extend(resp.data or [])
+    return created
+
+
 def get_conversation(conversation_id: str):
     resp = get_client().table("conversations").select("*").eq("id", conversation_id).limit(1).execute()
     return resp.data[0] if resp.data else None
 
 
 def update_conversation(conversation_id: str, updates: dict):
-    resp = get_client().table("conversations").update(updates).eq("id", conversation_id).execute()
+    with telemetry.span("db_write", table="conversations"):
+        resp = get_client().table("conversations").update(updates).eq("id", conversation_id).execute()
     return resp.data[0] if resp.data else None
 
 
-def get_conversations_by_status(status: str):
+def compute_review_metrics(conversation: dict, approved_at: str = None, sent_response: str = None) -> dict:
+    """Compute was_edited and response_time_seconds for a conversation being approved or sent.
+
+    Merge the result into the status update so analytics read stored columns
+    instead of comparing response bodies. Uses the conversation's own
+    approved_at/sent_response when not given.
+    """
+    if sent_response is None:
+        sent_response = conversation.get("sent_response")
+    was_edited = (sent_response is not None
+                  and sent_response.strip() != (conversation.get("ai_response") or "").strip())
+
+    response_time_seconds = None
+    approved_at = approved_at or conversation.get("approved_at")
+    if conversation.get("created_at") and approved_at:
+        try:
+            created = datetime.fromisoformat(conversation["created_at"].replace("Z", "+00:00"))
+            approved = datetime.fromisoformat(approved_at.replace("Z", "+00:00"))
+            response_time_seconds = int((approved - created).total_seconds())
+        except (ValueError, TypeError):
+            pass
+
+    return {"was_edited": was_edited, "response_time_seconds": response_time_seconds}
+
+
+def count_conversations_missing_review_metrics() -> int:
+    """Count reviewed conversations whose was_edited/response_time_seconds were never filled."""
     resp = (get_client().table("conversations")
-            .select("*, users(id, email, first_name, stage, business_idea, summary)")
-            .eq("status", status)
-            .order("created_at", desc=False)
+            .select("id", count="exact")
+            .in_("status", ["Sent", "Approved"])
+            .is_("was_edited", "null")
+            .limit(1)
             .execute())
+    return resp.count or 0
+
+
+def backfill_review_metrics(batch_size: int = 500) -> int:
+    """Fill review metrics for one batch of historical rows. Returns rows updated."""
+    resp = get_client().rpc("backfill_review_metrics", {"batch_size": batch_size}).execute()
+    return resp.data or 0
+
+
+def get_conversations_by_status(status: str, limit: int = None, after: tuple = None):
+    """Get conversations with a status, oldest first.
+
+    Pass limit for one page; pass after=(created_at, id) of the last row seen
+    to get the next page (keyset pagination, stable under concurrent inserts).
+    """
+    q = (get_client().table("conversations")
+         .select(f"{CONVERSATION_PROJECTIONS['review']}, users(id, email, first_name, stage, business_idea, summary)")
+         .eq("status", status))
+    if after:
+        created_at, conv_id = after
+        q = q.or_(f'created_at.gt."{created_at}",and(created_at.eq."{created_at}",id.gt.{conv_id})')
+    q = q.order("created_at", desc=False).order("id", desc=False)
+    if limit:
+        q = q.limit(limit)
+    resp = q.execute()
     return resp.data
 
 
+def get_status_counts() -> dict:
+    """Get row counts per status for conversations and users in one query.
+
+    Returns {"conversations": {status: n, ...}, "users": {status: n, ...}}.
+    """
+    resp = get_client().rpc("get_status_counts", {}).execute()
+    counts = {"conversations": {}, "users": {}}
+    for row in resp.data:
+        counts.setdefault(row["kind"], {})[row["status"]] = row["total"]
+    return counts
+
+
+_SEND_USER_COLUMNS = ("users(id, email, first_name, stage, business_idea, current_challenge, summary, "
+                      "gmail_thread_id, gmail_message_id, bounce_count, notes)")
+
+
 def get_approved_unsent():
     """Fetch conversations ready to send: Approved (unsent) + Send Failed (< 3 attempts)."""
     # Approved, never sent
     approved_resp = (get_client().table("conversations")
-                     .select("*, users(id, email, first_name, stage, summary, gmail_thread_id, gmail_message_id, bounce_count)")
+                     .select(f"{CONVERSATION_PROJECTIONS['send']}, {_SEND_USER_COLUMNS}")
                      .eq("status", "Approved")
                      .is_("sent_at", "null")
                      .order("created_at", desc=False)
                      .execute())
     # Send Failed, retryable (< 3 attempts)
     retry_resp = (get_client().table("conversations")
-                  .select("*, users(id, email, first_name, stage, summary, gmail_thread_id, gmail_message_id, bounce_count)")
+                  .select(f"{CONVERSATION_PROJECTIONS['send']}, {_SEND_USER_COLUMNS}")
                   .eq("status", "Send Failed")
                   .lt("send_attempts", 3)
                   .order("created_at", desc=False)
@@ -163,9 +315,58 @@ def get_approved_unsent():
     return approved_resp.data + retry_resp.data
 
 
+def get_conversations_for_send(conversation_ids: list[str]) -> list[dict]:
+    """The conversations among conversation_ids that are still Approved or Send Failed,
+    with the same columns as get_approved_unsent."""
+    conversations = []
+    for chunk in _chunked(conversation_ids):
+        resp = (get_client().table("conversations")
+                .select(f"{CONVERSATION_PROJECTIONS['send']}, {_SEND_USER_COLUMNS}")
+                .in_("id", chunk)
+                .in_("status", ["Approved", "Send Failed"])
+                .execute())
+        conversations.extend(resp.data)
+    return conversations
+
+
+def get_latest_sent_message_ids(user_ids: list[str]) -> dict:
+    """{user_id: Message-ID of their latest Sent conversation}, for threading replies.
+
+    One query per IN_FILTER_CHUNK ids. Users with no Sent conversation, or
+    whose latest one has no Message-ID, are left out.
+    """
+    latest = {}
+    for chunk in _chunked(user_ids):
+        resp = (get_client().table("conversations")
+                .select("user_id, gmail_message_id")
+                .in_("user_id", chunk)
+                .eq("status", "Sent")
+                .order("created_at", desc=True)
+                .execute())
+        for row in resp.data:
+            latest.setdefault(row["user_id"], row.get("gmail_message_id"))
+    return {uid: message_id for uid, message_id in latest.items() if message_id}
+
+
+def get_latest_evaluated_confidence(user_id: str) -> int | None:
+    """Evaluator score of the last generated response to a user, or None.
+
+    Only rows with evaluation_details count: check-ins, pause/resume and
+    canned replies carry a fixed confidence that says nothing about the user.
+    """
+    resp = (get_client().table("conversations")
+            .select("confidence")
+            .eq("user_id", user_id)
+            .not_.is_("evaluation_details", "null")
+            .order("created_at", desc=True)
+            .limit(1)
+            .execute())
+    return resp.data[0]["confidence"] if resp.data else None
+
+
 def get_recent_conversations(user_id: str, limit: int = 3):
     resp = (get_client().table("conversations")
-            .select("*")
+            .select(CONVERSATION_PROJECTIONS["context"])
             .eq("user_id", user_id)
             .eq("status", "Sent")
             .order("created_at", desc=True)
@@ -174,15 +375,48 @@ def get_recent_conversations(user_id: str, limit: int = 3):
     return resp.data
 
 
-def get_conversations_for_user(user_id: str):
+def get_recent_conversations_for_users(user_ids: list[str], limit: int = 3) -> dict:
+    """Batch version of get_recent_conversations for many users in one query.
+
+    Returns {user_id: [conversation, ...]} newest first; users with no Sent
+    conversations map to an empty list.
+    """
+    history = {uid: [] for uid in user_ids}
+    if not user_ids:
+        return history
+    resp = get_client().rpc("get_recent_conversations_for_users", {
+        "user_ids": list(user_ids),
+        "per_user": limit,
+    }).execute()
+    for row in resp.data:
+        history.setdefault(row["user_id"], []).append(row)
+    return history
+
+
+def get_conversations_for_user(user_id: str, projection: str = "light"):
     resp = (get_client().table("conversations")
-            .select("*")
+            .select(CONVERSATION_PROJECTIONS[projection])
             .eq("user_id", user_id)
             .order("created_at", desc=True)
             .execute())
     return resp.data
 
 
+def get_conversations_for_users(user_ids: list[str], status: str = None, projection: str = "light") -> dict:
+    """Batch version of get_conversations_for_user: {user_id: [conversation, ...]} newest first."""
+    by_user = {uid: [] for uid in user_ids}
+    for chunk in _chunked(user_ids):
+        q = (get_client().table("conversations")
+             .select(CONVERSATION_PROJECTIONS[projection])
+             .in_("user_id", chunk))
+        if status:
+            q = q.eq("status", status)
+        resp = q.order("created_at", desc=True).execute()
+        for row in resp.data:
+            by_user.setdefault(row["user_id"], []).append(row)
+    return by_user
+
+
 def conversation_exists_for_message(gmail_message_id: str) -> bool:
     resp = (get_client().table("conversations")
             .select("id")
@@ -199,7 +433,7 @@ def delete_conversation(conversation_id: str):
 
 def get_all_conversations(limit: int = 100):
     resp = (get_client().table("conversations")
-            .select("*, users(id, email, first_name, stage)")
+            .select(f"{CONVERSATION_PROJECTIONS['review']}, users(id, email, first_name, stage)")
             .order("created_at", desc=True)
             .limit(limit)
             .execute())
@@ -208,75 +442,65 @@ def get_all_conversations(limit: int = 100):
 
 def has_pending_outreach(user_id: str) -> bool:
     """Check if a user has any conversations in Pending Review or Approved (unsent)."""
-    for status in ("Pending Review", "Approved"):
+    resp = (get_client().table("conversations")
+            .select("id")
+            .eq("user_id", user_id)
+            .in_("status", PENDING_OUTREACH_STATUSES)
+            .limit(1)
+            .execute())
+    return len(resp.data) > 0
+
+
+def get_users_with_pending_outreach(user_ids: list[str]) -> set:
+    """Batch version of has_pending_outreach: the ids among user_ids that have some."""
+    pending = set()
+    for chunk in _chunked(user_ids):
         resp = (get_client().table("conversations")
-                .select("id")
-                .eq("user_id", user_id)
-                .eq("status", status)
-                .limit(1)
+                .select("user_id")
+                .in_("user_id", chunk)
+                .in_("status", PENDING_OUTREACH_STATUSES)
                 .execute())
-        if resp.data:
-            return True
-    return False
+        pending.update(row["user_id"] for row in resp.data)
+    return pending
 
 
 def has_recent_reengagement(user_id: str, within_days: int = 14) -> bool:
-    cutoff = datetime.now(timezone.utc)
-    resp = (get_client().table("conversations")
-            .select("id, created_at")
-            .eq("user_id", user_id)
-            .eq("type", "Re-engagement")
-            .order("created_at", desc=True)
-            .limit(1)
-            .execute())
-    if not resp.data:
-        return False
-    last = datetime.fromisoformat(resp.data[0].get("created_at", "").replace("Z", "+00:00"))
-    return (cutoff - last).days < within_days
+    return user_id in get_users_with_recent_reengagement([user_id], within_days)
+
+
+def get_users_with_recent_reengagement(user_ids: list[str], within_days: int = 14) -> set:
+    """The ids among user_ids sent a Re-engagement in the last within_days days."""
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=within_days)).isoformat()
+    recent = set()
+    for chunk in _chunked(user_ids):
+        resp = (get_client().table("conversations")
+                .select("user_id")
+                .in_("user_id", chunk)
+                .eq("type", "Re-engagement")
+                .gt("created_at", cutoff)
+                .execute())
+        recent.update(row["user_id"] for row in resp.data)
+    return recent
 
 
 def count_thread_replies(user_id: str) -> int:
     """Count the number of Follow-up replies sent since the last Check-in for a user.
 
     This effectively counts replies within the current 'thread' / check-in cycle,
-    used to enforce the 4-reply cap per thread.
+    used to enforce the 4-reply cap per thread. Counted in one query by the
+    count_thread_replies RPC (migration v13).
     """
-    # Get the most recent check-in
-    checkin_resp = (get_client().table("conversations")
-                    .select("created_at")
-                    .eq("user_id", user_id)
-                    .eq("type", "Check-in")
-                    .eq("status", "Sent")
-                    .order("created_at", desc=True)
-                    .limit(1)
-                    .execute())
-
-    if checkin_resp.data:
-        last_checkin_time = checkin_resp.data[0]["created_at"]
-        # Count follow-ups since that check-in
-        followup_resp = (get_client().table("conversations")
-                         .select("id")
-                         .eq("user_id", user_id)
-                         .eq("type", "Follow-up")
-                         .eq("status", "Sent")
-                         .gt("created_at", last_checkin_time)
-                         .execute())
-        return len(followup_resp.data)
-    else:
-        # No check-in found, count all follow-ups
-        followup_resp = (get_client().table("conversations")
-                         .select("id")
-                         .eq("user_id", user_id)
-                         .eq("type", "Follow-up")
-                         .eq("status", "Sent")
-                         .execute())
-        return len(followup_resp.data)
+    resp = get_client().rpc("count_thread_replies", {"p_user_id": user_id}).execute()
+    return resp.data or 0
 
 
 # ── Model Responses ────────────────────────────────────────────
 
 def get_model_responses_by_stage(stage: str):
-    resp = get_client().table("model_responses").select("*").eq("stage", stage).execute()
+    resp = (get_client().table("model_responses")
+            .select("id, stage, scenario, user_example, ideal_response")
+            .eq("stage", stage)
+            .execute())
     return resp.data
 
 
@@ -288,7 +512,10 @@ def get_all_model_responses():
 # ── Corrected Responses ───────────────────────────────────────
 
 def get_recent_corrections(limit: int = 10, stage: str = None):
-    q = get_client().table("corrected_responses").select("*").order("created_at", desc=True).limit(limit)
+    q = (get_client().table("corrected_responses")
+         .select("id, ai_response, corrected_response, correction_notes, correction_type, created_at")
+         .order("created_at", desc=True)
+         .limit(limit))
     resp = q.execute()
     return resp.data
 
@@ -303,14 +530,10 @@ def get_all_corrections():
     return resp.data
 
 
-def get_correction_stats() -> dict:
-    """Get correction statistics grouped by type for analytics."""
-    resp = get_client().table("corrected_responses").select("correction_type, created_at").execute()
-    stats = {}
-    for row in resp.data:
-        ctype = row.get("correction_type", "Unknown")
-        stats[ctype] = stats.get(ctype, 0) + 1
-    return stats
+def get_correction_stats(start_date=None, end_date=None) -> dict:
+    """Get correction counts grouped by type for analytics, optionally within a date range."""
+    resp = get_client().rpc("analytics_correction_counts", _date_range_params(start_date, end_date)).execute()
+    return {row["correction_type"]: row["corrections"] for row in resp.data}
 
 
 # ── Resources ─────────────────────────────────────────────────
@@ -324,12 +547,12 @@ def get_resources_by_stage(stage: str = None):
     """Get resources, optionally filtered by stage (includes stage=NULL for all-stage resources)."""
     if stage:
         resp = (get_client().table("resources")
-                .select("*")
+                .select("id, name, description, topics, stage")
                 .or_(f"stage.eq.{stage},stage.is.null")
                 .order("name")
                 .execute())
     else:
-        resp = get_client().table("resources").select("*").order("name").execute()
+        resp = get_client().table("resources").select("id, name, description, topics, stage").order("name").execute()
     return resp.data
 
 
@@ -354,12 +577,20 @@ def get_setting(key: str, default: str = None) -> str:
     return default
 
 
+def get_settings(defaults: dict) -> dict:
+    """Read several settings in one query: {key: value}, falling back to defaults."""
+    resp = get_client().table("settings").select("key, value").in_("key", list(defaults)).execute()
+    values = dict(defaults)
+    values.update({row["key"]: row["value"] for row in resp.data})
+    return values
+
+
 def set_setting(key: str, value: str):
     get_client().table("settings").upsert({"key": key, "value": value}).execute()
 
 
 def get_all_settings() -> dict:
-    resp = get_client().table("settings").select("*").execute()
+    resp = get_client().table("settings").select("key, value").execute()
     return {row["key"]: row["value"] for row in resp.data}
 
 
@@ -374,25 +605,45 @@ def start_workflow_run(workflow_name: str) -> str:
 
 
 def complete_workflow_run(run_id: str, items_processed: int = 0,
-                          items_failed: int = 0, items_skipped: int = 0):
+                          items_failed: int = 0, items_skipped: int = 0, metrics: dict = None):
     status = "completed_with_errors" if items_failed > 0 else "completed"
     update_data = {
         "status": status,
         "completed_at": datetime.now(timezone.utc).isoformat(),
         "items_processed": items_processed,
     }
+    if metrics is not None:
+        update_data["metrics"] = metrics
     # Store failure/skip info in error_message field if any failures occurred
     if items_failed > 0 or items_skipped > 0:
         update_data["error_message"] = f"{items_failed} failed, {items_skipped} skipped"
     get_client().table("workflow_runs").update(update_data).eq("id", run_id).execute()
 
 
-def fail_workflow_run(run_id: str, error_message: str):
-    get_client().table("workflow_runs").update({
+def fail_workflow_run(run_id: str, error_message: str, metrics: dict = None):
+    update_data = {
         "status": "failed",
         "completed_at": datetime.now(timezone.utc).isoformat(),
         "error_message": error_message,
-    }).eq("id", run_id).execute()
+    }
+    if metrics is not None:
+        update_data["metrics"] = metrics
+    get_client().table("workflow_runs").update(update_data).eq("id", run_id).execute()
+
+
+def fail_stale_workflow_runs(older_than_hours: int = 4) -> int:
+    """Mark runs still 'running' after older_than_hours as failed; their process was killed."""
+    cutoff = (datetime.now(timezone.utc) - timedelta(hours=older_than_hours)).isoformat()
+    resp = (get_client().table("workflow_runs")
+            .update({
+                "status": "failed",
+                "completed_at": datetime.now(timezone.utc).isoformat(),
+                "error_message": "Run did not finish (process killed or timed out)",
+            })
+            .eq("status", "running")
+            .lt("started_at", cutoff)
+            .execute())
+    return len(resp.data or [])
 
 
 def get_recent_workflow_runs(hours: int = 24, limit: int = 50):
@@ -404,25 +655,105 @@ def get_recent_workflow_runs(hours: int = 24, limit: int = 50):
     return resp.data
 
 
+# ── Jobs ───────────────────────────────────────────────────────
+# Durable queue (migration v16); see services/job_queue.py.
+
+def enqueue_jobs(jobs: list[dict]) -> int:
+    """Insert jobs in one query, skipping any whose dedupe_key is already live."""
+    if not jobs:
+        return 0
+    resp = get_client().rpc("enqueue_jobs", {"p_jobs": jobs}).execute()
+    return resp.data or 0
+
+
+def claim_jobs(worker_id: str, job_type: str, limit: int = 10, lease_seconds: int = 300) -> list[dict]:
+    """Lease up to limit due jobs of job_type to worker_id (FOR UPDATE SKIP LOCKED)."""
+    resp = get_client().rpc("claim_jobs", {
+        "worker_id": worker_id,
+        "p_job_type": job_type,
+        "max_jobs": limit,
+        "lease_seconds": lease_seconds,
+    }).execute()
+    return resp.data or []
+
+
+def complete_jobs(job_ids: list[str], worker_id: str):
+    """Mark jobs done. Jobs whose lease passed to another worker are left alone."""
+    for chunk in _chunked(job_ids):
+        (get_client().table("jobs")
+         .update({
+             "status": "done",
+             "completed_at": datetime.now(timezone.utc).isoformat(),
+             "locked_by": None,
+             "locked_until": None,
+         })
+         .in_("id", chunk)
+         .eq("locked_by", worker_id)
+         .execute())
+
+
+def release_jobs(job_ids: list[str], worker_id: str) -> int:
+    """Put leased jobs back in the queue, due now, without counting the attempt (migration v17)."""
+    if not job_ids:
+        return 0
+    resp = get_client().rpc("release_jobs", {"p_job_ids": job_ids, "worker_id": worker_id}).execute()
+    return resp.data or 0
+
+
+def fail_job(job_id: str, worker_id: str, error: str, retry_at: datetime = None):
+    """Requeue a failed job to run at retry_at, or mark it dead when retry_at is None."""
+    updates = {"last_error": error[:2000], "locked_by": None, "locked_until": None}
+    if retry_at is None:
+        updates.update({"status": "dead", "completed_at": datetime.now(timezone.utc).isoformat()})
+    else:
+        updates.update({"status": "queued", "run_after": retry_at.isoformat()})
+    get_client().table("jobs").update(updates).eq("id", job_id).eq("locked_by", worker_id).execute()
+
+
+def has_due_jobs(job_types: list[str]) -> bool:
+    """True if claim_jobs would find work: a due queued job, or a running one whose lease expired."""
+    now = datetime.now(timezone.utc).isoformat()
+    resp = (get_client().table("jobs")
+            .select("id")
+            .in_("job_type", job_types)
+            .or_(f"and(status.eq.queued,run_after.lte.{now}),and(status.eq.running,locked_until.lt.{now})")
+            .limit(1)
+            .execute())
+    return bool(resp.data)
+
+
+def get_job_counts() -> list[dict]:
+    """Jobs not yet done, grouped by type and status, with the oldest created_at."""
+    resp = get_client().rpc("get_job_counts", {}).execute()
+    return resp.data or []
+
+
+def get_dead_jobs(limit: int = 20) -> list[dict]:
+    resp = (get_client().table("jobs")
+            .select("id, job_type, payload, attempts, last_error, created_at, completed_at")
+            .eq("status", "dead")
+            .order("completed_at", desc=True)
+            .limit(limit)
+            .execute())
+    return resp.data
+
+
+def delete_finished_jobs(older_than_days: int = 7) -> int:
+    """Remove done jobs older than older_than_days; dead jobs are kept for review."""
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=older_than_days)).isoformat()
+    resp = get_client().table("jobs").delete().eq("status", "done").lt("completed_at", cutoff).execute()
+    return len(resp.data or [])
+
+
 # ── Knowledge Base ─────────────────────────────────────────────
 
 def get_all_knowledge_sources() -> list:
-    """Get distinct sources with chunk counts and word totals."""
-    resp = get_client().table("knowledge_chunks").select("source_name, source_type, word_count").execute()
-    # Aggregate in Python since Supabase REST doesn't support GROUP BY
-    sources = {}
-    for row in resp.data:
-        name = row["source_name"]
-        if name not in sources:
-            sources[name] = {
-                "source_name": name,
-                "source_type": row["source_type"],
-                "chunk_count": 0,
-                "total_words": 0,
-            }
-        sources[name]["chunk_count"] += 1
-        sources[name]["total_words"] += row.get("word_count", 0)
-    return sorted(sources.values(), key=lambda s: s["source_name"])
+    """Get distinct sources with chunk counts and word totals.
+
+    Aggregated in Postgres by the get_knowledge_sources RPC (migration v7).
+    """
+    resp = get_client().rpc("get_knowledge_sources", {}).execute()
+    return resp.data
 
 
 def get_chunks_by_source(source_name: str) -> list:
@@ -465,16 +796,12 @@ def delete_chunks_by_source(source_name: str):
 
 def get_knowledge_stats() -> dict:
     """Get aggregate stats: source count, chunk count, total words."""
-    resp = get_client().table("knowledge_chunks").select("source_name, word_count").execute()
-    sources = set()
-    total_words = 0
-    for row in resp.data:
-        sources.add(row["source_name"])
-        total_words += row.get("word_count", 0)
+    resp = get_client().rpc("get_knowledge_stats", {}).execute()
+    row = resp.data[0] if resp.data else {}
     return {
-        "source_count": len(sources),
-        "chunk_count": len(resp.data),
-        "total_words": total_words,
+        "source_count": row.get("source_count", 0),
+        "chunk_count": row.get("chunk_count", 0),
+        "total_words": row.get("total_words", 0),
     }
 
 
@@ -493,40 +820,61 @@ def match_knowledge_chunks(query_embedding: list, match_count: int = 5, stage_fi
 
 # ── Analytics ──────────────────────────────────────────────────
 
-def get_confidence_calibration_data() -> list[dict]:
-    """Get data for confidence calibration: confidence score vs was_edited.
+def _date_range_params(start_date=None, end_date=None) -> dict:
+    """Build the start_date/end_date RPC params shared by the analytics functions.
 
-    Returns list of dicts with confidence, was_edited, approved_by,
-    response_time_hours for conversations that were reviewed.
+    Accepts date/datetime objects or ISO strings; None leaves that end open.
     """
-    resp = (get_client().table("conversations")
-            .select("confidence, ai_response, sent_response, status, approved_by, created_at, approved_at")
-            .in_("status", ["Sent", "Approved"])
-            .order("created_at", desc=True)
-            .limit(500)
-            .execute())
+    def _iso(value):
+        if value is None or isinstance(value, str):
+            return value
+        return value.isoformat()
+    return {"start_date": _iso(start_date), "end_date": _iso(end_date)}
 
-    results = []
-    for c in resp.data:
-        was_edited = (c.get("sent_response") is not None
-                      and c.get("sent_response", "").strip() != (c.get("ai_response") or "").strip())
-        # Calculate response time (time from creation to approval)
-        response_time_hours = None
-        if c.get("created_at") and c.get("approved_at"):
-            try:
-                created = datetime.fromisoformat(c["created_at"].replace("Z", "+00:00"))
-                approved = datetime.fromisoformat(c["approved_at"].replace("Z", "+00:00"))
-                response_time_hours = (approved - created).total_seconds() / 3600
-            except (ValueError, TypeError):
-                pass
-
-        results.append({
-            "confidence": c.get("confidence"),
-            "was_edited": was_edited,
-            "approved_by": c.get("approved_by"),
-            "response_time_hours": response_time_hours,
-        })
-    return results
+
+def get_edit_rate_by_confidence(start_date=None, end_date=None) -> list[dict]:
+    """Get responses, edited count and avg approval time (hrs) per confidence score.
+
+    Aggregated in the database so no response bodies leave Postgres.
+    """
+    resp = get_client().rpc("analytics_edit_rate_by_confidence", _date_range_params(start_date, end_date)).execute()
+    return resp.data
+
+
+def get_response_time_summary(start_date=None, end_date=None) -> dict:
+    """Get approval latency summary: responses, avg/median/min/max hours."""
+    resp = get_client().rpc("analytics_response_time_summary", _date_range_params(start_date, end_date)).execute()
+    row = resp.data[0] if resp.data else {}
+    return {
+        "responses": row.get("responses") or 0,
+        "avg_hours": row.get("avg_hours"),
+        "median_hours": row.get("median_hours"),
+        "min_hours": row.get("min_hours"),
+        "max_hours": row.get("max_hours"),
+    }
+
+
+def get_response_time_histogram(start_date=None, end_date=None) -> list[dict]:
+    """Get approval latency bucket counts (<1h ... 48h+), in bucket order."""
+    resp = get_client().rpc("analytics_response_time_histogram", _date_range_params(start_date, end_date)).execute()
+    return resp.data
+
+
+def get_satisfaction_daily(start_date=None, end_date=None) -> list[dict]:
+    """Get average satisfaction score and response count per day."""
+    resp = get_client().rpc("analytics_satisfaction_daily", _date_range_params(start_date, end_date)).execute()
+    return resp.data
+
+
+def get_satisfaction_summary(start_date=None, end_date=None) -> dict:
+    """Get overall satisfaction average, scored responses and unique users."""
+    resp = get_client().rpc("analytics_satisfaction_summary", _date_range_params(start_date, end_date)).execute()
+    row = resp.data[0] if resp.data else {}
+    return {
+        "avg_score": row.get("avg_score"),
+        "responses": row.get("responses") or 0,
+        "unique_users": row.get("unique_users") or 0,
+    }
 
 
 def get_satisfaction_trend(user_id: str = None, limit: int = 50) -> list[dict]:
@@ -540,3 +888,40 @@ def get_satisfaction_trend(user_id: str = None, limit: int = 50) -> list[dict]:
         q = q.eq("user_id", user_id)
     resp = q.execute()
     return resp.data
+
+
+# ── Performance ────────────────────────────────────────────────
+
+def get_stage_latency(start_date=None, end_date=None) -> list[dict]:
+    """Get samples and p50/p95/max ms per pipeline stage, slowest first."""
+    resp = get_client().rpc("perf_stage_latency", _date_range_params(start_date, end_date)).execute()
+    return resp.data
+
+
+def get_generate_latency(start_date=None, end_date=None, by_day: bool = False) -> list[dict]:
+    """Get generate-stage p50/p95 ms per provider/model (and per day if by_day).
+
+    Each conversation counts once, under the provider that answered (migration v18).
+    """
+    params = {**_date_range_params(start_date, end_date), "by_day": by_day}
+    resp = get_client().rpc("perf_generate_latency", params).execute()
+    return resp.data
+
+
+def get_llm_usage(start_date=None, end_date=None) -> list[dict]:
+    """Get calls and prompt/completion/cached token totals per provider/model."""
+    resp = get_client().rpc("perf_llm_usage", _date_range_params(start_date, end_date)).execute()
+    return resp.data
+
+
+def get_run_throughput(start_date=None, end_date=None) -> list[dict]:
+    """Get finished workflow runs with items_processed and duration_seconds."""
+    resp = get_client().rpc("perf_run_throughput", _date_range_params(start_date, end_date)).execute()
+    return resp.data
+
+
+def get_slowest_conversations(start_date=None, end_date=None, limit: int = 20) -> list[dict]:
+    """Get the slowest processed emails with their pipeline_metrics, slowest first."""
+    params = {**_date_range_params(start_date, end_date), "max_rows": limit}
+    resp = get_client().rpc("perf_slowest_conversations", params).execute()
+    return resp.data
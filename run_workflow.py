@@ -1,7 +1,23 @@
-"""Entry point for GitHub Actions to run workflows by name."""
+"""Entry point for GitHub Actions to run workflows by name.
 
+    python run_workflow.py <workflow>
+    python run_workflow.py worker [--types send,update_summary] [--once] [--poll-seconds 30]
+    python run_workflow.py serve [--timezone America/New_York]
+
+A worker drains the job queue (services/job_queue.py). Several can run at
+once, each claims different jobs.
+
+serve runs all five workflows on SCHEDULES in one long-lived process, so
+imports and API clients are set up once instead of on every GitHub Actions
+run. Disable the Actions schedules when using it.
+"""
+
+import argparse
 import logging
+import os
+import signal
 import sys
+import threading
 import time
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
@@ -15,21 +31,194 @@ WORKFLOWS = {
     "cleanup": "workflows.cleanup",
 }
 
-if __name__ == "__main__":
-    if len(sys.argv) != 2 or sys.argv[1] not in WORKFLOWS:
-        print(f"Usage: python run_workflow.py <{'|'.join(WORKFLOWS)}>")
-        sys.exit(1)
+# Seconds a run may take before it stops claiming work (services/deadline.py):
+# the GitHub Actions timeout-minutes less ~5 minutes for checkout and pip
+# install. WORKFLOW_BUDGET_SECONDS overrides it for every workflow.
+BUDGETS = {
+    "process_emails": 15 * 60,
+    "check_in": 25 * 60,
+    "send_approved": 175 * 60,
+    "re_engagement": 10 * 60,
+    "cleanup": 10 * 60,
+}
+
+# serve: local times in the coach's timezone, matching .github/workflows/*.yml
+SCHEDULES = {
+    "process_emails": [{"hour": "8-21", "minute": 0}],
+    "send_approved": [{"hour": 9, "minute": 0}, {"hour": 14, "minute": 30}],
+    "check_in": [{"hour": 9, "minute": 0}],
+    "re_engagement": [{"hour": 10, "minute": 0}],
+    "cleanup": [{"hour": 23, "minute": 0}],
+}
+
+# A run missed by more than this (process suspended, or still busy with the
+# previous run) is skipped; several missed runs collapse into one
+MISFIRE_GRACE_SECONDS = 15 * 60
+
+# One run of each workflow at a time, across all of its schedules
+_locks = {name: threading.Lock() for name in WORKFLOWS}
+
 
-    name = sys.argv[1]
+def run_workflow(name: str) -> bool:
+    """Run one workflow by name. Returns False if it raised."""
     logger.info(f"Starting workflow: {name}")
     start_time = time.time()
 
     try:
+        from services import deadline, telemetry
+
         module = __import__(WORKFLOWS[name], fromlist=["run"])
-        module.run()
+        budget = float(os.environ.get("WORKFLOW_BUDGET_SECONDS") or BUDGETS[name])
+        with deadline.budget(budget), telemetry.collect("process", workflow=name) as metrics:
+            module.run()
         elapsed = round(time.time() - start_time, 1)
         logger.info(f"Workflow '{name}' completed in {elapsed}s")
+        if metrics.spans:
+            logger.info(f"Stage timings: {telemetry.format_stages(metrics.summary())}")
+        return True
     except Exception as e:
         elapsed = round(time.time() - start_time, 1)
         logger.error(f"Workflow '{name}' failed after {elapsed}s: {e}", exc_info=True)
+        return False
+
+
+def run_exclusive(name: str) -> bool:
+    """Run a workflow unless a run of it is already in progress in this process."""
+    lock = _locks[name]
+    if not lock.acquire(blocking=False):
+        logger.warning(f"Skipping {name}: previous run still in progress")
+        return False
+    try:
+        return run_workflow(name)
+    finally:
+        lock.release()
+
+
+def run_worker(argv: list[str]):
+    """Drain due jobs, then poll for more until interrupted (or once with --once)."""
+    from services import job_queue
+
+    parser = argparse.ArgumentParser(prog="run_workflow.py worker", description="Drain the job queue")
+    parser.add_argument("--types", default=",".join(job_queue.JOB_TYPES), help="Comma-separated job types")
+    parser.add_argument("--once", action="store_true", help="Exit once no jobs are due")
+    parser.add_argument("--poll-seconds", type=float, default=30, help="Wait between polls when idle")
+    args = parser.parse_args(argv)
+
+    job_types = [t.strip() for t in args.types.split(",") if t.strip()]
+    unknown = [t for t in job_types if t not in job_queue.JOB_TYPES]
+    if unknown:
+        parser.error(f"unknown job type(s): {', '.join(unknown)}")
+
+    worker_id = job_queue.default_worker_id()
+    logger.info(f"Worker {worker_id} draining: {', '.join(job_types)}")
+    try:
+        while True:
+            try:
+                result = job_queue.drain(job_types, worker_id=worker_id)
+            except Exception as e:
+                if args.once:
+                    raise
+                # Database or network blip; leased jobs are reclaimed after their lease
+                logger.error(f"Drain failed: {e}", exc_info=True)
+                result = None
+            if args.once:
+                break
+            if not result or not (result["done"] or result["skipped"] or result["errors"]):
+                time.sleep(args.poll_seconds)
+    except KeyboardInterrupt:
+        logger.info("Worker stopped")
+
+
+def build_scheduler(tz_name: str):
+    """A BackgroundScheduler with one job per SCHEDULES entry, not yet started."""
+    from apscheduler.executors.pool import ThreadPoolExecutor
+    from apscheduler.schedulers.background import BackgroundScheduler
+    from apscheduler.triggers.cron import CronTrigger
+
+    scheduler = BackgroundScheduler(
+        timezone=tz_name,
+        # Different workflows may overlap (send_approved sleeps between sends)
+        executors={"default": ThreadPoolExecutor(len(WORKFLOWS))},
+        job_defaults={"coalesce": True, "max_instances": 1, "misfire_grace_time": MISFIRE_GRACE_SECONDS},
+    )
+    for name, times in SCHEDULES.items():
+        for i, fields in enumerate(times):
+            scheduler.add_job(run_exclusive, CronTrigger(timezone=tz_name, **fields),
+                              args=[name], id=f"{name}:{i}", name=name)
+    return scheduler
+
+
+def _warm_up():
+    """Import every workflow and create the API clients before the first run."""
+    import config
+    from db import supabase_client as db
+    from services import openai_service
+
+    config.validate()
+    for module in WORKFLOWS.values():
+        __import__(module)
+    db.get_client()
+    openai_service.get_client()
+    if config.ANTHROPIC_API_KEY:
+        from services import anthropic_service
+        anthropic_service.get_client()
+
+
+def run_serve(argv: list[str], stop: threading.Event = None):
+    """Run the workflows on SCHEDULES until SIGTERM or SIGINT.
+
+    The first signal stops scheduling and waits for running workflows to
+    finish; a second one exits at once. Jobs interrupted that way are
+    reclaimed from the queue once their lease expires.
+    """
+    import config
+    from db import supabase_client as db
+
+    parser = argparse.ArgumentParser(prog="run_workflow.py serve", description="Run workflows on a schedule")
+    parser.add_argument("--timezone", help="Timezone for SCHEDULES (default: the coach_timezone setting)")
+    args = parser.parse_args(argv)
+
+    _warm_up()
+    tz_name = args.timezone or db.get_setting("coach_timezone", config.COACH_TIMEZONE)
+    scheduler = build_scheduler(tz_name)
+    stop = stop or threading.Event()
+
+    def request_stop(signum, frame):
+        if stop.is_set():
+            logger.warning("Second signal received, exiting without waiting for running workflows")
+            os._exit(1)
+        logger.info(f"Received {signal.Signals(signum).name}, waiting for running workflows to finish")
+        stop.set()
+
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, request_stop)
+        signal.signal(signal.SIGINT, request_stop)
+
+    scheduler.start()
+    for job in scheduler.get_jobs():
+        logger.info(f"Scheduled {job.name}: next run {job.next_run_time.isoformat()}")
+
+    stop.wait()
+    scheduler.shutdown(wait=True)
+    logger.info("Scheduler stopped")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "worker":
+        run_worker(sys.argv[2:])
+        sys.exit(0)
+
+    if len(sys.argv) >= 2 and sys.argv[1] == "serve":
+        run_serve(sys.argv[2:])
+        sys.exit(0)
+
+    if len(sys.argv) != 2 or sys.argv[1] not in WORKFLOWS:
+        print(f"Usage: python run_workflow.py <{'|'.join(WORKFLOWS)}|worker|serve>")
+        sys.exit(1)
+
+    # config is lazy; check every credential before starting rather than mid-run
+    import config
+    config.validate()
+
+    if not run_workflow(sys.argv[1]):
         sys.exit(1)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Backfill was_edited and response_time_seconds on historical conversations.
+
+Run once after applying db/migration_v9.sql. New rows get these columns when
+they are approved or sent; this fills in Sent/Approved rows that predate the
+migration. Work happens in Postgres in batches (backfill_review_metrics RPC),
+so no response bodies are downloaded. Safe to re-run.
+
+Usage:
+    python scripts/backfill_review_metrics.py --dry-run      # Count rows to backfill
+    python scripts/backfill_review_metrics.py                # Backfill in batches of 500
+    python scripts/backfill_review_metrics.py --batch-size 2000
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import supabase_client as db
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def backfill(batch_size: int = 500) -> int:
+    """Backfill batches until none remain. Returns total rows updated."""
+    total = 0
+    while True:
+        updated = db.backfill_review_metrics(batch_size)
+        if not updated:
+            break
+        total += updated
+        logger.info(f"Backfilled {updated} conversation(s) ({total} total)")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill review metrics on historical conversations")
+    parser.add_argument("--batch-size", type=int, default=500, help="Rows updated per RPC call (default: 500)")
+    parser.add_argument("--dry-run", action="store_true", help="Only count rows that need backfilling")
+    args = parser.parse_args()
+
+    remaining = db.count_conversations_missing_review_metrics()
+    logger.info(f"{remaining} reviewed conversation(s) missing review metrics")
+    if args.dry_run or not remaining:
+        return
+
+    total = backfill(args.batch_size)
+    logger.info(f"Done. Backfilled {total} conversation(s).")
+
+
+if __name__ == "__main__":
+    main()
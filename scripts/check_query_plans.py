@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Check that the hot per-email queries are index scans, using EXPLAIN.
+
+Runs against a local Postgres with the project schema applied (not Supabase).
+Sequential scans are disabled for the session, so a query that has no usable
+index still shows up as a Seq Scan even on a near-empty database. Exits
+non-zero if any hot query scans users or conversations sequentially.
+
+Needs the psql client on PATH. The schema uses pgvector (migration v5), so
+the local server needs the vector extension, e.g. the pgvector/pgvector image.
+
+Usage:
+    createdb coaching_plans
+    python scripts/check_query_plans.py --dsn postgresql://localhost/coaching_plans --apply
+    python scripts/check_query_plans.py --dsn postgresql://localhost/coaching_plans
+
+    --apply runs db/setup.sql and every db/migration_vN.sql in numeric order first.
+    DATABASE_URL is used when --dsn is not given.
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+DB_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "db")
+
+# Tables whose lookups must stay logarithmic as history grows
+CHECKED_TABLES = ("users", "conversations")
+
+SAMPLE_USER_ID = "00000000-0000-0000-0000-000000000001"
+SAMPLE_TIME = "2026-01-01T00:00:00+00:00"
+
+# Hot queries, written as the SQL PostgREST generates for the db functions
+HOT_QUERIES = {
+    "get_user_by_email": "select id from users where email = 'alice@example.com' limit 1",
+    "conversation_exists_for_message": (
+        "select id from conversations where gmail_message_id = '<abc@mail.gmail.com>' limit 1"
+    ),
+    "get_recent_conversations": (
+        f"select id from conversations where user_id = '{SAMPLE_USER_ID}' and status = 'Sent' "
+        "order by created_at desc limit 5"
+    ),
+    "has_pending_outreach": (
+        f"select id from conversations where user_id = '{SAMPLE_USER_ID}' "
+        "and status in ('Pending Review', 'Approved') limit 1"
+    ),
+    # Body of the count_thread_replies function (migration v13)
+    "count_thread_replies": (
+        f"select count(*) from conversations c where c.user_id = '{SAMPLE_USER_ID}' "
+        "and c.type = 'Follow-up' and c.status = 'Sent' and c.created_at > coalesce("
+        f"(select max(ci.created_at) from conversations ci where ci.user_id = '{SAMPLE_USER_ID}' "
+        "and ci.type = 'Check-in' and ci.status = 'Sent'), '-infinity'::timestamptz)"
+    ),
+    "get_approved_unsent": (
+        "select id from conversations where status = 'Approved' and sent_at is null order by created_at"
+    ),
+    "get_conversations_by_status (keyset page)": (
+        "select id from conversations where status = 'Pending Review' "
+        f"and (created_at > '{SAMPLE_TIME}' or (created_at = '{SAMPLE_TIME}' "
+        "and id > '00000000-0000-0000-0000-000000000000')) "
+        "order by created_at, id limit 25"
+    ),
+}
+
+
+def migration_files(db_dir: str = DB_DIR) -> list[str]:
+    """setup.sql followed by migration_vN.sql in numeric (not lexical) order."""
+    migrations = []
+    for name in os.listdir(db_dir):
+        m = re.fullmatch(r"migration_v(\d+)\.sql", name)
+        if m:
+            migrations.append((int(m.group(1)), name))
+    return [os.path.join(db_dir, "setup.sql")] + [
+        os.path.join(db_dir, name) for _, name in sorted(migrations)
+    ]
+
+
+def seq_scans(plan: dict, tables=CHECKED_TABLES) -> list[str]:
+    """Walk an EXPLAIN (FORMAT JSON) plan tree; return checked tables read by Seq Scan."""
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in tables:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child, tables))
+    return found
+
+
+def _psql(dsn: str, *args: str) -> str:
+    result = subprocess.run(
+        ["psql", dsn, "-X", "-q", "-t", "-A", "-v", "ON_ERROR_STOP=1", *args],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip())
+    return result.stdout
+
+
+def explain(dsn: str, sql: str) -> dict:
+    out = _psql(dsn, "-c", "set enable_seqscan = off", "-c", f"explain (format json) {sql}")
+    return json.loads(out)[0]["Plan"]
+
+
+def apply_migrations(dsn: str):
+    for path in migration_files():
+        print(f"Applying {os.path.basename(path)}")
+        _psql(dsn, "-f", path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN the hot queries against a local Postgres")
+    parser.add_argument("--dsn", default=os.environ.get("DATABASE_URL"), help="Local Postgres connection string")
+    parser.add_argument("--apply", action="store_true", help="Apply setup.sql and all migrations first")
+    args = parser.parse_args()
+
+    if not args.dsn:
+        parser.error("pass --dsn or set DATABASE_URL")
+
+    if args.apply:
+        apply_migrations(args.dsn)
+
+    failures = 0
+    for name, sql in HOT_QUERIES.items():
+        scans = seq_scans(explain(args.dsn, sql))
+        if scans:
+            failures += 1
+            print(f"FAIL  {name}: sequential scan on {', '.join(scans)}")
+        else:
+            print(f"ok    {name}")
+
+    if failures:
+        print(f"\n{failures} hot quer{'y' if failures == 1 else 'ies'} not using an index")
+        sys.exit(1)
+    print("\nAll hot queries use indexes.")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ chunks them, auto-tags with GPT-4o-mini, embeds, and inserts into Supabase.
 Usage:
     python scripts/ingest_knowledge_base.py --dry-run    # Preview chunks
     python scripts/ingest_knowledge_base.py              # Full ingestion
+    python scripts/ingest_knowledge_base.py --workers 4  # Extract/chunk files in parallel
 """
 
 import argparse
@@ -15,6 +16,7 @@ import logging
 import os
 import re
 import sys
+import threading
 import time
 
 # Add project root to path
@@ -33,141 +35,212 @@ SOURCE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file
 TARGET_CHUNK_WORDS = 1000
 MIN_CHUNK_WORDS = 100
 
+# Match chapter headings (various formats)
+CHAPTER_PATTERN = re.compile(
+    r'^(Chapter\s+\d+[:\.\s].*|CHAPTER\s+\d+[:\.\s].*|Chapter\s+(?:One|Two|Three|Four|Five|Six|Seven|Eight|Nine|Ten|Eleven|Twelve|Thirteen|Fourteen|Fifteen|Sixteen|Seventeen|Eighteen|Nineteen|Twenty)[:\.\s].*)',
+    re.MULTILINE | re.IGNORECASE
+)
+PARAGRAPH_SPLIT = re.compile(r'\n\s*\n')
+
+# Shared budget for OpenAI calls (tagging + embedding batches) across all workers
+API_CALLS_PER_MINUTE = 300
+# Chunks tagged, embedded and inserted together; only one batch holds embeddings
+INGEST_BATCH_CHUNKS = 50
+
 
 # ── PDF Extraction ─────────────────────────────────────────────
 
-def extract_text_from_pdf(pdf_path: str) -> str:
-    """Extract all text from a PDF file."""
+def iter_pdf_pages(pdf_path: str):
+    """Yield the text of a PDF one page at a time."""
     from PyPDF2 import PdfReader
 
     reader = PdfReader(pdf_path)
-    pages = []
     for page in reader.pages:
         text = page.extract_text()
         if text:
             # Strip null bytes — PDFs sometimes contain \x00 which PostgreSQL rejects
-            text = text.replace("\x00", "")
-            pages.append(text.strip())
-    return "\n\n".join(pages)
+            text = text.replace("\x00", "").strip()
+            if text:
+                yield text
+
+
+def iter_text_blocks(txt_path: str):
+    """Yield a text file in blank-line separated blocks without reading it whole."""
+    block = []
+    with open(txt_path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                block.append(line)
+            elif block:
+                yield "".join(block)
+                block = []
+    if block:
+        yield "".join(block)
+
+
+def iter_paragraphs(blocks):
+    """Split a stream of text blocks (pages, file sections) into paragraphs."""
+    for block in blocks:
+        for para in PARAGRAPH_SPLIT.split(block):
+            para = para.strip()
+            if para:
+                yield para
 
 
 # ── Chunking ───────────────────────────────────────────────────
 
-def chunk_by_chapters(text: str, source_name: str) -> list:
-    """Try to split book text by chapter boundaries.
-
-    Looks for patterns like "Chapter 1", "CHAPTER ONE", "Chapter 1:", etc.
-    Falls back to paragraph-based chunking if no chapters found.
+class IncrementalChunker:
+    """Build ~TARGET_CHUNK_WORDS chunks from paragraphs as they arrive.
+
+    Holds at most one finished chunk plus the one being filled (or a section
+    being kept whole, up to keep_whole_words), so memory is bounded by chunk
+    size rather than source size. The held chunk lets a short tail
+    (< MIN_CHUNK_WORDS) be merged back into it; a section whose only text is
+    such a tail produces no chunk.
+
+    Args:
+        detect_chapters: Treat chapter heading lines as chunk boundaries and
+            label the following chunks with the heading (books). Text before
+            the first heading is chunked unlabelled.
+        keep_whole_words: Don't split a section until it exceeds this many
+            words, so shorter ones come out as one chunk. The section is the
+            whole source (lectures), or each chapter with detect_chapters.
     """
-    # Match chapter headings (various formats)
-    chapter_pattern = re.compile(
-        r'^(Chapter\s+\d+[:\.\s].*|CHAPTER\s+\d+[:\.\s].*|Chapter\s+(?:One|Two|Three|Four|Five|Six|Seven|Eight|Nine|Ten|Eleven|Twelve|Thirteen|Fourteen|Fifteen|Sixteen|Seventeen|Eighteen|Nineteen|Twenty)[:\.\s].*)',
-        re.MULTILINE | re.IGNORECASE
-    )
-
-    matches = list(chapter_pattern.finditer(text))
-
-    if len(matches) < 2:
-        # Not enough chapters found, fall back to paragraph chunking
-        return chunk_by_paragraphs(text, source_name)
-
-    chunks = []
-    for i, match in enumerate(matches):
-        chapter_title = match.group(0).strip()
-        start = match.start()
-        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
-        chapter_text = text[start:end].strip()
-
-        # If the chapter is very long, sub-chunk by paragraphs
-        word_count = len(chapter_text.split())
-        if word_count > TARGET_CHUNK_WORDS * 2:
-            sub_chunks = chunk_by_paragraphs(chapter_text, source_name, chapter=chapter_title)
-            chunks.extend(sub_chunks)
-        else:
-            chunks.append({
-                "source_name": source_name,
-                "chapter": chapter_title,
-                "content": chapter_text,
-                "word_count": word_count,
-            })
-
-    return chunks
-
 
-def chunk_by_paragraphs(text: str, source_name: str, chapter: str = None) -> list:
-    """Split text into chunks by paragraph boundaries, targeting ~1000 words.
-
-    Groups paragraphs together until hitting the target word count,
-    then starts a new chunk.
-    """
-    paragraphs = re.split(r'\n\s*\n', text)
-    paragraphs = [p.strip() for p in paragraphs if p.strip()]
+    def __init__(self, source_name: str, detect_chapters: bool = False, keep_whole_words: int = 0):
+        self.source_name = source_name
+        self.detect_chapters = detect_chapters
+        self.keep_whole_words = keep_whole_words
+        self.chapter = None
+        self._paragraphs = []
+        self._words = 0
+        self._held = None
+        self._whole = None
+        self._whole_words = 0
+        if not detect_chapters:
+            self._keep_whole()
+
+    def feed(self, para: str) -> list:
+        """Add one paragraph. Returns any chunks completed by it."""
+        if not self.detect_chapters:
+            return self._add(para)
+
+        out = []
+        lines = []
+        for line in para.splitlines():
+            if CHAPTER_PATTERN.match(line + "\n"):
+                out += self._add("\n".join(lines))
+                out += self._start_chapter(line.strip())
+                lines = []
+            lines.append(line)
+        out += self._add("\n".join(lines))
+        return out
+
+    def close(self) -> list:
+        """Flush whatever is left at the end of the source."""
+        return self._end_section()
+
+    def _keep_whole(self):
+        if self.keep_whole_words:
+            self._whole = []
+            self._whole_words = 0
+
+    def _add(self, text: str) -> list:
+        text = text.strip()
+        words = len(text.split())
+        if not words:
+            return []
+
+        if self._whole is not None:
+            self._whole.append(text)
+            self._whole_words += words
+            if self._whole_words <= self.keep_whole_words:
+                return []
+            # Too long to keep whole — replay the buffer through normal chunking
+            buffered, self._whole = self._whole, None
+            out = []
+            for p in buffered:
+                out += self._add(p)
+            return out
+
+        out = []
+        if self._words + words > TARGET_CHUNK_WORDS and self._words >= MIN_CHUNK_WORDS:
+            out += self._hold(self._make_chunk(self._paragraphs, self._words))
+            self._paragraphs = []
+            self._words = 0
+        self._paragraphs.append(text)
+        self._words += words
+        return out
+
+    def _start_chapter(self, title: str) -> list:
+        out = self._end_section()
+        self.chapter = title
+        self._keep_whole()
+        return out
+
+    def _end_section(self) -> list:
+        if self._whole is not None:
+            whole, self._whole = self._whole, None
+            return [self._make_chunk(whole, self._whole_words)] if whole else []
+        return self._flush()
+
+    def _flush(self) -> list:
+        out = []
+        if self._paragraphs:
+            if self._words >= MIN_CHUNK_WORDS:
+                out += self._hold(self._make_chunk(self._paragraphs, self._words))
+            elif self._held:
+                # Too short on its own — merge with previous chunk
+                self._held["content"] += "\n\n" + "\n\n".join(self._paragraphs)
+                self._held["word_count"] += self._words
+            else:
+                logger.info(f"Skipping {self._words}-word section of {self.source_name} (< {MIN_CHUNK_WORDS} words)")
+            self._paragraphs = []
+            self._words = 0
+        if self._held:
+            out.append(self._held)
+            self._held = None
+        return out
+
+    def _hold(self, chunk: dict) -> list:
+        released = [self._held] if self._held else []
+        self._held = chunk
+        return released
+
+    def _make_chunk(self, paragraphs: list, word_count: int) -> dict:
+        return {
+            "source_name": self.source_name,
+            "chapter": self.chapter,
+            "content": "\n\n".join(paragraphs),
+            "word_count": word_count,
+        }
 
-    chunks = []
-    current_paragraphs = []
-    current_word_count = 0
 
+def iter_chunks(paragraphs, source_name: str, detect_chapters: bool = False, keep_whole_words: int = 0):
+    """Yield chunks from a paragraph stream as soon as each one fills up."""
+    chunker = IncrementalChunker(source_name, detect_chapters=detect_chapters,
+                                 keep_whole_words=keep_whole_words)
     for para in paragraphs:
-        para_words = len(para.split())
-
-        if current_word_count + para_words > TARGET_CHUNK_WORDS and current_word_count >= MIN_CHUNK_WORDS:
-            # Save current chunk and start a new one
-            chunk_text = "\n\n".join(current_paragraphs)
-            chunks.append({
-                "source_name": source_name,
-                "chapter": chapter,
-                "content": chunk_text,
-                "word_count": current_word_count,
-            })
-            current_paragraphs = [para]
-            current_word_count = para_words
-        else:
-            current_paragraphs.append(para)
-            current_word_count += para_words
-
-    # Don't forget the last chunk
-    if current_paragraphs and current_word_count >= MIN_CHUNK_WORDS:
-        chunk_text = "\n\n".join(current_paragraphs)
-        chunks.append({
-            "source_name": source_name,
-            "chapter": chapter,
-            "content": chunk_text,
-            "word_count": current_word_count,
-        })
-    elif current_paragraphs and chunks:
-        # Too short on its own — merge with previous chunk
-        prev = chunks[-1]
-        prev["content"] += "\n\n" + "\n\n".join(current_paragraphs)
-        prev["word_count"] += current_word_count
-
-    return chunks
+        yield from chunker.feed(para)
+    yield from chunker.close()
 
 
-def chunk_lecture(text: str, source_name: str) -> list:
-    """Chunk a lecture transcript.
+# ── AI Tagging ─────────────────────────────────────────────────
 
-    Short lectures (< 2x target) stay whole. Longer ones get paragraph-chunked.
-    """
-    word_count = len(text.split())
+_tagging_client = None
 
-    if word_count <= TARGET_CHUNK_WORDS * 2:
-        return [{
-            "source_name": source_name,
-            "chapter": None,
-            "content": text.strip(),
-            "word_count": word_count,
-        }]
 
-    return chunk_by_paragraphs(text, source_name)
+def _get_tagging_client():
+    global _tagging_client
+    if _tagging_client is None:
+        from openai import OpenAI
+        _tagging_client = OpenAI(api_key=config.OPENAI_API_KEY, timeout=60.0)
+    return _tagging_client
 
 
-# ── AI Tagging ─────────────────────────────────────────────────
-
 def tag_chunk(chunk: dict) -> dict:
     """Use GPT-4o-mini to generate title, summary, stages, and topics for a chunk."""
-    from openai import OpenAI
-
-    client = OpenAI(api_key=config.OPENAI_API_KEY, timeout=60.0)
+    client = _get_tagging_client()
 
     # Truncate content for tagging prompt (first 2000 chars is plenty)
     content_preview = chunk["content"][:2000]
@@ -231,72 +304,188 @@ def get_source_name(filename: str) -> str:
 
 # ── Main Ingestion ─────────────────────────────────────────────
 
-def process_file(filepath: str) -> list:
-    """Process a single file into tagged chunks."""
+def iter_file_chunks(filepath: str):
+    """Stream a single file into untagged chunks, one page or section at a time."""
     filename = os.path.basename(filepath)
     source_name = get_source_name(filename)
     source_type = detect_source_type(filename)
 
-    logger.info(f"Processing: {filename} (type={source_type})")
-
-    # Extract text
     if filepath.lower().endswith(".pdf"):
-        text = extract_text_from_pdf(filepath)
+        blocks = iter_pdf_pages(filepath)
     elif filepath.lower().endswith(".txt"):
-        with open(filepath, encoding="utf-8") as f:
-            text = f.read()
+        blocks = iter_text_blocks(filepath)
     else:
         logger.warning(f"Skipping unsupported file type: {filename}")
-        return []
-
-    if not text.strip():
-        logger.warning(f"No text extracted from {filename}")
-        return []
+        return
 
-    # Chunk
     if source_type == "lecture":
-        chunks = chunk_lecture(text, source_name)
+        # Short lectures (< 2x target) stay whole
+        options = {"keep_whole_words": TARGET_CHUNK_WORDS * 2}
     elif source_type == "book":
-        chunks = chunk_by_chapters(text, source_name)
+        # Chapters up to 2x target stay whole; longer ones are paragraph-chunked
+        options = {"detect_chapters": True, "keep_whole_words": TARGET_CHUNK_WORDS * 2}
     else:
         # Syllabus or other — use paragraph chunking
-        chunks = chunk_by_paragraphs(text, source_name)
+        options = {}
 
-    # Set source_type on each chunk
-    for chunk in chunks:
+    for chunk in iter_chunks(iter_paragraphs(blocks), source_name, **options):
         chunk["source_type"] = source_type
+        yield chunk
+
+
+def process_file(filepath: str) -> list:
+    """Process a single file into chunks (one pool worker's unit of work)."""
+    filename = os.path.basename(filepath)
+    logger.info(f"Processing: {filename} (type={detect_source_type(filename)})")
+
+    chunks = list(iter_file_chunks(filepath))
+    if not chunks:
+        logger.warning(f"No text extracted from {filename}")
+        return []
 
     logger.info(f"  → {len(chunks)} chunks from {filename}")
     return chunks
 
 
-def tag_all_chunks(chunks: list) -> list:
-    """Tag all chunks with AI-generated metadata. Includes rate limiting."""
+def _process_file_timed(filepath: str) -> dict:
+    """Process one file and report how long extraction and chunking took."""
+    start = time.perf_counter()
+    chunks = process_file(filepath)
+    return {
+        "file": os.path.basename(filepath),
+        "chunks": chunks,
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+
+
+def iter_corpus_chunks(filepaths: list, workers: int = 1, file_stats: list = None):
+    """Yield untagged chunks from every file, in filepaths order.
+
+    Sequentially, each file streams straight from the chunker. With
+    workers > 1, files are chunked in a process pool and come back one
+    file's chunk list at a time; at most `workers` files are submitted ahead
+    of the consumer, so finished files never pile up while tagging catches up.
+
+    Appends {"file", "chunks", "words", "seconds"} to file_stats for each
+    file; seconds covers extraction and chunking only.
+    """
+    file_stats = [] if file_stats is None else file_stats
+
+    if workers <= 1 or len(filepaths) <= 1:
+        for path in filepaths:
+            filename = os.path.basename(path)
+            logger.info(f"Processing: {filename} (type={detect_source_type(filename)})")
+            stats = {"file": filename, "chunks": 0, "words": 0, "seconds": 0.0}
+            file_stats.append(stats)
+            chunks = iter_file_chunks(path)
+            while True:
+                start = time.perf_counter()
+                chunk = next(chunks, None)
+                stats["seconds"] += time.perf_counter() - start
+                if chunk is None:
+                    break
+                stats["chunks"] += 1
+                stats["words"] += chunk["word_count"]
+                yield chunk
+            if not stats["chunks"]:
+                logger.warning(f"No text extracted from {filename}")
+        return
+
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+    from itertools import islice
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(filepaths))) as pool:
+        remaining = iter(filepaths)
+        pending = deque(pool.submit(_process_file_timed, path) for path in islice(remaining, workers))
+        while pending:
+            result = pending.popleft().result()
+            path = next(remaining, None)
+            if path:
+                pending.append(pool.submit(_process_file_timed, path))
+            chunks = result.pop("chunks")
+            file_stats.append({**result, "chunks": len(chunks),
+                               "words": sum(c["word_count"] for c in chunks)})
+            yield from chunks
+
+
+def iter_batches(chunks, size: int):
+    """Group a chunk stream into lists of at most size chunks."""
+    batch = []
+    for chunk in chunks:
+        batch.append(chunk)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ── API Stages ─────────────────────────────────────────────────
+
+class RateLimiter:
+    """Thread-safe limiter spacing API calls evenly at max_per_minute."""
+
+    def __init__(self, max_per_minute: int = API_CALLS_PER_MINUTE):
+        self.interval = 60.0 / max_per_minute
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+def tag_all_chunks(chunks: list, workers: int = 1, limiter: RateLimiter = None) -> list:
+    """Tag all chunks with AI-generated metadata.
+
+    With workers > 1, tagging calls run on a thread pool. Every call goes
+    through the shared rate limiter either way.
+    """
+    limiter = limiter or RateLimiter()
     total = len(chunks)
-    for i, chunk in enumerate(chunks):
+
+    def _tag(indexed):
+        i, chunk = indexed
+        limiter.wait()
         logger.info(f"Tagging chunk {i + 1}/{total}: {chunk['source_name']}")
-        tag_chunk(chunk)
-        # Small delay to avoid rate limits
-        if (i + 1) % 10 == 0:
-            time.sleep(1)
+        return tag_chunk(chunk)
+
+    if workers <= 1:
+        for item in enumerate(chunks):
+            _tag(item)
+        return chunks
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # tag_chunk updates each dict in place, so chunk order is untouched
+        list(pool.map(_tag, enumerate(chunks)))
     return chunks
 
 
-def embed_all_chunks(chunks: list) -> list:
+def embed_all_chunks(chunks: list, limiter: RateLimiter = None, batch_size: int = 20) -> list:
     """Generate embeddings for all chunks."""
-    texts = [chunk["content"] for chunk in chunks]
-    logger.info(f"Embedding {len(texts)} chunks...")
-    embeddings = embedding_service.embed_batch(texts, batch_size=20)
+    limiter = limiter or RateLimiter()
+    logger.info(f"Embedding {len(chunks)} chunks...")
 
-    for chunk, emb in zip(chunks, embeddings):
-        chunk["embedding"] = emb
+    for i in range(0, len(chunks), batch_size):
+        batch = chunks[i:i + batch_size]
+        limiter.wait()
+        embeddings = embedding_service.embed_batch([chunk["content"] for chunk in batch], batch_size=batch_size)
+        for chunk, emb in zip(batch, embeddings):
+            chunk["embedding"] = emb
 
     logger.info("Embedding complete")
     return chunks
 
 
 def insert_chunks(chunks: list):
-    """Insert all chunks into Supabase."""
+    """Insert a batch of chunks into Supabase."""
     total = len(chunks)
     for i, chunk in enumerate(chunks):
         db.insert_knowledge_chunk({
@@ -314,12 +503,14 @@ def insert_chunks(chunks: list):
         if (i + 1) % 10 == 0:
             logger.info(f"Inserted {i + 1}/{total} chunks")
 
-    logger.info(f"All {total} chunks inserted into Supabase")
+    logger.info(f"{total} chunks inserted into Supabase")
 
 
 def main():
     parser = argparse.ArgumentParser(description="Ingest knowledge base files into Supabase")
     parser.add_argument("--dry-run", action="store_true", help="Preview chunks without inserting")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes for extraction/chunking and threads for tagging (default 1)")
     args = parser.parse_args()
 
     if not os.path.isdir(SOURCE_DIR):
@@ -337,25 +528,19 @@ def main():
         logger.error("No PDF or TXT files found in knowledge-base-files/")
         sys.exit(1)
 
-    logger.info(f"Found {len(files)} files to process")
+    logger.info(f"Found {len(files)} files to process (workers={args.workers})")
 
-    # Process all files into chunks
-    all_chunks = []
-    for filepath in files:
-        chunks = process_file(filepath)
-        all_chunks.extend(chunks)
-
-    logger.info(f"Total chunks: {len(all_chunks)}")
-    total_words = sum(c["word_count"] for c in all_chunks)
-    logger.info(f"Total words: {total_words:,}")
+    # Chunks stream from the files in sorted order; nothing holds the whole corpus
+    file_stats = []
+    chunks = iter_corpus_chunks(files, workers=args.workers, file_stats=file_stats)
 
     if args.dry_run:
         print(f"\n{'='*60}")
-        print(f"DRY RUN — {len(all_chunks)} chunks from {len(files)} files")
-        print(f"Total words: {total_words:,}")
+        print(f"DRY RUN — {len(files)} files")
         print(f"{'='*60}\n")
 
-        for i, chunk in enumerate(all_chunks):
+        stage_start = time.perf_counter()
+        for i, chunk in enumerate(chunks):
             source = chunk["source_name"]
             chapter = chunk.get("chapter", "")
             wc = chunk["word_count"]
@@ -363,24 +548,53 @@ def main():
             print(f"[{i + 1}] {source} | {chapter or 'no chapter'} | {wc} words")
             print(f"    {preview}...")
             print()
+        timings = {"extract + chunk": time.perf_counter() - stage_start}
 
+        print_summary(file_stats, timings)
         print(f"Run without --dry-run to tag, embed, and insert all chunks.")
         return
 
-    # Tag all chunks with AI
-    logger.info("Starting AI tagging...")
-    tag_all_chunks(all_chunks)
+    # API stages share one rate limiter regardless of worker count
+    limiter = RateLimiter()
+    timings = {"extract + chunk": 0.0, "tag": 0.0, "embed": 0.0, "insert": 0.0}
+
+    # Tag, embed and insert one batch at a time, so embeddings never pile up
+    batches = iter_batches(chunks, INGEST_BATCH_CHUNKS)
+    while True:
+        stage_start = time.perf_counter()
+        batch = next(batches, None)
+        timings["extract + chunk"] += time.perf_counter() - stage_start
+        if batch is None:
+            break
 
-    # Embed all chunks
-    logger.info("Starting embedding...")
-    embed_all_chunks(all_chunks)
+        stage_start = time.perf_counter()
+        tag_all_chunks(batch, workers=args.workers, limiter=limiter)
+        timings["tag"] += time.perf_counter() - stage_start
 
-    # Insert into Supabase
-    logger.info("Inserting into Supabase...")
-    insert_chunks(all_chunks)
+        stage_start = time.perf_counter()
+        embed_all_chunks(batch, limiter=limiter)
+        timings["embed"] += time.perf_counter() - stage_start
 
+        stage_start = time.perf_counter()
+        insert_chunks(batch)
+        timings["insert"] += time.perf_counter() - stage_start
+
+    print_summary(file_stats, timings)
     logger.info("Ingestion complete!")
 
 
+def print_summary(file_stats: list, timings: dict):
+    """Print per-file chunking time and per-stage totals."""
+    print(f"\n{'File':<50} {'Chunks':>7} {'Words':>9} {'Seconds':>8}")
+    for stats in file_stats:
+        print(f"{stats['file'][:50]:<50} {stats['chunks']:>7} {stats['words']:>9,} {stats['seconds']:>8.2f}")
+    print(f"{'Total':<50} {sum(s['chunks'] for s in file_stats):>7} "
+          f"{sum(s['words'] for s in file_stats):>9,}")
+    print()
+    for stage, seconds in timings.items():
+        print(f"{stage:<20} {seconds:>8.1f}s")
+    print()
+
+
 if __name__ == "__main__":
     main()
@@ -1,8 +1,10 @@
 """AI service router — delegates to the correct provider based on settings."""
 
 import logging
+import time
 
 from db import supabase_client as db
+from services import circuit_breaker, deadline, telemetry
 
 logger = logging.getLogger(__name__)
 
@@ -11,12 +13,57 @@ PROVIDERS = {
     "anthropic": ["claude-sonnet-4-6", "claude-opus-4-6", "claude-opus-4-5-20250918"],
 }
 
+# USD per 1M tokens: (input, cached input, output). List prices; update when
+# providers change them. Used for cost estimates on the Performance page.
+MODEL_PRICING = {
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-5.4": (2.50, 0.25, 15.00),
+    "gpt-5-mini": (0.25, 0.025, 2.00),
+    "gpt-5-nano": (0.05, 0.005, 0.40),
+    "claude-sonnet-4-6": (3.00, 0.30, 15.00),
+    "claude-opus-4-6": (5.00, 0.50, 25.00),
+    "claude-opus-4-5-20250918": (5.00, 0.50, 25.00),
+}
 
-def get_ai_config() -> tuple:
-    """Read ai_provider and ai_model from settings. Validate and return (provider, model)."""
-    provider = db.get_setting("ai_provider", "openai")
-    model = db.get_setting("ai_model", "gpt-4o")
 
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> float | None:
+    """Estimated USD cost of a model's usage, or None if the model has no pricing.
+
+    prompt_tokens includes cached_tokens, which are billed at the cached rate.
+    """
+    if model not in MODEL_PRICING:
+        return None
+    input_price, cached_price, output_price = MODEL_PRICING[model]
+    cached = min(cached_tokens or 0, prompt_tokens or 0)
+    uncached = (prompt_tokens or 0) - cached
+    return (uncached * input_price + cached * cached_price + (completion_tokens or 0) * output_price) / 1_000_000
+
+
+FAST, PREMIUM = "fast", "premium"
+
+# Complexity-based model routing (choose_route). With no fast model set,
+# every message goes to the premium model, ai_provider / ai_model.
+ROUTING_DEFAULTS = {
+    "ai_fast_model": "",
+    "routing_max_words": "80",
+    "routing_premium_stages": "Growth",
+    "routing_min_prior_confidence": "7",
+    "routing_classifier": "off",
+}
+
+AI_SETTINGS = {
+    "ai_provider": "openai",
+    "ai_model": "gpt-4o",
+    "ai_fallback_provider": "",
+    "ai_fallback_model": "",
+    circuit_breaker.STATE_KEY: None,
+    **ROUTING_DEFAULTS,
+}
+
+
+def _validate_config(provider: str, model: str) -> tuple:
+    """Return (provider, model), replacing an unknown provider or mismatched model with a default."""
     # Validate provider
     if provider not in PROVIDERS:
         logger.warning(f"Unknown AI provider '{provider}', falling back to openai")
@@ -30,6 +77,137 @@ def get_ai_config() -> tuple:
     return provider, model
 
 
+def get_ai_config() -> tuple:
+    """Read ai_provider and ai_model from settings. Validate and return (provider, model)."""
+    return get_ai_routes()[0]
+
+
+def load_ai_settings(extra: dict = None) -> dict:
+    """Provider, failover and routing settings plus saved breaker state, in one query.
+
+    extra maps further setting keys to their defaults, read in the same query
+    for callers that need a few settings of their own.
+    """
+    settings = db.get_settings({**AI_SETTINGS, **(extra or {})})
+    circuit_breaker.sync(settings[circuit_breaker.STATE_KEY])
+    return settings
+
+
+def get_ai_routes(settings: dict = None) -> list[tuple]:
+    """The (provider, model) pairs to try for generation, primary first.
+
+    The failover pair comes from ai_fallback_provider / ai_fallback_model and
+    is left out when unset or on the same provider. Circuit breaker state
+    saved by other runs is read in the same query.
+    """
+    settings = settings or load_ai_settings()
+    routes = [_validate_config(settings["ai_provider"], settings["ai_model"])]
+
+    fallback_provider = settings["ai_fallback_provider"]
+    if fallback_provider in PROVIDERS and fallback_provider != routes[0][0]:
+        routes.append(_validate_config(fallback_provider, settings["ai_fallback_model"]))
+    elif fallback_provider:
+        logger.warning(f"Ignoring AI fallback provider '{fallback_provider}'")
+    return routes
+
+
+def _provider_of(model: str) -> str | None:
+    return next((provider for provider, models in PROVIDERS.items() if model in models), None)
+
+
+def _int_setting(settings: dict, key: str) -> int:
+    try:
+        return int(settings[key])
+    except (TypeError, ValueError):
+        return int(ROUTING_DEFAULTS[key])
+
+
+def choose_route(message: str, user: dict = None, prior_confidence: int = None,
+                 settings: dict = None, message_type: str = None) -> tuple:
+    """(FAST or PREMIUM, reason) for a message, from the routing settings.
+
+    A message goes to the fast model only if every rule calls it simple: at
+    most routing_max_words words and one question, the user not in one of
+    routing_premium_stages, and the last generated response to them scored
+    at least routing_min_prior_confidence. With routing_classifier on,
+    GPT-4o-mini then gets the final say. Onboarding replies always get the
+    premium model.
+
+    prior_confidence defaults to the evaluator score of the user's last
+    generated response, looked up only once the cheaper rules have passed.
+    """
+    settings = settings or load_ai_settings()
+    if not _provider_of(settings["ai_fast_model"]):
+        return PREMIUM, "no fast model set"
+    if message_type == "onboarding challenge response":
+        return PREMIUM, "onboarding"
+
+    words = len(message.split())
+    if not words or words > _int_setting(settings, "routing_max_words"):
+        return PREMIUM, f"{words} words"
+    if message.count("?") > 1:
+        return PREMIUM, f"{message.count('?')} questions"
+    premium_stages = {s.strip() for s in (settings["routing_premium_stages"] or "").split(",") if s.strip()}
+    if user and user.get("stage") in premium_stages:
+        return PREMIUM, f"stage {user['stage']}"
+    min_confidence = _int_setting(settings, "routing_min_prior_confidence")
+    if prior_confidence is None and user and user.get("id"):
+        prior_confidence = db.get_latest_evaluated_confidence(user["id"])
+    if prior_confidence is not None and prior_confidence < min_confidence:
+        return PREMIUM, f"prior confidence {prior_confidence}"
+
+    if settings["routing_classifier"] == "on":
+        from services import openai_service
+        try:
+            if openai_service.classify_complexity(message) != "simple":
+                return PREMIUM, "classifier: complex"
+        except Exception as e:
+            logger.warning(f"Complexity classifier failed, using premium model: {e}")
+            return PREMIUM, "classifier failed"
+        return FAST, "classifier: simple"
+    return FAST, f"{words} words"
+
+
+def _with_failover(routes: list[tuple], call):
+    """Return call(provider, model) for the first route whose breaker allows it.
+
+    A route that fails, or whose breaker is open, fails over to the next one.
+    Raises the last provider error, or CircuitOpen if every breaker was open.
+    """
+    last_error = None
+    try:
+        for provider, model in routes:
+            breaker = circuit_breaker.get(provider)
+            if not breaker.allow():
+                logger.warning(f"Circuit open for {provider}; skipping {model}")
+                continue
+            started = time.monotonic()
+            # The provider's retry loop reports each attempt to the breaker
+            with circuit_breaker.watching(provider) as watch:
+                try:
+                    result = call(provider, model)
+                except deadline.DeadlineExceeded:
+                    # Not the provider's fault; a half-open probe must not stay taken
+                    breaker.release_probe()
+                    raise
+                except Exception as e:
+                    if not watch["reported"]:
+                        breaker.record_failure(time.monotonic() - started)
+                    logger.warning(f"{provider} generation failed: {e}")
+                    last_error = e
+                    continue
+            if not watch["reported"]:
+                breaker.record_success(time.monotonic() - started)
+            if provider != routes[0][0]:
+                logger.info(f"Generated with fallback {provider}/{model}")
+            return result
+    finally:
+        circuit_breaker.save_changes()
+    if last_error is not None:
+        raise last_error
+    raise circuit_breaker.CircuitOpen(f"All AI providers unavailable: {', '.join(p for p, _ in routes)}")
+
+
 def _extract_user_message(user_context: str) -> str:
     """Extract the user's current message from the assembled context string."""
     marker = "## Their Current Message\n"
@@ -53,48 +231,73 @@ def _retrieve_knowledge(user_context: str, user: dict) -> str:
         from services import knowledge_service
         parsed_message = _extract_user_message(user_context)
         if parsed_message:
-            query = knowledge_service.build_retrieval_query(user, parsed_message)
-            chunks = knowledge_service.retrieve_relevant_chunks(
-                query, match_count=5, stage_filter=user.get("stage")
-            )
+            with telemetry.span("rag"):
+                query = knowledge_service.build_retrieval_query(user, parsed_message)
+                chunks = knowledge_service.retrieve_relevant_chunks(
+                    query, match_count=5, stage_filter=user.get("stage")
+                )
             return knowledge_service.format_chunks_for_prompt(chunks)
     except Exception as e:
         logger.warning(f"Knowledge retrieval failed, continuing without RAG: {e}")
     return ""
 
 
-def generate_response(user_context: str, user: dict = None) -> str:
+def generate_response(user_context: str, user: dict = None, message_type: str = None) -> str:
     """Generate a coaching response using the configured AI provider.
 
+    Simple messages go to ai_fast_model when set (choose_route), with the
+    premium model behind it as failover. Fails over to the configured
+    fallback provider when a provider errors or its circuit breaker is open.
+    The route and generation latency are logged.
+
     Args:
         user_context: The assembled coaching context string
         user: Optional user dict — used to build retrieval query for RAG
+        message_type: As passed to build_assistant_context, for routing
     """
-    provider, model = get_ai_config()
+    settings = load_ai_settings()
+    routes = get_ai_routes(settings)
+    route, reason = choose_route(_extract_user_message(user_context), user, settings=settings,
+                                 message_type=message_type)
+    if route == FAST:
+        fast_model = settings["ai_fast_model"]
+        routes = [(_provider_of(fast_model), fast_model)] + [r for r in routes if r[1] != fast_model]
+    telemetry.count(f"generation_route.{route}")
 
     # Retrieve relevant knowledge base excerpts for all providers
     knowledge_context = ""
     if user:
         knowledge_context = _retrieve_knowledge(user_context, user)
 
-    if provider == "anthropic":
-        from services import anthropic_service
-        return anthropic_service.generate_response(user_context, model=model, knowledge_context=knowledge_context)
-    else:
+    def _generate(provider, model):
+        if provider == "anthropic":
+            from services import anthropic_service
+            return anthropic_service.generate_response(user_context, model=model, knowledge_context=knowledge_context)
         from services import openai_service
         # For OpenAI, append knowledge context directly to the user context
+        context = user_context
         if knowledge_context:
-            user_context += f"\n\n## Reference Material from Your Books and Lectures\nThese are actual excerpts from your teaching materials. You may reference these sources naturally if they are directly relevant to what the user is dealing with. Do NOT quote them verbatim — paraphrase in your own voice.\n\n{knowledge_context}"
-        return openai_service.generate_response(user_context, model=model)
+            context += f"\n\n## Reference Material from Your Books and Lectures\nThese are actual excerpts from your teaching materials. You may reference these sources naturally if they are directly relevant to what the user is dealing with. Do NOT quote them verbatim — paraphrase in your own voice.\n\n{knowledge_context}"
+        return openai_service.generate_response(context, model=model)
 
+    started = time.monotonic()
+    response = _with_failover(routes, _generate)
+    logger.info(f"Generated with route {route} ({reason}), {routes[0][0]}/{routes[0][1]} first, "
+                f"in {(time.monotonic() - started) * 1000:.0f}ms")
+    return response
 
-def generate_checkin_question(user_context: str) -> str:
-    """Generate a personalized check-in question using the configured AI provider."""
-    provider, model = get_ai_config()
 
-    if provider == "anthropic":
-        from services import anthropic_service
-        return anthropic_service.generate_checkin_question(user_context, model=model)
-    else:
+def generate_checkin_question(user_context: str, routes: list[tuple] = None) -> str:
+    """Generate a personalized check-in question using the configured AI provider.
+
+    routes is the list from get_ai_routes(); batch callers pass it in so
+    settings are read once per run instead of once per user.
+    """
+    def _generate(provider, model):
+        if provider == "anthropic":
+            from services import anthropic_service
+            return anthropic_service.generate_checkin_question(user_context, model=model)
         from services import openai_service
         return openai_service.generate_checkin_question(user_context, model=model)
+
+    return _with_failover(routes or get_ai_routes(), _generate)
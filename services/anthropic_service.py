@@ -5,11 +5,13 @@ import os
 import time
 
 import config
+from services import circuit_breaker, deadline, telemetry
 
 logger = logging.getLogger(__name__)
 
 MAX_RETRIES = 3
 RETRY_DELAY_BASE = 2
+REQUEST_TIMEOUT_SECONDS = 120.0
 
 _client = None
 _instructions = None
@@ -21,9 +23,12 @@ def get_client():
         from anthropic import Anthropic
         _client = Anthropic(
             api_key=config.ANTHROPIC_API_KEY,
-            timeout=120.0,
+            timeout=REQUEST_TIMEOUT_SECONDS,
             max_retries=0,
         )
+    request_timeout = deadline.timeout(REQUEST_TIMEOUT_SECONDS)
+    if request_timeout < REQUEST_TIMEOUT_SECONDS:
+        return _client.with_options(timeout=request_timeout)
     return _client
 
 
@@ -43,19 +48,46 @@ def _retry_with_backoff(func, *args, **kwargs):
     """Retry an API call with exponential backoff."""
     last_error = None
     for attempt in range(MAX_RETRIES):
+        deadline.check("Anthropic API call")
+        started = time.monotonic()
         try:
-            return func(*args, **kwargs)
+            result = func(*args, **kwargs)
         except Exception as e:
             last_error = e
+            if not circuit_breaker.attempt_failed(time.monotonic() - started):
+                logger.error(f"Anthropic API call failed: {e}. Circuit breaker open, not retrying")
+                break
             if attempt < MAX_RETRIES - 1:
                 delay = RETRY_DELAY_BASE * (2 ** attempt)
+                if not deadline.allows(delay + deadline.MIN_CALL_SECONDS):
+                    logger.error(f"Anthropic API call failed: {e}. No time left in this run to retry")
+                    break
                 logger.warning(f"Anthropic API call failed (attempt {attempt + 1}/{MAX_RETRIES}): {e}. Retrying in {delay}s...")
                 time.sleep(delay)
             else:
                 logger.error(f"Anthropic API call failed after {MAX_RETRIES} attempts: {e}")
+        else:
+            circuit_breaker.attempt_succeeded(time.monotonic() - started)
+            return result
     raise last_error
 
 
+def _record_usage(message, model: str):
+    """Report a call's token usage to telemetry.
+
+    Anthropic's input_tokens excludes cache reads; telemetry counts prompt
+    tokens including cached ones (as OpenAI does), so they are added back.
+    """
+    usage = getattr(message, "usage", None)
+    if usage is None:
+        return
+    cached = getattr(usage, "cache_read_input_tokens", 0)
+    prompt = usage.input_tokens
+    if isinstance(prompt, int) and isinstance(cached, int):
+        prompt += cached
+    telemetry.record_llm_usage("anthropic", model, prompt, usage.output_tokens, cached)
+
+
 def generate_response(user_context: str, model: str = "claude-sonnet-4-6", knowledge_context: str = "") -> str:
     """Generate a coaching response using Claude.
 
@@ -78,6 +110,7 @@ def generate_response(user_context: str, model: str = "claude-sonnet-4-6", knowl
             temperature=0.7,
             max_tokens=1500,
         )
+        _record_usage(message, model)
         return message.content[0].text
 
     return _retry_with_backoff(_call)
@@ -101,6 +134,7 @@ Do NOT include a sign-off like "Wes" - that will be added automatically.
             temperature=0.7,
             max_tokens=300,
         )
+        _record_usage(message, model)
         return message.content[0].text
 
     return _retry_with_backoff(_call)
@@ -0,0 +1,247 @@
+"""Per-provider circuit breakers for AI generation.
+
+Each provider has a breaker that watches its recent calls. When too many of
+them fail, or are too slow, the breaker opens and ai_service stops calling
+that provider, failing over to the secondary one from settings instead of
+spending three retries with backoff on every email:
+
+    breaker = circuit_breaker.get("openai")
+    if breaker.allow():
+        started = time.monotonic()
+        try:
+            result = call()
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success(time.monotonic() - started)
+
+After OPEN_SECONDS an open breaker goes half-open and lets one probe call
+through: success closes it, failure opens it for another OPEN_SECONDS.
+
+Outcomes are counted per provider attempt, not per email. ai_service runs
+each call inside watching(provider), and the provider services' retry loops
+report every attempt with attempt_failed() / attempt_succeeded(). A retry
+loop stops as soon as the breaker opens, so an outage costs a few failed
+attempts rather than three retries with backoff on every email.
+
+Workflows run in separate processes, so the state and the recent outcomes
+are saved to the circuit_breakers setting whenever a failure is recorded,
+and while the window still holds one. ai_service reads the setting with the
+AI settings and passes it to sync(). Failures from one cron run therefore
+count toward opening the breaker in the next, an open breaker stays open,
+and the Run Workflows page can show it.
+"""
+
+import contextvars
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from db import supabase_client as db
+
+logger = logging.getLogger(__name__)
+
+STATE_KEY = "circuit_breakers"
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+# Recent calls per provider that the error rate is computed over
+WINDOW = 20
+# Calls needed in the window before the breaker can open
+MIN_CALLS = 5
+# Share of failed (or slow) calls in the window that opens the breaker
+ERROR_RATE_THRESHOLD = 0.5
+# A call that succeeds but takes longer than this counts as a failure
+SLOW_CALL_SECONDS = 90
+# How long an open breaker waits before letting a probe through
+OPEN_SECONDS = 300
+
+
+class CircuitOpen(Exception):
+    """Raised when every configured provider's breaker is open."""
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker over a provider's last WINDOW calls."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = CLOSED
+        self.changed_at = 0.0  # wall clock, comparable across processes
+        self.updated_at = 0.0  # last change worth saving: an outcome or a transition
+        self.opened_at = None
+        self._outcomes = deque(maxlen=WINDOW)  # (ok, latency_seconds)
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """True if a call may go to this provider now."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if time.time() - self.opened_at < OPEN_SECONDS:
+                    return False
+                self._transition(HALF_OPEN)
+            # Half-open: one probe at a time
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self, latency: float):
+        if latency > SLOW_CALL_SECONDS:
+            logger.warning(f"{self.name} call took {latency:.0f}s; counting it as a failure")
+            self.record_failure(latency)
+            return
+        with self._lock:
+            if any(not ok for ok, _ in self._outcomes):
+                # The error rate is still falling; other runs need to see it
+                self._touch()
+            self._outcomes.append((True, latency))
+            if self.state == HALF_OPEN:
+                self._probing = False
+                self._outcomes.clear()
+                self._transition(CLOSED)
+
+    def record_failure(self, latency: float = None):
+        with self._lock:
+            self._touch()
+            self._outcomes.append((False, latency))
+            if self.state == HALF_OPEN:
+                self._probing = False
+                self._transition(OPEN)
+            elif self.state == CLOSED and self._tripped():
+                self._transition(OPEN)
+
+    def release_probe(self):
+        """Give up a half-open probe without an outcome, so the next call may probe."""
+        with self._lock:
+            self._probing = False
+
+    def error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return sum(1 for ok, _ in self._outcomes if not ok) / len(self._outcomes)
+
+    def snapshot(self) -> dict:
+        latencies = [latency for ok, latency in self._outcomes if ok]
+        return {
+            "state": self.state,
+            "changed_at": self.changed_at,
+            "updated_at": self.updated_at,
+            "opened_at": self.opened_at,
+            "calls": len(self._outcomes),
+            "error_rate": round(self.error_rate(), 2),
+            "avg_latency": round(sum(latencies) / len(latencies), 1) if latencies else None,
+            "outcomes": [[ok, None if latency is None else round(latency, 1)] for ok, latency in self._outcomes],
+        }
+
+    def _tripped(self) -> bool:
+        return len(self._outcomes) >= MIN_CALLS and self.error_rate() >= ERROR_RATE_THRESHOLD
+
+    def _transition(self, state: str):
+        logger.warning(f"Circuit breaker for {self.name}: {self.state} -> {state} "
+                       f"(error rate {self.error_rate():.0%} over {len(self._outcomes)} calls)")
+        self.state = state
+        self.changed_at = time.time()
+        if state == OPEN:
+            self.opened_at = self.changed_at
+        self._touch()
+
+    def _touch(self):
+        self.updated_at = time.time()
+        _changed.add(self.name)
+
+
+_breakers = {}
+_changed = set()
+_registry_lock = threading.Lock()
+# The breaker provider retry loops report attempts to, set by watching()
+_watched = contextvars.ContextVar("watched_breaker", default=None)
+
+
+def get(name: str) -> CircuitBreaker:
+    """The breaker for a provider, created closed on first use."""
+    with _registry_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name)
+        return _breakers[name]
+
+
+@contextmanager
+def watching(name: str):
+    """Report provider attempts made in the block to name's breaker.
+
+    Yields a dict whose "reported" is True once a retry loop reported an
+    attempt, so the caller knows not to record the call's outcome again.
+    """
+    watch = {"breaker": get(name), "reported": False}
+    token = _watched.set(watch)
+    try:
+        yield watch
+    finally:
+        _watched.reset(token)
+
+
+def attempt_failed(latency: float) -> bool:
+    """Record a failed attempt on the watched breaker. Returns False if retrying should stop."""
+    watch = _watched.get()
+    if watch is None:
+        return True
+    watch["reported"] = True
+    watch["breaker"].record_failure(latency)
+    return watch["breaker"].state == CLOSED
+
+
+def attempt_succeeded(latency: float):
+    """Record a successful attempt on the watched breaker, if any."""
+    watch = _watched.get()
+    if watch is not None:
+        watch["reported"] = True
+        watch["breaker"].record_success(latency)
+
+
+def sync(raw: str | None):
+    """Adopt states and outcomes saved by other processes that are newer than ours."""
+    try:
+        saved = json.loads(raw or "{}")
+    except ValueError:
+        return
+    for name, state in saved.items():
+        breaker = get(name)
+        updated_at = state.get("updated_at") or state.get("changed_at", 0)
+        with breaker._lock:
+            if updated_at > breaker.updated_at and state.get("state") in (CLOSED, OPEN, HALF_OPEN):
+                breaker.state = OPEN if state["state"] == HALF_OPEN else state["state"]
+                breaker.changed_at = state.get("changed_at", 0)
+                breaker.updated_at = updated_at
+                breaker.opened_at = state.get("opened_at") or breaker.changed_at
+                breaker._outcomes = deque(((bool(ok), latency) for ok, latency in state.get("outcomes") or []),
+                                          maxlen=WINDOW)
+                breaker._probing = False
+
+
+def save_changes():
+    """Save every breaker's state and outcomes if any changed since the last save. Never raises."""
+    if not _changed:
+        return
+    _changed.clear()
+    try:
+        states = {name: breaker.snapshot() for name, breaker in _breakers.items()}
+        for state in states.values():
+            state["saved_at"] = datetime.now(timezone.utc).isoformat()
+        db.set_setting(STATE_KEY, json.dumps(states))
+    except Exception as e:
+        logger.warning(f"Could not save circuit breaker state: {e}")
+
+
+def reset():
+    """Forget all breaker state (tests)."""
+    with _registry_lock:
+        _breakers.clear()
+        _changed.clear()
@@ -8,12 +8,12 @@ from datetime import datetime, timezone
 from email_reply_parser import EmailReplyParser
 
 from db import supabase_client as db
-from services import openai_service, gmail_service, ai_service
+from services import openai_service, gmail_service, ai_service, job_queue, telemetry, triage
 
 logger = logging.getLogger(__name__)
 
 
-def _generate_dedup_key(email_data: dict) -> str:
+def generate_dedup_key(email_data: dict) -> str:
     """Generate a synthetic dedup key from email content when Message-ID is missing.
 
     Creates a hash from (from_email, subject, first 500 chars of body) to prevent
@@ -208,16 +208,19 @@ def generate_and_evaluate(user: dict, parsed_message: str, message_type: str = "
     detected_stage, stage_changed, resource_referenced, summary_update, status
     """
     # Build context and generate response
-    context = build_assistant_context(user, parsed_message, message_type)
-    ai_response = ai_service.generate_response(context, user=user)
+    with telemetry.span("context_build"):
+        context = build_assistant_context(user, parsed_message, message_type)
+    with telemetry.span("generate"):
+        ai_response = ai_service.generate_response(context, user=user, message_type=message_type)
 
     # Evaluate the response
-    evaluation = openai_service.evaluate_response(
-        user_message=parsed_message,
-        ai_response=ai_response,
-        user_stage=user.get("stage", "Ideation"),
-        evaluation_prompt=_get_evaluation_prompt(),
-    )
+    with telemetry.span("evaluate"):
+        evaluation = openai_service.evaluate_response(
+            user_message=parsed_message,
+            ai_response=ai_response,
+            user_stage=user.get("stage", "Ideation"),
+            evaluation_prompt=_get_evaluation_prompt(),
+        )
 
     confidence = evaluation.get("confidence", 5)
     flag = evaluation.get("flag", False)
@@ -254,16 +257,24 @@ def generate_and_evaluate(user: dict, parsed_message: str, message_type: str = "
 def process_email(email_data: dict) -> dict | None:
     """Process a single incoming email through the full pipeline.
 
-    Returns the created conversation record, or None if skipped.
+    Returns the created conversation record, or None if skipped. Stage
+    timings and token usage up to the insert are stored on the conversation
+    as pipeline_metrics.
     """
+    with telemetry.collect("conversation", message_id=email_data.get("message_id")) as metrics:
+        return _process_email(email_data, metrics)
+
+
+def _process_email(email_data: dict, metrics: telemetry.Collector) -> dict | None:
     from_email = email_data["from_email"]
     raw_body = email_data["body"]
     message_id = email_data["message_id"]
 
     # If Message-ID header is missing, generate a synthetic one for dedup
     if not message_id:
-        message_id = _generate_dedup_key(email_data)
+        message_id = generate_dedup_key(email_data)
         email_data["message_id"] = message_id
+        metrics.labels["message_id"] = message_id
         logger.info(f"No Message-ID header, using synthetic key: {message_id}")
 
     # Skip if we already processed this message
@@ -285,9 +296,21 @@ def process_email(email_data: dict) -> dict | None:
         logger.info(f"Ignoring email from unknown sender: {from_email}")
         return None
 
+    # Triage trivial replies (auto-replies, empty ones, bare "thanks") before any LLM call.
+    # Acknowledgements are handled after the pause/resume and reply cap checks below.
+    with telemetry.span("triage"):
+        reply = EmailReplyParser.parse_reply(raw_body).strip()
+        route = triage.classify(email_data, reply)
+    if route == triage.ACKNOWLEDGEMENT and user.get("status") == "Onboarding":
+        route = None  # An onboarding reply activates the user, however short
+    if route and route != triage.ACKNOWLEDGEMENT:
+        _handle_triaged(route, email_data, reply, user, message_id)
+        return None
+
     # Handle onboarding — single reply activates the user
     if user.get("status") == "Onboarding":
-        parsed = parse_email(raw_body)
+        with telemetry.span("parse"):
+            parsed = parse_email(raw_body)
 
         # Activate user with their reply (stage + challenge + idea in one shot)
         db.update_user(user["id"], {
@@ -316,15 +339,18 @@ def process_email(email_data: dict) -> dict | None:
             "status": "Pending Review",  # Onboarding always goes through review
             "resource_referenced": result.get("resource_referenced"),
             "evaluation_details": result.get("evaluation_details"),
+            "pipeline_metrics": metrics.summary(),
         })
         logger.info(f"Onboarding complete for {from_email} - activated, awaiting review")
         return None
 
-    # Parse email content
-    parsed = parse_email(raw_body)
+    # Parse email content (an acknowledgement already is, and may be too short for the parser)
+    with telemetry.span("parse"):
+        parsed = reply if route == triage.ACKNOWLEDGEMENT else parse_email(raw_body)
 
     # Check for pause/resume
-    intent = detect_intent(parsed)
+    with telemetry.span("intent"):
+        intent = detect_intent(parsed)
 
     if intent == "pause":
         db.update_user(user["id"], {"status": "Paused"})
@@ -390,6 +416,10 @@ def process_email(email_data: dict) -> dict | None:
         })
         return None
 
+    if route == triage.ACKNOWLEDGEMENT:
+        _handle_triaged(route, email_data, reply, user, message_id)
+        return None
+
     # Determine message type
     recent = db.get_recent_conversations(user["id"], limit=1)
     message_type = "follow-up question" if recent else "check-in response"
@@ -399,7 +429,8 @@ def process_email(email_data: dict) -> dict | None:
 
     # Analyze member satisfaction/engagement
     try:
-        satisfaction = openai_service.analyze_satisfaction(parsed)
+        with telemetry.span("satisfaction"):
+            satisfaction = openai_service.analyze_satisfaction(parsed)
     except Exception as e:
         logger.warning(f"Failed to analyze satisfaction for {from_email}: {e}")
         satisfaction = None
@@ -422,8 +453,12 @@ def process_email(email_data: dict) -> dict | None:
         "stage_changed": result.get("stage_changed", False),
         "approved_by": result.get("approved_by"),
         "approved_at": datetime.now(timezone.utc).isoformat() if result["status"] == "Approved" else None,
+        # Auto-approved drafts are sent unedited, approved at creation
+        "was_edited": False if result["status"] == "Approved" else None,
+        "response_time_seconds": 0 if result["status"] == "Approved" else None,
         "satisfaction_score": satisfaction,
         "evaluation_details": result.get("evaluation_details"),
+        "pipeline_metrics": metrics.summary(),
     })
 
     # Update user metadata
@@ -461,6 +496,68 @@ def process_email(email_data: dict) -> dict | None:
     return conversation
 
 
+def _handle_triaged(route: str, email_data: dict, reply: str, user: dict, message_id: str):
+    """Handle a message triage.classify() routed away from generation.
+
+    Auto-replies get no response and no conversation. Possible auto-replies
+    (the body reads like one, the headers don't say so) are flagged without
+    a draft for the coach to check. Empty replies are flagged without a
+    draft, since the text may be in an attachment.
+    Acknowledgements get a canned draft for review, and count as the user
+    being active; from a Paused user they need no response.
+    """
+    triage.record(route)
+    from_email = email_data["from_email"]
+
+    if route == triage.AUTO_REPLY:
+        logger.info(f"Auto-reply from {from_email}, no response needed")
+        return
+
+    conversation = {
+        "user_id": user["id"],
+        "type": "Follow-up",
+        "user_message_raw": email_data["body"],
+        "user_message_parsed": reply,
+        "email_subject": email_data.get("subject"),
+        "gmail_message_id": message_id or None,
+        "gmail_thread_id": email_data.get("in_reply_to"),
+    }
+    if route == triage.EMPTY:
+        db.create_conversation({
+            **conversation,
+            "status": "Flagged",
+            "flag_reason": "Empty reply - no text to respond to. Check Gmail for attachments.",
+        })
+        logger.info(f"Empty reply from {from_email}, flagged without a draft")
+        return
+    if route == triage.POSSIBLE_AUTO_REPLY:
+        db.create_conversation({
+            **conversation,
+            "status": "Flagged",
+            "flag_reason": "Looks like an out-of-office reply - check whether it needs a response.",
+        })
+        logger.info(f"Possible auto-reply from {from_email}, flagged without a draft")
+        return
+    if user.get("status") == "Paused":
+        logger.info(f"Acknowledgement from paused user {from_email}, no response needed")
+        return
+
+    db.create_conversation({
+        **conversation,
+        "status": "Pending Review",
+        "ai_response": triage.canned_reply(reply, user.get("first_name") or "there"),
+        "confidence": 9,
+    })
+    updates = {
+        "last_response_date": datetime.now(timezone.utc).isoformat(),
+        "gmail_message_id": email_data.get("message_id"),
+    }
+    if email_data.get("in_reply_to"):
+        updates["gmail_thread_id"] = email_data["in_reply_to"]
+    db.update_user(user["id"], updates)
+    logger.info(f"Acknowledgement from {from_email}, canned draft queued for review")
+
+
 # ── Coaching Playbook ──────────────────────────────────────────
 
 PLAYBOOK_PROMPT = """You are analyzing corrections that a human coach (Wes) has made to AI-generated coaching responses. Your job is to distill these corrections into a concise set of coaching principles.
@@ -487,8 +584,18 @@ Here are the corrections to analyze:
 def regenerate_playbook() -> str | None:
     """Analyze all corrections and generate/update the coaching playbook.
 
-    Returns the generated playbook text, or None if not enough corrections exist.
+    Returns the generated playbook text, or None if not enough corrections
+    exist or generation fails.
     """
+    try:
+        return _regenerate_playbook()
+    except Exception as e:
+        logger.error(f"Failed to generate coaching playbook: {e}")
+        return None
+
+
+def _regenerate_playbook() -> str | None:
+    """regenerate_playbook, raising if the LLM call or saving fails."""
     corrections = db.get_all_corrections()
     if len(corrections) < 3:
         logger.info(f"Only {len(corrections)} correction(s) — need at least 3 to generate playbook")
@@ -515,33 +622,43 @@ def regenerate_playbook() -> str | None:
     # Use the configured AI provider to generate the playbook
     provider, model = ai_service.get_ai_config()
 
-    try:
-        if provider == "anthropic":
-            from services import anthropic_service
-            client = anthropic_service.get_client()
-            response = client.messages.create(
-                model=model,
-                max_tokens=1500,
-                messages=[{"role": "user", "content": prompt}],
-            )
-            playbook = response.content[0].text.strip()
-        else:
-            from services import openai_service as oai
-            client = oai.get_client()
-            response = client.chat.completions.create(
-                model=model,
-                max_tokens=1500,
-                messages=[{"role": "user", "content": prompt}],
-            )
-            playbook = response.choices[0].message.content.strip()
-
-        # Save to settings
-        db.set_setting("coaching_playbook", playbook)
-        db.set_setting("coaching_playbook_updated", datetime.now(timezone.utc).isoformat())
-        db.set_setting("coaching_playbook_correction_count", str(len(corrections)))
-        logger.info(f"Coaching playbook regenerated from {len(corrections)} corrections")
-        return playbook
+    if provider == "anthropic":
+        from services import anthropic_service
+        client = anthropic_service.get_client()
+        response = client.messages.create(
+            model=model,
+            max_tokens=1500,
+            messages=[{"role": "user", "content": prompt}],
+        )
+        playbook = response.content[0].text.strip()
+    else:
+        from services import openai_service as oai
+        client = oai.get_client()
+        response = client.chat.completions.create(
+            model=model,
+            max_tokens=1500,
+            messages=[{"role": "user", "content": prompt}],
+        )
+        playbook = response.choices[0].message.content.strip()
+
+    # Save to settings
+    db.set_setting("coaching_playbook", playbook)
+    db.set_setting("coaching_playbook_updated", datetime.now(timezone.utc).isoformat())
+    db.set_setting("coaching_playbook_correction_count", str(len(corrections)))
+    logger.info(f"Coaching playbook regenerated from {len(corrections)} corrections")
+    return playbook
+
+
+def queue_playbook_regeneration() -> bool:
+    """Queue a playbook rebuild for the next process_emails run or worker.
+
+    Used by the dashboard after saving a correction, so the page doesn't wait
+    on an LLM call. A burst of corrections shares one queued job.
+    """
+    return job_queue.enqueue("regenerate_playbook", dedupe_key="regenerate_playbook") > 0
 
-    except Exception as e:
-        logger.error(f"Failed to generate coaching playbook: {e}")
-        return None
+
+@job_queue.handler("regenerate_playbook")
+def handle_regenerate_playbook(payload: dict):
+    # Failures raise, so the job is retried with backoff instead of counting as skipped
+    return _regenerate_playbook()
@@ -0,0 +1,66 @@
+"""Run-level deadline, so a workflow finishes cleanly before its host kills it.
+
+run_workflow.py gives each run a budget a few minutes short of the GitHub
+Actions timeout:
+
+    with deadline.budget(15 * 60):
+        module.run()
+
+Inside it, provider and Gmail retries give up rather than sleep past the
+deadline, request timeouts shrink to the time left, and job_queue.drain
+stops claiming jobs it cannot finish. Jobs left over stay queued for the
+next run, and the workflow still records its run as completed. With no
+budget set (tests, the dashboard) nothing changes.
+
+The deadline lives in a context variable, so each serve-mode thread has
+its own.
+"""
+
+import contextvars
+import time
+from contextlib import contextmanager
+
+# Least time worth starting a provider or Gmail call with
+MIN_CALL_SECONDS = 5
+
+_deadline = contextvars.ContextVar("run_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """Raised instead of starting work that cannot finish before the run's deadline."""
+
+
+@contextmanager
+def budget(seconds: float):
+    """Set a deadline seconds from now for the enclosed block. A nested budget can only shorten it."""
+    end = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(end if current is None else min(end, current))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> float | None:
+    """Seconds left before the deadline, or None when no budget is set."""
+    end = _deadline.get()
+    return None if end is None else max(end - time.monotonic(), 0.0)
+
+
+def allows(seconds: float) -> bool:
+    """True if there is no deadline or at least seconds remain."""
+    left = remaining()
+    return left is None or left >= seconds
+
+
+def check(what: str = "call"):
+    """Raise DeadlineExceeded if too little time is left to start what."""
+    if not allows(MIN_CALL_SECONDS):
+        raise DeadlineExceeded(f"Run deadline reached before {what}")
+
+
+def timeout(default: float) -> float:
+    """A request timeout: default, or the time left if that is shorter."""
+    left = remaining()
+    return default if left is None else max(min(default, left), 1.0)
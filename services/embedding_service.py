@@ -3,27 +3,31 @@
 import logging
 import time
 
-from openai import OpenAI
-
 import config
+from services import deadline
 
 logger = logging.getLogger(__name__)
 
 MODEL = "text-embedding-3-small"  # 1536 dimensions, very cheap
 MAX_RETRIES = 3
 RETRY_DELAY_BASE = 2
+REQUEST_TIMEOUT_SECONDS = 60.0
 
 _client = None
 
 
-def get_client() -> OpenAI:
+def get_client():
     global _client
     if _client is None:
+        from openai import OpenAI
         _client = OpenAI(
             api_key=config.OPENAI_API_KEY,
-            timeout=60.0,
+            timeout=REQUEST_TIMEOUT_SECONDS,
             max_retries=0,
         )
+    request_timeout = deadline.timeout(REQUEST_TIMEOUT_SECONDS)
+    if request_timeout < REQUEST_TIMEOUT_SECONDS:
+        return _client.with_options(timeout=request_timeout)
     return _client
 
 
@@ -31,12 +35,16 @@ def _retry_with_backoff(func, *args, **kwargs):
     """Retry an API call with exponential backoff."""
     last_error = None
     for attempt in range(MAX_RETRIES):
+        deadline.check("Embedding API call")
         try:
             return func(*args, **kwargs)
         except Exception as e:
             last_error = e
             if attempt < MAX_RETRIES - 1:
                 delay = RETRY_DELAY_BASE * (2 ** attempt)
+                if not deadline.allows(delay + deadline.MIN_CALL_SECONDS):
+                    logger.error(f"Embedding API call failed: {e}. No time left in this run to retry")
+                    break
                 logger.warning(f"Embedding API call failed (attempt {attempt + 1}/{MAX_RETRIES}): {e}. Retrying in {delay}s...")
                 time.sleep(delay)
             else:
@@ -7,25 +7,32 @@ from email.utils import formataddr, parseaddr
 import logging
 import time
 import random
+import re
 
 import config
+from services import deadline, telemetry
 
 logger = logging.getLogger(__name__)
 
 MAX_RETRIES = 3
 RETRY_DELAY_BASE = 2  # seconds, doubles each retry
+SOCKET_TIMEOUT_SECONDS = 60
 
 
 def _retry(func, *args, **kwargs):
     """Retry a Gmail operation with exponential backoff."""
     last_error = None
     for attempt in range(MAX_RETRIES):
+        deadline.check("Gmail operation")
         try:
             return func(*args, **kwargs)
         except Exception as e:
             last_error = e
             if attempt < MAX_RETRIES - 1:
                 delay = RETRY_DELAY_BASE * (2 ** attempt)
+                if not deadline.allows(delay + deadline.MIN_CALL_SECONDS):
+                    logger.error(f"Gmail operation failed: {e}. No time left in this run to retry")
+                    break
                 logger.warning(f"Gmail operation failed (attempt {attempt + 1}/{MAX_RETRIES}): {e}. Retrying in {delay}s...")
                 time.sleep(delay)
             else:
@@ -46,6 +53,11 @@ IGNORED_SENDERS = [
 ]
 
 
+# Headers that mark automatic replies (RFC 3834 and vendor variants), passed
+# to services/triage.py as auto_headers
+AUTO_REPLY_HEADERS = ("Auto-Submitted", "X-Autoreply", "X-Autorespond", "Precedence")
+
+
 def _is_ignored_sender(from_addr: str) -> bool:
     """Return True if this sender should be ignored."""
     addr = from_addr.lower()
@@ -53,18 +65,44 @@ def _is_ignored_sender(from_addr: str) -> bool:
 
 
 def _imap_connect():
-    conn = imaplib.IMAP4_SSL(config.GMAIL_IMAP_HOST)
+    conn = imaplib.IMAP4_SSL(config.GMAIL_IMAP_HOST, timeout=deadline.timeout(SOCKET_TIMEOUT_SECONDS))
     conn.login(config.GMAIL_ADDRESS, config.GMAIL_APP_PASSWORD)
     return conn
 
 
 def _smtp_connect():
-    server = smtplib.SMTP(config.GMAIL_SMTP_HOST, config.GMAIL_SMTP_PORT)
+    server = smtplib.SMTP(config.GMAIL_SMTP_HOST, config.GMAIL_SMTP_PORT,
+                          timeout=deadline.timeout(SOCKET_TIMEOUT_SECONDS))
     server.starttls()
     server.login(config.GMAIL_ADDRESS, config.GMAIL_APP_PASSWORD)
     return server
 
 
+def inbox_status() -> dict:
+    """UIDVALIDITY, UIDNEXT and UNSEEN for INBOX, e.g. {"uidvalidity": 1, "uidnext": 4521, "unseen": 0}.
+
+    One STATUS command, without SELECT or SEARCH, so callers can cheaply
+    tell whether anything arrived since they last looked.
+    """
+    def _status():
+        conn = _imap_connect()
+        try:
+            typ, data = conn.status("INBOX", "(UIDVALIDITY UIDNEXT UNSEEN)")
+            if typ != "OK":
+                raise imaplib.IMAP4.error(f"STATUS INBOX failed: {data}")
+            # b'"INBOX" (UIDVALIDITY 1 UIDNEXT 4521 UNSEEN 0)'
+            fields = re.findall(r"([A-Z]+) (\d+)", data[0].decode())
+            return {name.lower(): int(value) for name, value in fields}
+        finally:
+            try:
+                conn.logout()
+            except Exception:
+                pass
+
+    with telemetry.span("imap_status"):
+        return _retry(_status)
+
+
 def fetch_unread_emails(max_results: int = 50) -> list[dict]:
     """Fetch unread emails from inbox, excluding emails from our own address."""
     def _fetch():
@@ -107,6 +145,7 @@ def fetch_unread_emails(max_results: int = 50) -> list[dict]:
                     "in_reply_to": in_reply_to,
                     "references": references,
                     "date": msg.get("Date", ""),
+                    "auto_headers": {name: msg[name] for name in AUTO_REPLY_HEADERS if msg[name]},
                 })
 
             return emails
@@ -116,7 +155,8 @@ def fetch_unread_emails(max_results: int = 50) -> list[dict]:
             except Exception:
                 pass
 
-    return _retry(_fetch)
+    with telemetry.span("imap_fetch"):
+        return _retry(_fetch)
 
 
 def mark_as_read(imap_id: str):
@@ -132,7 +172,8 @@ def mark_as_read(imap_id: str):
             except Exception:
                 pass
 
-    _retry(_mark)
+    with telemetry.span("imap_mark_read", count=1):
+        _retry(_mark)
 
 
 def mark_multiple_as_read(imap_ids: list[str]):
@@ -152,7 +193,8 @@ def mark_multiple_as_read(imap_ids: list[str]):
             except Exception:
                 pass
 
-    _retry(_mark_batch)
+    with telemetry.span("imap_mark_read", count=len(imap_ids)):
+        _retry(_mark_batch)
 
 
 def send_email(to_email: str, subject: str, body: str, in_reply_to: str = None,
@@ -188,7 +230,8 @@ def send_email(to_email: str, subject: str, body: str, in_reply_to: str = None,
             except Exception:
                 pass
 
-    _retry(_send)
+    with telemetry.span("smtp_send"):
+        _retry(_send)
     return msg["Message-ID"]
 
 
@@ -380,7 +423,8 @@ def fetch_old_unread_emails(max_results: int = 100) -> list[dict]:
             except Exception:
                 pass
 
-    return _retry(_fetch)
+    with telemetry.span("imap_fetch"):
+        return _retry(_fetch)
 
 
 def _extract_body(msg) -> str:
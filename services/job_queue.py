@@ -0,0 +1,255 @@
+"""Durable job queue on the Postgres jobs table (db/migration_v16.sql).
+
+Cron workflows are thin enqueuers: they find the work (unread emails, users
+due a check-in, approved conversations) and enqueue one typed job per item.
+Workers lease due jobs with FOR UPDATE SKIP LOCKED, so any number of them
+can drain the queue in parallel without handling a job twice:
+
+    job_queue.enqueue_many([job_queue.job("send", {"conversation_id": cid}, dedupe_key=f"send:{cid}")])
+    job_queue.drain(["send"])
+
+Each workflow drains its own job types right after enqueueing, so one cron
+run still finishes its work; `python run_workflow.py worker` drains every
+type. A failed job is retried with exponential backoff and goes dead after
+its type's max_attempts, keeping last_error for review. An @on_dead
+callback can act on it then (process_emails quarantines the email).
+
+Under a run deadline (services/deadline.py) drain claims only as many jobs
+as the time left covers at the type's item_seconds, and a job that cannot
+start or hits the deadline is released back to the queue without spending
+an attempt, for the next run to pick up. Once a batch defers anything, drain
+stops claiming that type, since the released jobs are due again at once.
+
+Delivery is at least once: a worker that dies mid-batch lets the lease
+expire and the jobs run again, so handlers must be idempotent. Handlers
+register with @handler next to the workflow that enqueues them. A batch
+handler receives the payloads of every job claimed in one round and returns
+one result per payload (None for skipped, an Exception to fail that job,
+PermanentJobError to fail it without retrying, DEFERRED to put it back
+untouched), so it can read and write in bulk.
+"""
+
+import importlib
+import logging
+import os
+import socket
+from datetime import datetime, timedelta, timezone
+
+from db import supabase_client as db
+from services import deadline
+
+logger = logging.getLogger(__name__)
+
+JOB_TYPES = ("process_email", "generate_checkin", "send", "update_summary", "regenerate_playbook")
+
+# Module that registers each type's handler, imported on first drain
+HANDLER_MODULES = {
+    "process_email": "workflows.process_emails",
+    "generate_checkin": "workflows.check_in",
+    "send": "workflows.send_approved",
+    "update_summary": "workflows.send_approved",
+    "regenerate_playbook": "services.coaching_service",
+}
+
+# batch_size: jobs per claim. lease_seconds must cover handling a whole batch,
+# or another worker may claim the same jobs while they are still running.
+# item_seconds: expected time per job, for claiming under a deadline.
+POLICIES = {
+    "process_email": {"batch_size": 5, "lease_seconds": 1800, "max_attempts": 5, "item_seconds": 60},
+    # One batch covers a day's check-ins, so run() drains them with the users
+    # it already loaded
+    "generate_checkin": {"batch_size": 500, "lease_seconds": 3 * 3600, "max_attempts": 3, "item_seconds": 15},
+    # A send batch sleeps up to send_delay_max_minutes between messages
+    "send": {"batch_size": 100, "lease_seconds": 3 * 3600, "max_attempts": 3, "item_seconds": 15},
+    "update_summary": {"batch_size": 50, "lease_seconds": 900, "max_attempts": 5, "item_seconds": 10},
+    "regenerate_playbook": {"batch_size": 1, "lease_seconds": 600, "max_attempts": 3, "item_seconds": 120},
+}
+
+BACKOFF_BASE_SECONDS = 60
+BACKOFF_MAX_SECONDS = 3600
+
+# Handler result for a job it did not get to; the job is released unchanged
+DEFERRED = object()
+
+_handlers = {}
+_dead_handlers = {}
+
+
+class PermanentJobError(Exception):
+    """Returned or raised by a handler when retrying cannot help; the job goes dead at once."""
+
+
+def handler(job_type: str, batch: bool = False):
+    """Register the decorated function as the handler for job_type."""
+    if job_type not in JOB_TYPES:
+        raise ValueError(f"Unknown job type '{job_type}'")
+
+    def register(fn):
+        _handlers[job_type] = (fn, batch)
+        return fn
+    return register
+
+
+def on_dead(job_type: str):
+    """Register the decorated function(payload, error, attempts) to run when a job of job_type goes dead."""
+    if job_type not in JOB_TYPES:
+        raise ValueError(f"Unknown job type '{job_type}'")
+
+    def register(fn):
+        _dead_handlers[job_type] = fn
+        return fn
+    return register
+
+
+def _get_handler(job_type: str):
+    if job_type not in _handlers:
+        importlib.import_module(HANDLER_MODULES[job_type])
+    return _handlers[job_type]
+
+
+def job(job_type: str, payload: dict = None, dedupe_key: str = None,
+        run_after: datetime = None, priority: int = 100) -> dict:
+    """Build a job row for enqueue_many. Lower priority runs first."""
+    if job_type not in JOB_TYPES:
+        raise ValueError(f"Unknown job type '{job_type}'")
+    return {
+        "job_type": job_type,
+        "payload": payload or {},
+        "dedupe_key": dedupe_key,
+        "priority": priority,
+        "run_after": run_after.isoformat() if run_after else None,
+        "max_attempts": POLICIES[job_type]["max_attempts"],
+    }
+
+
+def enqueue(job_type: str, payload: dict = None, **kwargs) -> int:
+    """Enqueue one job; returns 0 if a live job with the same dedupe_key exists."""
+    return db.enqueue_jobs([job(job_type, payload, **kwargs)])
+
+
+def enqueue_many(jobs: list[dict]) -> int:
+    """Enqueue job() rows in one query; returns how many were new."""
+    return db.enqueue_jobs(jobs)
+
+
+def backoff_seconds(attempts: int) -> int:
+    """Delay before retrying a job that has failed attempts times."""
+    return min(BACKOFF_BASE_SECONDS * 2 ** max(attempts - 1, 0), BACKOFF_MAX_SECONDS)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def drain(job_types: list[str] = None, worker_id: str = None) -> dict:
+    """Claim and run due jobs of each type until none are left.
+
+    Returns {"done", "skipped", "retried", "dead", "deferred", "errors"};
+    errors holds one message per failed job for the workflow's alert email.
+    Under a deadline, stops claiming once the time left is below one job's
+    item_seconds, or once a batch of the type deferred jobs; deferred counts
+    jobs released for the next run.
+    """
+    worker = worker_id or default_worker_id()
+    result = {"done": 0, "skipped": 0, "retried": 0, "dead": 0, "deferred": 0, "errors": []}
+
+    for job_type in job_types or JOB_TYPES:
+        policy = POLICIES[job_type]
+        while True:
+            limit = _claim_limit(policy)
+            if not limit:
+                logger.warning(f"Run deadline near; leaving {job_type} jobs for the next run")
+                break
+            jobs = db.claim_jobs(worker, job_type, limit, policy["lease_seconds"])
+            if not jobs:
+                break
+            deferred = _run_batch(job_type, jobs, worker, result)
+            if deferred:
+                # Released jobs are due now; claiming again would just hand them back
+                logger.warning(f"Run deadline near; deferred {deferred} {job_type} job(s) to the next run")
+                break
+            if len(jobs) < limit:
+                break
+
+    if result["done"] or result["errors"] or result["deferred"]:
+        logger.info(f"Drained jobs: {result['done']} done, {result['skipped']} skipped, "
+                    f"{result['retried']} retried, {result['dead']} dead, {result['deferred']} deferred")
+    return result
+
+
+def _claim_limit(policy: dict) -> int:
+    """Jobs to claim: a full batch, or as many as the run's remaining time covers."""
+    left = deadline.remaining()
+    if left is None:
+        return policy["batch_size"]
+    return min(policy["batch_size"], int(left // policy["item_seconds"]))
+
+
+def _run_batch(job_type: str, jobs: list[dict], worker: str, result: dict) -> int:
+    """Run one claimed batch and settle each job. Returns how many were deferred."""
+    fn, batch = _get_handler(job_type)
+
+    runnable = []
+    for j in jobs:
+        # Reclaimed after its lease expired on the final attempt
+        if j["attempts"] > j["max_attempts"]:
+            _fail(j, RuntimeError("lease expired on the final attempt"), worker, result)
+        else:
+            runnable.append(j)
+    if not runnable:
+        return 0
+
+    if batch:
+        try:
+            outcomes = fn([j["payload"] for j in runnable])
+        except Exception as e:
+            outcomes = [e] * len(runnable)
+    else:
+        item_seconds = POLICIES[job_type]["item_seconds"]
+        outcomes = []
+        for j in runnable:
+            if not deadline.allows(item_seconds):
+                outcomes.append(DEFERRED)
+                continue
+            try:
+                outcomes.append(fn(j["payload"]))
+            except Exception as e:
+                outcomes.append(e)
+
+    completed, released = [], []
+    for j, outcome in zip(runnable, outcomes):
+        if outcome is DEFERRED or isinstance(outcome, deadline.DeadlineExceeded):
+            released.append(j["id"])
+        elif isinstance(outcome, Exception):
+            _fail(j, outcome, worker, result)
+        else:
+            completed.append(j["id"])
+            result["done" if outcome else "skipped"] += 1
+    db.complete_jobs(completed, worker)
+    if released:
+        result["deferred"] += len(released)
+        try:
+            db.release_jobs(released, worker)
+        except Exception as e:
+            # They are reclaimed once their lease expires, at the cost of an attempt
+            logger.error(f"Failed to release {len(released)} deferred {job_type} job(s): {e}")
+    return len(released)
+
+
+def _fail(j: dict, error: Exception, worker: str, result: dict):
+    message = f"{j['job_type']} job {j['id']} failed (attempt {j['attempts']}/{j['max_attempts']}): {error}"
+    result["errors"].append(message)
+    if isinstance(error, PermanentJobError) or j["attempts"] >= j["max_attempts"]:
+        logger.error(f"{message} — giving up", exc_info=error)
+        db.fail_job(j["id"], worker, str(error))
+        result["dead"] += 1
+        if j["job_type"] in _dead_handlers:
+            try:
+                _dead_handlers[j["job_type"]](j["payload"], error, j["attempts"])
+            except Exception as e:
+                logger.error(f"on_dead for {j['job_type']} job {j['id']} failed: {e}", exc_info=True)
+    else:
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=backoff_seconds(j["attempts"]))
+        logger.warning(f"{message} — retrying after {retry_at.isoformat()}")
+        db.fail_job(j["id"], worker, str(error), retry_at)
+        result["retried"] += 1
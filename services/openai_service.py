@@ -2,27 +2,33 @@ import json
 import logging
 import os
 import time
-from openai import OpenAI
 
 import config
+from services import circuit_breaker, deadline, telemetry
 
 logger = logging.getLogger(__name__)
 
 MAX_RETRIES = 3
 RETRY_DELAY_BASE = 2  # seconds, doubles each retry
+REQUEST_TIMEOUT_SECONDS = 120.0
 
 _client = None
 _instructions = None
 
 
-def get_client() -> OpenAI:
+def get_client():
     global _client
     if _client is None:
+        from openai import OpenAI
         _client = OpenAI(
             api_key=config.OPENAI_API_KEY,
-            timeout=120.0,       # 120s total request timeout
+            timeout=REQUEST_TIMEOUT_SECONDS,
             max_retries=0,       # We handle retries ourselves via _retry_with_backoff
         )
+    # Near the run deadline, requests time out when the run would
+    request_timeout = deadline.timeout(REQUEST_TIMEOUT_SECONDS)
+    if request_timeout < REQUEST_TIMEOUT_SECONDS:
+        return _client.with_options(timeout=request_timeout)
     return _client
 
 
@@ -42,19 +48,44 @@ def _retry_with_backoff(func, *args, **kwargs):
     """Retry an OpenAI API call with exponential backoff."""
     last_error = None
     for attempt in range(MAX_RETRIES):
+        deadline.check("OpenAI API call")
+        started = time.monotonic()
         try:
-            return func(*args, **kwargs)
+            result = func(*args, **kwargs)
         except Exception as e:
             last_error = e
+            if not circuit_breaker.attempt_failed(time.monotonic() - started):
+                logger.error(f"OpenAI API call failed: {e}. Circuit breaker open, not retrying")
+                break
             if attempt < MAX_RETRIES - 1:
                 delay = RETRY_DELAY_BASE * (2 ** attempt)
+                if not deadline.allows(delay + deadline.MIN_CALL_SECONDS):
+                    logger.error(f"OpenAI API call failed: {e}. No time left in this run to retry")
+                    break
                 logger.warning(f"OpenAI API call failed (attempt {attempt + 1}/{MAX_RETRIES}): {e}. Retrying in {delay}s...")
                 time.sleep(delay)
             else:
                 logger.error(f"OpenAI API call failed after {MAX_RETRIES} attempts: {e}")
+        else:
+            circuit_breaker.attempt_succeeded(time.monotonic() - started)
+            return result
     raise last_error
 
 
+def _record_usage(response, model: str, api: str = "chat"):
+    """Report a call's token usage to telemetry (Responses or Chat Completions shape)."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    if api == "responses":
+        prompt, completion = usage.input_tokens, usage.output_tokens
+        details = getattr(usage, "input_tokens_details", None)
+    else:
+        prompt, completion = usage.prompt_tokens, usage.completion_tokens
+        details = getattr(usage, "prompt_tokens_details", None)
+    telemetry.record_llm_usage("openai", model, prompt, completion, getattr(details, "cached_tokens", 0))
+
+
 def generate_response(user_context: str, model: str = "gpt-4o") -> str:
     """Generate a coaching response using the Responses API."""
     client = get_client()
@@ -67,6 +98,7 @@ def generate_response(user_context: str, model: str = "gpt-4o") -> str:
             temperature=0.7,
             max_output_tokens=1500,  # ~3 paragraphs of coaching response
         )
+        _record_usage(response, model, api="responses")
         return response.output_text
 
     return _retry_with_backoff(_call)
@@ -95,6 +127,7 @@ def evaluate_response(user_message: str, ai_response: str, user_stage: str,
             temperature=0.2,
             response_format={"type": "json_object"},
         )
+        _record_usage(response, "gpt-4o-mini")
         return response.choices[0].message.content
 
     text = _retry_with_backoff(_call)
@@ -135,6 +168,7 @@ A keyword detector flagged this as a "{detected_intent}" request. Does the perso
             temperature=0.1,
             max_tokens=5,
         )
+        _record_usage(response, "gpt-4o-mini")
         return response.choices[0].message.content.strip().lower()
 
     try:
@@ -146,16 +180,26 @@ A keyword detector flagged this as a "{detected_intent}" request. Does the perso
 
 
 def generate_summary_update(current_summary: str, user_message: str,
-                            coach_response: str) -> str:
-    """Generate a brief summary update to append to the user's journey summary."""
+                            coach_response: str, earlier_exchanges: list[tuple] = ()) -> str:
+    """Generate a brief summary update to append to the user's journey summary.
+
+    earlier_exchanges are (user_message, coach_response) pairs sent before
+    this one and not yet in the summary, so one call covers them all.
+    """
     client = get_client()
 
+    earlier_text = "".join(
+        f"User's Message:\n{u}\n\nCoach's Response:\n{c}\n\n" for u, c in earlier_exchanges
+    )
+    if earlier_text:
+        earlier_text = f"Earlier Exchanges (oldest first):\n{earlier_text}Latest Exchange:\n"
+
     prompt = f"""You are helping update a user's coaching summary. Based on the recent exchange below, provide a brief 1-2 sentence update to add to their ongoing summary.
 
 Current Summary:
 {current_summary or 'No previous summary'}
 
-User's Message:
+{earlier_text}User's Message:
 {user_message}
 
 Coach's Response:
@@ -170,6 +214,7 @@ Provide only the new summary text to append (1-2 sentences). Focus on key progre
             temperature=0.5,
             max_tokens=200,
         )
+        _record_usage(response, "gpt-4o-mini")
         return response.choices[0].message.content.strip()
 
     return _retry_with_backoff(_call)
@@ -200,6 +245,7 @@ Email:
             temperature=0.1,
             max_tokens=2000,
         )
+        _record_usage(response, "gpt-4o-mini")
         return response.choices[0].message.content.strip()
 
     return _retry_with_backoff(_call)
@@ -223,6 +269,7 @@ Do NOT include a sign-off like "Wes" - that will be added automatically.
             temperature=0.7,
             max_tokens=300,
         )
+        _record_usage(response, model)
         return response.choices[0].message.content.strip()
 
     return _retry_with_backoff(_call)
@@ -257,6 +304,7 @@ Rules:
             temperature=0.7,
             max_tokens=30,
         )
+        _record_usage(response, "gpt-4o-mini")
         return response.choices[0].message.content.strip().strip('"\'')
 
     try:
@@ -298,6 +346,7 @@ Return ONLY a number (1-10), nothing else."""
             temperature=0.2,
             max_tokens=5,
         )
+        _record_usage(response, "gpt-4o-mini")
         text = response.choices[0].message.content.strip()
         try:
             score = float(text)
@@ -306,3 +355,34 @@ Return ONLY a number (1-10), nothing else."""
             return 5.0
 
     return _retry_with_backoff(_call)
+
+
+def classify_complexity(user_message: str) -> str:
+    """Classify a member's message as "simple" or "complex" for model routing.
+
+    Simple messages (status updates, short answers) can be coached well by a
+    fast model; anything else, or an unclear answer, is "complex".
+    """
+    client = get_client()
+
+    prompt = f"""Classify this coaching program member's email for how much thought a good coaching reply needs.
+
+Message: {user_message}
+
+- simple: a status update, short answer or progress report that needs encouragement and one next step
+- complex: a strategic question, a decision between options, a setback, or anything emotional or ambiguous
+
+Return ONLY one word: simple or complex."""
+
+    def _call():
+        response = client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0,
+            max_tokens=3,
+        )
+        _record_usage(response, "gpt-4o-mini")
+        text = response.choices[0].message.content.strip().lower()
+        return "simple" if text.startswith("simple") else "complex"
+
+    return _retry_with_backoff(_call)
@@ -0,0 +1,197 @@
+"""Lightweight stage timing and LLM token accounting for the pipeline.
+
+Code marks a pipeline stage with a span, and provider services report token
+usage after each LLM call:
+
+    with telemetry.span("generate"):
+        ...
+    telemetry.record_llm_usage("openai", "gpt-4o", prompt_tokens=..., completion_tokens=...)
+
+Named counters (telemetry.count) cover events that are neither, such as
+emails triaged without an LLM call.
+
+Spans and usage are recorded into every active Collector. A workflow run
+opens one for the whole run, and process_email opens one per conversation, so
+the same timings roll up to both levels:
+
+    run_metrics = telemetry.collect("run", workflow="process_emails", run_id=run_id).start()
+    ...
+    db.complete_workflow_run(run_id, ..., metrics=run_metrics.finish())
+
+Spans may nest (generate includes rag), so stage totals are inclusive.
+Set TELEMETRY_JSONL to a file path to also append every span and LLM call as
+a JSON line for offline analysis. With no active collector and no JSONL path,
+spans cost two clock reads.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+JSONL_ENV_VAR = "TELEMETRY_JSONL"
+
+_collectors = contextvars.ContextVar("telemetry_collectors", default=())
+_current_stage = contextvars.ContextVar("telemetry_stage", default=None)
+_jsonl_lock = threading.Lock()
+
+
+class Collector:
+    """Accumulates spans and LLM calls while active; summary() aggregates them."""
+
+    def __init__(self, kind: str, **labels):
+        self.kind = kind
+        self.labels = labels
+        self.spans = []
+        self.llm_calls = []
+        self.counts = {}
+        self._started = None
+        self._elapsed_ms = None
+        self._token = None
+
+    def start(self) -> "Collector":
+        self._started = time.perf_counter()
+        self._token = _collectors.set(_collectors.get() + (self,))
+        return self
+
+    def finish(self) -> dict:
+        """Stop collecting and return the summary. Safe to call more than once."""
+        if self._token is not None:
+            self._elapsed_ms = (time.perf_counter() - self._started) * 1000
+            try:
+                _collectors.reset(self._token)
+            except ValueError:
+                # Finished from a different context; drop just this collector
+                _collectors.set(tuple(c for c in _collectors.get() if c is not self))
+            self._token = None
+        return self.summary()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.finish()
+        return False
+
+    def summary(self) -> dict:
+        """Per-stage count/total/max ms, per-(stage, model) token totals and counters, JSON-ready."""
+        elapsed_ms = self._elapsed_ms
+        if elapsed_ms is None and self._started is not None:
+            elapsed_ms = (time.perf_counter() - self._started) * 1000
+
+        stages = {}
+        for s in self.spans:
+            agg = stages.setdefault(s["stage"], {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "errors": 0})
+            agg["count"] += 1
+            agg["total_ms"] += s["ms"]
+            agg["max_ms"] = max(agg["max_ms"], s["ms"])
+            if not s["ok"]:
+                agg["errors"] += 1
+        for agg in stages.values():
+            agg["total_ms"] = round(agg["total_ms"], 1)
+            agg["max_ms"] = round(agg["max_ms"], 1)
+
+        llm = {}
+        for call in self.llm_calls:
+            key = (call["stage"], call["provider"], call["model"])
+            agg = llm.setdefault(key, {
+                "stage": call["stage"], "provider": call["provider"], "model": call["model"], "calls": 0,
+                "prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0,
+            })
+            agg["calls"] += 1
+            for field in ("prompt_tokens", "completion_tokens", "cached_tokens"):
+                agg[field] += call[field]
+
+        return {
+            "total_ms": round(elapsed_ms, 1) if elapsed_ms is not None else None,
+            "stages": stages,
+            "llm": list(llm.values()),
+            "counts": dict(self.counts),
+        }
+
+
+def collect(kind: str, **labels) -> Collector:
+    """Create a collector; use as a context manager or call .start()/.finish()."""
+    return Collector(kind, **labels)
+
+
+def format_stages(summary: dict) -> str:
+    """One-line "stage total (count)" rendering of a summary, slowest first."""
+    stages = sorted(summary["stages"].items(), key=lambda kv: kv[1]["total_ms"], reverse=True)
+    return ", ".join(f"{stage} {agg['total_ms'] / 1000:.1f}s ({agg['count']})" for stage, agg in stages)
+
+
+def current_stage() -> str | None:
+    return _current_stage.get()
+
+
+@contextmanager
+def span(stage: str, **attrs):
+    """Time a pipeline stage. Exceptions propagate and mark the span failed."""
+    token = _current_stage.set(stage)
+    start = time.perf_counter()
+    ok = True
+    try:
+        yield
+    except BaseException:
+        ok = False
+        raise
+    finally:
+        ms = (time.perf_counter() - start) * 1000
+        _current_stage.reset(token)
+        record = {"stage": stage, "ms": ms, "ok": ok}
+        if attrs:
+            record["attrs"] = attrs
+        for collector in _collectors.get():
+            collector.spans.append(record)
+        _export({"type": "span", **record})
+
+
+def record_llm_usage(provider: str, model: str, prompt_tokens=0, completion_tokens=0, cached_tokens=0):
+    """Record one LLM call's token usage against the current stage.
+
+    prompt_tokens is the full input including cached_tokens, as OpenAI reports it.
+    """
+    record = {
+        "stage": _current_stage.get(),
+        "provider": provider,
+        "model": model,
+        "prompt_tokens": _as_int(prompt_tokens),
+        "completion_tokens": _as_int(completion_tokens),
+        "cached_tokens": _as_int(cached_tokens),
+    }
+    for collector in _collectors.get():
+        collector.llm_calls.append(record)
+    _export({"type": "llm", **record})
+
+
+def count(name: str, n: int = 1):
+    """Add n to a named counter on every active collector, e.g. emails triaged without an LLM call."""
+    for collector in _collectors.get():
+        collector.counts[name] = collector.counts.get(name, 0) + n
+
+
+def _as_int(value) -> int:
+    # SDK usage fields can be None (and are mocks in tests)
+    return int(value) if isinstance(value, (int, float)) else 0
+
+
+def _export(event: dict):
+    path = os.environ.get(JSONL_ENV_VAR)
+    if not path:
+        return
+    labels = {}
+    for collector in _collectors.get():
+        labels.update(collector.labels)
+    line = json.dumps({"ts": datetime.now(timezone.utc).isoformat(), **labels, **event}, default=str)
+    try:
+        with _jsonl_lock, open(path, "a") as f:
+            f.write(line + "\n")
+    except OSError as e:
+        logger.warning(f"Could not write telemetry to {path}: {e}")
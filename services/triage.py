@@ -0,0 +1,155 @@
+"""Deterministic triage of trivial replies, before any LLM call.
+
+Most of what users send needs a real coaching response, but some of it
+doesn't: "thanks!", "sounds good", out-of-office auto-replies, or a reply
+with no text at all. process_email classifies each message here first,
+with compiled patterns, the auto-reply headers gmail_service collects and
+length limits, and routes those without running generate, evaluate and
+satisfaction:
+
+    ACKNOWLEDGEMENT      canned draft into Pending Review, once the pause/resume
+                         and thread reply cap checks have passed
+    AUTO_REPLY           no response (auto-reply headers)
+    POSSIBLE_AUTO_REPLY  no draft; flagged, since only the subject or body reads like one
+    EMPTY                no draft; flagged so the coach can check for attachments
+
+Only headers are trusted to drop a message. People write "I'm out of the
+office next week, please pause my check-ins" too, and title such a message
+"Out of office", so a subject or body that merely reads like an auto-reply
+is flagged for the coach, and never triaged at all if it asks something or
+mentions pausing or resuming.
+
+Each triaged email is counted on the active telemetry collectors, so a
+process_emails run reports how many LLM calls triage avoided (report()).
+"""
+
+import re
+
+from services import telemetry
+
+ACKNOWLEDGEMENT = "acknowledgement"
+AUTO_REPLY = "auto_reply"
+POSSIBLE_AUTO_REPLY = "possible_auto_reply"
+EMPTY = "empty"
+
+# generate + evaluate + satisfaction for a normal email
+LLM_CALLS_PER_EMAIL = 3
+
+# Longest reply that can still be a bare acknowledgement
+MAX_ACK_WORDS = 10
+MAX_ACK_CHARS = 80
+# Out-of-office body phrases only count in replies this short, unless the
+# message has no In-Reply-To (a reply a person wrote in the thread has one)
+MAX_AUTO_REPLY_CHARS = 160
+MAX_UNTHREADED_AUTO_REPLY_CHARS = 600
+
+# Header values that mark a message as machine-sent (RFC 3834 and common
+# vendor headers); gmail_service.AUTO_REPLY_HEADERS lists what is collected
+_AUTO_PRECEDENCE = {"auto_reply", "bulk", "junk"}
+
+_ACK_PHRASE = (
+    r"(?:ok(?:ay)?|k|cool|great|perfect|awesome|nice|noted|got it|will do|sounds (?:good|great)"
+    r"|thanks?(?: (?:so|very) much| a lot| again)?|thank you(?: (?:so|very) much| again)?|thx|ty|tysm"
+    r"|cheers|appreciate it|much appreciated|many thanks|you too|same to you)"
+)
+# One or more acknowledgement phrases, optionally followed by a name, with
+# any punctuation or emoji in between
+_ACK_RE = re.compile(
+    rf"^(?:{_ACK_PHRASE}[\s,.!:;)\-]*)+(?:wes|coach)?[\s,.!:;)\-]*$",
+    re.IGNORECASE,
+)
+_THANKS_RE = re.compile(r"\b(?:thanks?|thank you|thx|ty|tysm|appreciate|cheers)\b", re.IGNORECASE)
+
+_AUTO_SUBJECT_RE = re.compile(
+    r"^(?:auto(?:matic)?[\s-]*(?:reply|response)|out of (?:the )?office|ooo\b|away from (?:the )?office"
+    r"|automatische antwort|abwesenheitsnotiz|r[ée]ponse automatique|respuesta autom[aá]tica)",
+    re.IGNORECASE,
+)
+_AUTO_BODY_RE = re.compile(
+    r"\b(?:i am|i'm|i will be|i'll be)\s+(?:currently\s+)?(?:out of (?:the )?office|away from (?:the office|my desk|email)"
+    r"|on (?:vacation|holiday|leave|annual leave|parental leave))"
+    r"|\blimited (?:access to|availability on) (?:my )?e-?mail"
+    r"|\bthis is an automated (?:reply|response|message)",
+    re.IGNORECASE,
+)
+_WORD_RE = re.compile(r"\w")
+# Emoji and pictographs, so "👍" or "🙏" alone read as an acknowledgement
+_EMOJI_RE = re.compile("[\U0001F300-\U0001FAFF☀-➿️]")
+
+
+def classify(email_data: dict, reply: str) -> str | None:
+    """ACKNOWLEDGEMENT, AUTO_REPLY, POSSIBLE_AUTO_REPLY or EMPTY for a trivial message, else None.
+
+    reply is the message with quoted history and signatures stripped by the
+    deterministic parser. Apart from machine-sent mail, anything with a
+    question mark is never trivial.
+    """
+    if _has_auto_reply_headers(email_data):
+        return AUTO_REPLY
+    if _looks_like_auto_reply(email_data, reply):
+        return POSSIBLE_AUTO_REPLY
+
+    text = reply.strip()
+    if text and "?" not in text and len(text) <= MAX_ACK_CHARS and len(text.split()) <= MAX_ACK_WORDS:
+        words_only = _EMOJI_RE.sub(" ", text).strip()
+        if not words_only or _ACK_RE.match(words_only):
+            return ACKNOWLEDGEMENT
+
+    if not _WORD_RE.search(email_data.get("body") or ""):
+        return EMPTY
+    return None
+
+
+def _has_auto_reply_headers(email_data: dict) -> bool:
+    """True if the headers mark the message as machine-sent."""
+    headers = {k.lower(): (v or "").strip().lower() for k, v in (email_data.get("auto_headers") or {}).items()}
+    auto_submitted = headers.get("auto-submitted", "")
+    if auto_submitted and auto_submitted != "no":
+        return True
+    if headers.get("x-autoreply") or headers.get("x-autorespond"):
+        return True
+    return headers.get("precedence") in _AUTO_PRECEDENCE
+
+
+def _looks_like_auto_reply(email_data: dict, reply: str) -> bool:
+    """True if the subject or the body alone reads like an out-of-office note.
+
+    Never for a question or a pause/resume request, which detect_intent
+    and the coach need to see.
+    """
+    # Imported here: coaching_service imports this module
+    from services.coaching_service import PAUSE_KEYWORDS, RESUME_KEYWORDS
+
+    lower = reply.lower()
+    if "?" in reply or any(kw in lower for kw in PAUSE_KEYWORDS + RESUME_KEYWORDS):
+        return False
+    if _AUTO_SUBJECT_RE.match((email_data.get("subject") or "").strip()):
+        return True
+    limit = MAX_AUTO_REPLY_CHARS if email_data.get("in_reply_to") else MAX_UNTHREADED_AUTO_REPLY_CHARS
+    return len(reply) <= limit and bool(_AUTO_BODY_RE.search(reply))
+
+
+def canned_reply(reply: str, first_name: str) -> str:
+    """Short draft answering an acknowledgement."""
+    if _THANKS_RE.search(reply):
+        return f"Anytime, {first_name}! Keep the momentum going."
+    return f"Sounds good, {first_name}! Keep me posted on how it goes."
+
+
+def record(route: str):
+    """Count a triaged email on the active telemetry collectors."""
+    telemetry.count(f"triage.{route}")
+    telemetry.count("triage.llm_calls_avoided", LLM_CALLS_PER_EMAIL)
+
+
+def report(summary: dict) -> dict:
+    """Triage counts from a telemetry summary, with the share of LLM calls avoided."""
+    counts = summary.get("counts") or {}
+    avoided = counts.get("triage.llm_calls_avoided", 0)
+    made = sum(row["calls"] for row in summary.get("llm") or [])
+    return {
+        "routes": {name.split(".", 1)[1]: n for name, n in counts.items()
+                   if name.startswith("triage.") and name != "triage.llm_calls_avoided"},
+        "llm_calls_avoided": avoided,
+        "llm_calls_avoided_share": round(avoided / (avoided + made), 3) if avoided + made else 0.0,
+    }
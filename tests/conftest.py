@@ -4,6 +4,7 @@ All tests use fake versions of Supabase, OpenAI, and Gmail so nothing
 touches real services, sends real emails, or costs API credits.
 """
 
+import itertools
 import os
 import sys
 import uuid
@@ -96,6 +97,8 @@ def make_conversation(**overrides):
         "approved_at": None,
         "evaluation_details": None,
         "send_attempts": 0,
+        "was_edited": None,
+        "response_time_seconds": None,
     }
     defaults.update(overrides)
     return defaults
@@ -145,11 +148,294 @@ class FakeQueryBuilder:
         return MagicMock(data=self._data)
 
 
-@pytest.fixture
-def mock_db(monkeypatch):
-    """Provides a dict-based fake database. Patches db.supabase_client functions.
+class FakeSupabaseClient:
+    """In-memory stand-in for the supabase client that counts round trips.
 
-    Returns a storage dict so tests can set up data and inspect calls.
+    Unlike install_fake_db, the real db.supabase_client functions run
+    unchanged; only get_client() is swapped. Each execute() is one PostgREST
+    request and is appended to .queries as (table or rpc name, operation).
+    """
+
+    def __init__(self, settings=None):
+        self.tables = {
+            "users": [], "conversations": [], "workflow_runs": [],
+            "model_responses": [], "corrected_responses": [], "resources": [], "settings": [], "jobs": [],
+        }
+        for key, value in (settings or {}).items():
+            self.tables["settings"].append({"key": key, "value": value})
+        self.queries = []
+
+    def table(self, name):
+        return _FakeTable(self, name)
+
+    def rpc(self, name, params=None):
+        return _FakeRPC(self, name, params or {})
+
+    def counts(self) -> dict:
+        """{name: number of round trips} for assertion messages."""
+        totals = {}
+        for name, op in self.queries:
+            totals[f"{name}.{op}"] = totals.get(f"{name}.{op}", 0) + 1
+        return totals
+
+
+def _split_columns(columns: str) -> list[str]:
+    """Split a PostgREST select list on top-level commas."""
+    parts, depth, current = [], 0, ""
+    for ch in columns:
+        if ch == "," and depth == 0:
+            parts.append(current.strip())
+            current = ""
+            continue
+        depth += (ch == "(") - (ch == ")")
+        current += ch
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+
+def _matches(value, op, target):
+    if op == "eq":
+        return value == target
+    if op == "neq":
+        return value != target
+    if op == "in":
+        return value in target
+    if op == "is":
+        return value is None if target in (None, "null") else value is target
+    if value is None:
+        return False
+    return {"gt": value > target, "gte": value >= target,
+            "lt": value < target, "lte": value <= target}[op]
+
+
+def _parse_atom(atom: str) -> tuple:
+    column, op, value = atom.split(".", 2)
+    return column, op, value.strip('"')
+
+
+class _FakeTable:
+    def __init__(self, client, name):
+        self._client = client
+        self._name = name
+        self._op = "select"
+        self._columns = "*"
+        self._payload = None
+        self._filters = []
+        self._ors = []
+        self._orders = []
+        self._limit = None
+        self.not_ = _FakeNot(self)
+
+    # Operations
+    def select(self, columns="*", **kw):
+        self._columns = columns
+        return self
+
+    def insert(self, data):
+        self._op, self._payload = "insert", data
+        return self
+
+    def update(self, data):
+        self._op, self._payload = "update", data
+        return self
+
+    def upsert(self, data, **kw):
+        self._op, self._payload = "upsert", data
+        return self
+
+    def delete(self):
+        self._op = "delete"
+        return self
+
+    # Filters
+    def _filter(self, column, op, value, negate=False):
+        self._filters.append((column, op, value, negate))
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, "eq", value)
+
+    def neq(self, column, value):
+        return self._filter(column, "neq", value)
+
+    def in_(self, column, values):
+        return self._filter(column, "in", list(values))
+
+    def is_(self, column, value):
+        return self._filter(column, "is", value)
+
+    def gt(self, column, value):
+        return self._filter(column, "gt", value)
+
+    def gte(self, column, value):
+        return self._filter(column, "gte", value)
+
+    def lt(self, column, value):
+        return self._filter(column, "lt", value)
+
+    def lte(self, column, value):
+        return self._filter(column, "lte", value)
+
+    def or_(self, expression):
+        # "col.op.value,and(col.op.value,...)": each branch is a list of atoms that must all match
+        branches = []
+        for branch in _split_columns(expression):
+            if branch.startswith("and(") and branch.endswith(")"):
+                branches.append([_parse_atom(atom) for atom in _split_columns(branch[4:-1])])
+            else:
+                branches.append([_parse_atom(branch)])
+        self._ors.append(branches)
+        return self
+
+    def order(self, column, desc=False):
+        self._orders.append((column, desc))
+        return self
+
+    def limit(self, n):
+        self._limit = n
+        return self
+
+    # Execution
+    def _selected(self, rows):
+        return [r for r in rows if self._keep(r)]
+
+    def _keep(self, row):
+        for column, op, value, negate in self._filters:
+            if _matches(row.get(column), op, value) == negate:
+                return False
+        for branches in self._ors:
+            if not any(all(_matches(row.get(c), op, v) for c, op, v in atoms) for atoms in branches):
+                return False
+        return True
+
+    def _project(self, row):
+        out = {}
+        for column in _split_columns(self._columns):
+            if column == "*":
+                out.update(row)
+            elif "(" in column:
+                embed, inner = column[:-1].split("(", 1)
+                parent_id = row.get(f"{embed.rstrip('s')}_id")
+                parent = next((p for p in self._client.tables.get(embed, []) if p.get("id") == parent_id), None)
+                out[embed] = None if parent is None else {
+                    c: parent.get(c) for c in _split_columns(inner)
+                }
+            else:
+                out[column] = row.get(column)
+        return out
+
+    def execute(self):
+        self._client.queries.append((self._name, self._op))
+        rows = self._client.tables.setdefault(self._name, [])
+        now = datetime.now(timezone.utc).isoformat()
+
+        if self._op in ("insert", "upsert"):
+            payload = self._payload if isinstance(self._payload, list) else [self._payload]
+            written = []
+            for data in payload:
+                key = "key" if self._name == "settings" else "id"
+                existing = next((r for r in rows if key in data and r.get(key) == data[key]), None)
+                if self._op == "upsert" and existing is not None:
+                    existing.update(data)
+                    written.append(dict(existing))
+                    continue
+                row = {"id": str(uuid.uuid4()), "created_at": now, **data}
+                if self._name == "workflow_runs":
+                    row.setdefault("started_at", now)
+                rows.append(row)
+                written.append(dict(row))
+            return MagicMock(data=written, count=None)
+
+        matched = self._selected(rows)
+        if self._op == "update":
+            for row in matched:
+                row.update(self._payload)
+            return MagicMock(data=[dict(r) for r in matched], count=None)
+        if self._op == "delete":
+            self._client.tables[self._name] = [r for r in rows if r not in matched]
+            return MagicMock(data=[dict(r) for r in matched], count=None)
+
+        for column, desc in reversed(self._orders):
+            matched.sort(key=lambda r: (r.get(column) is None, r.get(column) or ""), reverse=desc)
+        if self._limit is not None:
+            matched = matched[:self._limit]
+        return MagicMock(data=[self._project(r) for r in matched], count=len(matched))
+
+
+class _FakeNot:
+    def __init__(self, table):
+        self._table = table
+
+    def is_(self, column, value):
+        return self._table._filter(column, "is", value, negate=True)
+
+
+class _FakeRPC:
+    """The RPCs the workflows call, computed over the client's tables."""
+
+    def __init__(self, client, name, params):
+        self._client = client
+        self._name = name
+        self._params = params
+
+    def execute(self):
+        self._client.queries.append((self._name, "rpc"))
+        handler = getattr(self, f"_{self._name}", None)
+        return MagicMock(data=handler(**self._params) if handler else [])
+
+    def _conversations(self, user_id, status=None):
+        return [c for c in self._client.tables["conversations"]
+                if c.get("user_id") == user_id and (status is None or c.get("status") == status)]
+
+    def _get_recent_conversations_for_users(self, user_ids, per_user=3):
+        rows = []
+        for uid in user_ids:
+            sent = sorted(self._conversations(uid, "Sent"), key=lambda c: c["created_at"], reverse=True)
+            rows.extend(sent[:per_user])
+        return rows
+
+    def _enqueue_jobs(self, p_jobs):
+        jobs = self._client.tables["jobs"]
+        live = {j["dedupe_key"] for j in jobs if j["dedupe_key"] and j["status"] in ("queued", "running")}
+        inserted = 0
+        for row in p_jobs:
+            if row.get("dedupe_key") and row["dedupe_key"] in live:
+                continue
+            now = datetime.now(timezone.utc).isoformat()
+            jobs.append({
+                "id": str(uuid.uuid4()), "status": "queued", "attempts": 0, "locked_by": None,
+                "locked_until": None, "last_error": None, "created_at": now, "completed_at": None,
+                **row, "run_after": row.get("run_after") or now,
+            })
+            live.add(row.get("dedupe_key"))
+            inserted += 1
+        return inserted
+
+    def _claim_jobs(self, worker_id, p_job_type, max_jobs=10, lease_seconds=300):
+        now = datetime.now(timezone.utc)
+        due = sorted(
+            (j for j in self._client.tables["jobs"]
+             if j["job_type"] == p_job_type and j["status"] == "queued"
+             and datetime.fromisoformat(j["run_after"]) <= now),
+            key=lambda j: (j["priority"], j["run_after"]),
+        )[:max_jobs]
+        for j in due:
+            j.update({"status": "running", "locked_by": worker_id, "attempts": j["attempts"] + 1,
+                      "locked_until": (now + timedelta(seconds=lease_seconds)).isoformat()})
+        return [dict(j) for j in due]
+
+    def _count_thread_replies(self, p_user_id):
+        sent = sorted(self._conversations(p_user_id, "Sent"), key=lambda c: c["created_at"])
+        checkins = [c["created_at"] for c in sent if c.get("type") == "Check-in"]
+        since = checkins[-1] if checkins else ""
+        return sum(1 for c in sent if c.get("type") == "Follow-up" and c["created_at"] > since)
+
+
+def install_fake_db(monkeypatch):
+    """Patch db.supabase_client functions with a dict-based fake database.
+
+    Returns the storage dict. Shared by the mock_db fixture and benchmarks/.
     """
     storage = {
         "users": [],
@@ -167,20 +453,25 @@ def mock_db(monkeypatch):
         "model_responses": [],
         "corrections": [],
         "workflow_runs": [],
+        "jobs": [],
     }
 
-    def get_user_by_email(email):
+    def get_user_by_email(email, projection="context"):
         for u in storage["users"]:
             if u["email"].lower() == email.lower():
                 return u
         return None
 
-    def get_user_by_id(user_id):
+    def get_user_by_id(user_id, projection="context"):
         for u in storage["users"]:
             if u["id"] == user_id:
                 return u
         return None
 
+    def get_users_by_ids(user_ids, projection="context"):
+        ids = set(user_ids)
+        return [u for u in storage["users"] if u["id"] in ids]
+
     def create_user(email, first_name=None):
         user = make_user(email=email.lower(), first_name=first_name or "there")
         storage["users"].append(user)
@@ -193,6 +484,13 @@ def mock_db(monkeypatch):
                 return u
         return None
 
+    def update_users(user_ids, updates):
+        ids = set(user_ids)
+        matched = [u for u in storage["users"] if u["id"] in ids]
+        for u in matched:
+            u.update(updates)
+        return len(matched)
+
     def delete_user(user_id):
         storage["users"] = [u for u in storage["users"] if u["id"] != user_id]
         storage["conversations"] = [c for c in storage["conversations"] if c.get("user_id") != user_id]
@@ -203,6 +501,9 @@ def mock_db(monkeypatch):
         storage["conversations"].append(data)
         return data
 
+    def create_conversations(rows, chunk_size=500):
+        return [create_conversation(row) for row in rows]
+
     def update_conversation(conv_id, updates):
         for c in storage["conversations"]:
             if c["id"] == conv_id:
@@ -224,9 +525,29 @@ def mock_db(monkeypatch):
                       if c.get("user_id") == user_id and c.get("status") == "Sent"]
         return user_convs[-limit:]
 
-    def get_conversations_for_user(user_id):
+    def get_latest_evaluated_confidence(user_id):
+        evaluated = [c for c in storage["conversations"]
+                     if c.get("user_id") == user_id and c.get("evaluation_details") is not None]
+        return evaluated[-1]["confidence"] if evaluated else None
+
+    def get_recent_conversations_for_users(user_ids, limit=3):
+        return {uid: list(reversed(get_recent_conversations(uid, limit))) for uid in user_ids}
+
+    def get_latest_sent_message_ids(user_ids):
+        latest = {uid: get_recent_conversations(uid, limit=1) for uid in user_ids}
+        return {uid: recent[0]["gmail_message_id"] for uid, recent in latest.items()
+                if recent and recent[0].get("gmail_message_id")}
+
+    def get_conversations_for_user(user_id, projection="light"):
         return [c for c in storage["conversations"] if c.get("user_id") == user_id]
 
+    def get_conversations_for_users(user_ids, status=None, projection="light"):
+        grouped = {uid: [] for uid in user_ids}
+        for c in storage["conversations"]:
+            if c.get("user_id") in grouped and (status is None or c.get("status") == status):
+                grouped[c["user_id"]].append(c)
+        return grouped
+
     def get_approved_unsent():
         results = []
         for c in storage["conversations"]:
@@ -244,8 +565,30 @@ def mock_db(monkeypatch):
                 results.append(c_copy)
         return results
 
-    def get_conversations_by_status(status):
-        return [c for c in storage["conversations"] if c.get("status") == status]
+    def get_conversations_for_send(conversation_ids):
+        ids = set(conversation_ids)
+        return [
+            {**c, "users": get_user_by_id(c.get("user_id"))}
+            for c in storage["conversations"]
+            if c["id"] in ids and c.get("status") in ("Approved", "Send Failed")
+        ]
+
+    def get_conversations_by_status(status, limit=None, after=None):
+        rows = sorted(
+            (c for c in storage["conversations"] if c.get("status") == status),
+            key=lambda c: (c.get("created_at") or "", c["id"]),
+        )
+        if after:
+            rows = [c for c in rows if (c.get("created_at") or "", c["id"]) > tuple(after)]
+        return rows[:limit] if limit else rows
+
+    def get_status_counts():
+        counts = {"conversations": {}, "users": {}}
+        for kind in counts:
+            for row in storage[kind]:
+                status = row.get("status") or "Unknown"
+                counts[kind][status] = counts[kind].get(status, 0) + 1
+        return counts
 
     def get_model_responses_by_stage(stage):
         return [m for m in storage["model_responses"] if m.get("stage") == stage]
@@ -256,6 +599,9 @@ def mock_db(monkeypatch):
     def get_setting(key, default=None):
         return storage["settings"].get(key, default)
 
+    def get_settings(defaults):
+        return {key: storage["settings"].get(key, default) for key, default in defaults.items()}
+
     def set_setting(key, value):
         storage["settings"][key] = value
 
@@ -264,19 +610,104 @@ def mock_db(monkeypatch):
         storage["workflow_runs"].append({"id": run_id, "workflow_name": name, "status": "running"})
         return run_id
 
-    def complete_workflow_run(run_id, items_processed=0, items_failed=0, items_skipped=0):
+    def complete_workflow_run(run_id, items_processed=0, items_failed=0, items_skipped=0, metrics=None):
         for r in storage["workflow_runs"]:
             if r["id"] == run_id:
                 r["status"] = "completed_with_errors" if items_failed > 0 else "completed"
                 r["items_processed"] = items_processed
                 r["items_failed"] = items_failed
                 r["items_skipped"] = items_skipped
+                r["metrics"] = metrics
 
-    def fail_workflow_run(run_id, error_message):
+    def fail_workflow_run(run_id, error_message, metrics=None):
         for r in storage["workflow_runs"]:
             if r["id"] == run_id:
                 r["status"] = "failed"
                 r["error_message"] = error_message
+                r["metrics"] = metrics
+
+    def enqueue_jobs(jobs):
+        live = {j["dedupe_key"] for j in storage["jobs"]
+                if j["dedupe_key"] and j["status"] in ("queued", "running")}
+        inserted = 0
+        for row in jobs:
+            if row.get("dedupe_key") and row["dedupe_key"] in live:
+                continue
+            now = datetime.now(timezone.utc).isoformat()
+            storage["jobs"].append({
+                "id": str(uuid.uuid4()), "status": "queued", "attempts": 0,
+                "locked_by": None, "locked_until": None, "last_error": None,
+                "created_at": now, "completed_at": None,
+                **row, "run_after": row.get("run_after") or now,
+            })
+            live.add(row.get("dedupe_key"))
+            inserted += 1
+        return inserted
+
+    def _job_is_due(j, now):
+        return ((j["status"] == "queued" and datetime.fromisoformat(j["run_after"]) <= now)
+                or (j["status"] == "running" and datetime.fromisoformat(j["locked_until"]) < now))
+
+    def claim_jobs(worker_id, job_type, limit=10, lease_seconds=300):
+        now = datetime.now(timezone.utc)
+        due = [j for j in storage["jobs"] if j["job_type"] == job_type and _job_is_due(j, now)]
+        due.sort(key=lambda j: (j["priority"], j["run_after"]))
+        for j in due[:limit]:
+            j.update({
+                "status": "running", "locked_by": worker_id, "attempts": j["attempts"] + 1,
+                "locked_until": (now + timedelta(seconds=lease_seconds)).isoformat(),
+            })
+        return [dict(j) for j in due[:limit]]
+
+    def complete_jobs(job_ids, worker_id):
+        for j in storage["jobs"]:
+            if j["id"] in job_ids and j["locked_by"] == worker_id:
+                j.update({"status": "done", "locked_by": None, "locked_until": None,
+                          "completed_at": datetime.now(timezone.utc).isoformat()})
+
+    def fail_stale_workflow_runs(older_than_hours=4):
+        cutoff = (datetime.now(timezone.utc) - timedelta(hours=older_than_hours)).isoformat()
+        stale = [r for r in storage["workflow_runs"]
+                 if r["status"] == "running" and r.get("started_at", cutoff) < cutoff]
+        for r in stale:
+            r.update({"status": "failed", "error_message": "Run did not finish (process killed or timed out)"})
+        return len(stale)
+
+    def release_jobs(job_ids, worker_id):
+        released = 0
+        for j in storage["jobs"]:
+            if j["id"] in job_ids and j["locked_by"] == worker_id and j["status"] == "running":
+                j.update({"status": "queued", "attempts": max(j["attempts"] - 1, 0), "locked_by": None,
+                          "locked_until": None, "run_after": datetime.now(timezone.utc).isoformat()})
+                released += 1
+        return released
+
+    def fail_job(job_id, worker_id, error, retry_at=None):
+        for j in storage["jobs"]:
+            if j["id"] == job_id and j["locked_by"] == worker_id:
+                j.update({"last_error": error, "locked_by": None, "locked_until": None})
+                if retry_at is None:
+                    j.update({"status": "dead", "completed_at": datetime.now(timezone.utc).isoformat()})
+                else:
+                    j.update({"status": "queued", "run_after": retry_at.isoformat()})
+
+    def has_due_jobs(job_types):
+        now = datetime.now(timezone.utc)
+        return any(j["job_type"] in job_types and _job_is_due(j, now) for j in storage["jobs"])
+
+    def get_job_counts():
+        counts = {}
+        for j in storage["jobs"]:
+            if j["status"] != "done":
+                key = (j["job_type"], j["status"])
+                counts[key] = counts.get(key, 0) + 1
+        return [{"job_type": t, "status": st, "jobs": n, "oldest": None} for (t, st), n in sorted(counts.items())]
+
+    def get_dead_jobs(limit=20):
+        return [j for j in storage["jobs"] if j["status"] == "dead"][:limit]
+
+    def delete_finished_jobs(older_than_days=7):
+        return 0
 
     def get_active_users_needing_checkin(days_since=3):
         users = []
@@ -292,7 +723,7 @@ def mock_db(monkeypatch):
                     users.append(u)
         return users
 
-    def get_active_users_for_checkin_today(day_of_week):
+    def get_active_users_for_checkin_today(day_of_week, settings=None):
         default_days_str = storage["settings"].get("default_checkin_days", "tue,fri")
         default_days = [d.strip().lower() for d in default_days_str.split(",")]
         min_days = int(storage["settings"].get("checkin_min_days_since_response", "3"))
@@ -338,6 +769,9 @@ def mock_db(monkeypatch):
             for c in storage["conversations"]
         )
 
+    def get_users_with_pending_outreach(user_ids):
+        return {uid for uid in user_ids if has_pending_outreach(uid)}
+
     def get_onboarding_users():
         return [u for u in storage["users"] if u.get("status") == "Onboarding"]
 
@@ -348,6 +782,9 @@ def mock_db(monkeypatch):
                 return (datetime.now(timezone.utc) - created).days < within_days
         return False
 
+    def get_users_with_recent_reengagement(user_ids, within_days=14):
+        return {uid for uid in user_ids if has_recent_reengagement(uid, within_days)}
+
     def count_thread_replies(user_id):
         return sum(
             1 for c in storage["conversations"]
@@ -362,18 +799,46 @@ def mock_db(monkeypatch):
     def get_resources_by_stage(stage=None):
         return []
 
-    def get_correction_stats():
+    def get_correction_stats(start_date=None, end_date=None):
         return {}
 
     def get_all_resources():
         return []
 
-    def get_confidence_calibration_data():
+    def get_edit_rate_by_confidence(start_date=None, end_date=None):
         return []
 
+    def get_response_time_summary(start_date=None, end_date=None):
+        return {"responses": 0, "avg_hours": None, "median_hours": None,
+                "min_hours": None, "max_hours": None}
+
+    def get_response_time_histogram(start_date=None, end_date=None):
+        return []
+
+    def get_satisfaction_daily(start_date=None, end_date=None):
+        return []
+
+    def get_satisfaction_summary(start_date=None, end_date=None):
+        return {"avg_score": None, "responses": 0, "unique_users": 0}
+
     def get_satisfaction_trend(user_id=None, limit=50):
         return []
 
+    def get_stage_latency(start_date=None, end_date=None):
+        return []
+
+    def get_generate_latency(start_date=None, end_date=None, by_day=False):
+        return []
+
+    def get_llm_usage(start_date=None, end_date=None):
+        return []
+
+    def get_run_throughput(start_date=None, end_date=None):
+        return []
+
+    def get_slowest_conversations(start_date=None, end_date=None, limit=20):
+        return []
+
     # Knowledge base functions
     storage["knowledge_chunks"] = []
 
@@ -456,18 +921,26 @@ def mock_db(monkeypatch):
     monkeypatch.setattr(db_mod, "get_user_by_id", get_user_by_id)
     monkeypatch.setattr(db_mod, "create_user", create_user)
     monkeypatch.setattr(db_mod, "update_user", update_user)
+    monkeypatch.setattr(db_mod, "update_users", update_users)
     monkeypatch.setattr(db_mod, "delete_user", delete_user)
     monkeypatch.setattr(db_mod, "create_conversation", create_conversation)
+    monkeypatch.setattr(db_mod, "create_conversations", create_conversations)
     monkeypatch.setattr(db_mod, "update_conversation", update_conversation)
     monkeypatch.setattr(db_mod, "delete_conversation", delete_conversation)
     monkeypatch.setattr(db_mod, "conversation_exists_for_message", conversation_exists_for_message)
     monkeypatch.setattr(db_mod, "get_recent_conversations", get_recent_conversations)
+    monkeypatch.setattr(db_mod, "get_latest_evaluated_confidence", get_latest_evaluated_confidence)
+    monkeypatch.setattr(db_mod, "get_recent_conversations_for_users", get_recent_conversations_for_users)
+    monkeypatch.setattr(db_mod, "get_latest_sent_message_ids", get_latest_sent_message_ids)
     monkeypatch.setattr(db_mod, "get_conversations_for_user", get_conversations_for_user)
+    monkeypatch.setattr(db_mod, "get_conversations_for_users", get_conversations_for_users)
     monkeypatch.setattr(db_mod, "get_approved_unsent", get_approved_unsent)
     monkeypatch.setattr(db_mod, "get_conversations_by_status", get_conversations_by_status)
+    monkeypatch.setattr(db_mod, "get_status_counts", get_status_counts)
     monkeypatch.setattr(db_mod, "get_model_responses_by_stage", get_model_responses_by_stage)
     monkeypatch.setattr(db_mod, "get_recent_corrections", get_recent_corrections)
     monkeypatch.setattr(db_mod, "get_setting", get_setting)
+    monkeypatch.setattr(db_mod, "get_settings", get_settings)
     monkeypatch.setattr(db_mod, "set_setting", set_setting)
     monkeypatch.setattr(db_mod, "start_workflow_run", start_workflow_run)
     monkeypatch.setattr(db_mod, "complete_workflow_run", complete_workflow_run)
@@ -476,15 +949,26 @@ def mock_db(monkeypatch):
     monkeypatch.setattr(db_mod, "get_active_users_for_checkin_today", get_active_users_for_checkin_today)
     monkeypatch.setattr(db_mod, "get_silent_users", get_silent_users)
     monkeypatch.setattr(db_mod, "has_pending_outreach", has_pending_outreach)
+    monkeypatch.setattr(db_mod, "get_users_with_pending_outreach", get_users_with_pending_outreach)
     monkeypatch.setattr(db_mod, "get_onboarding_users", get_onboarding_users)
     monkeypatch.setattr(db_mod, "has_recent_reengagement", has_recent_reengagement)
+    monkeypatch.setattr(db_mod, "get_users_with_recent_reengagement", get_users_with_recent_reengagement)
     monkeypatch.setattr(db_mod, "count_thread_replies", count_thread_replies)
     monkeypatch.setattr(db_mod, "get_resource_list_for_prompt", get_resource_list_for_prompt)
     monkeypatch.setattr(db_mod, "get_resources_by_stage", get_resources_by_stage)
     monkeypatch.setattr(db_mod, "get_correction_stats", get_correction_stats)
     monkeypatch.setattr(db_mod, "get_all_resources", get_all_resources)
-    monkeypatch.setattr(db_mod, "get_confidence_calibration_data", get_confidence_calibration_data)
+    monkeypatch.setattr(db_mod, "get_edit_rate_by_confidence", get_edit_rate_by_confidence)
+    monkeypatch.setattr(db_mod, "get_response_time_summary", get_response_time_summary)
+    monkeypatch.setattr(db_mod, "get_response_time_histogram", get_response_time_histogram)
+    monkeypatch.setattr(db_mod, "get_satisfaction_daily", get_satisfaction_daily)
+    monkeypatch.setattr(db_mod, "get_satisfaction_summary", get_satisfaction_summary)
     monkeypatch.setattr(db_mod, "get_satisfaction_trend", get_satisfaction_trend)
+    monkeypatch.setattr(db_mod, "get_stage_latency", get_stage_latency)
+    monkeypatch.setattr(db_mod, "get_generate_latency", get_generate_latency)
+    monkeypatch.setattr(db_mod, "get_llm_usage", get_llm_usage)
+    monkeypatch.setattr(db_mod, "get_run_throughput", get_run_throughput)
+    monkeypatch.setattr(db_mod, "get_slowest_conversations", get_slowest_conversations)
     monkeypatch.setattr(db_mod, "get_all_knowledge_sources", get_all_knowledge_sources)
     monkeypatch.setattr(db_mod, "get_chunks_by_source", get_chunks_by_source)
     monkeypatch.setattr(db_mod, "get_chunk_by_id", get_chunk_by_id)
@@ -492,18 +976,54 @@ def mock_db(monkeypatch):
     monkeypatch.setattr(db_mod, "update_knowledge_chunk", update_knowledge_chunk)
     monkeypatch.setattr(db_mod, "delete_chunks_by_source", delete_chunks_by_source)
     monkeypatch.setattr(db_mod, "get_knowledge_stats", get_knowledge_stats)
+    monkeypatch.setattr(db_mod, "get_users_by_ids", get_users_by_ids)
+    monkeypatch.setattr(db_mod, "get_conversations_for_send", get_conversations_for_send)
+    monkeypatch.setattr(db_mod, "enqueue_jobs", enqueue_jobs)
+    monkeypatch.setattr(db_mod, "claim_jobs", claim_jobs)
+    monkeypatch.setattr(db_mod, "complete_jobs", complete_jobs)
+    monkeypatch.setattr(db_mod, "release_jobs", release_jobs)
+    monkeypatch.setattr(db_mod, "fail_stale_workflow_runs", fail_stale_workflow_runs)
+    monkeypatch.setattr(db_mod, "fail_job", fail_job)
+    monkeypatch.setattr(db_mod, "get_job_counts", get_job_counts)
+    monkeypatch.setattr(db_mod, "has_due_jobs", has_due_jobs)
+    monkeypatch.setattr(db_mod, "get_dead_jobs", get_dead_jobs)
+    monkeypatch.setattr(db_mod, "delete_finished_jobs", delete_finished_jobs)
     monkeypatch.setattr(db_mod, "match_knowledge_chunks", match_knowledge_chunks)
 
     return storage
 
 
 @pytest.fixture
-def mock_openai(monkeypatch):
-    """Patches OpenAI service functions with controllable fakes.
+def fake_supabase(monkeypatch):
+    """Swap db.supabase_client.get_client() for a FakeSupabaseClient.
 
-    Returns a dict of MagicMock objects so tests can inspect calls
-    and override return values.
+    The real db functions run against in-memory tables, so tests can assert
+    how many PostgREST round trips a workflow makes (client.queries).
+    """
+    import db.supabase_client as db_mod
+
+    client = FakeSupabaseClient(settings={
+        "global_auto_approve_threshold": "10",
+        "max_thread_replies": "4",
+        "default_checkin_days": "mon,tue,wed,thu,fri,sat,sun",
+        "ai_provider": "openai",
+        "ai_model": "gpt-4o",
+    })
+    monkeypatch.setattr(db_mod, "get_client", lambda: client)
+    return client
+
+
+@pytest.fixture
+def mock_db(monkeypatch):
+    """Provides a dict-based fake database. Patches db.supabase_client functions.
+
+    Returns a storage dict so tests can set up data and inspect calls.
     """
+    return install_fake_db(monkeypatch)
+
+
+def install_fake_openai(monkeypatch):
+    """Patch OpenAI service functions with MagicMock fakes; returns them by name."""
     import services.openai_service as oai
 
     mocks = {
@@ -530,6 +1050,7 @@ def mock_openai(monkeypatch):
         "analyze_satisfaction": MagicMock(return_value=7.0),
         "confirm_intent": MagicMock(return_value=True),
         "generate_email_subject": MagicMock(return_value="Checking in on your app"),
+        "classify_complexity": MagicMock(return_value="simple"),
     }
 
     for name, mock in mocks.items():
@@ -539,14 +1060,23 @@ def mock_openai(monkeypatch):
 
 
 @pytest.fixture
-def mock_gmail(monkeypatch):
-    """Patches Gmail service functions with no-op fakes.
+def mock_openai(monkeypatch):
+    """Patches OpenAI service functions with controllable fakes.
 
-    Returns a dict of MagicMock objects so tests can inspect calls.
+    Returns a dict of MagicMock objects so tests can inspect calls
+    and override return values.
     """
+    return install_fake_openai(monkeypatch)
+
+
+def install_fake_gmail(monkeypatch):
+    """Patch Gmail service functions with no-op MagicMock fakes; returns them by name."""
     import services.gmail_service as gmail
 
+    # New mail on every check by default, so process_emails never takes the idle exit
+    uidnext = itertools.count(1)
     mocks = {
+        "inbox_status": MagicMock(side_effect=lambda: {"uidvalidity": 1, "uidnext": next(uidnext), "unseen": 1}),
         "fetch_unread_emails": MagicMock(return_value=[]),
         "mark_as_read": MagicMock(),
         "mark_multiple_as_read": MagicMock(),
@@ -565,6 +1095,24 @@ def mock_gmail(monkeypatch):
     return mocks
 
 
+@pytest.fixture
+def mock_gmail(monkeypatch):
+    """Patches Gmail service functions with no-op fakes.
+
+    Returns a dict of MagicMock objects so tests can inspect calls.
+    """
+    return install_fake_gmail(monkeypatch)
+
+
+@pytest.fixture(autouse=True)
+def fresh_circuit_breakers():
+    """Start every test with all provider breakers closed."""
+    from services import circuit_breaker
+    circuit_breaker.reset()
+    yield
+    circuit_breaker.reset()
+
+
 @pytest.fixture(autouse=True)
 def no_sleep(monkeypatch):
     """Prevent any real sleeping during tests."""
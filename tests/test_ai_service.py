@@ -1,12 +1,16 @@
 """Tests for the AI service router.
 
-Covers: provider routing, fallback behavior, model validation.
+Covers: provider routing, fallback behavior, model validation, circuit
+breakers and failover, and complexity-based model routing.
 """
 
+import json
 from unittest.mock import MagicMock, patch
 
-from tests.conftest import make_user
-from services import ai_service
+import pytest
+
+from tests.conftest import make_conversation, make_email, make_user
+from services import ai_service, circuit_breaker, coaching_service, deadline, telemetry
 
 
 class TestAIServiceRouting:
@@ -105,3 +109,244 @@ class TestGetAIConfig:
         provider, model = ai_service.get_ai_config()
         assert provider == "anthropic"
         assert model == "claude-sonnet-4-6"  # Falls back to first Anthropic model
+
+
+class TestFailover:
+    """Circuit breakers and failover to ai_fallback_provider / ai_fallback_model."""
+
+    @staticmethod
+    def _configure_fallback(mock_db):
+        mock_db["settings"]["ai_fallback_provider"] = "anthropic"
+        mock_db["settings"]["ai_fallback_model"] = "claude-sonnet-4-6"
+
+    def test_routes_include_configured_fallback(self, mock_db):
+        self._configure_fallback(mock_db)
+        assert ai_service.get_ai_routes() == [("openai", "gpt-4o"), ("anthropic", "claude-sonnet-4-6")]
+
+    def test_fallback_on_same_provider_is_ignored(self, mock_db):
+        mock_db["settings"]["ai_fallback_provider"] = "openai"
+        assert ai_service.get_ai_routes() == [("openai", "gpt-4o")]
+
+    def test_failed_primary_fails_over(self, mock_db, mock_openai, mock_anthropic):
+        self._configure_fallback(mock_db)
+        mock_openai["generate_response"].side_effect = Exception("503 Service Unavailable")
+
+        result = ai_service.generate_response("test context")
+
+        assert result == mock_anthropic["generate_response"].return_value
+        assert mock_anthropic["generate_response"].call_args[1]["model"] == "claude-sonnet-4-6"
+
+    def test_open_breaker_skips_primary(self, mock_db, mock_openai, mock_anthropic):
+        self._configure_fallback(mock_db)
+        mock_openai["generate_response"].side_effect = Exception("503 Service Unavailable")
+
+        for _ in range(circuit_breaker.MIN_CALLS):
+            ai_service.generate_response("test context")
+        assert circuit_breaker.get("openai").state == circuit_breaker.OPEN
+
+        mock_openai["generate_response"].reset_mock()
+        ai_service.generate_response("test context")
+        mock_openai["generate_response"].assert_not_called()
+        assert mock_anthropic["generate_response"].call_count == circuit_breaker.MIN_CALLS + 1
+
+    def test_all_breakers_open_raises(self, mock_db, mock_openai):
+        mock_openai["generate_response"].side_effect = Exception("503 Service Unavailable")
+        for _ in range(circuit_breaker.MIN_CALLS):
+            with pytest.raises(Exception, match="503"):
+                ai_service.generate_response("test context")
+
+        with pytest.raises(circuit_breaker.CircuitOpen):
+            ai_service.generate_response("test context")
+
+    def test_half_open_probe_closes_breaker(self, mock_db, mock_openai, monkeypatch):
+        now = [1_000_000.0]
+        monkeypatch.setattr(circuit_breaker.time, "time", lambda: now[0])
+        mock_openai["generate_response"].side_effect = Exception("timeout")
+        for _ in range(circuit_breaker.MIN_CALLS):
+            with pytest.raises(Exception):
+                ai_service.generate_response("test context")
+
+        now[0] += circuit_breaker.OPEN_SECONDS
+        mock_openai["generate_response"].side_effect = None
+        ai_service.generate_response("test context")
+
+        assert circuit_breaker.get("openai").state == circuit_breaker.CLOSED
+
+    def test_deadline_during_probe_releases_it(self, mock_db, mock_openai, monkeypatch):
+        now = [1_000_000.0]
+        monkeypatch.setattr(circuit_breaker.time, "time", lambda: now[0])
+        mock_openai["generate_response"].side_effect = Exception("timeout")
+        for _ in range(circuit_breaker.MIN_CALLS):
+            with pytest.raises(Exception):
+                ai_service.generate_response("test context")
+
+        now[0] += circuit_breaker.OPEN_SECONDS
+        mock_openai["generate_response"].side_effect = deadline.DeadlineExceeded("Run deadline reached")
+        with pytest.raises(deadline.DeadlineExceeded):
+            ai_service.generate_response("test context")
+
+        assert circuit_breaker.get("openai").allow()
+
+    def test_slow_calls_count_as_failures(self):
+        breaker = circuit_breaker.get("openai")
+        for _ in range(circuit_breaker.MIN_CALLS):
+            breaker.record_success(circuit_breaker.SLOW_CALL_SECONDS + 1)
+        assert breaker.state == circuit_breaker.OPEN
+
+    def test_each_retry_counts_and_retries_stop_once_open(self, mock_db, monkeypatch):
+        from services import openai_service
+        client = MagicMock()
+        client.responses.create.side_effect = TimeoutError("Request timed out")
+        monkeypatch.setattr(openai_service, "_client", client)
+
+        with pytest.raises(TimeoutError):
+            ai_service.generate_response("test context")
+        assert circuit_breaker.get("openai").snapshot()["calls"] == openai_service.MAX_RETRIES
+
+        # The fifth failed attempt opens the breaker; the third retry is never made
+        with pytest.raises(TimeoutError):
+            ai_service.generate_response("test context")
+        assert circuit_breaker.get("openai").state == circuit_breaker.OPEN
+        assert client.responses.create.call_count == circuit_breaker.MIN_CALLS
+
+    def test_failures_add_up_across_runs(self, mock_db, mock_openai, mock_anthropic):
+        self._configure_fallback(mock_db)
+        mock_openai["generate_response"].side_effect = Exception("timeout")
+
+        # Three cron runs, each a new process that fails twice before its deadline
+        for run in range(3):
+            circuit_breaker.reset()
+            for _ in range(2):
+                ai_service.generate_response("test context")
+            if run < 2:
+                assert circuit_breaker.get("openai").state == circuit_breaker.CLOSED
+
+        assert circuit_breaker.get("openai").state == circuit_breaker.OPEN
+        saved = json.loads(mock_db["settings"][circuit_breaker.STATE_KEY])
+        assert saved["openai"]["calls"] == circuit_breaker.MIN_CALLS
+
+        circuit_breaker.reset()
+        mock_openai["generate_response"].reset_mock()
+        ai_service.generate_response("test context")
+        mock_openai["generate_response"].assert_not_called()
+
+    def test_open_state_carries_to_next_run(self, mock_db, mock_openai, mock_anthropic):
+        self._configure_fallback(mock_db)
+        mock_openai["generate_response"].side_effect = Exception("503 Service Unavailable")
+        for _ in range(circuit_breaker.MIN_CALLS):
+            ai_service.generate_response("test context")
+
+        saved = json.loads(mock_db["settings"][circuit_breaker.STATE_KEY])
+        assert saved["openai"]["state"] == circuit_breaker.OPEN
+
+        # A new process starts with no breakers, then reads the saved state
+        circuit_breaker.reset()
+        mock_openai["generate_response"].reset_mock()
+        ai_service.generate_response("test context")
+        mock_openai["generate_response"].assert_not_called()
+
+    def test_deadline_is_not_a_provider_failure(self, mock_db, mock_openai):
+        mock_openai["generate_response"].side_effect = deadline.DeadlineExceeded("out of time")
+        with pytest.raises(deadline.DeadlineExceeded):
+            ai_service.generate_response("test context")
+        assert circuit_breaker.get("openai").snapshot()["calls"] == 0
+
+
+def _context(message: str) -> str:
+    return f"## Context About This User\nName: Alice\n\n## Their Current Message\n{message}\n\n## Instructions\nBe brief."
+
+
+class TestModelRouting:
+    """Complexity-based routing between ai_fast_model and the premium ai_model."""
+
+    @pytest.fixture
+    def fast_routing(self, mock_db):
+        mock_db["settings"]["ai_fast_model"] = "gpt-4o-mini"
+        return mock_db["settings"]
+
+    def _model_used(self, mock_openai):
+        return mock_openai["generate_response"].call_args[1]["model"]
+
+    def test_no_fast_model_uses_premium(self, mock_db, mock_openai):
+        ai_service.generate_response(_context("Talked to 3 customers."))
+        assert self._model_used(mock_openai) == "gpt-4o"
+
+    def test_short_update_uses_fast_model(self, fast_routing, mock_openai):
+        ai_service.generate_response(_context("Talked to 3 customers, 2 want a demo."), user=make_user(stage="Ideation"))
+        assert self._model_used(mock_openai) == "gpt-4o-mini"
+
+    def test_long_message_uses_premium(self, fast_routing, mock_openai):
+        ai_service.generate_response(_context("word " * 81))
+        assert self._model_used(mock_openai) == "gpt-4o"
+
+    def test_max_words_is_configurable(self, fast_routing, mock_openai):
+        fast_routing["routing_max_words"] = "200"
+        ai_service.generate_response(_context("word " * 81))
+        assert self._model_used(mock_openai) == "gpt-4o-mini"
+
+    def test_premium_stage_uses_premium(self, fast_routing):
+        route, reason = ai_service.choose_route("Signed two customers.", make_user(stage="Growth"), settings=None)
+        assert (route, reason) == (ai_service.PREMIUM, "stage Growth")
+
+    def test_several_questions_use_premium(self, fast_routing):
+        assert ai_service.choose_route("Should I raise prices? Or add a tier?")[0] == ai_service.PREMIUM
+
+    def test_low_prior_confidence_uses_premium(self, fast_routing):
+        assert ai_service.choose_route("Done with the survey.", prior_confidence=4)[0] == ai_service.PREMIUM
+        assert ai_service.choose_route("Done with the survey.", prior_confidence=8)[0] == ai_service.FAST
+
+    def test_onboarding_uses_premium(self, fast_routing):
+        route, _ = ai_service.choose_route("Pricing.", message_type="onboarding challenge response")
+        assert route == ai_service.PREMIUM
+
+    def test_classifier_can_keep_premium(self, fast_routing, mock_openai):
+        fast_routing["routing_classifier"] = "on"
+        mock_openai["classify_complexity"].return_value = "complex"
+        assert ai_service.choose_route("My cofounder quit.")[0] == ai_service.PREMIUM
+
+        mock_openai["classify_complexity"].side_effect = Exception("timeout")
+        assert ai_service.choose_route("My cofounder quit.") == (ai_service.PREMIUM, "classifier failed")
+
+    def test_classifier_not_called_when_off(self, fast_routing, mock_openai):
+        ai_service.choose_route("Done with the survey.")
+        mock_openai["classify_complexity"].assert_not_called()
+
+    def test_fast_model_failure_falls_back_to_premium(self, fast_routing, mock_openai):
+        mock_openai["generate_response"].side_effect = [Exception("overloaded"), "Premium answer"]
+
+        assert ai_service.generate_response(_context("Sent the invoices.")) == "Premium answer"
+        assert [c[1]["model"] for c in mock_openai["generate_response"].call_args_list] == ["gpt-4o-mini", "gpt-4o"]
+
+    def test_fast_model_on_other_provider(self, fast_routing, mock_openai, mock_anthropic):
+        fast_routing["ai_fast_model"] = "claude-sonnet-4-6"
+        ai_service.generate_response(_context("Sent the invoices."))
+        mock_anthropic["generate_response"].assert_called_once()
+        mock_openai["generate_response"].assert_not_called()
+
+    def test_route_is_counted(self, fast_routing, mock_openai):
+        with telemetry.collect("conversation") as metrics:
+            ai_service.generate_response(_context("Sent the invoices."))
+        assert metrics.summary()["counts"] == {"generation_route.fast": 1}
+
+    def test_prior_confidence_from_last_evaluated_response(self, fast_routing, mock_db, mock_openai, mock_gmail):
+        user = make_user(email="alice@example.com", stage="Ideation")
+        mock_db["users"].append(user)
+        mock_db["conversations"].append(make_conversation(
+            user_id=user["id"], status="Sent", confidence=3, evaluation_details={"tone": 3}))
+
+        coaching_service.process_email(make_email(from_email="alice@example.com", body="Sent the invoices."))
+
+        assert self._model_used(mock_openai) == "gpt-4o"
+
+    def test_check_in_confidence_is_not_prior_confidence(self, fast_routing, mock_db, mock_openai, mock_gmail):
+        user = make_user(email="alice@example.com", stage="Ideation")
+        mock_db["users"].append(user)
+        mock_db["conversations"].append(make_conversation(
+            user_id=user["id"], status="Sent", confidence=3, evaluation_details={"tone": 3}))
+        # The check-in sent since carries a fixed confidence of 9
+        mock_db["conversations"].append(make_conversation(
+            user_id=user["id"], type="Check-in", status="Sent", confidence=9, evaluation_details=None))
+
+        coaching_service.process_email(make_email(from_email="alice@example.com", body="Sent the invoices."))
+
+        assert self._model_used(mock_openai) == "gpt-4o"
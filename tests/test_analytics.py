@@ -0,0 +1,183 @@
+"""Tests for the analytics db functions backing the Analytics dashboard page."""
+
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import db.supabase_client as db_mod
+from tests.conftest import make_user, make_conversation
+from workflows import send_approved
+
+
+def _rpc_client(mock_client, data):
+    mock_client.return_value.rpc.return_value.execute.return_value = MagicMock(data=data)
+    return mock_client.return_value
+
+
+# ── Date range params ─────────────────────────────────────────
+
+class TestDateRangeParams:
+    def test_open_range(self):
+        assert db_mod._date_range_params() == {"start_date": None, "end_date": None}
+
+    def test_datetimes_and_dates_become_iso(self):
+        start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        params = db_mod._date_range_params(start, date(2026, 2, 1))
+        assert params == {"start_date": "2026-01-01T00:00:00+00:00", "end_date": "2026-02-01"}
+
+    def test_strings_pass_through(self):
+        params = db_mod._date_range_params("2026-01-01", None)
+        assert params == {"start_date": "2026-01-01", "end_date": None}
+
+
+# ── Server-side aggregation ───────────────────────────────────
+
+class TestAnalyticsRPC:
+    """Analytics aggregate in Postgres; no conversation rows are downloaded."""
+
+    def test_edit_rate_by_confidence(self):
+        rows = [{"confidence": 8, "responses": 10, "edited": 3, "avg_response_time_hours": 2.5}]
+        start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        with patch.object(db_mod, "get_client") as mock_client:
+            client = _rpc_client(mock_client, rows)
+            result = db_mod.get_edit_rate_by_confidence(start)
+
+        client.rpc.assert_called_once_with(
+            "analytics_edit_rate_by_confidence",
+            {"start_date": start.isoformat(), "end_date": None},
+        )
+        client.table.assert_not_called()
+        assert result == rows
+
+    def test_response_time_summary(self):
+        row = {"responses": 4, "avg_hours": 3.0, "median_hours": 2.0, "min_hours": 0.5, "max_hours": 9.5}
+        with patch.object(db_mod, "get_client") as mock_client:
+            client = _rpc_client(mock_client, [row])
+            summary = db_mod.get_response_time_summary()
+
+        client.rpc.assert_called_once_with(
+            "analytics_response_time_summary", {"start_date": None, "end_date": None},
+        )
+        assert summary == row
+
+    def test_response_time_summary_empty(self):
+        with patch.object(db_mod, "get_client") as mock_client:
+            _rpc_client(mock_client, [{"responses": 0, "avg_hours": None, "median_hours": None,
+                                       "min_hours": None, "max_hours": None}])
+            summary = db_mod.get_response_time_summary()
+
+        assert summary["responses"] == 0
+        assert summary["avg_hours"] is None
+
+    def test_response_time_histogram(self):
+        rows = [{"bucket": "<1h", "bucket_order": 1, "responses": 2},
+                {"bucket": "1-2h", "bucket_order": 2, "responses": 0}]
+        with patch.object(db_mod, "get_client") as mock_client:
+            client = _rpc_client(mock_client, rows)
+            result = db_mod.get_response_time_histogram(end_date="2026-03-01")
+
+        client.rpc.assert_called_once_with(
+            "analytics_response_time_histogram", {"start_date": None, "end_date": "2026-03-01"},
+        )
+        assert result == rows
+
+    def test_correction_stats_from_rpc(self):
+        rows = [{"correction_type": "Tone", "corrections": 5},
+                {"correction_type": "Length", "corrections": 2}]
+        with patch.object(db_mod, "get_client") as mock_client:
+            client = _rpc_client(mock_client, rows)
+            stats = db_mod.get_correction_stats("2026-01-01", "2026-02-01")
+
+        client.rpc.assert_called_once_with(
+            "analytics_correction_counts", {"start_date": "2026-01-01", "end_date": "2026-02-01"},
+        )
+        client.table.assert_not_called()
+        assert stats == {"Tone": 5, "Length": 2}
+
+    def test_satisfaction_daily_and_summary(self):
+        daily = [{"day": "2026-01-02", "avg_score": 7.5, "responses": 2}]
+        with patch.object(db_mod, "get_client") as mock_client:
+            client = _rpc_client(mock_client, daily)
+            assert db_mod.get_satisfaction_daily() == daily
+            client.rpc.assert_called_with(
+                "analytics_satisfaction_daily", {"start_date": None, "end_date": None},
+            )
+
+        with patch.object(db_mod, "get_client") as mock_client:
+            _rpc_client(mock_client, [])
+            summary = db_mod.get_satisfaction_summary()
+
+        assert summary == {"avg_score": None, "responses": 0, "unique_users": 0}
+
+
+# ── Precomputed review metrics ────────────────────────────────
+
+class TestReviewMetrics:
+    def test_unedited_approval(self):
+        created = datetime(2026, 1, 1, 9, tzinfo=timezone.utc)
+        conv = make_conversation(created_at=created.isoformat(), ai_response="Keep going.")
+        approved_at = (created + timedelta(hours=2, seconds=5)).isoformat()
+
+        metrics = db_mod.compute_review_metrics(conv, approved_at)
+
+        assert metrics == {"was_edited": False, "response_time_seconds": 7205}
+
+    def test_edited_approval(self):
+        conv = make_conversation(ai_response="Keep going.")
+        metrics = db_mod.compute_review_metrics(conv, conv["created_at"], sent_response="Keep going!")
+        assert metrics["was_edited"] is True
+        assert metrics["response_time_seconds"] == 0
+
+    def test_whitespace_only_change_is_not_an_edit(self):
+        conv = make_conversation(ai_response="Keep going.")
+        metrics = db_mod.compute_review_metrics(conv, sent_response="  Keep going.\n")
+        assert metrics["was_edited"] is False
+
+    def test_missing_or_bad_timestamps(self):
+        conv = make_conversation(approved_at=None)
+        assert db_mod.compute_review_metrics(conv)["response_time_seconds"] is None
+        assert db_mod.compute_review_metrics(conv, "not a date")["response_time_seconds"] is None
+
+    def test_send_approved_stores_metrics(self, mock_db, mock_openai, mock_gmail):
+        user = make_user()
+        mock_db["users"].append(user)
+        created = datetime.now(timezone.utc) - timedelta(hours=3)
+        conv = make_conversation(
+            user_id=user["id"],
+            status="Approved",
+            ai_response="Talk to five customers this week.",
+            sent_response="Talk to ten customers this week.",
+            created_at=created.isoformat(),
+            approved_at=(created + timedelta(hours=1)).isoformat(),
+        )
+        mock_db["conversations"].append(conv)
+
+        send_approved.run()
+
+        stored = mock_db["conversations"][0]
+        assert stored["status"] == "Sent"
+        assert stored["was_edited"] is True
+        assert stored["response_time_seconds"] == 3600
+
+
+class TestBackfillReviewMetrics:
+    def test_backfill_loops_until_done(self, monkeypatch):
+        from scripts import backfill_review_metrics
+
+        batches = iter([500, 500, 120, 0])
+        calls = []
+
+        def fake_backfill(batch_size):
+            calls.append(batch_size)
+            return next(batches)
+
+        monkeypatch.setattr(db_mod, "backfill_review_metrics", fake_backfill)
+
+        assert backfill_review_metrics.backfill(batch_size=500) == 1120
+        assert calls == [500, 500, 500, 500]
+
+    def test_backfill_rpc(self):
+        with patch.object(db_mod, "get_client") as mock_client:
+            client = _rpc_client(mock_client, 42)
+            assert db_mod.backfill_review_metrics(250) == 42
+
+        client.rpc.assert_called_once_with("backfill_review_metrics", {"batch_size": 250})
@@ -0,0 +1,37 @@
+"""Call counts from the offline benchmarks must not grow past benchmarks/baseline.json."""
+
+import pytest
+
+from benchmarks.harness import SCENARIOS, compare, run_scenario
+from benchmarks.run import load_baseline
+
+NO_LATENCY = {"db": 0, "llm": 0, "imap": 0, "smtp": 0}
+
+
+class TestBenchmarkBaseline:
+    @pytest.mark.parametrize("workflow", sorted(SCENARIOS))
+    def test_call_counts_within_baseline(self, workflow):
+        baseline = load_baseline()
+        result = run_scenario(workflow, 10, NO_LATENCY)
+
+        assert f"{workflow}@10" in baseline
+        assert compare([result], baseline) == []
+
+    def test_extra_query_is_reported(self):
+        result = run_scenario("check_in", 10, NO_LATENCY)
+        baseline = {"check_in@10": {
+            "calls": {**result["calls"], "db": result["calls"]["db"] - 1},
+            "calls_by_function": {**result["calls_by_function"], "db.get_users_with_pending_outreach": 0},
+            "wall_seconds": result["wall_seconds"],
+        }}
+
+        regressions = compare([result], baseline)
+
+        assert len(regressions) == 1
+        assert "db calls" in regressions[0]
+        assert "db.get_users_with_pending_outreach" in regressions[0]
+
+    def test_seeding_is_not_counted(self):
+        result = run_scenario("re_engagement", 10, NO_LATENCY)
+        assert result["calls"]["llm"] == 0
+        assert result["calls_by_function"]["db.start_workflow_run"] == 1
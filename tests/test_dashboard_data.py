@@ -0,0 +1,161 @@
+"""Tests for the dashboard's cached, keyset-paginated data layer."""
+
+import os
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import db.supabase_client as db_mod
+from dashboard import data
+from tests.conftest import make_user, make_conversation
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dashboard", "pages")
+
+
+@pytest.fixture(autouse=True)
+def clear_dashboard_cache():
+    data.invalidate_all()
+    yield
+    data.invalidate_all()
+
+
+def _pending(mock_db, n):
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    convs = [make_conversation(created_at=(base + timedelta(minutes=i)).isoformat()) for i in range(n)]
+    mock_db["conversations"].extend(convs)
+    return convs
+
+
+class TestKeysetPagination:
+    def test_pages_in_created_order(self, mock_db):
+        convs = _pending(mock_db, 5)
+
+        rows, has_more = data.conversations_by_status("Pending Review", pages=1, page_size=2)
+        assert [c["id"] for c in rows] == [c["id"] for c in convs[:2]]
+        assert has_more
+
+        rows, has_more = data.conversations_by_status("Pending Review", pages=3, page_size=2)
+        assert [c["id"] for c in rows] == [c["id"] for c in convs]
+        assert not has_more
+
+    def test_db_keyset_filter(self):
+        with patch.object(db_mod, "get_client") as mock_client:
+            q = mock_client.return_value.table.return_value.select.return_value.eq.return_value
+            q.or_.return_value.order.return_value.order.return_value.limit.return_value.execute.return_value = \
+                MagicMock(data=[])
+
+            db_mod.get_conversations_by_status("Pending Review", limit=25, after=("2026-01-01T00:00:00+00:00", "abc"))
+
+        q.or_.assert_called_once_with(
+            'created_at.gt."2026-01-01T00:00:00+00:00",'
+            'and(created_at.eq."2026-01-01T00:00:00+00:00",id.gt.abc)'
+        )
+        q.or_.return_value.order.return_value.order.return_value.limit.assert_called_once_with(25)
+
+
+class TestCaching:
+    def test_cached_until_invalidated(self, mock_db):
+        _pending(mock_db, 1)
+        calls = []
+        original = db_mod.get_conversations_by_status
+
+        def counting(*args, **kwargs):
+            calls.append(args)
+            return original(*args, **kwargs)
+
+        with patch.object(db_mod, "get_conversations_by_status", counting):
+            data.conversations_by_status("Pending Review")
+            data.conversations_by_status("Pending Review")
+            assert len(calls) == 1
+
+            mock_db["conversations"][0]["status"] = "Approved"
+            data.invalidate_conversations()
+            rows, _ = data.conversations_by_status("Pending Review")
+
+        assert len(calls) == 2
+        assert rows == []
+
+    def test_invalidating_conversations_keeps_users_cached(self, mock_db):
+        with patch.object(db_mod, "get_all_users", MagicMock(return_value=[])) as get_all_users:
+            data.all_users()
+            data.invalidate_conversations()
+            data.all_users()
+
+        get_all_users.assert_called_once()
+
+
+class TestStatusCounts:
+    def test_grouped_rpc(self):
+        rows = [
+            {"kind": "conversations", "status": "Pending Review", "total": 12},
+            {"kind": "conversations", "status": "Flagged", "total": 2},
+            {"kind": "users", "status": "Active", "total": 30},
+            {"kind": "users", "status": "Paused", "total": 4},
+        ]
+        with patch.object(db_mod, "get_client") as mock_client:
+            mock_client.return_value.rpc.return_value.execute.return_value = MagicMock(data=rows)
+            counts = db_mod.get_status_counts()
+
+        mock_client.return_value.rpc.assert_called_once_with("get_status_counts", {})
+        mock_client.return_value.table.assert_not_called()
+        assert counts == {
+            "conversations": {"Pending Review": 12, "Flagged": 2},
+            "users": {"Active": 30, "Paused": 4},
+        }
+
+    def test_counts_refresh_after_invalidation(self, mock_db):
+        _pending(mock_db, 3)
+        assert data.conversation_count("Pending Review") == 3
+
+        mock_db["conversations"][0]["status"] = "Flagged"
+        assert data.conversation_count("Pending Review") == 3  # still cached
+
+        data.invalidate_conversations()
+        assert data.conversation_count("Pending Review") == 2
+        assert data.conversation_count("Flagged") == 1
+
+
+class TestPendingReviewHistory:
+    def test_history_rpc_groups_by_user(self):
+        rows = [
+            {"id": "c2", "user_id": "u1", "created_at": "2026-01-02", "user_message_parsed": "b",
+             "ai_response": "B", "sent_response": "B"},
+            {"id": "c1", "user_id": "u1", "created_at": "2026-01-01", "user_message_parsed": "a",
+             "ai_response": "A", "sent_response": "A"},
+        ]
+        with patch.object(db_mod, "get_client") as mock_client:
+            mock_client.return_value.rpc.return_value.execute.return_value = MagicMock(data=rows)
+            history = db_mod.get_recent_conversations_for_users(["u1", "u2"], limit=3)
+
+        mock_client.return_value.rpc.assert_called_once_with(
+            "get_recent_conversations_for_users", {"user_ids": ["u1", "u2"], "per_user": 3},
+        )
+        assert [c["id"] for c in history["u1"]] == ["c2", "c1"]
+        assert history["u2"] == []
+
+    def test_no_users_skips_query(self):
+        with patch.object(db_mod, "get_client") as mock_client:
+            assert db_mod.get_recent_conversations_for_users([]) == {}
+        mock_client.assert_not_called()
+
+    def test_page_prefetches_history_once(self, mock_db, monkeypatch):
+        for i in range(20):
+            user = make_user(email=f"user{i}@example.com")
+            mock_db["users"].append(user)
+            mock_db["conversations"].append(make_conversation(
+                user_id=user["id"], status="Sent", created_at=f"2026-01-01T00:{i:02d}:00+00:00",
+            ))
+            mock_db["conversations"].append(make_conversation(user_id=user["id"], users=user))
+
+        batched = MagicMock(side_effect=db_mod.get_recent_conversations_for_users)
+        monkeypatch.setattr(db_mod, "get_recent_conversations_for_users", batched)
+        monkeypatch.setattr(db_mod, "get_recent_conversations",
+                            MagicMock(side_effect=AssertionError("per-card history query")))
+
+        at = AppTest.from_file(os.path.join(PAGES_DIR, "1_pending_review.py"), default_timeout=30).run()
+
+        assert not at.exception
+        batched.assert_called_once()
+        assert len(batched.call_args[0][0]) == 20
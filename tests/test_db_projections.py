@@ -0,0 +1,82 @@
+"""Hot-path reads in db.supabase_client select explicit columns, never "*"."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+import db.supabase_client as db_mod
+
+
+class RecordingClient:
+    """Stands in for the Supabase client; records every select() projection."""
+
+    def __init__(self):
+        self.selects = []
+
+    def table(self, name):
+        self._table = name
+        return self
+
+    def select(self, *columns, **kwargs):
+        self.selects.append((self._table, ", ".join(columns)))
+        return self
+
+    def execute(self):
+        return MagicMock(data=[], count=0)
+
+    def __getattr__(self, name):
+        # Filters, ordering, limits and .not_ all chain back to the builder
+        if name == "not_":
+            return self
+        return lambda *args, **kwargs: self
+
+
+HOT_PATHS = {
+    "get_user_by_email": ("alice@example.com",),
+    "get_user_by_id": ("user-1",),
+    "get_active_users_needing_checkin": (),
+    "get_active_users_for_checkin_today": ("tue",),
+    "get_onboarding_users": (),
+    "get_silent_users": (),
+    "get_all_users": (),
+    "get_conversations_by_status": ("Pending Review",),
+    "get_approved_unsent": (),
+    "get_recent_conversations": ("user-1",),
+    "get_conversations_for_user": ("user-1",),
+    "get_all_conversations": (),
+    "get_model_responses_by_stage": ("Ideation",),
+    "get_recent_corrections": (),
+    "get_resource_list_for_prompt": ("Ideation",),
+    "get_all_settings": (),
+}
+
+
+@pytest.fixture
+def recording_client(monkeypatch):
+    client = RecordingClient()
+    monkeypatch.setattr(db_mod, "get_client", lambda: client)
+    return client
+
+
+class TestProjections:
+    @pytest.mark.parametrize("func_name", sorted(HOT_PATHS))
+    def test_hot_path_does_not_select_star(self, recording_client, func_name):
+        getattr(db_mod, func_name)(*HOT_PATHS[func_name])
+
+        assert recording_client.selects, f"{func_name} made no select()"
+        for table, columns in recording_client.selects:
+            assert "*" not in columns, f"{func_name} selects * from {table}"
+
+    def test_full_profile_is_opt_in(self, recording_client):
+        db_mod.get_all_users(projection="full")
+        assert recording_client.selects == [("users", "*")]
+
+    def test_light_user_profile_skips_large_columns(self):
+        light = db_mod.USER_PROJECTIONS["light"]
+        assert "summary" not in light
+        assert "notes" not in light
+
+    def test_context_conversation_profile_skips_raw_body(self):
+        context = db_mod.CONVERSATION_PROJECTIONS["context"]
+        assert "user_message_raw" not in context
+        assert "evaluation_details" not in context
@@ -0,0 +1,186 @@
+"""Tests for run deadlines: retries, job claiming and deferral, and stale runs."""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+import run_workflow
+from services import deadline, job_queue, openai_service
+from tests.conftest import make_conversation, make_user
+from workflows import cleanup, send_approved
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A controllable monotonic clock for deadline; advance with clock.now += seconds."""
+    class Clock:
+        now = 1000.0
+    monkeypatch.setattr(deadline.time, "monotonic", lambda: Clock.now)
+    return Clock
+
+
+class TestBudget:
+    def test_no_budget_means_no_limits(self):
+        assert deadline.remaining() is None
+        assert deadline.allows(10 ** 6)
+        assert deadline.timeout(120) == 120
+
+    def test_remaining_counts_down(self, clock):
+        with deadline.budget(60):
+            clock.now += 45
+            assert deadline.remaining() == 15
+            assert deadline.timeout(120) == 15
+            assert not deadline.allows(20)
+        assert deadline.remaining() is None
+
+    def test_nested_budget_only_shortens(self, clock):
+        with deadline.budget(60):
+            with deadline.budget(600):
+                assert deadline.remaining() == 60
+            with deadline.budget(10):
+                assert deadline.remaining() == 10
+
+    def test_check_raises_when_out_of_time(self, clock):
+        with deadline.budget(60):
+            clock.now += 58
+            with pytest.raises(deadline.DeadlineExceeded):
+                deadline.check("test call")
+
+
+class TestRetries:
+    def test_no_call_started_past_deadline(self, clock):
+        call = MagicMock()
+        with deadline.budget(3):
+            with pytest.raises(deadline.DeadlineExceeded):
+                openai_service._retry_with_backoff(call)
+        call.assert_not_called()
+
+    def test_retry_skipped_when_backoff_would_overrun(self, clock):
+        call = MagicMock(side_effect=TimeoutError("slow provider"))
+        with deadline.budget(6):
+            with pytest.raises(TimeoutError):
+                openai_service._retry_with_backoff(call)
+        assert call.call_count == 1
+
+    def test_retries_normally_with_time_left(self, clock):
+        call = MagicMock(side_effect=[TimeoutError(), "ok"])
+        with deadline.budget(600):
+            assert openai_service._retry_with_backoff(call) == "ok"
+
+    def test_request_timeout_shrinks_near_deadline(self, clock, monkeypatch):
+        client = MagicMock()
+        monkeypatch.setattr(openai_service, "_client", client)
+
+        assert openai_service.get_client() is client
+        with deadline.budget(30):
+            openai_service.get_client()
+        client.with_options.assert_called_once_with(timeout=30)
+
+
+class TestDrainUnderDeadline:
+    def test_claims_only_what_fits(self, mock_db, clock, monkeypatch):
+        item = job_queue.POLICIES["update_summary"]["item_seconds"]
+        seen = []
+
+        def handle(payload):
+            clock.now += item
+            seen.append(payload["n"])
+            return True
+
+        monkeypatch.setitem(job_queue._handlers, "update_summary", (handle, False))
+        job_queue.enqueue_many([job_queue.job("update_summary", {"n": n}) for n in range(20)])
+
+        with deadline.budget(item * 5 + 1):
+            result = job_queue.drain(["update_summary"])
+
+        # Five claimed up front; the claim after them finds no time left
+        assert seen == [0, 1, 2, 3, 4]
+        assert result["done"] == 5
+        queued = [j for j in mock_db["jobs"] if j["status"] == "queued"]
+        assert len(queued) == 15
+        assert all(j["attempts"] == 0 for j in queued)
+
+    def test_defers_jobs_not_reached_in_batch(self, mock_db, clock, monkeypatch):
+        def slow(payload):
+            clock.now += 145
+            return True
+
+        monkeypatch.setitem(job_queue._handlers, "update_summary", (slow, False))
+        job_queue.enqueue_many([job_queue.job("update_summary", {"n": n}) for n in range(3)])
+
+        with deadline.budget(150):
+            result = job_queue.drain(["update_summary"])
+
+        assert (result["done"], result["deferred"]) == (1, 2)
+        deferred = [j for j in mock_db["jobs"] if j["status"] == "queued"]
+        assert [j["attempts"] for j in deferred] == [0, 0]
+
+    def test_stops_claiming_after_a_deferred_batch(self, mock_db, clock, monkeypatch):
+        claims = []
+        claim_jobs = job_queue.db.claim_jobs
+
+        def counting_claim(*args):
+            jobs = claim_jobs(*args)
+            claims.append(len(jobs))
+            return jobs
+
+        monkeypatch.setattr(job_queue.db, "claim_jobs", counting_claim)
+        monkeypatch.setitem(job_queue.POLICIES, "send", {**job_queue.POLICIES["send"], "batch_size": 2})
+        # A batch handler that can never fit its work, like handle_sends near the deadline
+        monkeypatch.setitem(job_queue._handlers, "send", (lambda payloads: [job_queue.DEFERRED] * len(payloads), True))
+        job_queue.enqueue_many([job_queue.job("send", {"n": n}) for n in range(2)])
+
+        with deadline.budget(600):
+            result = job_queue.drain(["send"])
+
+        assert claims == [2]
+        assert result["deferred"] == 2
+        assert all(j["status"] == "queued" for j in mock_db["jobs"])
+
+    def test_deadline_hit_inside_handler_is_not_an_attempt(self, mock_db, monkeypatch):
+        def out_of_time(payload):
+            raise deadline.DeadlineExceeded("Run deadline reached before OpenAI API call")
+
+        monkeypatch.setitem(job_queue._handlers, "update_summary", (out_of_time, False))
+        job_queue.enqueue("update_summary", {})
+
+        result = job_queue.drain(["update_summary"])
+
+        assert result["deferred"] == 1 and result["errors"] == []
+        assert mock_db["jobs"][0]["status"] == "queued"
+        assert mock_db["jobs"][0]["attempts"] == 0
+
+    def test_send_wait_past_deadline_is_deferred(self, mock_db, mock_openai, mock_gmail, clock, monkeypatch):
+        user = make_user()
+        mock_db["users"].append(user)
+        mock_db["conversations"].append(make_conversation(user_id=user["id"], status="Approved", sent_at=None))
+        monkeypatch.setattr(send_approved.random, "randint", lambda a, b: 50)
+
+        with deadline.budget(30 * 60):
+            send_approved.run()
+
+        mock_gmail["send_email"].assert_not_called()
+        assert mock_db["jobs"][0]["status"] == "queued"
+        assert mock_db["workflow_runs"][0]["status"] == "completed"
+
+
+class TestRunRecords:
+    def test_run_workflow_applies_budget(self, mock_db, monkeypatch):
+        from workflows import re_engagement
+        seen = []
+        monkeypatch.setattr(re_engagement, "run", lambda: seen.append(deadline.remaining()))
+        monkeypatch.setenv("WORKFLOW_BUDGET_SECONDS", "42")
+
+        assert run_workflow.run_workflow("re_engagement")
+        assert 0 < seen[0] <= 42
+
+    def test_cleanup_fails_stale_running_runs(self, mock_db, mock_gmail):
+        started = (datetime.now(timezone.utc) - timedelta(hours=5)).isoformat()
+        mock_db["workflow_runs"].append({"id": "killed", "workflow_name": "process_emails",
+                                         "status": "running", "started_at": started})
+
+        cleanup.run()
+
+        killed = next(r for r in mock_db["workflow_runs"] if r["id"] == "killed")
+        assert killed["status"] == "failed"
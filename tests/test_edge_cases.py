@@ -188,9 +188,12 @@ class TestProcessEmailWorkflow:
 
         # Second email should have been processed (known user)
         assert any(u["email"] == "good@example.com" for u in mock_db["users"])
-        # First email should NOT be marked as read (so cleanup can catch it)
-        # Second email SHOULD be marked as read
-        mock_gmail["mark_multiple_as_read"].assert_called_once_with(["2"])
+        # Both are marked read once queued; the failed one retries from the job queue
+        mock_gmail["mark_multiple_as_read"].assert_called_once_with(["1", "2"])
+        failed = [j for j in mock_db["jobs"] if j["payload"]["from_email"] == "bad@example.com"]
+        assert failed[0]["status"] == "queued"
+        assert failed[0]["attempts"] == 1
+        assert "Simulated processing error" in failed[0]["last_error"]
 
 
 class TestCleanupWorkflow:
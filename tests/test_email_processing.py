@@ -1,10 +1,15 @@
 """Tests for email processing logic (coaching_service.process_email).
 
-Covers: new users, known users, pause/resume, duplicates, junk filtering, self-emails.
+Covers: new users, known users, pause/resume, duplicates, junk filtering, self-emails,
+and the process_emails idle check.
 """
 
+import json
+from unittest.mock import MagicMock
+
 from tests.conftest import make_user, make_email, make_conversation
-from services import coaching_service
+from services import coaching_service, gmail_service, job_queue
+from workflows import process_emails
 
 
 class TestUnknownSenderIgnored:
@@ -205,3 +210,72 @@ class TestIntentDetection:
     def test_case_insensitive(self):
         assert coaching_service.detect_intent("PAUSE") == "pause"
         assert coaching_service.detect_intent("RESUME") == "resume"
+
+
+class TestIdleTicks:
+    """process_emails skips ticks where the inbox STATUS shows nothing new."""
+
+    QUIET = {"uidvalidity": 1, "uidnext": 500, "unseen": 0}
+
+    def _status(self, mock_gmail, status):
+        mock_gmail["inbox_status"].side_effect = None
+        mock_gmail["inbox_status"].return_value = status
+
+    def test_no_unseen_mail_skips_run(self, mock_db, mock_openai, mock_gmail):
+        self._status(mock_gmail, self.QUIET)
+
+        process_emails.run()
+        process_emails.run()
+
+        mock_gmail["fetch_unread_emails"].assert_not_called()
+        assert mock_db["workflow_runs"] == []
+        assert json.loads(mock_db["settings"]["inbox_state"])["idle_ticks"] == 2
+
+    def test_full_run_records_and_resets_idle_ticks(self, mock_db, mock_openai, mock_gmail):
+        self._status(mock_gmail, self.QUIET)
+        process_emails.run()
+        self._status(mock_gmail, {"uidvalidity": 1, "uidnext": 501, "unseen": 1})
+
+        process_emails.run()
+
+        mock_gmail["fetch_unread_emails"].assert_called_once()
+        assert mock_db["workflow_runs"][0]["metrics"]["idle_ticks"] == 1
+        state = json.loads(mock_db["settings"]["inbox_state"])
+        assert (state["uidnext"], state["idle_ticks"]) == (501, 0)
+
+    def test_unchanged_leftover_unseen_mail_is_idle(self, mock_db, mock_openai, mock_gmail):
+        # Unseen mail the last full run already saw (e.g. our own messages)
+        leftover = {"uidvalidity": 1, "uidnext": 501, "unseen": 2}
+        self._status(mock_gmail, leftover)
+        process_emails.run()
+
+        process_emails.run()
+
+        assert mock_gmail["fetch_unread_emails"].call_count == 1
+        assert len(mock_db["workflow_runs"]) == 1
+
+    def test_due_retry_prevents_idle_exit(self, mock_db, mock_openai, mock_gmail):
+        self._status(mock_gmail, self.QUIET)
+        job_queue.enqueue("process_email", make_email(), dedupe_key="email:<retry@x>")
+
+        process_emails.run()
+
+        assert len(mock_db["workflow_runs"]) == 1
+        assert mock_db["jobs"][0]["status"] == "done"
+
+    def test_force_and_status_failure_do_full_run(self, mock_db, mock_openai, mock_gmail):
+        self._status(mock_gmail, self.QUIET)
+        process_emails.run(force=True)
+        mock_gmail["inbox_status"].side_effect = OSError("IMAP down")
+        process_emails.run()
+
+        assert len(mock_db["workflow_runs"]) == 2
+
+    def test_inbox_status_parses_status_response(self, monkeypatch):
+        conn = MagicMock()
+        conn.status.return_value = ("OK", [b'"INBOX" (UIDVALIDITY 7 UIDNEXT 4521 UNSEEN 3)'])
+        monkeypatch.setattr(gmail_service, "_imap_connect", lambda: conn)
+
+        assert gmail_service.inbox_status() == {"uidvalidity": 7, "uidnext": 4521, "unseen": 3}
+        conn.select.assert_not_called()
+        conn.logout.assert_called_once()
@@ -0,0 +1,260 @@
+"""Tests for the durable job queue and the workflows that enqueue into it."""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from services import coaching_service, job_queue
+from tests.conftest import make_conversation, make_email, make_user
+from workflows import check_in, process_emails, send_approved
+
+real_process_email = coaching_service.process_email
+
+
+@pytest.fixture
+def handlers(monkeypatch):
+    """Register test handlers in place of the real ones; returns a registrar."""
+    def register(job_type, fn, batch=False):
+        monkeypatch.setitem(job_queue._handlers, job_type, (fn, batch))
+    return register
+
+
+def _make_due(jobs):
+    """Move every queued job's run_after into the past, as if its backoff elapsed."""
+    past = (datetime.now(timezone.utc) - timedelta(seconds=1)).isoformat()
+    for j in jobs:
+        if j["status"] == "queued":
+            j["run_after"] = past
+
+
+class TestEnqueue:
+    def test_live_dedupe_key_is_skipped(self, mock_db):
+        assert job_queue.enqueue("send", {"conversation_id": "c1"}, dedupe_key="send:c1") == 1
+        assert job_queue.enqueue("send", {"conversation_id": "c1"}, dedupe_key="send:c1") == 0
+        assert len(mock_db["jobs"]) == 1
+
+    def test_done_job_does_not_block_its_key(self, mock_db, handlers):
+        handlers("send", lambda payload: True)
+        job_queue.enqueue("send", {}, dedupe_key="send:c1")
+        job_queue.drain(["send"])
+
+        assert job_queue.enqueue("send", {}, dedupe_key="send:c1") == 1
+
+    def test_unknown_job_type_rejected(self):
+        with pytest.raises(ValueError):
+            job_queue.job("make_coffee")
+
+    def test_max_attempts_from_policy(self):
+        row = job_queue.job("process_email", {"message_id": "<m1>"})
+        assert row["max_attempts"] == job_queue.POLICIES["process_email"]["max_attempts"]
+
+
+class TestDrain:
+    def test_runs_and_completes_jobs(self, mock_db, handlers):
+        seen = []
+        handlers("update_summary", lambda payload: seen.append(payload["n"]) or True)
+        job_queue.enqueue_many([job_queue.job("update_summary", {"n": n}) for n in range(3)])
+
+        result = job_queue.drain(["update_summary"])
+
+        assert seen == [0, 1, 2]
+        assert result["done"] == 3
+        assert {j["status"] for j in mock_db["jobs"]} == {"done"}
+
+    def test_none_result_counts_as_skipped(self, mock_db, handlers):
+        handlers("update_summary", lambda payload: None)
+        job_queue.enqueue("update_summary", {})
+
+        result = job_queue.drain(["update_summary"])
+
+        assert result["skipped"] == 1
+        assert mock_db["jobs"][0]["status"] == "done"
+
+    def test_failure_requeues_with_backoff(self, mock_db, handlers):
+        calls = []
+
+        def flaky(payload):
+            calls.append(1)
+            raise RuntimeError("provider timeout")
+
+        handlers("update_summary", flaky)
+        job_queue.enqueue("update_summary", {})
+
+        result = job_queue.drain(["update_summary"])
+        job = mock_db["jobs"][0]
+
+        assert result["retried"] == 1
+        assert "provider timeout" in result["errors"][0]
+        assert job["status"] == "queued"
+        assert job["last_error"] == "provider timeout"
+        assert datetime.fromisoformat(job["run_after"]) > datetime.now(timezone.utc)
+
+        # Not due yet, so draining again doesn't rerun it
+        job_queue.drain(["update_summary"])
+        assert len(calls) == 1
+
+    def test_dead_after_max_attempts(self, mock_db, handlers):
+        def broken(payload):
+            raise ValueError("bad payload")
+
+        handlers("update_summary", broken)
+        job_queue.enqueue("update_summary", {})
+        max_attempts = job_queue.POLICIES["update_summary"]["max_attempts"]
+
+        for _ in range(max_attempts):
+            result = job_queue.drain(["update_summary"])
+            _make_due(mock_db["jobs"])
+
+        job = mock_db["jobs"][0]
+        assert result["dead"] == 1
+        assert job["status"] == "dead"
+        assert job["attempts"] == max_attempts
+
+    def test_permanent_error_skips_retries(self, mock_db, handlers):
+        handlers("update_summary", lambda payload: job_queue.PermanentJobError("address bounced"), batch=False)
+        job_queue.enqueue("update_summary", {})
+
+        result = job_queue.drain(["update_summary"])
+
+        assert result["dead"] == 1
+        assert mock_db["jobs"][0]["status"] == "dead"
+
+    def test_batch_handler_gets_all_payloads(self, mock_db, handlers):
+        batches = []
+
+        def batch(payloads):
+            batches.append([p["n"] for p in payloads])
+            return [True, None, RuntimeError("one bad row")]
+
+        handlers("update_summary", batch, batch=True)
+        job_queue.enqueue_many([job_queue.job("update_summary", {"n": n}) for n in range(3)])
+
+        result = job_queue.drain(["update_summary"])
+
+        assert batches == [[0, 1, 2]]
+        assert (result["done"], result["skipped"], result["retried"]) == (1, 1, 1)
+        assert [j["status"] for j in mock_db["jobs"]] == ["done", "done", "queued"]
+
+    def test_expired_lease_on_final_attempt_goes_dead(self, mock_db, handlers):
+        calls = []
+        handlers("update_summary", lambda payload: calls.append(1) or True)
+        job_queue.enqueue("update_summary", {})
+        job = mock_db["jobs"][0]
+        # A worker died holding the job on its last attempt
+        job.update({
+            "status": "running", "attempts": job["max_attempts"], "locked_by": "dead-worker",
+            "locked_until": (datetime.now(timezone.utc) - timedelta(minutes=1)).isoformat(),
+        })
+
+        result = job_queue.drain(["update_summary"])
+
+        assert calls == []
+        assert result["dead"] == 1
+        assert job["status"] == "dead"
+
+    def test_backoff_doubles_up_to_cap(self):
+        assert [job_queue.backoff_seconds(n) for n in (1, 2, 3)] == [60, 120, 240]
+        assert job_queue.backoff_seconds(20) == job_queue.BACKOFF_MAX_SECONDS
+
+
+class TestWorkflowJobs:
+    def test_failed_email_is_retried_from_queue(self, mock_db, mock_openai, mock_gmail, monkeypatch):
+        mock_db["users"].append(make_user(email="alice@example.com"))
+        mock_gmail["fetch_unread_emails"].return_value = [make_email(from_email="alice@example.com")]
+        real_process = coaching_service.process_email
+        monkeypatch.setattr(coaching_service, "process_email", lambda e: (_ for _ in ()).throw(TimeoutError()))
+
+        process_emails.run()
+        assert mock_db["conversations"] == []
+
+        # Next run: the email is no longer unread, but its job is due again
+        monkeypatch.setattr(coaching_service, "process_email", real_process)
+        mock_gmail["fetch_unread_emails"].return_value = []
+        _make_due(mock_db["jobs"])
+        process_emails.run()
+
+        assert len(mock_db["conversations"]) == 1
+        assert mock_db["jobs"][0]["status"] == "done"
+
+    def test_email_quarantined_after_max_attempts(self, mock_db, mock_openai, mock_gmail, monkeypatch):
+        user = make_user(email="alice@example.com")
+        mock_db["users"].append(user)
+        email = make_email(from_email="alice@example.com", message_id="<poison@x>")
+        mock_gmail["fetch_unread_emails"].return_value = [email]
+        calls = []
+
+        def poison(email_data):
+            calls.append(1)
+            raise ValueError("unparseable body")
+
+        monkeypatch.setattr(coaching_service, "process_email", poison)
+
+        for _ in range(job_queue.POLICIES["process_email"]["max_attempts"]):
+            process_emails.run()
+            _make_due(mock_db["jobs"])
+
+        [flagged] = mock_db["conversations"]
+        assert flagged["status"] == "Flagged"
+        assert flagged["user_id"] == user["id"]
+        assert flagged["gmail_message_id"] == "<poison@x>"
+        assert "unparseable body" in flagged["flag_reason"]
+        assert mock_db["jobs"][0]["status"] == "dead"
+
+        # Fetched again (e.g. marked unread): requeued, but the real pipeline skips it
+        monkeypatch.setattr(coaching_service, "process_email", real_process_email)
+        process_emails.run()
+
+        assert len(calls) == job_queue.POLICIES["process_email"]["max_attempts"]
+        assert len(mock_db["conversations"]) == 1
+        mock_openai["generate_response"].assert_not_called()
+
+    def test_on_dead_failure_does_not_break_drain(self, mock_db, handlers, monkeypatch):
+        handlers("update_summary", lambda payload: job_queue.PermanentJobError("gone"))
+        monkeypatch.setitem(job_queue._dead_handlers, "update_summary", lambda *args: 1 / 0)
+        job_queue.enqueue("update_summary", {})
+
+        result = job_queue.drain(["update_summary"])
+
+        assert result["dead"] == 1
+
+    def test_check_in_rerun_same_day_adds_nothing(self, mock_db, mock_openai, mock_gmail):
+        today = check_in.DAY_MAP[datetime.now(timezone.utc).weekday()]
+        mock_db["users"].append(make_user(
+            checkin_days=today, last_response_date=(datetime.now(timezone.utc) - timedelta(days=4)).isoformat(),
+        ))
+
+        check_in.run()
+        check_in.run()
+
+        assert len(mock_db["conversations"]) == 1
+
+    def test_send_job_skips_already_sent_conversation(self, mock_db, mock_openai, mock_gmail):
+        user = make_user()
+        mock_db["users"].append(user)
+        conv = make_conversation(user_id=user["id"], status="Approved", sent_at=None)
+        mock_db["conversations"].append(conv)
+        job_queue.enqueue("send", {"conversation_id": conv["id"], "immediate": True})
+        conv["status"] = "Sent"  # Sent by another worker before this job ran
+
+        send_approved.run(immediate=True)
+
+        mock_gmail["send_email"].assert_not_called()
+
+    def test_corrections_share_one_playbook_job(self, mock_db):
+        assert coaching_service.queue_playbook_regeneration() is True
+        assert coaching_service.queue_playbook_regeneration() is False
+
+        assert [j["job_type"] for j in mock_db["jobs"]] == ["regenerate_playbook"]
+
+    def test_failed_playbook_job_is_retried(self, mock_db, monkeypatch):
+        corrections = [{"ai_response": "a", "corrected_response": "b", "correction_notes": "c"}] * 3
+        monkeypatch.setattr(coaching_service.db, "get_all_corrections", lambda: corrections)
+        monkeypatch.setattr(coaching_service.ai_service, "get_ai_config", lambda: ("openai", "gpt-4o"))
+        monkeypatch.setattr(coaching_service.openai_service, "get_client", MagicMock(side_effect=RuntimeError("provider timeout")))
+        coaching_service.queue_playbook_regeneration()
+
+        result = job_queue.drain(["regenerate_playbook"])
+
+        assert result["retried"] == 1
+        assert mock_db["jobs"][0]["last_error"] == "provider timeout"
@@ -423,47 +423,113 @@ class TestKnowledgeDBOperations:
         assert len(results) == 3
 
 
+class TestKnowledgeAggregationRPC:
+    """The real db functions aggregate in Postgres instead of downloading every chunk."""
+
+    def test_get_all_knowledge_sources_uses_rpc(self):
+        import db.supabase_client as db_mod
+
+        rows = [{"source_name": "Lecture 1", "source_type": "lecture", "chunk_count": 2, "total_words": 250}]
+        with patch.object(db_mod, "get_client") as mock_client:
+            mock_client.return_value.rpc.return_value.execute.return_value = MagicMock(data=rows)
+
+            sources = db_mod.get_all_knowledge_sources()
+
+        mock_client.return_value.rpc.assert_called_once_with("get_knowledge_sources", {})
+        mock_client.return_value.table.assert_not_called()
+        assert sources == rows
+
+    def test_get_knowledge_stats_uses_rpc(self):
+        import db.supabase_client as db_mod
+
+        row = {"source_count": 2, "chunk_count": 3, "total_words": 350}
+        with patch.object(db_mod, "get_client") as mock_client:
+            mock_client.return_value.rpc.return_value.execute.return_value = MagicMock(data=[row])
+
+            stats = db_mod.get_knowledge_stats()
+
+        mock_client.return_value.rpc.assert_called_once_with("get_knowledge_stats", {})
+        mock_client.return_value.table.assert_not_called()
+        assert stats == row
+
+    def test_get_knowledge_stats_empty_result(self):
+        import db.supabase_client as db_mod
+
+        with patch.object(db_mod, "get_client") as mock_client:
+            mock_client.return_value.rpc.return_value.execute.return_value = MagicMock(data=[])
+
+            stats = db_mod.get_knowledge_stats()
+
+        assert stats == {"source_count": 0, "chunk_count": 0, "total_words": 0}
+
+
 # ── Ingestion Script Chunking ──────────────────────────────────
 
 class TestIngestionChunking:
     """Tests for the chunking logic in the ingestion script."""
 
-    def test_chunk_by_paragraphs_basic(self, mock_db):
-        """chunk_by_paragraphs splits text at paragraph boundaries."""
-        from scripts.ingest_knowledge_base import chunk_by_paragraphs
-
-        # Create text with multiple paragraphs
-        paragraphs = ["Word " * 600, "Another " * 600]  # Each ~600 words
-        text = "\n\n".join(paragraphs)
-
-        chunks = chunk_by_paragraphs(text, "Test Source")
+    def test_short_source_is_dropped(self, mock_db):
+        """A paragraph-chunked source under MIN_CHUNK_WORDS produces no chunks."""
+        from scripts.ingest_knowledge_base import iter_chunks
 
-        assert len(chunks) >= 1
-        for chunk in chunks:
-            assert chunk["source_name"] == "Test Source"
-            assert chunk["word_count"] > 0
+        assert list(iter_chunks(iter(["Too short to index. " * 10]), "Syllabus")) == []
 
-    def test_chunk_lecture_short(self, mock_db):
-        """Short lectures stay as a single chunk."""
-        from scripts.ingest_knowledge_base import chunk_lecture
+    def test_short_lecture_stays_whole(self, mock_db):
+        """Short lectures stay as a single chunk, however short."""
+        from scripts.ingest_knowledge_base import iter_chunks, TARGET_CHUNK_WORDS
 
-        text = "This is a short lecture. " * 50  # ~300 words
-        chunks = chunk_lecture(text, "Lecture 1")
+        paragraphs = ["This is a short lecture. " * 50, "Wrap up. " * 20]
+        chunks = list(iter_chunks(iter(paragraphs), "Lecture 1", keep_whole_words=TARGET_CHUNK_WORDS * 2))
 
         assert len(chunks) == 1
         assert chunks[0]["source_name"] == "Lecture 1"
+        assert chunks[0]["word_count"] == 290
 
-    def test_chunk_lecture_long(self, mock_db):
+    def test_long_lecture_is_split(self, mock_db):
         """Long lectures get split into multiple chunks."""
-        from scripts.ingest_knowledge_base import chunk_lecture
+        from scripts.ingest_knowledge_base import iter_chunks, TARGET_CHUNK_WORDS
 
-        # Create long text with paragraph breaks
         paragraphs = [f"Paragraph {i}. " + "word " * 800 for i in range(5)]
-        text = "\n\n".join(paragraphs)
-
-        chunks = chunk_lecture(text, "Lecture 34")
+        chunks = list(iter_chunks(iter(paragraphs), "Lecture 34", keep_whole_words=TARGET_CHUNK_WORDS * 2))
 
         assert len(chunks) > 1
+        assert sum(c["word_count"] for c in chunks) == 5 * 802
+
+    def test_chapter_up_to_twice_target_stays_whole(self, mock_db):
+        """A 1,500-word chapter is one chunk; a 2,500-word one is split."""
+        from scripts.ingest_knowledge_base import iter_chunks, TARGET_CHUNK_WORDS
+
+        paragraphs = (["Chapter 1: Ideas\n" + "idea " * 500] + ["idea " * 500] * 2
+                      + ["Chapter 2: Customers\n" + "talk " * 500] + ["talk " * 500] * 4)
+        chunks = list(iter_chunks(iter(paragraphs), "The Launch System", detect_chapters=True,
+                                  keep_whole_words=TARGET_CHUNK_WORDS * 2))
+
+        assert [(c["chapter"], c["word_count"]) for c in chunks] == [
+            ("Chapter 1: Ideas", 1503),
+            ("Chapter 2: Customers", 503),
+            ("Chapter 2: Customers", 1000),
+            ("Chapter 2: Customers", 1000),
+        ]
+
+    def test_text_before_first_heading_is_kept_unlabelled(self, mock_db):
+        """Front matter before the first heading is chunked without a chapter, unless too short."""
+        from scripts.ingest_knowledge_base import iter_chunks
+
+        paragraphs = ["Introduction. " + "intro " * 200, "Chapter 1: Ideas\n" + "idea " * 300]
+        chunks = list(iter_chunks(iter(paragraphs), "The Launch System", detect_chapters=True))
+        assert [c["chapter"] for c in chunks] == [None, "Chapter 1: Ideas"]
+
+        paragraphs = ["Copyright 2024", "Chapter 1: Ideas\n" + "idea " * 300]
+        chunks = list(iter_chunks(iter(paragraphs), "The Launch System", detect_chapters=True))
+        assert [c["chapter"] for c in chunks] == ["Chapter 1: Ideas"]
+
+    def test_single_heading_labels_its_chunks(self, mock_db):
+        """One heading is enough to label the chunks after it."""
+        from scripts.ingest_knowledge_base import iter_chunks
+
+        chunks = list(iter_chunks(iter(["Chapter 1: Ideas\n" + "idea " * 300]), "Guide", detect_chapters=True))
+
+        assert [c["chapter"] for c in chunks] == ["Chapter 1: Ideas"]
 
     def test_detect_source_type(self, mock_db):
         """detect_source_type correctly identifies file types."""
@@ -479,3 +545,166 @@ class TestIngestionChunking:
 
         assert get_source_name("Lecture 7.txt") == "Lecture 7"
         assert get_source_name("The Launch System.pdf") == "The Launch System"
+
+
+# ── Streaming Ingestion ────────────────────────────────────────
+
+class TestStreamingIngestion:
+    """Tests for the generator-based extraction and incremental chunker."""
+
+    def test_iter_chunks_emits_at_target(self, mock_db):
+        """Chunks are cut as they reach TARGET_CHUNK_WORDS and no words are lost."""
+        from scripts.ingest_knowledge_base import iter_chunks, TARGET_CHUNK_WORDS
+
+        paragraphs = [f"Para {i}. " + "word " * 298 for i in range(10)]  # 300 words each
+        chunks = list(iter_chunks(iter(paragraphs), "Test Source"))
+
+        assert len(chunks) == 4
+        assert all(c["word_count"] <= TARGET_CHUNK_WORDS for c in chunks)
+        assert sum(c["word_count"] for c in chunks) == 3000
+
+    def test_iter_chunks_is_lazy(self, mock_db):
+        """The first chunk is yielded without consuming the whole paragraph stream."""
+        from scripts.ingest_knowledge_base import iter_chunks
+
+        consumed = []
+
+        def paragraphs():
+            for i in range(1000):
+                consumed.append(i)
+                yield "word " * 300
+
+        first = next(iter_chunks(paragraphs(), "Big Book"))
+
+        assert first["word_count"] >= 900
+        assert len(consumed) < 10
+
+    def test_chapter_headings_split_and_label_chunks(self, mock_db):
+        """Books are split at chapter headings and each chunk carries its chapter."""
+        from scripts.ingest_knowledge_base import iter_chunks
+
+        paragraphs = [
+            "Chapter 1: Getting Started\n" + "start " * 200,
+            "more " * 200,
+            "Chapter 2: Talking to Customers\n" + "talk " * 300,
+        ]
+        chunks = list(iter_chunks(iter(paragraphs), "The Launch System", detect_chapters=True))
+
+        assert [c["chapter"] for c in chunks] == ["Chapter 1: Getting Started", "Chapter 2: Talking to Customers"]
+        assert chunks[0]["word_count"] == 404
+        assert chunks[1]["content"].startswith("Chapter 2")
+
+    def test_short_tail_merges_into_previous_chunk(self, mock_db):
+        """A tail shorter than MIN_CHUNK_WORDS is merged rather than emitted alone."""
+        from scripts.ingest_knowledge_base import iter_chunks
+
+        paragraphs = ["word " * 900, "more " * 300, "tail " * 20]
+        chunks = list(iter_chunks(iter(paragraphs), "Test Source"))
+
+        assert len(chunks) == 2
+        assert chunks[-1]["word_count"] == 320
+        assert chunks[-1]["content"].endswith("tail")
+
+    def test_process_file_streams_text_lecture(self, mock_db, tmp_path):
+        """A short lecture transcript stays whole when processed from disk."""
+        from scripts.ingest_knowledge_base import process_file
+
+        path = tmp_path / "Lecture 3.txt"
+        path.write_text("Intro paragraph. " * 50 + "\n\n" + "Second paragraph. " * 50, encoding="utf-8")
+
+        chunks = process_file(str(path))
+
+        assert len(chunks) == 1
+        assert chunks[0]["source_name"] == "Lecture 3"
+        assert chunks[0]["source_type"] == "lecture"
+        assert chunks[0]["word_count"] == 200
+
+    def test_corpus_pool_preserves_order(self, mock_db, tmp_path):
+        """The process pool yields chunks and per-file stats in input order."""
+        from scripts.ingest_knowledge_base import iter_corpus_chunks
+
+        paths = []
+        for i in range(3):
+            path = tmp_path / f"Lecture {i}.txt"
+            path.write_text(f"Lecture {i} content. " * 60, encoding="utf-8")
+            paths.append(str(path))
+
+        sequential_stats, pooled_stats = [], []
+        sequential = list(iter_corpus_chunks(paths, file_stats=sequential_stats))
+        pooled = list(iter_corpus_chunks(paths, workers=2, file_stats=pooled_stats))
+
+        assert pooled == sequential
+        assert [s["file"] for s in pooled_stats] == ["Lecture 0.txt", "Lecture 1.txt", "Lecture 2.txt"]
+        assert [(s["chunks"], s["words"]) for s in pooled_stats] == [(1, 180)] * 3
+        assert [(s["chunks"], s["words"]) for s in sequential_stats] == [(1, 180)] * 3
+
+    def test_corpus_streams_sequentially(self, mock_db, tmp_path):
+        """Without a pool, a file's first chunk arrives before the file is fully chunked."""
+        import scripts.ingest_knowledge_base as ingest
+
+        path = tmp_path / "Big Syllabus.txt"
+        path.write_text("\n\n".join("word " * 500 for _ in range(40)), encoding="utf-8")
+        stats = []
+
+        first = next(ingest.iter_corpus_chunks([str(path)], file_stats=stats))
+
+        assert first["word_count"] == 1000
+        assert stats[0]["chunks"] == 1
+
+    def test_main_ingests_in_bounded_batches(self, mock_db, tmp_path, monkeypatch):
+        """Each batch is tagged, embedded and inserted before later chunks are made."""
+        import scripts.ingest_knowledge_base as ingest
+
+        (tmp_path / "Syllabus.txt").write_text("\n\n".join("word " * 500 for _ in range(10)), encoding="utf-8")
+        produced, inserted = [], []
+        file_chunks = ingest.iter_file_chunks
+
+        def counting_file_chunks(path):
+            for chunk in file_chunks(path):
+                produced.append(chunk)
+                yield chunk
+
+        monkeypatch.setattr(ingest, "SOURCE_DIR", str(tmp_path))
+        monkeypatch.setattr(ingest, "INGEST_BATCH_CHUNKS", 2)
+        monkeypatch.setattr(ingest.sys, "argv", ["ingest_knowledge_base.py"])
+        monkeypatch.setattr(ingest, "iter_file_chunks", counting_file_chunks)
+        monkeypatch.setattr(ingest, "tag_chunk", lambda chunk: chunk)
+        monkeypatch.setattr(ingest.embedding_service, "embed_batch",
+                            lambda texts, batch_size: [[0.0]] * len(texts))
+        monkeypatch.setattr(ingest, "insert_chunks",
+                            lambda batch: inserted.append((len(batch), len(produced))))
+
+        ingest.main()
+
+        # Five 1,000-word chunks; at most one chunk is made ahead of each insert
+        assert inserted == [(2, 2), (2, 4), (1, 5)]
+
+    def test_tag_all_chunks_threaded_keeps_order(self, mock_db, monkeypatch):
+        """Threaded tagging tags every chunk in place without reordering."""
+        import scripts.ingest_knowledge_base as ingest
+
+        def fake_tag(chunk):
+            chunk["title"] = f"Title for {chunk['content']}"
+            return chunk
+
+        monkeypatch.setattr(ingest, "tag_chunk", fake_tag)
+        chunks = [{"source_name": "S", "content": str(i)} for i in range(25)]
+
+        result = ingest.tag_all_chunks(chunks, workers=4)
+
+        assert result is chunks
+        assert [c["title"] for c in chunks] == [f"Title for {i}" for i in range(25)]
+
+    def test_rate_limiter_spaces_calls(self, mock_db, monkeypatch):
+        """Calls beyond the per-minute budget wait for their slot."""
+        import scripts.ingest_knowledge_base as ingest
+
+        sleeps = []
+        monkeypatch.setattr(ingest.time, "monotonic", lambda: 100.0)
+        monkeypatch.setattr(ingest.time, "sleep", sleeps.append)
+
+        limiter = ingest.RateLimiter(max_per_minute=60)
+        for _ in range(3):
+            limiter.wait()
+
+        assert sleeps == [1.0, 2.0]
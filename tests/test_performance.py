@@ -0,0 +1,125 @@
+"""Tests for the Performance page and the db functions and cost estimates behind it."""
+
+import os
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import db.supabase_client as db_mod
+from services.ai_service import MODEL_PRICING, PROVIDERS, estimate_cost
+
+PAGE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dashboard", "pages", "6_performance.py"
+)
+
+
+class TestEstimateCost:
+    def test_uncached_prompt_and_completion(self):
+        # gpt-4o: $2.50 in, $10.00 out per 1M
+        assert estimate_cost("gpt-4o", 1_000_000, 100_000) == pytest.approx(3.50)
+
+    def test_cached_tokens_billed_at_cached_rate(self):
+        # 800k of the 1M prompt tokens cached at $1.25
+        assert estimate_cost("gpt-4o", 1_000_000, 0, 800_000) == pytest.approx(0.5 + 1.0)
+
+    def test_unknown_model_has_no_estimate(self):
+        assert estimate_cost("some-new-model", 1000, 1000) is None
+
+    def test_every_selectable_model_is_priced(self):
+        for models in PROVIDERS.values():
+            for model in models:
+                assert model in MODEL_PRICING
+
+
+class TestPerformanceRPC:
+    """Latency and token aggregates are computed in Postgres (db/migration_v15.sql)."""
+
+    @pytest.mark.parametrize("func_name, rpc_name", [
+        ("get_stage_latency", "perf_stage_latency"),
+        ("get_llm_usage", "perf_llm_usage"),
+        ("get_run_throughput", "perf_run_throughput"),
+    ])
+    def test_date_ranged_rpc(self, func_name, rpc_name):
+        start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        with patch.object(db_mod, "get_client") as mock_client:
+            mock_client.return_value.rpc.return_value.execute.return_value = MagicMock(data=[])
+            getattr(db_mod, func_name)(start)
+
+        mock_client.return_value.rpc.assert_called_once_with(
+            rpc_name, {"start_date": start.isoformat(), "end_date": None},
+        )
+
+    def test_generate_latency_by_day(self):
+        with patch.object(db_mod, "get_client") as mock_client:
+            mock_client.return_value.rpc.return_value.execute.return_value = MagicMock(data=[])
+            db_mod.get_generate_latency(by_day=True)
+
+        mock_client.return_value.rpc.assert_called_once_with(
+            "perf_generate_latency", {"start_date": None, "end_date": None, "by_day": True},
+        )
+
+    def test_slowest_conversations_limit(self):
+        with patch.object(db_mod, "get_client") as mock_client:
+            mock_client.return_value.rpc.return_value.execute.return_value = MagicMock(data=[])
+            db_mod.get_slowest_conversations(limit=5)
+
+        mock_client.return_value.rpc.assert_called_once_with(
+            "perf_slowest_conversations", {"start_date": None, "end_date": None, "max_rows": 5},
+        )
+
+
+PIPELINE_METRICS = {
+    "total_ms": 8200.0,
+    "stages": {
+        "parse": {"count": 1, "total_ms": 3.1, "max_ms": 3.1, "errors": 0},
+        "generate": {"count": 1, "total_ms": 6100.0, "max_ms": 6100.0, "errors": 0},
+        "evaluate": {"count": 1, "total_ms": 1500.0, "max_ms": 1500.0, "errors": 0},
+    },
+    "llm": [{"stage": "generate", "provider": "openai", "model": "gpt-4o", "calls": 1,
+             "prompt_tokens": 3000, "completion_tokens": 400, "cached_tokens": 2048}],
+}
+
+
+class TestPerformancePage:
+    def test_renders_without_data(self, mock_db):
+        at = AppTest.from_file(PAGE, default_timeout=30).run()
+
+        assert not at.exception
+        assert len(at.info) == 5
+
+    def test_renders_metrics(self, mock_db, monkeypatch):
+        monkeypatch.setattr(db_mod, "get_stage_latency", lambda *a, **k: [
+            {"stage": "total", "samples": 40, "p50_ms": 7000.0, "p95_ms": 12000.0, "max_ms": 15000.0},
+            {"stage": "generate", "samples": 40, "p50_ms": 5000.0, "p95_ms": 9000.0, "max_ms": 11000.0},
+        ])
+        monkeypatch.setattr(db_mod, "get_run_throughput", lambda *a, **k: [
+            {"id": "r1", "workflow_name": "process_emails", "started_at": "2026-01-01T00:00:00+00:00",
+             "status": "completed", "items_processed": 10, "duration_seconds": 120.0},
+            {"id": "r2", "workflow_name": "check_in", "started_at": "2026-01-01T01:00:00+00:00",
+             "status": "completed", "items_processed": 0, "duration_seconds": 5.0},
+        ])
+        monkeypatch.setattr(db_mod, "get_llm_usage", lambda *a, **k: [
+            {"provider": "openai", "model": "gpt-4o", "calls": 40,
+             "prompt_tokens": 1_000_000, "completion_tokens": 100_000, "cached_tokens": 0},
+            {"provider": "openai", "model": "retired-model", "calls": 1,
+             "prompt_tokens": 10, "completion_tokens": 1, "cached_tokens": 0},
+        ])
+        monkeypatch.setattr(db_mod, "get_generate_latency", lambda *a, by_day=False, **k: [
+            {"day": "2026-01-01" if by_day else None, "provider": "openai", "model": "gpt-4o",
+             "conversations": 40, "p50_ms": 5000.0, "p95_ms": 9000.0, "avg_completion_tokens": 400.0},
+        ])
+        monkeypatch.setattr(db_mod, "get_slowest_conversations", lambda *a, **k: [
+            {"id": "c1", "created_at": "2026-01-01T00:00:00+00:00", "type": "Check-in", "status": "Pending Review",
+             "email": "alice@example.com", "total_ms": 8200.0, "pipeline_metrics": PIPELINE_METRICS},
+        ])
+
+        at = AppTest.from_file(PAGE, default_timeout=30).run()
+
+        assert not at.exception
+        metrics = {m.label: m.value for m in at.metric}
+        assert metrics["p50 per Email"] == "7.0s"
+        assert metrics["Median Items / min"] == "5.0"
+        assert metrics["Estimated Cost"] == "$3.50"
+        assert not at.info
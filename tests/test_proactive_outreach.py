@@ -42,6 +42,31 @@ class TestCheckIn:
         assert conv["status"] == "Pending Review"
         assert conv["ai_response"]  # has generated content
 
+    def test_checkin_subject_pregenerated(self, mock_db, mock_openai, mock_gmail):
+        """The draft carries its subject line, so sending needs no LLM call."""
+        today = _get_today_day()
+        user = make_user(email="alice@example.com", status="Active", checkin_days=today,
+                         business_idea="A dog-walking app",
+                         last_response_date=(datetime.now(timezone.utc) - timedelta(days=4)).isoformat())
+        mock_db["users"].append(user)
+
+        check_in.run()
+
+        assert mock_db["conversations"][0]["email_subject"] == "Checking in on your app"
+        assert "A dog-walking app" in mock_openai["generate_email_subject"].call_args[0][0]
+
+    def test_checkin_subject_fallback_on_error(self, mock_db, mock_openai, mock_gmail):
+        today = _get_today_day()
+        mock_db["users"].append(make_user(
+            email="alice@example.com", status="Active", checkin_days=today,
+            last_response_date=(datetime.now(timezone.utc) - timedelta(days=4)).isoformat(),
+        ))
+        mock_openai["generate_email_subject"].side_effect = Exception("API down")
+
+        check_in.run()
+
+        assert mock_db["conversations"][0]["email_subject"] == "Coaching Check-In"
+
     def test_does_not_send_email_directly(self, mock_db, mock_openai, mock_gmail):
         """Check-ins should never call send_email directly."""
         today = _get_today_day()
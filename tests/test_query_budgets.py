@@ -0,0 +1,142 @@
+"""Round-trip budgets for the workflows.
+
+These run the real db.supabase_client functions against FakeSupabaseClient
+(the fake_supabase fixture) and count PostgREST requests per workflow run.
+Batch workflows must stay O(1) in the number of users; per-email workflows
+may cost a fixed number of queries per item, but no more. A new query inside
+a per-user loop fails here before it reaches production.
+"""
+
+import math
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import services.embedding_service as embedding
+from services import job_queue
+from tests.conftest import make_conversation, make_email, make_user
+from workflows import check_in, process_emails, re_engagement, send_approved
+
+
+# Queries allowed per item on top of the fixed per-run cost
+SEND_QUERIES_PER_ITEM = 2       # mark sent, update summary
+EMAIL_QUERIES_PER_ITEM = 14     # dedupe, user, context, RAG, settings, save
+FIXED_QUERIES = 5               # run bookkeeping, batch reads, settings
+
+# Each claimed batch of jobs costs a claim and a complete (services/job_queue.py)
+JOB_QUERIES_PER_BATCH = 2
+
+
+def _batches(job_type: str, n: int) -> int:
+    return math.ceil(n / job_queue.POLICIES[job_type]["batch_size"])
+
+
+def _days_ago(days: int) -> str:
+    return (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+
+
+@pytest.fixture(autouse=True)
+def offline_embeddings(monkeypatch):
+    monkeypatch.setattr(embedding, "embed_text", lambda text: [0.0] * 1536)
+
+
+def _seed_users(client, n, **overrides):
+    start = len(client.tables["users"])
+    users = [make_user(email=f"user{i}@example.com", first_name=f"User{i}", **overrides)
+             for i in range(start, start + n)]
+    client.tables["users"].extend(users)
+    return users
+
+
+def _run(client, workflow, *args, **kwargs) -> int:
+    client.queries.clear()
+    workflow(*args, **kwargs)
+    return len(client.queries)
+
+
+class TestBatchWorkflows:
+    def test_check_in_200_users(self, fake_supabase, mock_openai, mock_gmail):
+        _seed_users(fake_supabase, 200, last_response_date=_days_ago(5))
+
+        queries = _run(fake_supabase, check_in.run)
+
+        assert len(fake_supabase.tables["conversations"]) == 200
+        assert queries <= 10, fake_supabase.counts()
+
+    def test_check_in_is_constant_in_users(self, fake_supabase, mock_openai, mock_gmail):
+        _seed_users(fake_supabase, 5, last_response_date=_days_ago(5))
+        small = _run(fake_supabase, check_in.run)
+        fake_supabase.tables["conversations"].clear()
+        _seed_users(fake_supabase, 150, last_response_date=_days_ago(5))
+
+        assert _run(fake_supabase, check_in.run) == small, fake_supabase.counts()
+
+    def test_re_engagement_is_constant_in_users(self, fake_supabase, mock_openai, mock_gmail):
+        _seed_users(fake_supabase, 5, last_response_date=_days_ago(20))
+        _seed_users(fake_supabase, 5, status="Onboarding", created_at=_days_ago(9))
+        small = _run(fake_supabase, re_engagement.run)
+
+        fake_supabase.tables["conversations"].clear()
+        for user in fake_supabase.tables["users"]:
+            user["status"] = "Active" if user["status"] == "Silent" else user["status"]
+        _seed_users(fake_supabase, 150, last_response_date=_days_ago(20))
+        _seed_users(fake_supabase, 50, status="Onboarding", created_at=_days_ago(9))
+
+        queries = _run(fake_supabase, re_engagement.run)
+
+        assert queries == small, fake_supabase.counts()
+        assert queries <= 12, fake_supabase.counts()
+        assert sum(u["status"] == "Silent" for u in fake_supabase.tables["users"]) == 155
+
+
+class TestPerItemWorkflows:
+    """Each item may cost a fixed number of queries; the budget is c·n + k."""
+
+    def _send_approved(self, client, n):
+        client.tables["conversations"].clear()
+        for user in _seed_users(client, n):
+            client.tables["conversations"].append(make_conversation(
+                user_id=user["id"], type="Check-in", status="Approved", sent_at=None,
+                created_at=_days_ago(1), approved_at=_days_ago(0), email_subject="Checking in",
+            ))
+        return _run(client, send_approved.run, immediate=True)
+
+    def _process_emails(self, client, gmail, n):
+        emails = []
+        for user in _seed_users(client, n):
+            emails.append(make_email(from_email=user["email"], imap_id=user["email"]))
+        gmail["fetch_unread_emails"].return_value = emails
+        return _run(client, process_emails.run)
+
+    def test_send_approved(self, fake_supabase, mock_openai, mock_gmail):
+        ten = self._send_approved(fake_supabase, 10)
+        twenty = self._send_approved(fake_supabase, 20)
+
+        assert mock_gmail["send_email"].call_count == 30
+        # send and update_summary jobs each claim in batches
+        batches = _batches("send", 10) + _batches("update_summary", 10)
+        assert twenty - ten <= 10 * SEND_QUERIES_PER_ITEM, fake_supabase.counts()
+        assert ten <= 10 * SEND_QUERIES_PER_ITEM + FIXED_QUERIES + batches * (JOB_QUERIES_PER_BATCH + 3), \
+            fake_supabase.counts()
+
+    def test_process_emails(self, fake_supabase, mock_openai, mock_gmail):
+        ten = self._process_emails(fake_supabase, mock_gmail, 10)
+        twenty = self._process_emails(fake_supabase, mock_gmail, 20)
+
+        assert len(fake_supabase.tables["conversations"]) == 30
+        batches = _batches("process_email", 10)
+        assert twenty - ten <= 10 * EMAIL_QUERIES_PER_ITEM + batches * JOB_QUERIES_PER_BATCH, fake_supabase.counts()
+        assert ten <= 10 * EMAIL_QUERIES_PER_ITEM + FIXED_QUERIES + (batches + 1) * JOB_QUERIES_PER_BATCH, \
+            fake_supabase.counts()
+
+
+class TestIdleTick:
+    def test_idle_process_emails_tick(self, fake_supabase, mock_openai, mock_gmail):
+        mock_gmail["inbox_status"].side_effect = None
+        mock_gmail["inbox_status"].return_value = {"uidvalidity": 1, "uidnext": 10, "unseen": 0}
+
+        queries = _run(fake_supabase, process_emails.run)
+
+        # Read the saved inbox state, check for due jobs, bump the idle counter
+        assert queries == 3, fake_supabase.counts()
+        assert fake_supabase.tables["workflow_runs"] == []
@@ -0,0 +1,63 @@
+"""Tests for the EXPLAIN-based index check and the single-query lookups it covers."""
+
+import os
+from unittest.mock import MagicMock, patch
+
+import db.supabase_client as db_mod
+from scripts import check_query_plans
+
+
+class TestPlanCheck:
+    def test_index_scan_passes(self):
+        plan = {"Node Type": "Limit", "Plans": [
+            {"Node Type": "Index Scan", "Relation Name": "conversations",
+             "Index Name": "idx_conversations_user_status_created"},
+        ]}
+        assert check_query_plans.seq_scans(plan) == []
+
+    def test_nested_seq_scan_is_found(self):
+        plan = {"Node Type": "Aggregate", "Plans": [
+            {"Node Type": "Sort", "Plans": [
+                {"Node Type": "Seq Scan", "Relation Name": "conversations"},
+            ]},
+        ]}
+        assert check_query_plans.seq_scans(plan) == ["conversations"]
+
+    def test_unchecked_tables_ignored(self):
+        plan = {"Node Type": "Seq Scan", "Relation Name": "settings"}
+        assert check_query_plans.seq_scans(plan) == []
+
+    def test_migrations_in_numeric_order(self):
+        names = [os.path.basename(p) for p in check_query_plans.migration_files()]
+        assert names[0] == "setup.sql"
+        versions = [int(n[len("migration_v"):-len(".sql")]) for n in names[1:]]
+        assert versions == sorted(versions)
+        assert "migration_v12.sql" in names
+
+
+class TestEmailLookup:
+    def test_exact_match_on_lowercased_email(self):
+        with patch.object(db_mod, "get_client") as mock_client:
+            select = mock_client.return_value.table.return_value.select.return_value
+            select.eq.return_value.limit.return_value.execute.return_value = MagicMock(data=[])
+
+            db_mod.get_user_by_email("  Alice_Smith@Example.com ")
+
+        select.eq.assert_called_once_with("email", "alice_smith@example.com")
+        select.ilike.assert_not_called()
+
+
+class TestThreadReplyCount:
+    def test_single_rpc_round_trip(self):
+        with patch.object(db_mod, "get_client") as mock_client:
+            mock_client.return_value.rpc.return_value.execute.return_value = MagicMock(data=3)
+
+            assert db_mod.count_thread_replies("user-1") == 3
+
+        mock_client.return_value.rpc.assert_called_once_with("count_thread_replies", {"p_user_id": "user-1"})
+        mock_client.return_value.table.assert_not_called()
+
+    def test_no_replies(self):
+        with patch.object(db_mod, "get_client") as mock_client:
+            mock_client.return_value.rpc.return_value.execute.return_value = MagicMock(data=0)
+            assert db_mod.count_thread_replies("user-1") == 0
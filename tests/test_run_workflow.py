@@ -0,0 +1,108 @@
+"""Tests for run_workflow.py serve mode: schedules, per-workflow locks, shutdown."""
+
+import threading
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+import run_workflow
+
+
+TZ = "America/New_York"
+
+
+@pytest.fixture
+def ran(monkeypatch):
+    """Replace run_workflow() with a recorder; returns the names it was called with."""
+    names = []
+    monkeypatch.setattr(run_workflow, "run_workflow", lambda name: names.append(name) or True)
+    return names
+
+
+class TestSchedules:
+    def test_every_workflow_is_scheduled(self):
+        assert set(run_workflow.SCHEDULES) == set(run_workflow.WORKFLOWS)
+
+    def test_jobs_fire_at_local_times(self):
+        scheduler = run_workflow.build_scheduler(TZ)
+        jobs = {job.id: job for job in scheduler.get_jobs()}
+        monday_early = datetime(2026, 3, 2, 6, 0, tzinfo=ZoneInfo(TZ))
+
+        def next_fire(job_id):
+            return jobs[job_id].trigger.get_next_fire_time(None, monday_early)
+
+        assert len(jobs) == sum(len(times) for times in run_workflow.SCHEDULES.values())
+        assert next_fire("process_emails:0").hour == 8
+        assert (next_fire("send_approved:1").hour, next_fire("send_approved:1").minute) == (14, 30)
+        assert next_fire("cleanup:0").hour == 23
+
+    def test_schedules_follow_dst(self):
+        scheduler = run_workflow.build_scheduler(TZ)
+        trigger = scheduler.get_job("check_in:0").trigger
+        winter = trigger.get_next_fire_time(None, datetime(2026, 1, 5, tzinfo=ZoneInfo(TZ)))
+        summer = trigger.get_next_fire_time(None, datetime(2026, 7, 6, tzinfo=ZoneInfo(TZ)))
+
+        assert winter.utcoffset() != summer.utcoffset()
+        assert winter.hour == summer.hour == 9
+
+
+class TestRunExclusive:
+    def test_runs_workflow(self, ran):
+        assert run_workflow.run_exclusive("check_in") is True
+        assert ran == ["check_in"]
+
+    def test_skips_while_same_workflow_running(self, ran):
+        with run_workflow._locks["send_approved"]:
+            assert run_workflow.run_exclusive("send_approved") is False
+            # Other workflows are not blocked
+            assert run_workflow.run_exclusive("process_emails") is True
+        assert ran == ["process_emails"]
+
+    def test_lock_released_after_failure(self, monkeypatch):
+        monkeypatch.setattr(run_workflow, "run_workflow", lambda name: 1 / 0)
+
+        with pytest.raises(ZeroDivisionError):
+            run_workflow.run_exclusive("cleanup")
+        assert not run_workflow._locks["cleanup"].locked()
+
+    def test_failed_workflow_returns_false(self, mock_db, monkeypatch):
+        from workflows import cleanup
+        monkeypatch.setattr(cleanup, "run", lambda: 1 / 0)
+
+        assert run_workflow.run_workflow("cleanup") is False
+
+
+class TestServe:
+    def test_waits_for_running_workflow_on_stop(self, mock_db, monkeypatch):
+        monkeypatch.setattr(run_workflow, "_warm_up", lambda: None)
+        started, finish, finished = threading.Event(), threading.Event(), []
+
+        def slow_run(name):
+            started.set()
+            finish.wait(5)
+            finished.append(name)
+            return True
+
+        monkeypatch.setattr(run_workflow, "run_workflow", slow_run)
+        real_build = run_workflow.build_scheduler
+
+        def build_and_fire(tz_name):
+            scheduler = real_build(tz_name)
+            scheduler.add_job(run_workflow.run_exclusive, args=["cleanup"], id="now")
+            return scheduler
+
+        monkeypatch.setattr(run_workflow, "build_scheduler", build_and_fire)
+        stop = threading.Event()
+        serve = threading.Thread(target=run_workflow.run_serve, args=(["--timezone", TZ], stop))
+        serve.start()
+
+        assert started.wait(5)
+        stop.set()
+        serve.join(0.2)
+        assert serve.is_alive()  # Still waiting for the running workflow
+
+        finish.set()
+        serve.join(5)
+        assert not serve.is_alive()
+        assert finished == ["cleanup"]
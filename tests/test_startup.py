@@ -0,0 +1,87 @@
+"""Startup cost of `run_workflow.py <name>`: lazy config and deferred SDK imports.
+
+Measured with `python -X importtime` in a fresh interpreter, since the test
+process has already imported everything.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+import config
+import run_workflow
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+# Cumulative import time allowed for run_workflow plus one workflow module.
+# Typically ~40ms; the SDKs alone used to cost close to a second.
+IMPORT_BUDGET_SECONDS = 0.3
+
+# Imported on first use (a client, or the dashboard), never at workflow startup
+DEFERRED_PACKAGES = ("openai", "anthropic", "supabase", "streamlit", "apscheduler")
+
+
+def _import_times(module: str) -> dict:
+    """Module name -> cumulative import time in seconds, from a fresh interpreter."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import run_workflow, {module}"],
+        cwd=ROOT, capture_output=True, text=True, env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    assert proc.returncode == 0, proc.stderr
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative) / 1_000_000
+    return times
+
+
+@pytest.mark.parametrize("name", sorted(run_workflow.WORKFLOWS))
+def test_workflow_startup_budget(name):
+    times = _import_times(run_workflow.WORKFLOWS[name])
+
+    heavy = sorted(m for m in times if m.split(".")[0] in DEFERRED_PACKAGES)
+    assert heavy == [], f"{name} imports {heavy[:5]} at startup"
+    startup = times["run_workflow"] + times[run_workflow.WORKFLOWS[name]]
+    assert startup < IMPORT_BUDGET_SECONDS, sorted(times.items(), key=lambda t: -t[1])[:10]
+
+
+class TestLazyConfig:
+    @pytest.fixture(autouse=True)
+    def fresh_config(self):
+        config.load.cache_clear()
+        yield
+        config.load.cache_clear()
+
+    def test_subsystems_load_independently(self, monkeypatch):
+        monkeypatch.delenv("GMAIL_APP_PASSWORD")
+
+        assert config.SUPABASE_URL == os.environ["SUPABASE_URL"]
+        with pytest.raises(SystemExit):
+            config.GMAIL_ADDRESS
+
+    def test_validate_checks_every_subsystem(self, monkeypatch):
+        monkeypatch.setenv("OPENAI_API_KEY", " ")
+
+        with pytest.raises(SystemExit):
+            config.validate()
+
+    def test_defaults_and_types(self, monkeypatch):
+        monkeypatch.delenv("GMAIL_SMTP_PORT", raising=False)
+        monkeypatch.delenv("COACH_TIMEZONE", raising=False)
+
+        assert config.GMAIL_SMTP_PORT == 587
+        assert config.COACH_TIMEZONE == "America/New_York"
+
+    def test_bad_port_exits(self, monkeypatch):
+        monkeypatch.setenv("GMAIL_SMTP_PORT", "smtp")
+
+        with pytest.raises(SystemExit):
+            config.GMAIL_SMTP_HOST
+
+    def test_unknown_setting(self):
+        with pytest.raises(AttributeError):
+            config.NOT_A_SETTING
@@ -0,0 +1,185 @@
+"""Tests for pipeline stage timing and LLM token accounting (services/telemetry.py)."""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from services import telemetry, coaching_service
+from tests.conftest import make_user, make_email
+from workflows import process_emails
+
+
+class TestSpans:
+    def test_span_is_recorded_in_active_collector(self):
+        with telemetry.collect("conversation") as metrics:
+            with telemetry.span("parse"):
+                pass
+            with telemetry.span("parse"):
+                pass
+
+        summary = metrics.summary()
+        assert summary["stages"]["parse"]["count"] == 2
+        assert summary["stages"]["parse"]["errors"] == 0
+        assert summary["total_ms"] >= summary["stages"]["parse"]["total_ms"]
+
+    def test_nested_collectors_both_receive_spans(self):
+        with telemetry.collect("run") as run:
+            with telemetry.collect("conversation") as conversation:
+                with telemetry.span("generate"):
+                    pass
+            with telemetry.span("imap_mark_read"):
+                pass
+
+        assert set(run.summary()["stages"]) == {"generate", "imap_mark_read"}
+        assert set(conversation.summary()["stages"]) == {"generate"}
+
+    def test_failed_span_is_counted_and_reraised(self):
+        with telemetry.collect("conversation") as metrics:
+            with pytest.raises(RuntimeError):
+                with telemetry.span("smtp_send"):
+                    raise RuntimeError("boom")
+
+        assert metrics.summary()["stages"]["smtp_send"]["errors"] == 1
+
+    def test_span_without_collector_is_a_no_op(self):
+        with telemetry.span("parse"):
+            assert telemetry.current_stage() == "parse"
+        assert telemetry.current_stage() is None
+
+    def test_finish_is_idempotent_and_stops_collecting(self):
+        metrics = telemetry.collect("run").start()
+        first = metrics.finish()
+        with telemetry.span("parse"):
+            pass
+
+        assert metrics.finish() == first
+        assert first["stages"] == {}
+
+
+class TestLLMUsage:
+    def test_usage_is_aggregated_per_model(self):
+        with telemetry.collect("conversation") as metrics:
+            with telemetry.span("generate"):
+                telemetry.record_llm_usage("openai", "gpt-4o", 1000, 200, 800)
+            with telemetry.span("evaluate"):
+                telemetry.record_llm_usage("openai", "gpt-4o-mini", 500, 50)
+                telemetry.record_llm_usage("openai", "gpt-4o-mini", 400, 40)
+
+        llm = {row["model"]: row for row in metrics.summary()["llm"]}
+        assert llm["gpt-4o"] == {
+            "stage": "generate", "provider": "openai", "model": "gpt-4o", "calls": 1,
+            "prompt_tokens": 1000, "completion_tokens": 200, "cached_tokens": 800,
+        }
+        assert llm["gpt-4o-mini"]["calls"] == 2
+        assert llm["gpt-4o-mini"]["prompt_tokens"] == 900
+        assert metrics.llm_calls[0]["stage"] == "generate"
+
+    def test_non_numeric_usage_counts_as_zero(self):
+        with telemetry.collect("conversation") as metrics:
+            telemetry.record_llm_usage("openai", "gpt-4o", None, object())
+
+        assert metrics.summary()["llm"][0]["prompt_tokens"] == 0
+        assert metrics.summary()["llm"][0]["completion_tokens"] == 0
+
+    def test_openai_responses_usage(self):
+        import services.openai_service as oai
+
+        usage = SimpleNamespace(input_tokens=1200, output_tokens=300,
+                                input_tokens_details=SimpleNamespace(cached_tokens=1024))
+        with telemetry.collect("conversation") as metrics:
+            oai._record_usage(SimpleNamespace(usage=usage), "gpt-4o", api="responses")
+
+        assert metrics.llm_calls[0]["prompt_tokens"] == 1200
+        assert metrics.llm_calls[0]["completion_tokens"] == 300
+        assert metrics.llm_calls[0]["cached_tokens"] == 1024
+
+    def test_openai_chat_usage_without_details(self):
+        import services.openai_service as oai
+
+        usage = SimpleNamespace(prompt_tokens=90, completion_tokens=5, prompt_tokens_details=None)
+        with telemetry.collect("conversation") as metrics:
+            oai._record_usage(SimpleNamespace(usage=usage), "gpt-4o-mini")
+
+        assert metrics.llm_calls[0]["prompt_tokens"] == 90
+        assert metrics.llm_calls[0]["cached_tokens"] == 0
+
+    def test_anthropic_usage(self):
+        import services.anthropic_service as anth
+
+        usage = SimpleNamespace(input_tokens=700, output_tokens=120, cache_read_input_tokens=600)
+        with telemetry.collect("conversation") as metrics:
+            anth._record_usage(SimpleNamespace(usage=usage), "claude-sonnet-4-6")
+
+        assert metrics.llm_calls[0]["provider"] == "anthropic"
+        assert metrics.llm_calls[0]["prompt_tokens"] == 1300  # cache reads included
+        assert metrics.llm_calls[0]["cached_tokens"] == 600
+
+
+class TestJsonlExport:
+    def test_events_are_appended_with_collector_labels(self, tmp_path, monkeypatch):
+        path = tmp_path / "telemetry.jsonl"
+        monkeypatch.setenv(telemetry.JSONL_ENV_VAR, str(path))
+
+        with telemetry.collect("run", workflow="process_emails", run_id="run-1"):
+            with telemetry.span("generate"):
+                telemetry.record_llm_usage("openai", "gpt-4o", 10, 5)
+
+        events = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [e["type"] for e in events] == ["llm", "span"]
+        assert all(e["workflow"] == "process_emails" and e["run_id"] == "run-1" for e in events)
+        assert events[1]["stage"] == "generate"
+
+    def test_no_file_without_env_var(self, tmp_path, monkeypatch):
+        monkeypatch.delenv(telemetry.JSONL_ENV_VAR, raising=False)
+        monkeypatch.chdir(tmp_path)
+
+        with telemetry.span("parse"):
+            pass
+
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestPipelineMetrics:
+    def test_conversation_stores_stage_timings_and_tokens(self, mock_db, mock_openai, mock_gmail):
+        def generate(user_context, model="gpt-4o"):
+            telemetry.record_llm_usage("openai", model, 1500, 250, 1024)
+            return "Keep going."
+
+        mock_openai["generate_response"].side_effect = generate
+        mock_db["users"].append(make_user(email="alice@example.com"))
+
+        coaching_service.process_email(make_email(from_email="alice@example.com"))
+
+        metrics = mock_db["conversations"][0]["pipeline_metrics"]
+        assert {"parse", "context_build", "generate", "evaluate", "satisfaction"} <= set(metrics["stages"])
+        assert metrics["llm"] == [{
+            "stage": "generate", "provider": "openai", "model": "gpt-4o", "calls": 1,
+            "prompt_tokens": 1500, "completion_tokens": 250, "cached_tokens": 1024,
+        }]
+        json.dumps(metrics)  # stored as jsonb
+
+    def test_workflow_run_aggregates_conversations(self, mock_db, mock_openai, mock_gmail):
+        mock_db["users"].append(make_user(email="alice@example.com"))
+        mock_db["users"].append(make_user(email="bob@example.com"))
+        mock_gmail["fetch_unread_emails"].return_value = [
+            make_email(from_email="alice@example.com", message_id="<a@mail>", imap_id="1"),
+            make_email(from_email="bob@example.com", message_id="<b@mail>", imap_id="2"),
+        ]
+
+        process_emails.run()
+
+        run = mock_db["workflow_runs"][0]
+        assert run["status"] == "completed"
+        assert run["metrics"]["stages"]["generate"]["count"] == 2
+        assert run["metrics"]["stages"]["parse"]["count"] == 2
+
+    def test_failed_run_still_records_metrics(self, mock_db, mock_openai, mock_gmail):
+        mock_gmail["fetch_unread_emails"].side_effect = RuntimeError("IMAP down")
+
+        with pytest.raises(RuntimeError):
+            process_emails.run()
+
+        run = mock_db["workflow_runs"][0]
+        assert run["status"] == "failed"
+        assert run["metrics"]["total_ms"] is not None
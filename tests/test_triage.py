@@ -0,0 +1,194 @@
+"""Tests for pre-LLM triage of trivial replies (services/triage.py).
+
+Covers: classification, routing in process_email, and the run's report of
+LLM calls avoided.
+"""
+
+import pytest
+
+from tests.conftest import make_conversation, make_email, make_user
+from services import coaching_service, triage
+from workflows import process_emails
+
+
+def _classify(body, **email_overrides):
+    email = make_email(body=body, **email_overrides)
+    return triage.classify(email, body.strip())
+
+
+class TestClassify:
+    @pytest.mark.parametrize("body", [
+        "Thanks!", "thank you so much, Wes", "Sounds good", "Got it 👍", "ok thanks!", "👍", "Will do. Cheers",
+    ])
+    def test_acknowledgements(self, body):
+        assert _classify(body) == triage.ACKNOWLEDGEMENT
+
+    @pytest.mark.parametrize("body", [
+        "Thanks! Quick question though?",
+        "Thanks, I talked to 3 customers and one wants to pay.",
+        "Great news: my first customer signed up today",
+    ])
+    def test_real_messages_are_not_triaged(self, body):
+        assert _classify(body) is None
+
+    def test_auto_submitted_header(self):
+        assert _classify("Thanks for your email.", auto_headers={"Auto-Submitted": "auto-replied"}) == triage.AUTO_REPLY
+
+    def test_auto_submitted_no_is_a_person(self):
+        assert _classify("I shipped the landing page", auto_headers={"Auto-Submitted": "no"}) is None
+
+    def test_out_of_office_subject_is_only_flagged(self):
+        assert _classify("Back Monday.", subject="Out of Office: Re: Coaching") == triage.POSSIBLE_AUTO_REPLY
+
+    def test_out_of_office_subject_with_header_is_an_auto_reply(self):
+        assert _classify("Back Monday.", subject="Out of Office: Re: Coaching",
+                         auto_headers={"X-Autoreply": "yes"}) == triage.AUTO_REPLY
+
+    def test_out_of_office_subject_pause_request_is_not_triaged(self):
+        body = "Away for two weeks, please pause my check-ins."
+        assert _classify(body, subject="Out of office") is None
+
+    def test_out_of_office_body_is_only_flagged(self):
+        body = "Hi, I am currently out of the office until March 3 with limited access to email."
+        assert _classify(body) == triage.POSSIBLE_AUTO_REPLY
+
+    def test_vacation_pause_request_is_not_triaged(self):
+        body = "I will be on vacation next week, please pause my check-ins until the 20th."
+        assert _classify(body) is None
+        assert _classify(body, in_reply_to="") is None
+
+    def test_vacation_question_is_not_triaged(self):
+        assert _classify("I'm out of the office next week, can we skip the check-in?") is None
+
+    def test_out_of_office_update_is_never_an_auto_reply(self):
+        body = ("I'm out of the office this week but wanted to say I launched the landing page "
+                "and got 12 signups.")
+        assert _classify(body) != triage.AUTO_REPLY
+
+    def test_longer_body_needs_missing_in_reply_to(self):
+        body = ("Thank you for your message. I am currently out of the office until March 3 with "
+                "limited access to email. For anything urgent, please contact my colleague Sam at the main office.")
+        assert _classify(body) is None
+        assert _classify(body, in_reply_to="") == triage.POSSIBLE_AUTO_REPLY
+
+    def test_long_update_mentioning_vacation_is_real(self):
+        body = "I'm on vacation next week, so " + "here is what I got done with the pricing page. " * 20
+        assert _classify(body) is None
+
+    def test_empty_body(self):
+        assert _classify("  \n\n ") == triage.EMPTY
+
+    def test_canned_reply_matches_thanks(self):
+        assert triage.canned_reply("thanks!", "Alice").startswith("Anytime, Alice")
+        assert triage.canned_reply("sounds good", "Alice").startswith("Sounds good, Alice")
+
+
+class TestRouting:
+    def test_acknowledgement_gets_canned_draft_without_llm(self, mock_db, mock_openai, mock_gmail):
+        user = make_user(email="alice@example.com", first_name="Alice")
+        mock_db["users"].append(user)
+
+        coaching_service.process_email(make_email(from_email="alice@example.com", body="Thanks Wes!"))
+
+        conv = mock_db["conversations"][0]
+        assert conv["status"] == "Pending Review"
+        assert conv["ai_response"].startswith("Anytime, Alice")
+        assert user["last_response_date"] is not None
+        mock_openai["generate_response"].assert_not_called()
+        mock_openai["evaluate_response"].assert_not_called()
+        mock_openai["analyze_satisfaction"].assert_not_called()
+
+    def test_paused_user_acknowledgement_gets_no_draft(self, mock_db, mock_openai, mock_gmail):
+        user = make_user(email="alice@example.com", status="Paused")
+        mock_db["users"].append(user)
+
+        coaching_service.process_email(make_email(from_email="alice@example.com", body="ok thanks"))
+
+        assert mock_db["conversations"] == []
+        assert user["status"] == "Paused"
+        mock_openai["parse_email_fallback"].assert_not_called()
+
+    def test_acknowledgement_at_reply_cap_gets_wrap_up(self, mock_db, mock_openai, mock_gmail):
+        user = make_user(email="alice@example.com", first_name="Alice")
+        mock_db["users"].append(user)
+        for _ in range(4):
+            mock_db["conversations"].append(make_conversation(user_id=user["id"], type="Follow-up", status="Sent"))
+
+        coaching_service.process_email(make_email(from_email="alice@example.com", body="👍"))
+
+        conv = mock_db["conversations"][-1]
+        assert conv["flag_reason"] == "Thread reply cap (4) reached"
+        assert conv["ai_response"].startswith("Great conversation so far, Alice")
+        mock_openai["parse_email_fallback"].assert_not_called()
+        mock_openai["generate_response"].assert_not_called()
+
+    def test_auto_reply_gets_no_response(self, mock_db, mock_openai, mock_gmail):
+        user = make_user(email="alice@example.com", status="Active")
+        mock_db["users"].append(user)
+
+        coaching_service.process_email(make_email(
+            from_email="alice@example.com", body="I'm out of the office, taking a break until Monday.",
+            auto_headers={"Auto-Submitted": "auto-replied"},
+        ))
+
+        assert mock_db["conversations"] == []
+        assert user["status"] == "Active"  # "break" is not read as a pause request
+        mock_openai["generate_response"].assert_not_called()
+
+    def test_vacation_pause_request_pauses_user(self, mock_db, mock_openai, mock_gmail):
+        user = make_user(email="alice@example.com", status="Active")
+        mock_db["users"].append(user)
+
+        coaching_service.process_email(make_email(
+            from_email="alice@example.com",
+            body="I will be on vacation next week, please pause my check-ins until the 20th.",
+        ))
+
+        assert user["status"] == "Paused"
+
+    def test_body_only_auto_reply_is_flagged_not_dropped(self, mock_db, mock_openai, mock_gmail):
+        mock_db["users"].append(make_user(email="alice@example.com"))
+
+        coaching_service.process_email(make_email(
+            from_email="alice@example.com",
+            body="I'm out of the office this week but wanted to say I launched the landing page and got 12 signups.",
+        ))
+
+        conv = mock_db["conversations"][0]
+        assert conv["status"] == "Flagged"
+        assert "out-of-office" in conv["flag_reason"]
+        mock_openai["generate_response"].assert_not_called()
+
+    def test_empty_reply_is_flagged_without_draft(self, mock_db, mock_openai, mock_gmail):
+        mock_db["users"].append(make_user(email="alice@example.com"))
+
+        coaching_service.process_email(make_email(from_email="alice@example.com", body=""))
+
+        conv = mock_db["conversations"][0]
+        assert conv["status"] == "Flagged"
+        assert not conv.get("ai_response")
+        mock_openai["parse_email_fallback"].assert_not_called()
+        mock_openai["generate_response"].assert_not_called()
+
+    def test_onboarding_acknowledgement_still_activates(self, mock_db, mock_openai, mock_gmail):
+        user = make_user(email="alice@example.com", status="Onboarding")
+        mock_db["users"].append(user)
+
+        coaching_service.process_email(make_email(from_email="alice@example.com", body="Sounds good!"))
+
+        assert user["status"] == "Active"
+        mock_openai["generate_response"].assert_called_once()
+
+    def test_run_reports_llm_calls_avoided(self, mock_db, mock_openai, mock_gmail):
+        mock_db["users"].append(make_user(email="alice@example.com"))
+        mock_db["users"].append(make_user(email="bob@example.com"))
+        mock_gmail["fetch_unread_emails"].return_value = [
+            make_email(from_email="alice@example.com", imap_id="1", body="Thanks!"),
+            make_email(from_email="bob@example.com", imap_id="2", body="I raised my prices."),
+        ]
+
+        process_emails.run(force=True)
+
+        report = mock_db["workflow_runs"][0]["metrics"]["triage"]
+        assert report["routes"] == {"acknowledgement": 1}
+        assert report["llm_calls_avoided"] == triage.LLM_CALLS_PER_EMAIL
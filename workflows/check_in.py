@@ -1,24 +1,36 @@
 """Send check-in emails to active users based on their personalized schedule."""
 
+import contextvars
 import logging
 from datetime import datetime, timezone
 
 from db import supabase_client as db
-from services import ai_service
+from services import ai_service, deadline, job_queue, openai_service, telemetry
 
 logger = logging.getLogger(__name__)
 
+# Subject for check-ins whose personalized subject could not be generated
+DEFAULT_SUBJECT = "Coaching Check-In"
+
 DAY_MAP = {0: "mon", 1: "tue", 2: "wed", 3: "thu", 4: "fri", 5: "sat", 6: "sun"}
 
+# Users and AI routes run() has already loaded, for the jobs it drains itself.
+# Jobs drained by a worker or a later run load their own.
+_prefetched = contextvars.ContextVar("checkin_prefetched", default=None)
+
 
 def run():
     """Send personalized check-in emails based on each user's configured schedule."""
     run_id = db.start_workflow_run("check_in")
+    run_metrics = telemetry.collect("run", workflow="check_in", run_id=run_id).start()
     sent = 0
 
     try:
+        # Schedule, timezone and AI settings in one query
+        settings = ai_service.load_ai_settings({"coach_timezone": "America/New_York", **db.CHECKIN_SETTINGS})
+
         # Determine today's day of week
-        tz_name = db.get_setting("coach_timezone", "America/New_York")
+        tz_name = settings["coach_timezone"]
         try:
             from zoneinfo import ZoneInfo
             tz = ZoneInfo(tz_name)
@@ -32,49 +44,98 @@ def run():
         now = datetime.now(tz)
         today = DAY_MAP[now.weekday()]
 
-        users = db.get_active_users_for_checkin_today(today)
+        users = db.get_active_users_for_checkin_today(today, settings=settings)
         logger.info(f"Found {len(users)} users scheduled for check-in on {today}")
 
-        for user in users:
-            try:
-                first_name = user.get("first_name") or "there"
-                email_addr = user["email"]
-
-                # Skip users who already have pending outreach
-                if db.has_pending_outreach(user["id"]):
-                    logger.info(f"Skipping check-in for {email_addr}: has pending outreach")
-                    continue
-
-                # Generate personalized check-in question based on user context
-                checkin_body = _generate_checkin_body(user, first_name)
-
-                # Route through Pending Review instead of sending directly
-                db.create_conversation({
-                    "user_id": user["id"],
-                    "type": "Check-in",
-                    "status": "Pending Review",
-                    "ai_response": checkin_body,
-                    "confidence": 9,
-                })
-
-                sent += 1
-                logger.info(f"Check-in queued for review: {email_addr}")
-
-            except Exception as e:
-                logger.error(f"Error creating check-in for {user['email']}: {e}", exc_info=True)
-                continue
-
-        db.complete_workflow_run(run_id, items_processed=sent)
+        # Keyed per user per day, so overlapping runs don't queue the same check-in twice
+        date_key = now.date().isoformat()
+        job_queue.enqueue_many([
+            job_queue.job("generate_checkin", {"user_id": u["id"]}, dedupe_key=f"checkin:{u['id']}:{date_key}")
+            for u in users
+        ])
+
+        token = _prefetched.set({
+            "users": {u["id"]: u for u in users},
+            "ai_routes": ai_service.get_ai_routes(settings) if users else None,
+        })
+        try:
+            result = job_queue.drain(["generate_checkin"])
+        finally:
+            _prefetched.reset(token)
+        sent = result["done"]
+        logger.info(f"{sent} check-in(s) queued for review")
+
+        db.complete_workflow_run(run_id, items_processed=sent, items_failed=len(result["errors"]),
+                                metrics=run_metrics.finish())
         logger.info(f"check_in completed: {sent} check-ins sent")
 
     except Exception as e:
         logger.error(f"check_in workflow failed: {e}", exc_info=True)
-        db.fail_workflow_run(run_id, str(e))
+        db.fail_workflow_run(run_id, str(e), metrics=run_metrics.finish())
         raise
 
 
-def _generate_checkin_body(user: dict, first_name: str) -> str:
-    """Generate a personalized check-in message or fall back to the standard template."""
+@job_queue.handler("generate_checkin", batch=True)
+def handle_generate_checkins(payloads: list[dict]) -> list:
+    """Draft check-ins for a batch of users into Pending Review.
+
+    Users, pending outreach and recent history are loaded for the whole batch
+    in three queries and the drafts are inserted in one; users and AI routes
+    run() already loaded are reused. Each draft carries
+    its subject line, so send_approved makes no LLM calls. Users who already
+    have outreach waiting, or are no longer Active, are skipped; those not
+    reached before the run deadline are deferred.
+    """
+    ids = [p["user_id"] for p in payloads]
+    prefetched = _prefetched.get() or {}
+    users = {uid: prefetched["users"][uid] for uid in ids if uid in prefetched.get("users", {})}
+    missing = [uid for uid in ids if uid not in users]
+    if missing:
+        users.update({u["id"]: u for u in db.get_users_by_ids(missing)})
+    pending = db.get_users_with_pending_outreach(list(users))
+    eligible = [uid for uid, u in users.items() if uid not in pending and u.get("status") == "Active"]
+    history = db.get_recent_conversations_for_users(eligible, limit=2)
+    ai_routes = (prefetched.get("ai_routes") or ai_service.get_ai_routes()) if eligible else None
+
+    drafts = []
+    results = []
+    for user_id in ids:
+        user = users.get(user_id)
+        if user_id not in eligible:
+            reason = "has pending outreach" if user_id in pending else "not an active user"
+            logger.info(f"Skipping check-in for {user['email'] if user else user_id}: {reason}")
+            results.append(None)
+            continue
+
+        if not deadline.allows(job_queue.POLICIES["generate_checkin"]["item_seconds"]):
+            results.append(job_queue.DEFERRED)
+            continue
+
+        # Generate personalized check-in question based on user context
+        first_name = user.get("first_name") or "there"
+        checkin_body = _generate_checkin_body(user, first_name, history.get(user_id, []), ai_routes)
+
+        # Route through Pending Review instead of sending directly
+        drafts.append({
+            "user_id": user_id,
+            "type": "Check-in",
+            "status": "Pending Review",
+            "ai_response": checkin_body,
+            "email_subject": generate_subject(user),
+            "confidence": 9,
+        })
+        results.append(True)
+        logger.info(f"Check-in drafted for {user['email']}")
+
+    db.create_conversations(drafts)
+    return results
+
+
+def _generate_checkin_body(user: dict, first_name: str, recent: list[dict], ai_routes: list[tuple] = None) -> str:
+    """Generate a personalized check-in message or fall back to the standard template.
+
+    recent is the user's latest Sent conversations, newest first.
+    """
     try:
         # Build minimal context for check-in generation
         summary = user.get("summary") or "No history yet"
@@ -82,8 +143,6 @@ def _generate_checkin_body(user: dict, first_name: str) -> str:
         business_idea = user.get("business_idea") or "Not specified"
         challenge = user.get("current_challenge") or "Not specified"
 
-        # Get recent conversations for context
-        recent = db.get_recent_conversations(user["id"], limit=2)
         recent_text = ""
         if recent:
             for conv in reversed(recent):
@@ -99,13 +158,29 @@ Current Challenge: {challenge}
 Journey Summary: {summary[-500:] if len(summary) > 500 else summary}
 Recent Exchanges: {recent_text if recent_text else 'None yet'}"""
 
-        return ai_service.generate_checkin_question(context)
+        return ai_service.generate_checkin_question(context, routes=ai_routes)
 
     except Exception as e:
         logger.warning(f"Failed to generate personalized check-in for {first_name}: {e}. Using standard template.")
         return _standard_checkin_body(first_name)
 
 
+def generate_subject(user: dict) -> str:
+    """Personalized subject line for a check-in, or "Coaching Check-In" if generation fails."""
+    try:
+        context_parts = [f"Name: {user.get('first_name') or 'there'}"]
+        if user.get("business_idea"):
+            context_parts.append(f"Project: {user['business_idea']}")
+        if user.get("current_challenge"):
+            context_parts.append(f"Current challenge: {user['current_challenge']}")
+        if user.get("summary"):
+            context_parts.append(f"Recent progress: {user['summary'][-200:]}")
+        return openai_service.generate_email_subject("\n".join(context_parts))
+    except Exception as e:
+        logger.warning(f"Failed to generate check-in subject for {user.get('email')}: {e}")
+        return DEFAULT_SUBJECT
+
+
 def _standard_checkin_body(first_name: str) -> str:
     """Fallback standard check-in template."""
     return f"""Hey {first_name},
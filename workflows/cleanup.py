@@ -4,7 +4,7 @@ import logging
 from datetime import datetime, timezone
 
 from db import supabase_client as db
-from services import gmail_service
+from services import gmail_service, telemetry
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +12,7 @@ logger = logging.getLogger(__name__)
 def run():
     """Find unread emails older than 24h and log them as flagged."""
     run_id = db.start_workflow_run("cleanup")
+    run_metrics = telemetry.collect("run", workflow="cleanup", run_id=run_id).start()
     processed = 0
     missed_summary = []
 
@@ -84,10 +85,26 @@ Check the Flagged page in the dashboard."""
             except Exception as e:
                 logger.error(f"Failed to send cleanup notification: {e}")
 
-        db.complete_workflow_run(run_id, items_processed=processed)
+        # Runs killed before they could record an outcome would show as running forever
+        try:
+            stale = db.fail_stale_workflow_runs(older_than_hours=4)
+            if stale:
+                logger.warning(f"Marked {stale} stale workflow run(s) as failed")
+        except Exception as e:
+            logger.error(f"Failed to close stale workflow runs: {e}")
+
+        # Finished jobs are only kept for a week; dead ones stay for review
+        try:
+            purged = db.delete_finished_jobs(older_than_days=7)
+            if purged:
+                logger.info(f"Deleted {purged} finished job(s)")
+        except Exception as e:
+            logger.error(f"Failed to delete finished jobs: {e}")
+
+        db.complete_workflow_run(run_id, items_processed=processed, metrics=run_metrics.finish())
         logger.info(f"cleanup completed: {processed} missed emails flagged")
 
     except Exception as e:
         logger.error(f"cleanup workflow failed: {e}", exc_info=True)
-        db.fail_workflow_run(run_id, str(e))
+        db.fail_workflow_run(run_id, str(e), metrics=run_metrics.finish())
         raise
@@ -1,55 +1,86 @@
 """Fetch new emails and process them into coaching response drafts."""
 
+import json
 import logging
+from datetime import datetime, timezone
 
 from db import supabase_client as db
-from services import gmail_service, coaching_service
+from services import gmail_service, coaching_service, job_queue, telemetry, triage
 
 logger = logging.getLogger(__name__)
 
+# Settings key holding the inbox STATUS seen by the last full run, plus the
+# number of idle ticks skipped since then
+INBOX_STATE_KEY = "inbox_state"
 
-def run():
-    """Main workflow: fetch unread emails, process each one."""
-    run_id = db.start_workflow_run("process_emails")
-    processed = 0
-    skipped = 0
-    errors = []
+# Job types this workflow drains; due ones keep a tick from being idle
+DRAINED_JOB_TYPES = ["regenerate_playbook", "process_email"]
+
+
+def run(force: bool = False):
+    """Main workflow: queue each unread email as a process_email job, then drain the queue.
 
+    Most hourly ticks find no new mail. Unless forced, a tick first compares
+    the inbox STATUS with the one saved by the last full run; if nothing
+    arrived and no jobs are due it only bumps the idle tick counter, without
+    fetching mail or writing a workflow_runs row. The next full run records
+    how many ticks were skipped in its metrics.
+
+    Args:
+        force: If True, skip the idle check (used by dashboard manual trigger).
+    """
+    state = _load_inbox_state()
+    status = None
     try:
-        emails = gmail_service.fetch_unread_emails(max_results=50)
-        logger.info(f"Found {len(emails)} unread emails")
+        status = gmail_service.inbox_status()
+    except Exception as e:
+        logger.warning(f"Inbox STATUS failed, doing a full run: {e}")
 
-        # Collect imap_ids to mark as read only after successful processing
-        to_mark_read = []
+    if not force and status and _inbox_unchanged(status, state) and not db.has_due_jobs(DRAINED_JOB_TYPES):
+        idle_ticks = state.get("idle_ticks", 0) + 1
+        _save_inbox_state(status, idle_ticks)
+        logger.info(f"No new mail and no due jobs; skipping ({idle_ticks} idle tick(s) since the last run)")
+        return
 
-        for email_data in emails:
-            try:
-                result = coaching_service.process_email(email_data)
-                if result:
-                    processed += 1
-                else:
-                    skipped += 1
+    run_id = db.start_workflow_run("process_emails")
+    run_metrics = telemetry.collect("run", workflow="process_emails", run_id=run_id).start()
 
-                # Only queue for mark-as-read AFTER processing succeeded (or intentional skip)
-                to_mark_read.append(email_data["imap_id"])
+    try:
+        emails = gmail_service.fetch_unread_emails(max_results=50)
+        logger.info(f"Found {len(emails)} unread emails")
 
-            except Exception as e:
-                error_msg = f"Error processing email from {email_data['from_email']}: {e}"
-                logger.error(error_msg, exc_info=True)
-                errors.append(error_msg)
-                # Don't mark as read so cleanup can catch it
-                continue
-
-        # Batch mark as read — only emails that were successfully processed
-        if to_mark_read:
+        # Once an email is queued the job is the durable record, so it can be
+        # marked read right away. Failures retry from the queue with backoff
+        # instead of leaving the email unread for the next run to refetch.
+        queued = job_queue.enqueue_many([
+            job_queue.job("process_email", email_data, dedupe_key=_job_key(email_data))
+            for email_data in emails
+        ])
+        if emails:
+            logger.info(f"Queued {queued} new email(s)")
             try:
-                gmail_service.mark_multiple_as_read(to_mark_read)
+                gmail_service.mark_multiple_as_read([e["imap_id"] for e in emails])
             except Exception as e:
-                logger.error(f"Failed to mark {len(to_mark_read)} emails as read: {e}", exc_info=True)
-                # Not fatal — cleanup workflow will handle stragglers
-
+                logger.error(f"Failed to mark {len(emails)} emails as read: {e}", exc_info=True)
+                # Not fatal — dedupe_key keeps the refetch from queueing them twice
+
+        # Playbook rebuilds queued by dashboard corrections go first so new
+        # drafts use the latest rules. Due retries from earlier runs drain too.
+        playbook = job_queue.drain(["regenerate_playbook"])
+        result = job_queue.drain(["process_email"])
+        processed, skipped = result["done"], result["skipped"]
+        errors = playbook["errors"] + result["errors"]
+
+        summary = run_metrics.finish()
+        triaged = triage.report(summary)
         db.complete_workflow_run(run_id, items_processed=processed,
-                                items_failed=len(errors), items_skipped=skipped)
+                                items_failed=len(errors), items_skipped=skipped,
+                                metrics={**summary, "idle_ticks": state.get("idle_ticks", 0), "triage": triaged})
+        if triaged["llm_calls_avoided"]:
+            logger.info(f"Triage handled {sum(triaged['routes'].values())} trivial email(s) without the LLM "
+                        f"({triaged['llm_calls_avoided_share']:.0%} of LLM calls avoided)")
+        if status:
+            _save_inbox_state(status, idle_ticks=0)
         logger.info(f"process_emails completed: {processed} processed, {skipped} skipped, {len(errors)} errors")
 
         # Send alert if there were errors
@@ -58,7 +89,7 @@ def run():
 
     except Exception as e:
         logger.error(f"process_emails workflow failed: {e}", exc_info=True)
-        db.fail_workflow_run(run_id, str(e))
+        db.fail_workflow_run(run_id, str(e), metrics=run_metrics.finish())
         _send_error_alert("process_emails", [str(e)])
         raise
 
@@ -82,3 +113,77 @@ Check the dashboard for more details."""
         )
     except Exception as e:
         logger.error(f"Failed to send error alert: {e}")
+
+
+def _load_inbox_state() -> dict:
+    try:
+        return json.loads(db.get_setting(INBOX_STATE_KEY) or "{}")
+    except ValueError:
+        return {}
+
+
+def _save_inbox_state(status: dict, idle_ticks: int):
+    db.set_setting(INBOX_STATE_KEY, json.dumps({
+        **status,
+        "idle_ticks": idle_ticks,
+        "checked_at": datetime.now(timezone.utc).isoformat(),
+    }))
+
+
+def _inbox_unchanged(status: dict, state: dict) -> bool:
+    """True if a full run would find nothing new.
+
+    No unseen mail means an empty fetch. Otherwise the unseen mail is only
+    new if UIDNEXT or the unseen count moved since the last full run;
+    leftovers like our own messages stay unseen without being refetched.
+    """
+    if status.get("unseen") == 0:
+        return True
+    return all(status.get(k) == state.get(k) for k in ("uidvalidity", "uidnext", "unseen"))
+
+
+def _job_key(email_data: dict) -> str:
+    return f"email:{email_data.get('message_id') or coaching_service.generate_dedup_key(email_data)}"
+
+
+@job_queue.handler("process_email")
+def handle_process_email(email_data: dict):
+    """Process one queued email. Safe to repeat: process_email skips Message-IDs it has seen."""
+    return coaching_service.process_email(email_data)
+
+
+@job_queue.on_dead("process_email")
+def quarantine_email(email_data: dict, error: Exception, attempts: int):
+    """Flag an email that failed every attempt, so it is reviewed by hand instead of retried.
+
+    The Flagged conversation carries the Message-ID, so process_email and
+    cleanup skip the email from now on even if it is fetched again.
+    """
+    message_id = email_data.get("message_id") or coaching_service.generate_dedup_key(email_data)
+    if db.conversation_exists_for_message(message_id):
+        return
+
+    from_email = email_data["from_email"]
+    flag_reason = f"Processing failed {attempts} time(s) - manual review needed. Last error: {error}"[:1000]
+    user = db.get_user_by_email(from_email)
+    if user:
+        db.create_conversation({
+            "user_id": user["id"],
+            "type": "Follow-up",
+            "user_message_raw": email_data["body"],
+            "email_subject": email_data.get("subject"),
+            "status": "Flagged",
+            "flag_reason": flag_reason,
+            "gmail_message_id": message_id,
+            "gmail_thread_id": email_data.get("in_reply_to"),
+        })
+    else:
+        db.create_conversation({
+            "type": "Onboarding",
+            "user_message_raw": f"From: {from_email}\n\n{email_data['body']}",
+            "email_subject": email_data.get("subject"),
+            "status": "Flagged",
+            "flag_reason": flag_reason,
+            "gmail_message_id": message_id,
+        })
+    logger.warning(f"Quarantined email {message_id} from {from_email} after {attempts} failed attempt(s)")
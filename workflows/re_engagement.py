@@ -4,6 +4,7 @@ import logging
 from datetime import datetime, timezone
 
 from db import supabase_client as db
+from services import telemetry
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +16,7 @@ def run():
     2. Mark users silent for 17+ days as "Silent" status
     """
     run_id = db.start_workflow_run("re_engagement")
+    run_metrics = telemetry.collect("run", workflow="re_engagement", run_id=run_id).start()
     processed = 0
 
     try:
@@ -24,15 +26,20 @@ def run():
         silent_users = db.get_silent_users(days=re_engagement_days)
         logger.info(f"Found {len(silent_users)} users silent for {re_engagement_days}+ days")
 
+        silent_ids = [u["id"] for u in silent_users]
+        pending = db.get_users_with_pending_outreach(silent_ids)
+        recently_reengaged = db.get_users_with_recent_reengagement(silent_ids, within_days=14)
+
+        drafts = []
         for user in silent_users:
             try:
                 # Skip if there's already pending outreach (Pending Review or Approved)
-                if db.has_pending_outreach(user["id"]):
+                if user["id"] in pending:
                     logger.info(f"Pending outreach exists for {user['email']}, skipping re-engagement")
                     continue
 
                 # Skip if we already sent a re-engagement in the last 14 days
-                if db.has_recent_reengagement(user["id"], within_days=14):
+                if user["id"] in recently_reengaged:
                     logger.info(f"Already sent re-engagement to {user['email']} recently, skipping")
                     continue
 
@@ -45,66 +52,77 @@ Haven't heard from you in a bit. Everything okay?
 When you're ready, just reply with a quick update on what you're working on."""
 
                 # Route through Pending Review instead of sending directly
-                db.create_conversation({
+                drafts.append({
                     "user_id": user["id"],
                     "type": "Re-engagement",
                     "status": "Pending Review",
                     "ai_response": body,
                 })
-
-                processed += 1
-                logger.info(f"Re-engagement queued for review: {user['email']}")
+                logger.info(f"Re-engagement drafted for {user['email']}")
 
             except Exception as e:
                 logger.error(f"Error sending re-engagement to {user['email']}: {e}", exc_info=True)
                 continue
 
-        # Part 2: Mark very silent users (17+ days = 10 days + 7 days after re-engagement)
-        very_silent_users = db.get_silent_users(days=re_engagement_days + 7)
-        for user in very_silent_users:
-            try:
-                db.update_user(user["id"], {"status": "Silent"})
+        db.create_conversations(drafts)
+        processed += len(drafts)
+
+        # Part 2: Mark very silent users (17+ days = 10 days + 7 days after re-engagement).
+        # They are a subset of silent_users, so no second read is needed.
+        very_silent_users = [
+            u for u in silent_users
+            if _days_since(u["last_response_date"]) >= re_engagement_days + 7
+        ]
+        if very_silent_users:
+            db.update_users([u["id"] for u in very_silent_users], {"status": "Silent"})
+            for user in very_silent_users:
                 logger.info(f"Marked {user['email']} as Silent")
-                processed += 1
-            except Exception as e:
-                logger.error(f"Error marking {user['email']} as Silent: {e}", exc_info=True)
+            processed += len(very_silent_users)
 
         # Part 3: Flag stalled onboarding users (no conversation in 7+ days)
-        onboarding_users = db.get_onboarding_users()
-        for user in onboarding_users:
+        stalled = []
+        for user in db.get_onboarding_users():
             try:
-                created = datetime.fromisoformat(user["created_at"].replace("Z", "+00:00"))
-                days_since = (datetime.now(timezone.utc) - created).days
-                if days_since < 7:
-                    continue
+                days_since = _days_since(user["created_at"])
+                if days_since >= 7:
+                    stalled.append((user, days_since))
+            except Exception as e:
+                logger.error(f"Error checking onboarding stall for {user.get('email')}: {e}", exc_info=True)
 
-                # Check if there's already a flagged conversation for this stall
-                existing = db.get_conversations_for_user(user["id"])
-                already_flagged = any(
-                    c.get("status") == "Flagged" and "stalled" in (c.get("flag_reason") or "").lower()
-                    for c in existing
-                )
-                if already_flagged:
-                    continue
+        # Existing flags for all stalled users in one query
+        flagged = db.get_conversations_for_users([u["id"] for u, _ in stalled], status="Flagged")
+        stall_flags = []
+        for user, days_since in stalled:
+            already_flagged = any(
+                "stalled" in (c.get("flag_reason") or "").lower()
+                for c in flagged.get(user["id"], [])
+            )
+            if already_flagged:
+                continue
 
-                first_name = user.get("first_name") or user.get("email", "Unknown")
-                db.create_conversation({
-                    "user_id": user["id"],
-                    "type": "Onboarding",
-                    "status": "Flagged",
-                    "flag_reason": f"Onboarding stalled — {first_name} hasn't responded in {days_since} days",
-                    "ai_response": None,
-                })
-                processed += 1
-                logger.info(f"Flagged stalled onboarding for {user['email']} ({days_since} days)")
+            first_name = user.get("first_name") or user.get("email", "Unknown")
+            stall_flags.append({
+                "user_id": user["id"],
+                "type": "Onboarding",
+                "status": "Flagged",
+                "flag_reason": f"Onboarding stalled — {first_name} hasn't responded in {days_since} days",
+                "ai_response": None,
+            })
+            logger.info(f"Flagged stalled onboarding for {user['email']} ({days_since} days)")
 
-            except Exception as e:
-                logger.error(f"Error checking onboarding stall for {user.get('email')}: {e}", exc_info=True)
+        db.create_conversations(stall_flags)
+        processed += len(stall_flags)
 
-        db.complete_workflow_run(run_id, items_processed=processed)
+        db.complete_workflow_run(run_id, items_processed=processed, metrics=run_metrics.finish())
         logger.info(f"re_engagement completed: {processed} items processed")
 
     except Exception as e:
         logger.error(f"re_engagement workflow failed: {e}", exc_info=True)
-        db.fail_workflow_run(run_id, str(e))
+        db.fail_workflow_run(run_id, str(e), metrics=run_metrics.finish())
         raise
+
+
+def _days_since(timestamp: str) -> int:
+    """Whole days between an ISO timestamp and now."""
+    then = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    return (datetime.now(timezone.utc) - then).days
@@ -7,33 +7,73 @@ import time
 from datetime import datetime, timezone
 
 from db import supabase_client as db
-from services import gmail_service, openai_service
+from services import deadline, gmail_service, job_queue, openai_service, telemetry
+from workflows import check_in
 
 logger = logging.getLogger(__name__)
 
 
 def run(immediate=False):
-    """Send all approved, unsent responses.
+    """Queue all approved, unsent responses as send jobs, then drain the queue.
 
     Each email gets a random offset of 1-N minutes (default N=100) so
     responses land at varied, human-feeling times rather than in a cluster.
     Emails are sorted by offset and sent with incremental gaps between them.
+    Summary updates for sent emails are queued and drained after the sends.
 
     Args:
         immediate: If True, skip all sleep delays (used by dashboard manual trigger).
     """
     run_id = db.start_workflow_run("send_approved")
-    sent = 0
-    errors = []
+    run_metrics = telemetry.collect("run", workflow="send_approved", run_id=run_id).start()
 
     try:
         conversations = db.get_approved_unsent()
         logger.info(f"Found {len(conversations)} approved responses to send")
 
-        if not conversations:
-            db.complete_workflow_run(run_id, items_processed=0, items_failed=0)
-            return
+        # Keyed per conversation: while a send job is queued or running, no
+        # other run can queue (and send) the same conversation
+        job_queue.enqueue_many([
+            job_queue.job("send", {"conversation_id": c["id"], "immediate": immediate}, dedupe_key=f"send:{c['id']}")
+            for c in conversations
+        ])
 
+        sends = job_queue.drain(["send"])
+        summaries = job_queue.drain(["update_summary"])
+        sent, errors = sends["done"], sends["errors"] + summaries["errors"]
+
+        db.complete_workflow_run(run_id, items_processed=sent, items_failed=len(errors),
+                                metrics=run_metrics.finish())
+        logger.info(f"send_approved completed: {sent} sent, {len(errors)} errors")
+
+        # Send alert if there were errors
+        if errors:
+            _send_error_alert("send_approved", errors)
+
+    except Exception as e:
+        logger.error(f"send_approved workflow failed: {e}", exc_info=True)
+        db.fail_workflow_run(run_id, str(e), metrics=run_metrics.finish())
+        _send_error_alert("send_approved", [str(e)])
+        raise
+
+
+@job_queue.handler("send", batch=True)
+def handle_sends(payloads: list[dict]) -> list:
+    """Send a batch of approved conversations, paced by random offsets.
+
+    Conversations are reloaded so one that was already sent, or pulled back
+    from Approved, is skipped. Subjects are pregenerated and fallback
+    threads loaded up front, so each send is the SMTP call plus one status
+    write; summary updates for the sent ones are queued in one query at the
+    end. Sends whose wait would run past the run deadline are deferred to
+    the next run.
+    """
+    ids = [p["conversation_id"] for p in payloads]
+    immediate = all(p.get("immediate") for p in payloads)
+    conversations = db.get_conversations_for_send(ids)
+    outcomes = {}
+
+    if conversations:
         # Assign each email a random offset and sort by it
         max_offset = max(1, int(db.get_setting("send_delay_max_minutes", "100")))
         for conv in conversations:
@@ -42,168 +82,197 @@ def run(immediate=False):
 
         logger.info(f"Send offsets: {[c['_send_offset'] for c in conversations]} minutes")
 
-        prev_offset = 0
-        for conv in conversations:
-            try:
-                user = conv.get("users")
-                if not user:
-                    logger.warning(f"No user found for conversation {conv['id']}")
-                    continue
-
-                # Use sent_response if edited, otherwise ai_response
-                response_text = conv.get("sent_response") or conv.get("ai_response")
-                if not response_text:
-                    logger.warning(f"No response text for conversation {conv['id']}")
-                    continue
-
-                # Add sign-off
-                full_response = f"{response_text}\n\nWes"
-
-                # Sleep the incremental gap from previous email's offset
-                if not immediate:
-                    gap_minutes = conv["_send_offset"] - prev_offset
-                    gap_seconds = gap_minutes * 60
-                    logger.info(f"Sending to {user['email']} (offset {conv['_send_offset']}m, sleeping {gap_seconds}s)")
-                    time.sleep(gap_seconds)
-                    prev_offset = conv["_send_offset"]
-                else:
-                    logger.info(f"Sending to {user['email']} (immediate mode, no delay)")
-
-                # Determine subject and threading based on conversation type
-                conv_type = conv.get("type")
-
-                if conv_type == "Check-in":
-                    # Check-ins start a fresh thread with a personalized subject
-                    try:
-                        context_parts = [f"Name: {user.get('first_name', 'there')}"]
-                        if user.get("business_idea"):
-                            context_parts.append(f"Project: {user['business_idea']}")
-                        if user.get("current_challenge"):
-                            context_parts.append(f"Current challenge: {user['current_challenge']}")
-                        if user.get("summary"):
-                            context_parts.append(f"Recent progress: {user['summary'][-200:]}")
-                        subject = openai_service.generate_email_subject("\n".join(context_parts))
-                    except Exception:
-                        subject = "Coaching Check-In"
-                    in_reply_to = None
-                    references = None
-                elif conv_type == "Onboarding":
-                    # Onboarding emails use "Launch Pad Coaching" subject
-                    in_reply_to = user.get("gmail_message_id")
-                    references = user.get("gmail_message_id")
-                    if in_reply_to:
-                        # Follow-up onboarding — thread under original subject
-                        subject = "Re: Launch Pad Coaching"
-                    else:
-                        # First onboarding message — fresh thread
-                        subject = "Launch Pad Coaching"
-                else:
-                    # Reply to user's email — use their thread subject
-                    stored_subject = conv.get("email_subject")
-                    if stored_subject:
-                        if stored_subject.lower().startswith("re:"):
-                            subject = stored_subject
-                        else:
-                            subject = f"Re: {stored_subject}"
-                    else:
-                        subject = "Re: Coaching"
-                    in_reply_to = user.get("gmail_message_id")
-                    references = user.get("gmail_message_id")
-
-                    if not in_reply_to:
-                        # Fallback: try to find thread from recent conversations
-                        recent = db.get_recent_conversations(user["id"], limit=1)
-                        if recent and recent[0].get("gmail_message_id"):
-                            in_reply_to = recent[0]["gmail_message_id"]
-                            references = in_reply_to
-                            logger.info(f"Using fallback threading for {user['email']}")
-
-                sent_msg_id = gmail_service.send_email(
-                    to_email=user["email"],
-                    subject=subject,
-                    body=full_response,
-                    in_reply_to=in_reply_to,
-                    references=references,
-                )
-
-                # Update conversation status
+    unthreaded = {c["user_id"] for c in conversations
+                  if c.get("users") and c.get("type") not in ("Check-in", "Onboarding")
+                  and not c["users"].get("gmail_message_id")}
+    fallback_threads = db.get_latest_sent_message_ids(list(unthreaded)) if unthreaded else {}
+
+    summary_jobs = []
+    prev_offset = 0
+    for conv in conversations:
+        user = conv.get("users")
+        try:
+            if not user:
+                logger.warning(f"No user found for conversation {conv['id']}")
+                continue
+
+            # Use sent_response if edited, otherwise ai_response
+            response_text = conv.get("sent_response") or conv.get("ai_response")
+            if not response_text:
+                logger.warning(f"No response text for conversation {conv['id']}")
+                continue
+
+            # Add sign-off
+            full_response = f"{response_text}\n\nWes"
+
+            # Incremental gap from previous email's offset
+            gap_seconds = 0 if immediate else (conv["_send_offset"] - prev_offset) * 60
+            if not deadline.allows(gap_seconds + job_queue.POLICIES["send"]["item_seconds"]):
+                outcomes[conv["id"]] = job_queue.DEFERRED
+                continue
+
+            if not immediate:
+                logger.info(f"Sending to {user['email']} (offset {conv['_send_offset']}m, sleeping {gap_seconds}s)")
+                time.sleep(gap_seconds)
+                prev_offset = conv["_send_offset"]
+            else:
+                logger.info(f"Sending to {user['email']} (immediate mode, no delay)")
+
+            subject, in_reply_to, references = _subject_and_threading(conv, user, fallback_threads)
+
+            gmail_service.send_email(
+                to_email=user["email"],
+                subject=subject,
+                body=full_response,
+                in_reply_to=in_reply_to,
+                references=references,
+            )
+
+            # Update conversation status
+            db.update_conversation(conv["id"], {
+                "status": "Sent",
+                "sent_at": datetime.now(timezone.utc).isoformat(),
+                "sent_response": response_text,
+                **db.compute_review_metrics(conv, sent_response=response_text),
+            })
+
+            user_message = conv.get("user_message_parsed") or conv.get("user_message_raw") or ""
+            if user_message:
+                summary_jobs.append(job_queue.job("update_summary", {
+                    "user_id": user["id"],
+                    "user_message": user_message,
+                    "coach_response": response_text,
+                    "sent_on": datetime.now(timezone.utc).strftime("%Y-%m-%d"),
+                }, dedupe_key=f"summary:{conv['id']}"))
+
+            outcomes[conv["id"]] = True
+            logger.info(f"Response sent to {user['email']}")
+
+        except smtplib.SMTPRecipientsRefused as e:
+            # Hard bounce — recipient address is invalid
+            error_msg = f"Bounce for conversation {conv['id']} to {user['email']}: {e}"
+            logger.error(error_msg)
+
+            # Track bounce on user
+            current_bounces = (user.get("bounce_count") or 0) + 1
+            user_updates = {"bounce_count": current_bounces}
+            if current_bounces >= 3:
+                user_updates["notes"] = f"{user.get('notes') or ''}\n[AUTO] 3+ bounces detected — email may be invalid.".strip()
+            db.update_user(user["id"], user_updates)
+
+            # Reject this conversation
+            db.update_conversation(conv["id"], {
+                "status": "Rejected",
+                "flag_reason": f"Email bounced ({current_bounces} total bounces)",
+            })
+            outcomes[conv["id"]] = job_queue.PermanentJobError(error_msg)
+
+        except Exception as e:
+            logger.error(f"Error sending response for conversation {conv['id']}: {e}", exc_info=True)
+
+            # Track send attempt; the job queue retries with backoff
+            attempts = (conv.get("send_attempts") or 0) + 1
+            if attempts >= 3:
                 db.update_conversation(conv["id"], {
-                    "status": "Sent",
-                    "sent_at": datetime.now(timezone.utc).isoformat(),
-                    "sent_response": response_text,
+                    "status": "Flagged",
+                    "flag_reason": f"Send failed 3 times: {e}",
+                    "send_attempts": attempts,
                 })
-
-                # Generate and apply summary update
-                try:
-                    user_message = conv.get("user_message_parsed") or conv.get("user_message_raw") or ""
-                    if user_message:
-                        summary_update = openai_service.generate_summary_update(
-                            current_summary=user.get("summary", ""),
-                            user_message=user_message,
-                            coach_response=response_text,
-                        )
-                        current_summary = user.get("summary") or ""
-                        date_prefix = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-                        new_summary = f"{current_summary}\n\n{date_prefix}: {summary_update}".strip()
-                        db.update_user(user["id"], {"summary": new_summary})
-                except Exception as e:
-                    logger.error(f"Failed to update summary for user {user['id']}: {e}")
-
-                sent += 1
-                logger.info(f"Response sent to {user['email']}")
-
-            except smtplib.SMTPRecipientsRefused as e:
-                # Hard bounce — recipient address is invalid
-                error_msg = f"Bounce for conversation {conv['id']} to {user['email']}: {e}"
-                logger.error(error_msg)
-                errors.append(error_msg)
-
-                # Track bounce on user
-                current_bounces = (user.get("bounce_count") or 0) + 1
-                user_updates = {"bounce_count": current_bounces}
-                if current_bounces >= 3:
-                    user_updates["notes"] = f"{user.get('notes') or ''}\n[AUTO] 3+ bounces detected — email may be invalid.".strip()
-                db.update_user(user["id"], user_updates)
-
-                # Reject this conversation
+                outcomes[conv["id"]] = job_queue.PermanentJobError(f"Send failed 3 times: {e}")
+            else:
                 db.update_conversation(conv["id"], {
-                    "status": "Rejected",
-                    "flag_reason": f"Email bounced ({current_bounces} total bounces)",
+                    "status": "Send Failed",
+                    "send_attempts": attempts,
                 })
-                continue
+                outcomes[conv["id"]] = e
 
-            except Exception as e:
-                error_msg = f"Error sending response for conversation {conv['id']}: {e}"
-                logger.error(error_msg, exc_info=True)
-                errors.append(error_msg)
-
-                # Track send attempt for retry logic
-                attempts = (conv.get("send_attempts") or 0) + 1
-                if attempts >= 3:
-                    db.update_conversation(conv["id"], {
-                        "status": "Flagged",
-                        "flag_reason": f"Send failed 3 times: {e}",
-                        "send_attempts": attempts,
-                    })
-                else:
-                    db.update_conversation(conv["id"], {
-                        "status": "Send Failed",
-                        "send_attempts": attempts,
-                    })
-                continue
+    job_queue.enqueue_many(summary_jobs)
+    return [outcomes.get(conversation_id) for conversation_id in ids]
 
-        db.complete_workflow_run(run_id, items_processed=sent, items_failed=len(errors))
-        logger.info(f"send_approved completed: {sent} sent, {len(errors)} errors")
 
-        # Send alert if there were errors
-        if errors:
-            _send_error_alert("send_approved", errors)
+def _subject_and_threading(conv: dict, user: dict, fallback_threads: dict) -> tuple:
+    """Subject, In-Reply-To and References for a conversation based on its type.
 
-    except Exception as e:
-        logger.error(f"send_approved workflow failed: {e}", exc_info=True)
-        db.fail_workflow_run(run_id, str(e))
-        _send_error_alert("send_approved", [str(e)])
-        raise
+    fallback_threads maps user id -> Message-ID of their latest Sent
+    conversation, for users with no gmail_message_id of their own.
+    """
+    conv_type = conv.get("type")
+
+    if conv_type == "Check-in":
+        # Check-ins start a fresh thread with a personalized subject. Drafts
+        # check_in created (no inbound message) carry it in email_subject; a
+        # reply-created Check-in's email_subject is the user's own subject.
+        if conv.get("email_subject") and not conv.get("user_message_raw"):
+            return conv["email_subject"], None, None
+        return check_in.generate_subject(user), None, None
+
+    if conv_type == "Onboarding":
+        # Onboarding emails use "Launch Pad Coaching" subject
+        in_reply_to = user.get("gmail_message_id")
+        if in_reply_to:
+            # Follow-up onboarding — thread under original subject
+            return "Re: Launch Pad Coaching", in_reply_to, in_reply_to
+        # First onboarding message — fresh thread
+        return "Launch Pad Coaching", None, None
+
+    # Reply to user's email — use their thread subject
+    stored_subject = conv.get("email_subject")
+    if stored_subject:
+        if stored_subject.lower().startswith("re:"):
+            subject = stored_subject
+        else:
+            subject = f"Re: {stored_subject}"
+    else:
+        subject = "Re: Coaching"
+    in_reply_to = user.get("gmail_message_id")
+    references = user.get("gmail_message_id")
+
+    if not in_reply_to and fallback_threads.get(user["id"]):
+        # Fallback: thread under their most recent Sent conversation
+        in_reply_to = references = fallback_threads[user["id"]]
+        logger.info(f"Using fallback threading for {user['email']}")
+
+    return subject, in_reply_to, references
+
+
+@job_queue.handler("update_summary", batch=True)
+def handle_summary_updates(payloads: list[dict]) -> list:
+    """Fold sent exchanges into each user's journey summary.
+
+    Users are loaded in one query, and all of a user's exchanges in the batch
+    are summarized in one LLM call and saved in one write, dated by the
+    latest. A user's jobs share the outcome.
+    """
+    users = {u["id"]: u for u in db.get_users_by_ids(list({p["user_id"] for p in payloads}))}
+    by_user = {}
+    for payload in payloads:
+        by_user.setdefault(payload["user_id"], []).append(payload)
+
+    outcomes = {}
+    for user_id, exchanges in by_user.items():
+        user = users.get(user_id)
+        if not user:
+            outcomes[user_id] = None
+            continue
+        if not deadline.allows(job_queue.POLICIES["update_summary"]["item_seconds"]):
+            outcomes[user_id] = job_queue.DEFERRED
+            continue
+        latest = exchanges[-1]
+        try:
+            summary_update = openai_service.generate_summary_update(
+                current_summary=user.get("summary", ""),
+                user_message=latest["user_message"],
+                coach_response=latest["coach_response"],
+                earlier_exchanges=[(p["user_message"], p["coach_response"]) for p in exchanges[:-1]],
+            )
+            current_summary = user.get("summary") or ""
+            new_summary = f"{current_summary}\n\n{latest['sent_on']}: {summary_update}".strip()
+            db.update_user(user_id, {"summary": new_summary})
+            outcomes[user_id] = True
+        except Exception as e:
+            logger.error(f"Failed to update summary for user {user_id}: {e}")
+            outcomes[user_id] = e
+    return [outcomes[p["user_id"]] for p in payloads]
 
 
 def _send_error_alert(workflow_name: str, errors: list[str]):